@@ -22,9 +22,14 @@ import logging
 from datetime import datetime
 from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
-import requests
 from dotenv import load_dotenv
 
+from http_client import close_client
+from market_catalog import get_catalog, market_token_ids
+from order_book import get_book_store
+from metrics import cycle_histogram, queue_gauge, signal_histogram, start_metrics_server
+from lazy_imports import report_startup
+
 load_dotenv()
 
 # Configuration
@@ -33,6 +38,7 @@ CLOB_API = "https://clob.polymarket.com"
 SCAN_INTERVAL = 30  # seconds between full scans
 MIN_ARB_PERCENT = 0.5  # Minimum arbitrage opportunity in % (0.5% = $0.005 per $1)
 MIN_LIQUIDITY = 1000  # Minimum USD liquidity to consider
+BOOK_CHECK_SHARES = 100  # Size used to confirm a CLASSIC arb against the YES/NO order books
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 
 # Logging
@@ -61,6 +67,8 @@ class ArbOpportunity:
     volume_24h: float
     detected_at: str
     expires_at: str
+    book_total_price: Optional[float] = None  # YES + NO VWAP to buy BOOK_CHECK_SHARES of each
+    book_arb_percent: Optional[float] = None  # Executable edge from the books (None = not checked)
 
 @dataclass
 class ScanStats:
@@ -83,52 +91,22 @@ class ArbitrageScanner:
         self.stats = ScanStats()
         self.running = False
         self.cache_file = os.path.join(DATA_DIR, 'arbitrage_opportunities.json')
+        self.catalog = get_catalog()
+        self.cycle_timer = cycle_histogram("arbitrage")
+        self.signal_timer = signal_histogram("arbitrage")
         
         # Ensure data directory exists
         os.makedirs(DATA_DIR, exist_ok=True)
     
-    def fetch_all_markets(self) -> List[dict]:
-        """Fetch all active markets from Polymarket"""
-        all_markets = []
-        offset = 0
-        limit = 100
-        
-        while True:
-            try:
-                response = requests.get(
-                    f"{GAMMA_API}/markets",
-                    params={
-                        "closed": False,
-                        "active": True,
-                        "limit": limit,
-                        "offset": offset
-                    },
-                    timeout=30
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"API error: {response.status_code}")
-                    break
-                
-                markets = response.json()
-                if not markets:
-                    break
-                
-                all_markets.extend(markets)
-                offset += limit
-                
-                # Rate limiting
-                time.sleep(0.2)
-                
-                # Safety limit
-                if offset > 2000:
-                    break
-                    
-            except Exception as e:
-                logger.error(f"Fetch error: {e}")
-                break
+    async def fetch_all_markets(self) -> List[dict]:
+        """Active markets from the shared catalog (incremental refresh, warm start)"""
+        try:
+            await self.catalog.refresh()
+        except Exception as e:
+            logger.error(f"Catalog refresh error: {e}")
         
-        logger.info(f"📊 Fetched {len(all_markets)} active markets")
+        all_markets = self.catalog.all()
+        logger.info(f"📊 {len(all_markets)} active markets in catalog")
         return all_markets
     
     def analyze_market(self, market: dict) -> Optional[ArbOpportunity]:
@@ -209,25 +187,57 @@ class ArbitrageScanner:
             logger.debug(f"Analysis error for {market.get('question', 'unknown')}: {e}")
             return None
     
-    def scan(self) -> List[ArbOpportunity]:
+    async def confirm_with_books(self, opp: ArbOpportunity, market: dict):
+        """Price a CLASSIC arb at the VWAP of both order books instead of gamma's mids"""
+        tokens = market_token_ids(market)
+        if opp.arb_type != 'CLASSIC' or len(tokens) < 2:
+            return
+        store = get_book_store()
+        try:
+            # Throwaway books: candidates change every scan, the shared store must not grow with them
+            yes_book, no_book = await asyncio.gather(
+                store.fetch_snapshot(tokens[0], keep=False), store.fetch_snapshot(tokens[1], keep=False)
+            )
+        except Exception as e:
+            logger.debug(f"Book check failed for {opp.market_id}: {str(e)[:100]}")
+            return
+        if yes_book is None or no_book is None:
+            return
+        yes_vwap = yes_book.vwap_to_fill("BUY", BOOK_CHECK_SHARES)
+        no_vwap = no_book.vwap_to_fill("BUY", BOOK_CHECK_SHARES)
+        if yes_vwap is None or no_vwap is None:
+            opp.book_arb_percent = 0.0  # Not enough depth to fill both legs
+            return
+        opp.book_total_price = yes_vwap + no_vwap
+        opp.book_arb_percent = max(0.0, (1.0 - opp.book_total_price) * 100)
+    
+    async def scan(self) -> List[ArbOpportunity]:
         """Perform a full scan of all markets"""
         start_time = time.time()
         
         logger.info("🔍 Starting arbitrage scan...")
         
-        markets = self.fetch_all_markets()
+        markets = await self.fetch_all_markets()
         opportunities = []
         
-        for market in markets:
-            opp = self.analyze_market(market)
-            if opp:
-                opportunities.append(opp)
+        candidates = []
+        with self.signal_timer.time():
+            for market in markets:
+                opp = self.analyze_market(market)
+                if opp:
+                    opportunities.append(opp)
+                    candidates.append((opp, market))
+        queue_gauge("arbitrage", "book_checks").set(len(candidates))
+        
+        # Confirm candidates against the executable books (one /book per outcome)
+        await asyncio.gather(*(self.confirm_with_books(opp, market) for opp, market in candidates))
         
         # Sort by arbitrage percentage (best first)
         opportunities.sort(key=lambda x: x.arb_percent, reverse=True)
         
         # Update stats
         scan_duration = int((time.time() - start_time) * 1000)
+        self.cycle_timer.observe(time.time() - start_time)
         self.stats = ScanStats(
             markets_scanned=len(markets),
             opportunities_found=len(opportunities),
@@ -243,7 +253,8 @@ class ArbitrageScanner:
         if opportunities:
             logger.info(f"💰 Found {len(opportunities)} arbitrage opportunities!")
             for i, opp in enumerate(opportunities[:5]):
-                logger.info(f"  {i+1}. {opp.market_question[:50]}... | +{opp.arb_percent:.2f}% | ${opp.guaranteed_profit:.2f}/100")
+                book_edge = f" | book +{opp.book_arb_percent:.2f}%" if opp.book_arb_percent is not None else ""
+                logger.info(f"  {i+1}. {opp.market_question[:50]}... | +{opp.arb_percent:.2f}% | ${opp.guaranteed_profit:.2f}/100{book_edge}")
         else:
             logger.info("No arbitrage opportunities found in this scan.")
         
@@ -270,10 +281,12 @@ class ArbitrageScanner:
         logger.info(f"   Min Liquidity: ${MIN_LIQUIDITY}")
         logger.info(f"   Scan Interval: {SCAN_INTERVAL}s")
         logger.info("=" * 60)
+        start_metrics_server("arbitrage")
+        report_startup("arbitrage", logger)
         
         while self.running:
             try:
-                self.scan()
+                await self.scan()
                 
                 logger.info(f"⏳ Next scan in {SCAN_INTERVAL}s...")
                 await asyncio.sleep(SCAN_INTERVAL)
@@ -285,6 +298,7 @@ class ArbitrageScanner:
                 logger.error(f"Scan error: {e}")
                 await asyncio.sleep(5)
         
+        await close_client()
         self.stop()
     
     def stop(self):
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+PolygraalX End-to-End Benchmark
+===============================
+Runs real bot cycles against the offline stand-in (mock_polymarket_api.py)
+and reports throughput plus p50/p99 latency per stage.
+
+Bots driven:
+    mean_reversion  MeanReversionBot.run_cycle (market fetch -> candles -> signal -> execute)
+    arbitrage       ArbitrageScanner.scan (fetch -> analyze -> save)
+    whale           WhaleTrackerV4.run_production (trades -> profile -> dashboard)
+    price_updater   price_updater.update_cycle (store read -> price fetch -> row writes)
+
+Usage:
+    python scripts/benchmarks/e2e_bench.py --cycles 50 --latency-ms 20
+    python scripts/benchmarks/e2e_bench.py --bots arbitrage --markets 2000 --json out.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import market_catalog
+from http_client import get_client, close_client
+from mock_polymarket_api import StandInConfig, StandInServer, SPOT_PRICES
+
+ALL_BOTS = ("mean_reversion", "arbitrage", "whale", "price_updater")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# STAGE TIMING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class StageTimer:
+    """Collects wall-clock samples per named stage"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    def record(self, stage: str, seconds: float):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def wrap(self, owner, attr: str, stage: str):
+        """Replace owner.attr with a timed version (sync or async)"""
+        original = getattr(owner, attr)
+
+        if asyncio.iscoroutinefunction(original):
+            @functools.wraps(original)
+            async def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await original(*args, **kwargs)
+                finally:
+                    self.record(stage, time.perf_counter() - start)
+        else:
+            @functools.wraps(original)
+            def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    self.record(stage, time.perf_counter() - start)
+
+        setattr(owner, attr, timed)
+
+    def report(self) -> Dict[str, dict]:
+        summary = {}
+        for stage, values in self.samples.items():
+            ordered = sorted(values)
+            summary[stage] = {
+                "count": len(ordered),
+                "mean_ms": statistics.fmean(ordered) * 1000,
+                "p50_ms": _percentile(ordered, 50) * 1000,
+                "p99_ms": _percentile(ordered, 99) * 1000,
+            }
+        return summary
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+class SyntheticExchange:
+    """ccxt-shaped exchange returning deterministic tickers/candles (no network)"""
+
+    def __init__(self):
+        self.tick = 0
+
+    def fetch_ticker(self, symbol: str) -> dict:
+        base = SPOT_PRICES.get(symbol.split('/')[0], 1.0)
+        self.tick += 1
+        return {"symbol": symbol, "last": base * (1 + 0.001 * ((self.tick % 7) - 3))}
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since=None, limit: int = 30) -> list:
+        base = SPOT_PRICES.get(symbol.split('/')[0], 1.0)
+        now_ms = int(time.time() // 60 * 60_000)
+        first = now_ms - (limit - 1) * 60_000 if since is None else max(since // 60_000 * 60_000, 0)
+        rows = []
+        for ts in range(first, now_ms + 1, 60_000):
+            i = ts // 60_000 % 1000
+            price = base * (1 + 0.002 * ((i * 13 + self.tick) % 11 - 5) / 5)
+            rows.append([ts, price, price * 1.001, price * 0.999, price, 10.0 + i % 30])
+        rows = rows[:limit]
+        # Forming candle stretched to trigger the occasional signal
+        if rows and rows[-1][0] == now_ms:
+            rows[-1][4] = base * (0.985 if self.tick % 2 else 1.015)
+        return rows
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BOT DRIVERS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+async def bench_mean_reversion(cycles: int, workdir: Path, timer: StageTimer):
+    import mean_reversion_bot as mrb
+
+    bot = mrb.MeanReversionBot(initial_bankroll=1000.0)
+    bot.price_feed.exchange = SyntheticExchange()
+    bot.execution.signals_file = str(workdir / "mean_reversion_signals.json")
+    bot.market_selector.cache_duration = mrb.timedelta(0)  # Fetch every cycle
+
+    timer.wrap(bot.market_selector, "fetch_15min_markets", "mean_reversion.fetch_markets")
+    timer.wrap(bot.price_feed, "refresh", "mean_reversion.candles")
+    timer.wrap(bot.signal_generator, "generate_signal", "mean_reversion.signal")
+    timer.wrap(bot.execution, "execute_signal", "mean_reversion.execute")
+    timer.wrap(bot, "run_cycle", "mean_reversion.cycle")
+
+    for _ in range(cycles):
+        await bot.run_cycle()
+
+
+async def bench_arbitrage(cycles: int, workdir: Path, timer: StageTimer):
+    import arbitrage_scanner as arb
+
+    scanner = arb.ArbitrageScanner()
+    scanner.cache_file = str(workdir / "arbitrage_opportunities.json")
+
+    timer.wrap(scanner, "fetch_all_markets", "arbitrage.fetch_markets")
+    timer.wrap(scanner, "analyze_market", "arbitrage.analyze_market")
+    timer.wrap(scanner, "save_opportunities", "arbitrage.save")
+    timer.wrap(scanner, "scan", "arbitrage.cycle")
+
+    for _ in range(cycles):
+        await scanner.scan()
+
+
+async def bench_whale(cycles: int, workdir: Path, timer: StageTimer):
+    import whale_tracker_v4 as wt
+
+    wt.POLL_INTERVAL = 0
+    tracker = wt.WhaleTrackerV4()
+    tracker.http = get_client()
+
+    polls = {"n": 0, "start": None}
+    fetch = tracker.fetch_recent_trades
+
+    async def counted_fetch():
+        # One poll = one cycle; close the previous cycle's sample here
+        now = time.perf_counter()
+        if polls["start"] is not None:
+            timer.record("whale.cycle", now - polls["start"])
+        polls["start"] = now
+        polls["n"] += 1
+        if polls["n"] > cycles:
+            tracker.running = False
+            return []
+        return await fetch()
+
+    tracker.fetch_recent_trades = counted_fetch
+    timer.wrap(tracker, "fetch_recent_trades", "whale.fetch_trades")
+    timer.wrap(tracker, "process_trade", "whale.process_trade")
+    timer.wrap(tracker, "get_wallet_profile", "whale.wallet_profile")
+    timer.wrap(tracker, "send_transaction", "whale.send")
+
+    await tracker.run_production()
+    await tracker.log_pipeline.aclose()
+
+
+async def bench_price_updater(cycles: int, workdir: Path, timer: StageTimer, server: StandInServer,
+                              n_orders: int = 50):
+    import price_updater as pu
+
+    pu.DATA_DIR = workdir
+    pu.ORDERS_FILE = workdir / "server_paper_orders.json"
+    pu.PROFILES_FILE = workdir / "server_paper_profiles.json"
+    pu.store = None
+    pu.cache_ttl = 0  # Every cycle hits the network
+
+    now = datetime.now().isoformat()
+    orders = []
+    for i, market in enumerate(server.markets[:n_orders]):
+        token_id = json.loads(market["clobTokenIds"])[0]
+        orders.append({
+            "id": f"bench_{i}",
+            "marketId": token_id if i % 2 else market["conditionId"],
+            "marketTitle": market["question"],
+            "outcome": "YES",
+            "status": "OPEN",
+            "entryPrice": 0.5,
+            "amount": 10.0,
+            "shares": 20.0,
+            "createdAt": now,
+            "source": "BENCH",
+        })
+    pu.ORDERS_FILE.write_text(json.dumps(orders))
+    pu.PROFILES_FILE.write_text(json.dumps([{"id": "default", "isActive": True, "balance": 1000.0}]))
+
+    get_client().set_rate_limit(pu.POLYMARKET_API, 100000)
+    timer.wrap(pu, "read_orders", "price_updater.read_orders")
+    timer.wrap(pu, "fetch_market_price", "price_updater.fetch_price")
+    timer.wrap(pu, "write_orders", "price_updater.write_orders")
+    timer.wrap(pu, "update_cycle", "price_updater.cycle")
+
+    for _ in range(cycles):
+        await pu.update_cycle()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RUNNER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+async def run_bench(bots, cycles: int, stand_in: StandInConfig) -> dict:
+    """Start the stand-in, redirect the shared client and run every bot"""
+    timer = StageTimer()
+    results = {"config": {"cycles": cycles, "bots": list(bots), **vars(stand_in)}, "bots": {}}
+
+    async with StandInServer(stand_in) as server:
+        http = get_client()
+        http.set_base_url_overrides(server.url_overrides())
+        # Benchmarks measure the pipeline, not our own throttling
+        for upstream in server.url_overrides():
+            http.set_rate_limit(upstream, 100000)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            workdir = Path(tmp)
+            # Fresh catalog per run, persisted outside the real data dir
+            market_catalog._shared_catalog = market_catalog.MarketCatalog(
+                market_catalog.CatalogConfig(cache_file=str(workdir / "market_catalog.json"))
+            )
+            for bot in bots:
+                start = time.perf_counter()
+                requests_before = server.request_count
+                if bot == "mean_reversion":
+                    await bench_mean_reversion(cycles, workdir, timer)
+                elif bot == "arbitrage":
+                    await bench_arbitrage(cycles, workdir, timer)
+                elif bot == "whale":
+                    await bench_whale(cycles, workdir, timer)
+                elif bot == "price_updater":
+                    await bench_price_updater(cycles, workdir, timer, server)
+                elapsed = time.perf_counter() - start
+                results["bots"][bot] = {
+                    "elapsed_s": elapsed,
+                    "cycles_per_s": cycles / elapsed if elapsed else 0.0,
+                    "requests": server.request_count - requests_before,
+                }
+
+        http.set_base_url_overrides({})
+        await close_client()
+
+    results["stages"] = timer.report()
+    return results
+
+
+def print_report(results: dict):
+    print()
+    print("=" * 78)
+    print(f"{'BOT':<20}{'cycles/s':>12}{'requests':>12}{'elapsed s':>12}")
+    print("-" * 78)
+    for bot, stats in results["bots"].items():
+        print(f"{bot:<20}{stats['cycles_per_s']:>12.2f}{stats['requests']:>12}{stats['elapsed_s']:>12.2f}")
+    print()
+    print(f"{'STAGE':<36}{'count':>8}{'mean ms':>11}{'p50 ms':>11}{'p99 ms':>11}")
+    print("-" * 78)
+    for stage, stats in sorted(results["stages"].items()):
+        print(f"{stage:<36}{stats['count']:>8}{stats['mean_ms']:>11.3f}"
+              f"{stats['p50_ms']:>11.3f}{stats['p99_ms']:>11.3f}")
+    print("=" * 78)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end bot benchmark against the offline stand-in")
+    parser.add_argument("--bots", nargs="+", choices=ALL_BOTS, default=list(ALL_BOTS))
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--markets", type=int, default=500)
+    parser.add_argument("--trades", type=int, default=100)
+    parser.add_argument("--book-depth", type=int, default=20)
+    parser.add_argument("--fixtures", type=str, help="Replay payloads recorded by mock_polymarket_api.py --record")
+    parser.add_argument("--json", type=str, help="Write results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Keep bot logging")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    stand_in = StandInConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        n_markets=args.markets, n_trades=args.trades, book_depth=args.book_depth,
+        fixtures_dir=args.fixtures
+    )
+    # WhaleTrackerV4 prints every log line; keep the report readable
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(open(os.devnull, "w")))
+        results = asyncio.run(run_bench(args.bots, args.cycles, stand_in))
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Microbenchmarks
+==========================
+Times the strategy hot functions on seeded synthetic inputs (no network)
+and compares against a stored baseline to flag regressions.
+
+Cases (n = input size):
+    mr.z_score               SignalGenerator.calculate_z_score over n values
+    mr.volatility_spike      SignalGenerator.detect_volatility_spike over an n-candle window
+    mr.bollinger             SignalGenerator.calculate_bollinger_position, period n (window)
+    mr.rolling_zscore        RollingStats push + z-score x n values (1000-value window)
+    oracle.implied_prob      CryptoOracle.calculate_implied_probability x n
+    oracle.implied_batch     fair_value.implied_probabilities over an n-strike ladder
+    oracle.fair_value        CryptoOracle.monitor_fair_value with n history samples
+    oracle.position_pnl      Fixed-point mark-to-market P&L (manage_position math) x n positions
+    arb.analyze_market       ArbitrageScanner.analyze_market x n markets
+    pu.check_tp_sl           price_updater.check_tp_sl x n orders (no trigger)
+    pu.calculate_pnl         price_updater.calculate_pnl x n orders
+    pu.sync_balance          price_updater.sync_balance over a store of n orders
+    scraper.calculate_score  OracleScraper.calculate_score x n profiles
+    whale.calculate_tag      WhaleTrackerV4.calculate_tag x n profiles
+
+Results are ns per input item (best of the repeats), keyed "<case>[n]".
+
+Usage:
+    python scripts/benchmarks/micro_bench.py                     # 10 .. 1M, compare to baseline
+    python scripts/benchmarks/micro_bench.py --quick             # 10 .. 10k
+    python scripts/benchmarks/micro_bench.py --cases pu. arb.    # Case name prefixes
+    python scripts/benchmarks/micro_bench.py --save-baseline     # Record a new baseline
+    python scripts/benchmarks/micro_bench.py --threshold 0.5 --json out.json
+
+Exit status is 1 when a case is slower than baseline * (1 + threshold).
+Calls shorter than the noise floor (100 us per call, e.g. most n=10 cases)
+are printed but not checked: timer and cache noise dominates them.
+Baselines are machine specific: re-record after changing hosts.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+BASELINE_FILE = Path(__file__).with_name("micro_baseline.json")
+FULL_SIZES = (10, 1_000, 100_000, 1_000_000)
+QUICK_SIZES = (10, 1_000, 10_000)
+DEFAULT_THRESHOLD = 0.50  # 50% slower than baseline = regression (absorbs host noise)
+NOISE_FLOOR_NS = 100_000  # Calls under 100 us (baseline and current) are not checked
+SEED = 42
+
+# A case builds its input for size n and returns the function to time
+Case = Callable[[int], Callable[[], object]]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SYNTHETIC INPUTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _candles(n: int, rng: random.Random) -> list:
+    from mean_reversion_bot import Candle
+
+    start = datetime(2025, 1, 1)
+    price = 100_000.0
+    candles = []
+    for i in range(n):
+        close = price * (1 + rng.gauss(0, 0.002))
+        candles.append(Candle(
+            timestamp=start + timedelta(minutes=i), open=price,
+            high=max(price, close) * 1.001, low=min(price, close) * 0.999,
+            close=close, volume=rng.uniform(1, 50)
+        ))
+        price = close
+    return candles
+
+
+def _markets(n: int, rng: random.Random) -> List[dict]:
+    markets = []
+    for i in range(n):
+        yes = round(rng.uniform(0.05, 0.95), 3)
+        no = round(1 - yes + rng.uniform(-0.03, 0.03), 3)
+        markets.append({
+            "conditionId": f"0x{i:064x}",
+            "question": f"Synthetic market {i}?",
+            "slug": f"synthetic-{i}",
+            "outcomePrices": json.dumps([str(yes), str(no)]),
+            "liquidityNum": rng.choice((500, 5_000, 50_000)),
+            "volume24hr": rng.uniform(0, 100_000),
+        })
+    return markets
+
+
+def _orders(n: int, rng: random.Random, closed_share: float = 0.0) -> List[dict]:
+    orders = []
+    for i in range(n):
+        entry = rng.uniform(0.2, 0.8)
+        order = {
+            "id": f"bench_{i}",
+            "marketId": f"m{i % 500}",
+            "outcome": rng.choice(("YES", "NO")),
+            "status": "OPEN",
+            "entryPrice": entry,
+            # Inside the TP/SL band so check_tp_sl never mutates the input
+            "currentPrice": entry * (1 + rng.uniform(-0.04, 0.04)),
+            "amount": 10.0,
+            "shares": 10.0 / entry,
+            "tp1Percent": 50, "tp2Percent": 100, "stopLossPercent": -50,
+        }
+        if rng.random() < closed_share:
+            order.update(status="CLOSED", originalAmount=10.0,
+                         exitPrice=entry * rng.uniform(0.5, 1.5), pnl=rng.uniform(-5, 5))
+        orders.append(order)
+    return orders
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CASES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _signal_generator():
+    from mean_reversion_bot import PriceFeed, SignalGenerator
+    return SignalGenerator(PriceFeed())
+
+
+def case_z_score(n: int):
+    rng = random.Random(SEED)
+    generator = _signal_generator()
+    values = [rng.gauss(0, 1) for _ in range(n)]
+    return lambda: generator.calculate_z_score(values, 2.5)
+
+
+def _window(n: int):
+    from candle_ring import CandleWindow
+    return CandleWindow.from_candles(_candles(n, random.Random(SEED)))
+
+
+def case_volatility_spike(n: int):
+    generator = _signal_generator()
+    window = _window(n)
+    return lambda: generator.detect_volatility_spike(window)
+
+
+def case_bollinger(n: int):
+    generator = _signal_generator()
+    window = _window(n)
+    return lambda: generator.calculate_bollinger_position(window, period=n)
+
+
+def case_rolling_zscore(n: int):
+    from rolling_stats import RollingStats
+
+    rng = random.Random(SEED)
+    values = [rng.gauss(0, 1) for _ in range(n)]
+
+    def run():
+        stats = RollingStats(window=1000)
+        for x in values:
+            stats.zscore(x)
+            stats.push(x)
+    return run
+
+
+def _oracle():
+    from crypto_oracle_v1_prod import CryptoOracle, OracleConfig
+    return CryptoOracle(OracleConfig(private_key="0x" + "b" * 64, use_market_stream=False, log_file=""))
+
+
+def case_implied_probability(n: int):
+    rng = random.Random(SEED)
+    oracle = _oracle()
+    inputs = [(rng.uniform(80_000, 120_000), rng.choice((90_000, 100_000, 110_000)), rng.randint(0, 60))
+              for _ in range(n)]
+    calc = oracle.calculate_implied_probability
+
+    def run():
+        for spot, strike, days in inputs:
+            calc(spot, strike, days)
+    return run
+
+
+def case_implied_batch(n: int):
+    from fair_value import implied_probabilities
+
+    rng = random.Random(SEED)
+    spots = [rng.uniform(80_000, 120_000) for _ in range(n)]
+    strikes = [rng.choice((90_000, 100_000, 110_000)) for _ in range(n)]
+    days = [rng.randint(0, 60) for _ in range(n)]
+
+    def run():
+        implied_probabilities(spots, strikes, days)
+    return run
+
+
+def case_fair_value(n: int):
+    rng = random.Random(SEED)
+    oracle = _oracle()
+    oracle.config.price_history_max_samples = n
+
+    # Deterministic prices instead of CoinGecko / gamma
+    oracle.get_spot_price = lambda symbol="BTC/USDT": 100_000.0
+
+    async def poly_price(market_id, outcome="YES"):
+        return 0.55
+    oracle.get_poly_price = poly_price
+
+    # Samples spread over the last 4 minutes: the 5-minute baseline lookup
+    # falls back to the oldest sample (a bot that started less than 5 minutes ago)
+    from price_history import PriceHistory
+
+    now = time.time()
+    key = "bench_BTC/USDT"
+    oracle.price_history[key] = history = PriceHistory(n)
+    for i in range(n):
+        history.append(now - 240 * (n - i) / n, 100_000.0 * (1 + rng.gauss(0, 0.001)), 0.55 + rng.gauss(0, 0.01))
+
+    loop = asyncio.new_event_loop()
+    expiry = datetime.now() + timedelta(days=7)
+    return lambda: loop.run_until_complete(oracle.monitor_fair_value("bench", 100_000.0, expiry))
+
+
+def case_position_pnl(n: int):
+    from money import Micros
+
+    rng = random.Random(SEED)
+    positions = []
+    for _ in range(n):
+        cost = Micros.from_float(round(rng.uniform(10, 500), 2))
+        positions.append((cost, cost / Micros.from_float(round(rng.uniform(0.05, 0.95), 2))))  # (cost, shares)
+    marks = [rng.uniform(0.01, 0.99) for _ in range(n)]
+
+    def run():
+        for (cost, shares), mark in zip(positions, marks):
+            (shares * Micros.from_float(mark) - cost).ratio(cost)
+    return run
+
+
+def case_analyze_market(n: int):
+    from arbitrage_scanner import ArbitrageScanner
+
+    scanner = ArbitrageScanner()
+    markets = _markets(n, random.Random(SEED))
+
+    def run():
+        for market in markets:
+            scanner.analyze_market(market)
+    return run
+
+
+def case_check_tp_sl(n: int):
+    import price_updater as pu
+
+    orders = _orders(n, random.Random(SEED))
+    profiles = [{"id": "bench", "isActive": True, "balance": 1000.0, "totalPnL": 0.0,
+                 "winningTrades": 0, "losingTrades": 0}]
+
+    def run():
+        for order in orders:
+            pu.check_tp_sl(order, profiles)
+    return run
+
+
+def case_calculate_pnl(n: int):
+    import price_updater as pu
+
+    orders = _orders(n, random.Random(SEED))
+
+    def run():
+        for order in orders:
+            pu.calculate_pnl(order)
+    return run
+
+
+_tmp_dirs: List[tempfile.TemporaryDirectory] = []
+
+
+def case_sync_balance(n: int):
+    import price_updater as pu
+    from paper_store import PaperStore, PaperStoreConfig
+
+    tmp = tempfile.TemporaryDirectory()
+    _tmp_dirs.append(tmp)
+    store = PaperStore(PaperStoreConfig(data_dir=tmp.name, json_mirror=False))
+    store.save_orders(_orders(n, random.Random(SEED), closed_share=0.7))
+    pu.store = store
+
+    profiles = [{"id": "bench", "isActive": True, "initialBalance": 1000.0, "balance": 1000.0}]
+
+    def run():
+        profiles[0]["balance"] = 1000.0  # Force the update branch every run
+        pu.sync_balance(profiles)
+    return run
+
+
+def case_calculate_score(n: int):
+    from oracle_scraper import OracleScraper, TraderProfile
+
+    rng = random.Random(SEED)
+    scraper = OracleScraper.__new__(OracleScraper)  # calculate_score needs no db/session
+    profiles = []
+    for i in range(n):
+        total = rng.randint(0, 300)
+        profiles.append(TraderProfile(
+            address=f"0x{i:040x}", total_pnl=rng.uniform(-50_000, 200_000),
+            win_rate=rng.random(), total_trades=total, crypto_trades=rng.randint(0, total)
+        ))
+
+    def run():
+        for profile in profiles:
+            scraper.calculate_score(profile)
+    return run
+
+
+def case_calculate_tag(n: int):
+    from whale_tracker_v4 import WhaleTrackerV4
+
+    rng = random.Random(SEED)
+    tracker = WhaleTrackerV4()
+    profiles = []
+    for _ in range(n):
+        count = rng.randint(0, 60)
+        smart = rng.randint(0, count)
+        dumb = rng.randint(0, count - smart)
+        profiles.append({
+            "trade_count": count, "volume": rng.uniform(0, 20_000),
+            "smart_trades": smart, "dumb_trades": dumb,
+            "smart_ratio": smart / count if count else 0, "dumb_ratio": dumb / count if count else 0,
+            "win_rate": rng.random(),
+        })
+
+    def run():
+        for profile in profiles:
+            tracker.calculate_tag(profile)
+    return run
+
+
+CASES: Dict[str, Case] = {
+    "mr.z_score": case_z_score,
+    "mr.volatility_spike": case_volatility_spike,
+    "mr.bollinger": case_bollinger,
+    "mr.rolling_zscore": case_rolling_zscore,
+    "oracle.implied_prob": case_implied_probability,
+    "oracle.implied_batch": case_implied_batch,
+    "oracle.fair_value": case_fair_value,
+    "oracle.position_pnl": case_position_pnl,
+    "arb.analyze_market": case_analyze_market,
+    "pu.check_tp_sl": case_check_tp_sl,
+    "pu.calculate_pnl": case_calculate_pnl,
+    "pu.sync_balance": case_sync_balance,
+    "scraper.calculate_score": case_calculate_score,
+    "whale.calculate_tag": case_calculate_tag,
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RUNNER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def time_call(fn: Callable[[], object], min_time: float = 0.2, max_repeats: int = 50) -> float:
+    """Best wall time of fn over repeats (at least 3, about min_time in total)"""
+    best = float("inf")
+    spent = 0.0
+    repeats = 0
+    while repeats < 3 or (spent < min_time and repeats < max_repeats):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+        repeats += 1
+    return best
+
+
+def run_cases(names: List[str], sizes: Tuple[int, ...], min_time: float = 0.2,
+              progress: Callable[[str, float], None] = None) -> Dict[str, float]:
+    """ns per item for every case x size, keyed '<case>[n]'"""
+    results = {}
+    for name in names:
+        for n in sizes:
+            fn = CASES[name](n)
+            ns_per_item = time_call(fn, min_time) / n * 1e9
+            key = f"{name}[{n}]"
+            results[key] = ns_per_item
+            if progress:
+                progress(key, ns_per_item)
+    return results
+
+
+def _size(key: str) -> int:
+    """'<case>[n]' -> n"""
+    return int(key.rsplit("[", 1)[1].rstrip("]"))
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float],
+            threshold: float = DEFAULT_THRESHOLD,
+            floor_ns: float = NOISE_FLOOR_NS) -> List[Tuple[str, float, float, float]]:
+    """(key, baseline ns, current ns, ratio) for every case slower than the threshold"""
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if not reference:
+            continue
+        if max(current, reference) * _size(key) < floor_ns:
+            continue  # Whole call too short to time reliably
+        ratio = current / reference
+        if ratio > 1 + threshold:
+            regressions.append((key, reference, current, ratio))
+    return regressions
+
+
+def load_baseline(path: Path) -> Dict[str, float]:
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(path: Path, results: Dict[str, float]):
+    """Merge results into the baseline file (other cases/sizes are kept)"""
+    data = {"results": load_baseline(path)}
+    data["results"].update(results)
+    data["results"] = dict(sorted(data["results"].items()))
+    data["machine"] = f"{platform.python_implementation()} {platform.python_version()} / {platform.machine()}"
+    data["recorded_at"] = datetime.now().isoformat(timespec="seconds")
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Strategy hot-function microbenchmarks")
+    parser.add_argument("--cases", nargs="+", default=[], help="Case name prefixes (default: all)")
+    parser.add_argument("--sizes", nargs="+", type=int, help=f"Input sizes (default: {FULL_SIZES})")
+    parser.add_argument("--quick", action="store_true", help=f"Sizes {QUICK_SIZES}")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds of repeats per case/size")
+    parser.add_argument("--baseline", type=str, default=str(BASELINE_FILE))
+    parser.add_argument("--save-baseline", action="store_true", help="Record results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--noise-floor", type=float, default=NOISE_FLOOR_NS / 1000,
+                        help="Microseconds per call below which a case is not checked")
+    parser.add_argument("--json", type=str, help="Write results to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    names = [name for name in CASES if not args.cases or any(name.startswith(p) for p in args.cases)]
+    sizes = tuple(args.sizes or (QUICK_SIZES if args.quick else FULL_SIZES))
+    baseline_path = Path(args.baseline)
+    baseline = load_baseline(baseline_path)
+
+    print(f"{'CASE':<36}{'ns/item':>14}{'baseline':>14}{'ratio':>9}")
+    print("-" * 73)
+
+    def progress(key: str, ns: float):
+        reference = baseline.get(key)
+        ratio = f"{ns / reference:>8.2f}x" if reference else f"{'-':>9}"
+        ref = f"{reference:>14.1f}" if reference else f"{'-':>14}"
+        print(f"{key:<36}{ns:>14.1f}{ref}{ratio}", flush=True)
+
+    results = run_cases(names, sizes, args.min_time, progress)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"sizes": sizes, "results": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+    if args.save_baseline:
+        save_baseline(baseline_path, results)
+        print(f"Baseline saved to {baseline_path}")
+        return
+
+    regressions = compare(results, baseline, args.threshold, args.noise_floor * 1000)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over +{args.threshold:.0%}:")
+        for key, reference, current, ratio in regressions:
+            print(f"   {key}: {reference:.1f} -> {current:.1f} ns/item ({ratio:.2f}x)")
+        sys.exit(1)
+    print(f"\n✅ No regression over +{args.threshold:.0%} (calls under {args.noise_floor:.0f} us not checked)"
+          if baseline else "\nNo baseline yet (--save-baseline)")
+
+
+if __name__ == "__main__":
+    main()
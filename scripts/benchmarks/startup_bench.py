@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Cold-Start Benchmark
+===============================
+Imports every bot entry point in a fresh interpreter and reports import
+time, peak RSS and whether a heavy dependency (ccxt, py_clob_client) was
+loaded at module level. Compared against a stored baseline, like
+micro_bench.py.
+
+A heavy dependency loaded at import is always a failure: those are
+lazy-loaded on first use (lazy_imports.py).
+
+Usage:
+    python scripts/benchmarks/startup_bench.py
+    python scripts/benchmarks/startup_bench.py --repeats 5 --save-baseline
+    python scripts/benchmarks/startup_bench.py --modules mean_reversion_bot --json out.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from micro_bench import compare, load_baseline, save_baseline
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+BASELINE_FILE = Path(__file__).with_name("startup_baseline.json")
+DEFAULT_THRESHOLD = 0.50
+
+ENTRY_POINTS = (
+    "mean_reversion_bot",
+    "crypto_oracle_v1_prod",
+    "trading_executor",
+    "price_updater",
+    "whale_tracker_v4",
+    "arbitrage_scanner",
+    "oracle_scraper",
+)
+HEAVY_MODULES = ("ccxt", "py_clob_client")
+
+_PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "import_s": elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def probe(module: str) -> dict:
+    """Import module in a fresh interpreter (cwd = scripts/) and return its cost"""
+    env = dict(os.environ, POLY_PRIVATE_KEY=os.getenv("POLY_PRIVATE_KEY", "0x" + "0" * 64))
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=SCRIPTS_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {result.stderr.strip()[-300:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(modules: List[str], repeats: int = 3) -> Dict[str, dict]:
+    """Median import time / RSS over repeats, plus heavy modules seen"""
+    report = {}
+    for module in modules:
+        runs = [probe(module) for _ in range(repeats)]
+        report[module] = {
+            "import_s": statistics.median(r["import_s"] for r in runs),
+            "rss_mb": statistics.median(r["rss_mb"] for r in runs),
+            "heavy": sorted({name for r in runs for name in r["heavy"]}),
+        }
+    return report
+
+
+def flatten(report: Dict[str, dict]) -> Dict[str, float]:
+    """Baseline keys: '<module>.import_s' and '<module>.rss_mb'"""
+    results = {}
+    for module, stats in report.items():
+        results[f"{module}.import_s"] = stats["import_s"]
+        results[f"{module}.rss_mb"] = stats["rss_mb"]
+    return results
+
+
+def _fmt(value, spec: str) -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time per bot entry point")
+    parser.add_argument("--modules", nargs="+", default=list(ENTRY_POINTS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--baseline", type=str, default=str(BASELINE_FILE))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--json", type=str, help="Write results to this file")
+    args = parser.parse_args()
+
+    baseline_path = Path(args.baseline)
+    baseline = load_baseline(baseline_path)
+    report = measure(args.modules, args.repeats)
+    results = flatten(report)
+
+    print(f"{'ENTRY POINT':<26}{'import s':>10}{'base s':>9}{'RSS MB':>9}{'base MB':>9}  heavy deps")
+    print("-" * 78)
+    for module, stats in report.items():
+        base_s = _fmt(baseline.get(f"{module}.import_s"), ".3f")
+        base_mb = _fmt(baseline.get(f"{module}.rss_mb"), ".1f")
+        print(f"{module:<26}{stats['import_s']:>10.3f}{base_s:>9}{stats['rss_mb']:>9.1f}{base_mb:>9}"
+              f"  {', '.join(stats['heavy']) or '-'}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.json}")
+
+    eager = {module: stats["heavy"] for module, stats in report.items() if stats["heavy"]}
+    if args.save_baseline and not eager:
+        save_baseline(baseline_path, results)
+        print(f"Baseline saved to {baseline_path}")
+        return
+
+    failed = False
+    for module, heavy in eager.items():
+        print(f"❌ {module} imports {', '.join(heavy)} at module load (use lazy_imports.lazy_import)")
+        failed = True
+    regressions = compare(results, baseline, args.threshold)
+    for key, reference, current, ratio in regressions:
+        print(f"❌ {key}: {reference:.3f} -> {current:.3f} ({ratio:.2f}x)")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print(f"\n✅ No cold-start regression over +{args.threshold:.0%}" if baseline
+          else "\nNo baseline yet (--save-baseline)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Candle Ring
+======================
+Columnar OHLCV history for one symbol: a preallocated float64 block with
+one row per field (ts, open, high, low, close, volume), replacing deques of
+Candle dataclasses.
+
+- 48 bytes per candle instead of a dataclass, a datetime and six floats
+  (~450 bytes), so hours of 1m history for 20+ symbols fit in a few MB
+- append / update in place: O(1). Rows are written after the live window;
+  when the block is full the last `capacity` candles move back to the front
+  (one copy every `slack` appends: amortized O(1))
+- window(n) is a zero-copy view of the last n candles, each column a
+  contiguous NumPy array for vectorized signal code. A view is only valid
+  until the next append: copy it to keep it
+- Open times (epoch ms) never decrease: find(ts) is a binary search
+
+Usage:
+    ring = CandleRing(capacity=240)               # 4h of 1m candles
+    ring.append(ts_ms, o, h, l, c, v)
+    ring.update(ring.find(ts_ms), o, h, l, c, v)  # Forming candle, in place
+    window = ring.window(30)                      # CandleWindow
+    window.close, window.change_pct, window.range_pct
+"""
+
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Field rows
+TS, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+FIELDS = ("ts", "open", "high", "low", "close", "volume")
+
+
+class CandleWindow:
+    """Last n candles as (6, n) float64 columns (views into a CandleRing)"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: np.ndarray):
+        self.data = data
+
+    @classmethod
+    def from_candles(cls, candles: Sequence) -> "CandleWindow":
+        """Columns from Candle-like objects (timestamp datetime, open, high, low, close, volume)"""
+        data = np.empty((6, len(candles)))
+        data[TS] = [c.timestamp.timestamp() * 1000 for c in candles]
+        data[OPEN] = [c.open for c in candles]
+        data[HIGH] = [c.high for c in candles]
+        data[LOW] = [c.low for c in candles]
+        data[CLOSE] = [c.close for c in candles]
+        data[VOLUME] = [c.volume for c in candles]
+        return cls(data)
+
+    def __len__(self) -> int:
+        return self.data.shape[1]
+
+    def __getitem__(self, index: slice) -> "CandleWindow":
+        return CandleWindow(self.data[:, index])
+
+    @property
+    def ts(self) -> np.ndarray:
+        return self.data[TS]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.data[OPEN]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.data[HIGH]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.data[LOW]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.data[CLOSE]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.data[VOLUME]
+
+    @property
+    def change_pct(self) -> np.ndarray:
+        """Open to close change in percent, 0 where open is 0 (as Candle.change_pct)"""
+        opens = self.data[OPEN]
+        out = np.zeros(opens.shape)
+        np.divide(self.data[CLOSE] - opens, opens, out=out, where=opens != 0)
+        return out * 100
+
+    @property
+    def range_pct(self) -> np.ndarray:
+        """High-low range in percent of low, 0 where low is 0 (as Candle.range_pct)"""
+        lows = self.data[LOW]
+        out = np.zeros(lows.shape)
+        np.divide(self.data[HIGH] - lows, lows, out=out, where=lows != 0)
+        return out * 100
+
+    def change_pct_at(self, i: int) -> float:
+        """change_pct of one candle, without computing the column"""
+        o = float(self.data[OPEN, i])
+        return 0.0 if o == 0 else (float(self.data[CLOSE, i]) - o) / o * 100
+
+    def rows(self) -> List[list]:
+        """[ts, open, high, low, close, volume] per candle, oldest first"""
+        return self.data.T.tolist()
+
+
+class CandleRing:
+    """Fixed-capacity columnar candle history with zero-copy windows"""
+
+    __slots__ = ("capacity", "_data", "_start", "_end")
+
+    def __init__(self, capacity: int, slack: int = None):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros((6, capacity + max(slack or capacity, 1)))
+        self._start = 0  # Column of the oldest candle
+        self._end = 0  # Column after the newest candle
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    # ─── Writes ────────────────────────────────────────────────────────────────
+
+    def _make_room(self):
+        if self._end - self._start == self.capacity:
+            self._start += 1  # Drop the oldest
+        if self._end == self._data.shape[1]:
+            size = self._end - self._start
+            self._data[:, :size] = self._data[:, self._start:self._end]
+            self._start, self._end = 0, size
+
+    def append(self, ts: float, open: float, high: float, low: float, close: float, volume: float):
+        """Add the newest candle (ts must not be older than the last one)"""
+        self._make_room()
+        column = self._data[:, self._end]
+        column[TS], column[OPEN], column[HIGH], column[LOW], column[CLOSE], column[VOLUME] = \
+            ts, open, high, low, close, volume
+        self._end += 1
+
+    def extend(self, rows: Iterable[Sequence[float]]):
+        """Append [ts, open, high, low, close, volume] rows, oldest first"""
+        rows = np.asarray(list(rows), dtype=float).reshape(-1, 6)[-self.capacity:]
+        n = len(rows)
+        if n == 0:
+            return
+        overflow = len(self) + n - self.capacity
+        if overflow > 0:
+            self._start += overflow
+        if self._end + n > self._data.shape[1]:
+            size = self._end - self._start
+            self._data[:, :size] = self._data[:, self._start:self._end]
+            self._start, self._end = 0, size
+        self._data[:, self._end:self._end + n] = rows.T
+        self._end += n
+
+    def update(self, i: int, open: float, high: float, low: float, close: float, volume: float):
+        """Overwrite the prices / volume of candle i (negative = from the newest)"""
+        column = self._data[:, self._index(i)]
+        column[OPEN], column[HIGH], column[LOW], column[CLOSE], column[VOLUME] = open, high, low, close, volume
+
+    def clear(self):
+        self._start = self._end = 0
+
+    # ─── Reads ─────────────────────────────────────────────────────────────────
+
+    def _index(self, i: int) -> int:
+        size = self._end - self._start
+        if i < 0:
+            i += size
+        if not 0 <= i < size:
+            raise IndexError("candle index out of range")
+        return self._start + i
+
+    def timestamp(self, i: int) -> float:
+        """Open time (ms) of candle i (negative = from the newest)"""
+        return float(self._data[TS, self._index(i)])
+
+    @property
+    def last_ts(self) -> Optional[float]:
+        return float(self._data[TS, self._end - 1]) if self._end > self._start else None
+
+    def find(self, ts: float) -> Optional[int]:
+        """Index of the candle opened at ts, None if absent (binary search)"""
+        column = self._data[TS, self._start:self._end]
+        i = int(np.searchsorted(column, ts))
+        if i < len(column) and column[i] == ts:
+            return i
+        return None
+
+    def window(self, n: int = None) -> CandleWindow:
+        """Zero-copy view of the last n candles (all if None), valid until the next append"""
+        start = self._start if n is None else max(self._end - n, self._start)
+        return CandleWindow(self._data[:, start:self._end])
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Candle Stream
+========================
+1-minute OHLCV candles built locally from a trade stream, so the mean
+reversion signals run at candle close instead of on the next REST poll.
+
+- CandleAggregator: trades -> candles per symbol
+  - open / close follow trade time, so out-of-order trades inside a minute
+    don't corrupt them
+  - a minute closes at the first trade of a later minute, or once the clock
+    passes its end + allowed_lateness_ms (advance)
+  - minutes without trades become flat candles (open = high = low = close
+    = previous close, volume 0), like exchange klines
+  - a late trade for the last closed minute amends it ("amend" event);
+    older ones are dropped and counted
+  - a stream gap ("gap" event) tells the consumer to backfill over REST
+- BinanceTradeStream: aggTrade WebSocket source with reconnect + backoff,
+  closes candles on the clock between trades
+- replay_trades: feeds recorded trades (JSON lines) as a local stand-in
+
+Events: listener(event, symbol, bar) with event "close", "amend" or "gap"
+(bar is None for gaps). The first bar of a symbol, and the first after a
+gap, is flagged partial: the stream started in the middle of its minute.
+
+Usage:
+    aggregator = CandleAggregator()
+    aggregator.add_listener(lambda event, symbol, bar: ...)
+    aggregator.add_trade("BTC/USDT", 97000.5, 0.01, ts_ms)
+    aggregator.advance(now_ms)                          # Clock-driven closes
+    stream = BinanceTradeStream(aggregator, ["BTC/USDT"]); await stream.start()
+    python candle_stream.py --symbols BTC/USDT ETH/USDT     # Print closes live
+    python candle_stream.py --replay trades.jsonl           # {"symbol", "price", "size", "ts"} lines
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import aiohttp
+
+from http_client import get_client
+
+logger = logging.getLogger("CandleStream")
+
+BINANCE_WS_URL = "wss://stream.binance.com:9443/stream"
+
+# Events
+CLOSE = "close"
+AMEND = "amend"
+GAP = "gap"
+
+
+class Bar:
+    """Candle under construction (open time in ms)"""
+
+    __slots__ = ("symbol", "ts", "open", "high", "low", "close", "volume", "trades",
+                 "first_ts", "last_ts", "partial")
+
+    def __init__(self, symbol: str, ts: int, price: float, volume: float = 0.0, trades: int = 0,
+                 trade_ts: int = None, partial: bool = False):
+        self.symbol = symbol
+        self.ts = ts
+        self.open = self.high = self.low = self.close = price
+        self.volume = volume
+        self.trades = trades
+        self.first_ts = self.last_ts = ts if trade_ts is None else trade_ts
+        self.partial = partial
+
+    def update(self, price: float, size: float, trade_ts: int):
+        if self.trades == 0:  # Flat bar: the first trade sets every price
+            self.open = self.high = self.low = self.close = price
+            self.first_ts = self.last_ts = trade_ts
+        else:
+            if price > self.high:
+                self.high = price
+            elif price < self.low:
+                self.low = price
+            if trade_ts < self.first_ts:
+                self.open, self.first_ts = price, trade_ts
+            if trade_ts >= self.last_ts:
+                self.close, self.last_ts = price, trade_ts
+        self.volume += size
+        self.trades += 1
+
+    def __repr__(self) -> str:
+        return (f"Bar({self.symbol} {self.ts} o={self.open} h={self.high} l={self.low} "
+                f"c={self.close} v={self.volume:g}{' partial' if self.partial else ''})")
+
+
+Listener = Callable[[str, str, Optional[Bar]], None]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# AGGREGATOR
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class CandleAggregator:
+    """Trades -> OHLCV candles, one forming bar per symbol"""
+
+    def __init__(self, timeframe_ms: int = 60_000, allowed_lateness_ms: int = 250, max_fill: int = 60):
+        self.timeframe_ms = timeframe_ms
+        self.allowed_lateness_ms = allowed_lateness_ms  # Clock wait for stragglers before closing
+        self.max_fill = max_fill  # More empty minutes than this in one go is reported as a gap
+        self.forming: Dict[str, Bar] = {}
+        self.last_closed: Dict[str, Bar] = {}
+        self._fresh: Set[str] = set()  # Symbols whose next bar starts mid-minute
+        self._listeners: List[Listener] = []
+
+        self.trades = 0
+        self.closes = 0
+        self.late_trades = 0  # Amended into the last closed minute
+        self.dropped_trades = 0  # Older than the last closed minute
+
+    def add_listener(self, callback: Listener):
+        """callback(event, symbol, bar) on every close / amend / gap"""
+        self._listeners.append(callback)
+
+    def _emit(self, event: str, symbol: str, bar: Optional[Bar]):
+        if event == CLOSE:
+            self.last_closed[symbol] = bar
+            self.closes += 1
+        for callback in self._listeners:
+            try:
+                callback(event, symbol, bar)
+            except Exception as e:
+                logger.error(f"❌ Candle listener error: {str(e)[:100]}")
+
+    # ─── Trades ────────────────────────────────────────────────────────────────
+
+    def add_trade(self, symbol: str, price: float, size: float, ts: int) -> Optional[Bar]:
+        """Aggregate one trade (ts in ms). Returns the bar it landed in, None if dropped."""
+        self.trades += 1
+        start = ts - ts % self.timeframe_ms
+        bar = self.forming.get(symbol)
+        if bar is not None:
+            if start == bar.ts:
+                bar.update(price, size, ts)
+                return bar
+            if start < bar.ts:
+                return self._late(symbol, start, price, size, ts)
+            # First trade of a later minute closes the forming one
+            del self.forming[symbol]
+            self._emit(CLOSE, symbol, bar)
+            self._fill(symbol, bar, start)
+        else:
+            last = self.last_closed.get(symbol)
+            if last is not None:
+                if start <= last.ts:
+                    return self._late(symbol, start, price, size, ts)
+                self._fill(symbol, last, start)
+
+        partial = symbol not in self.last_closed or symbol in self._fresh
+        self._fresh.discard(symbol)
+        bar = self.forming[symbol] = Bar(symbol, start, price, size, 1, ts, partial)
+        return bar
+
+    def _late(self, symbol: str, start: int, price: float, size: float, ts: int) -> Optional[Bar]:
+        last = self.last_closed.get(symbol)
+        if last is None or last.ts != start:
+            self.dropped_trades += 1
+            return None
+        last.update(price, size, ts)
+        self.late_trades += 1
+        self._emit(AMEND, symbol, last)
+        return last
+
+    def _fill(self, symbol: str, last: Bar, until: int):
+        """Flat candles for the empty minutes between last and until (exclusive)"""
+        missing = (until - last.ts) // self.timeframe_ms - 1
+        if missing <= 0:
+            return
+        if missing > self.max_fill:
+            logger.warning(f"⚠️ {symbol}: {missing} minutes without trades, reporting a gap")
+            self.last_closed.pop(symbol, None)
+            self._emit(GAP, symbol, None)
+            return
+        for _ in range(missing):
+            last = Bar(symbol, last.ts + self.timeframe_ms, last.close)
+            self._emit(CLOSE, symbol, last)
+
+    # ─── Clock ─────────────────────────────────────────────────────────────────
+
+    def advance(self, now_ms: int):
+        """Close every minute that ended more than allowed_lateness_ms before now"""
+        cutoff = now_ms - self.allowed_lateness_ms
+        tf = self.timeframe_ms
+        for symbol in list(self.forming):
+            bar = self.forming[symbol]
+            if bar.ts + tf <= cutoff:
+                del self.forming[symbol]
+                self._emit(CLOSE, symbol, bar)
+        for symbol, last in list(self.last_closed.items()):
+            if symbol not in self.forming and last.ts + 2 * tf <= cutoff:
+                self._fill(symbol, last, cutoff - cutoff % tf)
+
+    def next_deadline(self) -> Optional[int]:
+        """Clock time (ms) at which advance() will close something next"""
+        tf, lateness = self.timeframe_ms, self.allowed_lateness_ms
+        deadlines = [bar.ts + tf + lateness for bar in self.forming.values()]
+        deadlines += [last.ts + 2 * tf + lateness for symbol, last in self.last_closed.items()
+                      if symbol not in self.forming]
+        return min(deadlines) if deadlines else None
+
+    def mark_gap(self, symbol: str):
+        """Trades may have been missed (disconnect): drop the forming bar and report a gap"""
+        self.forming.pop(symbol, None)
+        self.last_closed.pop(symbol, None)
+        self._fresh.add(symbol)
+        self._emit(GAP, symbol, None)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SOURCES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class TradeStreamConfig:
+    """WebSocket connection settings"""
+    ws_url: str = BINANCE_WS_URL
+    silence_timeout: float = 30.0  # Reconnect if no trade for this long
+    reconnect_base: float = 0.5
+    reconnect_max: float = 30.0
+
+
+def _stream_name(symbol: str) -> str:
+    return symbol.replace("/", "").lower() + "@aggTrade"
+
+
+class BinanceTradeStream:
+    """Binance aggTrade subscriber feeding a CandleAggregator"""
+
+    def __init__(self, aggregator: CandleAggregator, symbols: Iterable[str], config: TradeStreamConfig = None):
+        self.aggregator = aggregator
+        self.symbols = list(symbols)
+        self.config = config or TradeStreamConfig()
+        self._by_exchange_symbol = {s.replace("/", "").upper(): s for s in self.symbols}
+
+        self.connected = False
+        self.reconnects = 0
+        self.messages = 0
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+    @property
+    def url(self) -> str:
+        return f"{self.config.ws_url}?streams={'/'.join(_stream_name(s) for s in self.symbols)}"
+
+    async def start(self):
+        """Run the connection loop in the background"""
+        if self._task and not self._task.done():
+            return
+        self._running = True
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        self.connected = False
+
+    async def run(self):
+        """Connect and consume; reconnect with backoff forever"""
+        http = get_client()
+        attempt = 0
+        while self._running:
+            try:
+                session = await http.session()
+                async with session.ws_connect(http.resolve(self.url), heartbeat=20) as ws:
+                    self.connected = True
+                    attempt = 0
+                    logger.info(f"🔌 Trade stream connected ({', '.join(self.symbols)})")
+                    await self._consume(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Trade stream error: {str(e)[:100] or type(e).__name__}")
+            finally:
+                if self.connected:
+                    self.connected = False
+                    for symbol in self.symbols:
+                        self.aggregator.mark_gap(symbol)
+
+            if not self._running:
+                break
+            delay = min(self.config.reconnect_base * (2 ** attempt), self.config.reconnect_max)
+            delay *= 0.5 + random.random() / 2
+            attempt += 1
+            self.reconnects += 1
+            logger.info(f"🔄 Trade stream reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _consume(self, ws: aiohttp.ClientWebSocketResponse):
+        aggregator = self.aggregator
+        last_message = time.monotonic()
+        while self._running:
+            # Wake up at the next candle close even when no trade arrives
+            deadline = aggregator.next_deadline()
+            timeout = self.config.silence_timeout
+            if deadline is not None:
+                timeout = min(timeout, max(deadline / 1000 - time.time(), 0.0) + 0.001)
+            try:
+                msg = await ws.receive(timeout=timeout)
+            except asyncio.TimeoutError:
+                msg = None
+
+            now = time.monotonic()
+            aggregator.advance(int(time.time() * 1000))
+            if msg is None:
+                if now - last_message > self.config.silence_timeout:
+                    logger.warning("⚠️ Trade stream silent, reconnecting")
+                    return
+                continue
+            if msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.CLOSING,
+                            aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.ERROR):
+                return
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
+
+            last_message = now
+            try:
+                payload = json.loads(msg.data)
+            except ValueError:
+                continue
+            self.messages += 1
+            self.handle_trade(payload.get("data", payload))
+
+    def handle_trade(self, trade: dict) -> Optional[Bar]:
+        """One aggTrade event: {"s": "BTCUSDT", "p": "97000.5", "q": "0.01", "T": ms}"""
+        symbol = self._by_exchange_symbol.get(str(trade.get("s", "")).upper())
+        if symbol is None:
+            return None
+        try:
+            return self.aggregator.add_trade(symbol, float(trade["p"]), float(trade["q"]), int(trade["T"]))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+def load_trades(path: str) -> List[dict]:
+    """Recorded trades, one {"symbol", "price", "size", "ts"} JSON object per line"""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def replay_trades(aggregator: CandleAggregator, trades: Iterable[dict], speed: float = 0.0,
+                        flush: bool = True) -> int:
+    """
+    Feed recorded trades into an aggregator, the trade timestamps driving
+    the clock. speed > 0 paces the replay (1.0 = real time), 0 = as fast as
+    possible. flush closes the last minutes at the end. Returns the count.
+    """
+    count, last_ts = 0, None
+    for trade in trades:
+        ts = int(trade["ts"])
+        if speed > 0 and last_ts is not None and ts > last_ts:
+            await asyncio.sleep((ts - last_ts) / 1000 / speed)
+        aggregator.add_trade(trade["symbol"], float(trade["price"]), float(trade.get("size", 0.0)), ts)
+        aggregator.advance(ts)
+        last_ts = ts if last_ts is None else max(last_ts, ts)
+        count += 1
+        if count % 1000 == 0:
+            await asyncio.sleep(0)  # Let consumers run
+    if flush and last_ts is not None:
+        aggregator.advance(last_ts - last_ts % aggregator.timeframe_ms
+                           + aggregator.timeframe_ms + aggregator.allowed_lateness_ms)
+    return count
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENTRY POINT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(description="1m candles from a trade stream")
+    parser.add_argument("--symbols", nargs="*", default=["BTC/USDT", "ETH/USDT"])
+    parser.add_argument("--replay", type=str, default=None, help="JSON-lines trade file instead of the WebSocket")
+    parser.add_argument("--speed", type=float, default=0.0, help="Replay pace (1.0 = real time, 0 = max)")
+    parser.add_argument("--ws-url", type=str, default=BINANCE_WS_URL)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)s | %(message)s', datefmt='%H:%M:%S')
+
+    aggregator = CandleAggregator()
+
+    def on_candle(event: str, symbol: str, bar: Optional[Bar]):
+        logger.info(f"🕯️ {event} {symbol} {bar if bar is not None else ''}")
+    aggregator.add_listener(on_candle)
+
+    async def serve():
+        if args.replay:
+            count = await replay_trades(aggregator, load_trades(args.replay), speed=args.speed)
+            logger.info(f"📊 {count} trades | {aggregator.closes} closes | {aggregator.late_trades} late | "
+                        f"{aggregator.dropped_trades} dropped")
+            return
+        stream = BinanceTradeStream(aggregator, args.symbols, TradeStreamConfig(ws_url=args.ws_url))
+        await stream.start()
+        try:
+            while True:
+                await asyncio.sleep(60)
+                logger.info(f"📊 {stream.messages} trades | {aggregator.closes} closes | "
+                            f"{stream.reconnects} reconnects")
+        finally:
+            await stream.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+PolygraalX CLOB Market-Data Stream
+==================================
+asyncio subscriber for the Polymarket CLOB "market" WebSocket channel.
+Keeps live top-of-book and last trade per token so bots stop polling
+/book and gamma for prices. Full L2 depth is maintained in the shared
+OrderBookStore (order_book.py).
+
+- book / price_change / last_trade_price / tick_size_change events
+- Books flagged by a hash mismatch are resynced from a /book snapshot
+- Automatic reconnect (exponential backoff + jitter), resubscribes every
+  tracked token after each reconnect
+- PING keepalive, reconnect when the feed goes silent
+- Dynamic subscribe/unsubscribe while connected
+
+Consumers:
+    In-process:  stream = get_stream(); await stream.start(); stream.subscribe([...])
+                 stream.mid(token_id), stream.add_listener(cb), await stream.wait_for_update()
+                 stream.book(token_id).vwap_to_fill("BUY", 100)
+    Fan-out:     python clob_ws.py --fanout-port 8899 --tokens <id> ...
+                 async for update in read_fanout(port=8899, token_ids=[...]): ...
+                 (JSON lines over a local TCP socket, one line per top-of-book change)
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Set
+
+import aiohttp
+
+from http_client import get_client
+from order_book import OrderBook, OrderBookStore, get_book_store
+
+logger = logging.getLogger("ClobStream")
+
+CLOB_WS_URL = "wss://ws-subscriptions-clob.polymarket.com/ws/market"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class StreamConfig:
+    """WebSocket connection and fan-out settings"""
+    ws_url: str = CLOB_WS_URL
+    ping_interval: float = 10.0  # CLOB expects a text PING every ~10s
+    silence_timeout: float = 30.0  # Reconnect if nothing received for this long
+    reconnect_base: float = 0.5
+    reconnect_max: float = 30.0
+    fanout_host: str = "127.0.0.1"
+    fanout_port: int = field(default_factory=lambda: int(os.getenv("CLOB_FANOUT_PORT", "0")))  # 0 = off
+
+
+@dataclass
+class TopOfBook:
+    """Live best bid/ask and last trade for one token"""
+    asset_id: str
+    market: str = ""
+    best_bid: Optional[float] = None
+    best_ask: Optional[float] = None
+    bid_size: float = 0.0
+    ask_size: float = 0.0
+    last_trade_price: Optional[float] = None
+    last_trade_size: float = 0.0
+    last_trade_side: str = ""
+    exchange_ts: int = 0  # ms, from the event
+    updated_at: float = 0.0  # Local receive time
+
+    @property
+    def mid(self) -> Optional[float]:
+        if self.best_bid is not None and self.best_ask is not None:
+            return (self.best_bid + self.best_ask) / 2
+        return self.last_trade_price
+
+    def age(self) -> float:
+        return time.time() - self.updated_at
+
+
+Listener = Callable[[str, TopOfBook, str], None]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# STREAM
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class ClobMarketStream:
+    """Self-healing subscriber to the CLOB market channel"""
+
+    def __init__(self, config: StreamConfig = None, store: OrderBookStore = None):
+        self.config = config or StreamConfig()
+        self.tokens: Set[str] = set()
+        self.books: Dict[str, TopOfBook] = {}
+        self.order_books = store or get_book_store()
+        self._resyncing: Set[str] = set()
+        self._background: Set[asyncio.Task] = set()  # Sends / resyncs, held until done
+        self._listeners: List[Listener] = []
+
+        self.connected = False
+        self.reconnects = 0
+        self.messages = 0
+        self.updated = asyncio.Event()
+
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._task: Optional[asyncio.Task] = None
+        self._fanout: Optional["FanoutServer"] = None
+        self._running = False
+
+    # ─── Public API ────────────────────────────────────────────────────────────
+
+    def subscribe(self, token_ids: Iterable[str]):
+        """Track more tokens (sent immediately if connected, else on connect)"""
+        new = {str(t) for t in token_ids if t} - self.tokens
+        if not new:
+            return
+        self.tokens |= new
+        self._send_nowait({"assets_ids": sorted(new), "operation": "subscribe"})
+
+    def unsubscribe(self, token_ids: Iterable[str]):
+        gone = {str(t) for t in token_ids} & self.tokens
+        if not gone:
+            return
+        self.tokens -= gone
+        for token in gone:
+            self.books.pop(token, None)
+            self.order_books.drop(token)
+        self._send_nowait({"assets_ids": sorted(gone), "operation": "unsubscribe"})
+
+    def set_tokens(self, token_ids: Iterable[str]):
+        """Make the subscription set exactly token_ids"""
+        wanted = {str(t) for t in token_ids if t}
+        self.unsubscribe(self.tokens - wanted)
+        self.subscribe(wanted)
+
+    def get(self, token_id: str) -> Optional[TopOfBook]:
+        return self.books.get(str(token_id))
+
+    def mid(self, token_id: str, max_age: float = None) -> Optional[float]:
+        """Live mid price, or None if unknown / disconnected / older than max_age"""
+        book = self.books.get(str(token_id))
+        if book is None or not self.connected:
+            return None
+        if max_age is not None and book.age() > max_age:
+            return None
+        return book.mid
+
+    def book(self, token_id: str) -> Optional[OrderBook]:
+        """Live L2 book of a tracked token, or None if unknown / disconnected"""
+        token_id = str(token_id)
+        if token_id not in self.tokens or not self.connected:
+            return None
+        return self.order_books.get(token_id)
+
+    def add_listener(self, callback: Listener):
+        """callback(token_id, top_of_book, event_type) on every top-of-book change"""
+        self._listeners.append(callback)
+
+    async def wait_for_update(self, timeout: float = None) -> bool:
+        """Wait until any tracked token changes. Returns False on timeout"""
+        try:
+            await asyncio.wait_for(self.updated.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.updated.clear()
+        return True
+
+    async def start(self):
+        """Run the connection loop (and fan-out server) in the background"""
+        if self._task and not self._task.done():
+            return
+        self.updated = asyncio.Event()  # Bind to the running loop
+        self._running = True
+        if self.config.fanout_port and self._fanout is None:
+            self._fanout = FanoutServer(self, self.config.fanout_host, self.config.fanout_port)
+            await self._fanout.start()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        self._running = False
+        if self._ws is not None and not self._ws.closed:
+            await self._ws.close()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        for task in list(self._background):
+            task.cancel()
+        if self._fanout:
+            await self._fanout.stop()
+            self._fanout = None
+        self.connected = False
+
+    # ─── Connection loop ───────────────────────────────────────────────────────
+
+    async def run(self):
+        """Connect, subscribe, consume; reconnect with backoff forever"""
+        http = get_client()
+        attempt = 0
+        while self._running:
+            url = http.resolve(self.config.ws_url)
+            try:
+                session = await http.session()
+                async with session.ws_connect(url, heartbeat=None, autoping=True) as ws:
+                    self._ws = ws
+                    self.connected = True
+                    attempt = 0
+                    logger.info(f"🔌 CLOB stream connected ({len(self.tokens)} tokens)")
+                    if self.tokens:
+                        await ws.send_json({"assets_ids": sorted(self.tokens), "type": "market"})
+                    await self._consume(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ CLOB stream error: {str(e)[:100] or type(e).__name__}")
+            finally:
+                self._ws = None
+                if self.connected:
+                    self._on_disconnect()
+
+            if not self._running:
+                break
+            delay = min(self.config.reconnect_base * (2 ** attempt), self.config.reconnect_max)
+            delay *= 0.5 + random.random() / 2
+            attempt += 1
+            self.reconnects += 1
+            logger.info(f"🔄 CLOB stream reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def _on_disconnect(self):
+        """
+        Stale books must not be served while disconnected, nor after the
+        reconnect until the first event: drop the L2 books and top of book
+        """
+        self.connected = False
+        for token in self.tokens:
+            self.order_books.drop(token)
+        self.books.clear()
+
+    async def _consume(self, ws: aiohttp.ClientWebSocketResponse):
+        last_ping = time.monotonic()
+        last_message = time.monotonic()
+        while self._running:
+            try:
+                msg = await ws.receive(timeout=self.config.ping_interval)
+            except asyncio.TimeoutError:
+                msg = None
+
+            now = time.monotonic()
+            if now - last_ping >= self.config.ping_interval:
+                await ws.send_str("PING")
+                last_ping = now
+
+            if msg is None:
+                if now - last_message > self.config.silence_timeout:
+                    logger.warning("⚠️ CLOB stream silent, reconnecting")
+                    return
+                continue
+            if msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.CLOSING,
+                            aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.ERROR):
+                return
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
+
+            last_message = now
+            if msg.data == "PONG":
+                continue
+            try:
+                payload = json.loads(msg.data)
+            except ValueError:
+                continue
+            self.messages += 1
+            for event in payload if isinstance(payload, list) else [payload]:
+                self.handle_event(event)
+
+    def _send_nowait(self, message: dict):
+        if self._ws is not None and not self._ws.closed:
+            self._spawn(self._ws.send_json(message), "WS send")
+
+    def _spawn(self, coro, what: str):
+        """Run coro in the background, holding the task until it is done"""
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(lambda done: self._background_done(done, what))
+
+    def _background_done(self, task: asyncio.Task, what: str):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"⚠️ {what} failed: {str(task.exception())[:100]}")
+
+    # ─── Event handling ────────────────────────────────────────────────────────
+
+    def handle_event(self, event: dict):
+        """Apply one market-channel event"""
+        event_type = event.get("event_type")
+        ts = int(event.get("timestamp") or 0)
+
+        if event_type == "book":
+            token = str(event.get("asset_id"))
+            if token not in self.tokens:
+                return
+            self.order_books.apply_event(event)
+            self._publish(token, event.get("market", ""), ts, event_type)
+
+        elif event_type == "price_change":
+            changes = event.get("price_changes")
+            if changes is None:
+                # Legacy format: one asset, list of level changes
+                changes = [dict(c, asset_id=event.get("asset_id"), hash=event.get("hash"))
+                           for c in event.get("changes", [])]
+            changes = [c for c in changes if str(c.get("asset_id")) in self.tokens]
+            if not changes:
+                return
+            self.order_books.apply_event({"event_type": event_type, "timestamp": ts, "price_changes": changes})
+            touched = {str(c.get("asset_id")): c for c in changes}
+            for token, change in touched.items():
+                self._publish(token, event.get("market", ""), ts, event_type, change)
+
+        elif event_type == "tick_size_change":
+            if str(event.get("asset_id")) in self.tokens:
+                self.order_books.apply_event(event)
+
+        elif event_type == "last_trade_price":
+            token = str(event.get("asset_id"))
+            if token not in self.tokens:
+                return
+            book = self.books.setdefault(token, TopOfBook(asset_id=token, market=event.get("market", "")))
+            book.last_trade_price = float(event["price"])
+            book.last_trade_size = float(event.get("size") or 0)
+            book.last_trade_side = event.get("side", "")
+            book.exchange_ts = ts or book.exchange_ts
+            book.updated_at = time.time()
+            self._notify(token, book, event_type)
+
+    def _publish(self, token: str, market: str, ts: int, event_type: str, change: dict = None):
+        order_book = self.order_books.get(token)
+        bid, bid_size, ask, ask_size = order_book.top() if order_book else (None, 0.0, None, 0.0)
+        if order_book and order_book.needs_resync:
+            self._schedule_resync(token)
+        # price_change events carry the authoritative top of book when present
+        if change and change.get("best_bid") not in (None, ""):
+            bid = float(change["best_bid"])
+        if change and change.get("best_ask") not in (None, ""):
+            ask = float(change["best_ask"])
+
+        book = self.books.setdefault(token, TopOfBook(asset_id=token))
+        book.market = market or book.market
+        book.best_bid, book.bid_size = bid, bid_size
+        book.best_ask, book.ask_size = ask, ask_size
+        book.exchange_ts = ts or book.exchange_ts
+        book.updated_at = time.time()
+        self._notify(token, book, event_type)
+
+    def _schedule_resync(self, token: str):
+        if token in self._resyncing or not self._running:
+            return
+        self._resyncing.add(token)
+
+        async def resync():
+            try:
+                await self.order_books.fetch_snapshot(token)
+                logger.info(f"🔁 Book {token[:12]}… resynced from /book")
+            except Exception as e:
+                logger.debug(f"Book resync failed: {str(e)[:100]}")
+            finally:
+                self._resyncing.discard(token)
+
+        self._spawn(resync(), "Book resync")
+
+    def _notify(self, token: str, book: TopOfBook, event_type: str):
+        self.updated.set()
+        for callback in self._listeners:
+            try:
+                callback(token, book, event_type)
+            except Exception as e:
+                logger.debug(f"Listener error: {str(e)[:100]}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LOCAL FAN-OUT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class FanoutServer:
+    """
+    Local TCP fan-out of top-of-book updates (JSON lines).
+    Clients may send {"subscribe": [token ids]} lines to add tokens to the
+    upstream subscription; they receive the current book for those tokens
+    immediately, then every change.
+    """
+
+    def __init__(self, stream: ClobMarketStream, host: str, port: int):
+        self.stream = stream
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._clients: Dict[asyncio.StreamWriter, Optional[Set[str]]] = {}
+        stream.add_listener(self._on_update)
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"📡 CLOB fan-out listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        for writer in list(self._clients):
+            writer.close()
+        self._clients.clear()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._clients[writer] = None  # None = every token
+        try:
+            while not reader.at_eof():
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    continue
+                tokens = [str(t) for t in request.get("subscribe", [])]
+                if tokens:
+                    wanted = self._clients.get(writer) or set()
+                    self._clients[writer] = wanted | set(tokens)
+                    self.stream.subscribe(tokens)
+                    for token in tokens:
+                        book = self.stream.get(token)
+                        if book:
+                            self._write(writer, token, book, "snapshot")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+
+    def _write(self, writer: asyncio.StreamWriter, token: str, book: TopOfBook, event_type: str):
+        line = json.dumps({"event": event_type, **asdict(book)}) + "\n"
+        try:
+            writer.write(line.encode())
+        except (ConnectionError, RuntimeError):
+            self._clients.pop(writer, None)
+
+    def _on_update(self, token: str, book: TopOfBook, event_type: str):
+        for writer, wanted in list(self._clients.items()):
+            if wanted is None or token in wanted:
+                self._write(writer, token, book, event_type)
+
+
+async def read_fanout(host: str = "127.0.0.1", port: int = 8899,
+                      token_ids: Iterable[str] = ()) -> AsyncIterator[dict]:
+    """Consume a FanoutServer from another process: yields top-of-book dicts"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        token_ids = list(token_ids)
+        if token_ids:
+            writer.write((json.dumps({"subscribe": token_ids}) + "\n").encode())
+            await writer.drain()
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            yield json.loads(line)
+    finally:
+        writer.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SHARED INSTANCE / ENTRY POINT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_shared_stream: Optional[ClobMarketStream] = None
+
+
+def get_stream() -> ClobMarketStream:
+    """Process-wide market stream"""
+    global _shared_stream
+    if _shared_stream is None:
+        _shared_stream = ClobMarketStream()
+    return _shared_stream
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLOB market stream with local fan-out")
+    parser.add_argument("--tokens", nargs="*", default=[], help="Token ids to subscribe at start")
+    parser.add_argument("--fanout-port", type=int, default=8899)
+    parser.add_argument("--ws-url", type=str, default=CLOB_WS_URL)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)s | %(message)s', datefmt='%H:%M:%S')
+
+    async def serve():
+        stream = ClobMarketStream(StreamConfig(ws_url=args.ws_url, fanout_port=args.fanout_port))
+        stream.subscribe(args.tokens)
+        await stream.start()
+        try:
+            while True:
+                await asyncio.sleep(60)
+                logger.info(f"📊 {len(stream.tokens)} tokens | {stream.messages} msgs | "
+                            f"{stream.reconnects} reconnects")
+        finally:
+            await stream.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
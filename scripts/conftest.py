@@ -0,0 +1,17 @@
+"""
+Shared pytest setup for the scripts/ test suites.
+
+Bot file logs go to a temporary directory instead of the working directory.
+Set before any bot module is imported: CRYPTO_ORACLE_LOG is read at import.
+"""
+
+import os
+import shutil
+import tempfile
+
+_LOG_DIR = tempfile.mkdtemp(prefix="polygraal-test-logs-")
+os.environ["CRYPTO_ORACLE_LOG"] = os.path.join(_LOG_DIR, "crypto_oracle.log")
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_LOG_DIR, ignore_errors=True)
@@ -28,6 +28,8 @@ import requests
 import numpy as np
 import pandas as pd
 
+from market_catalog import get_catalog
+
 # Optional imports with fallback
 try:
     import ccxt
@@ -166,6 +168,9 @@ class CryptoOracle:
         # Cache for smart wallet analysis
         self.smart_wallet_cache: Dict[str, List[str]] = {}
         
+        # Shared market catalog (incremental refresh, persisted for warm start)
+        self.catalog = get_catalog()
+        
     def _setup_logging(self) -> logging.Logger:
         """Setup logging configuration"""
         logger = logging.getLogger("CryptoOracle")
@@ -825,82 +830,72 @@ class CryptoOracle:
         
         print(f"\n🔍 Scanning for crypto markets...")
         
-        for keyword in keywords:
-            try:
-                response = requests.get(
-                    f"{self.config.gamma_api}/markets",
-                    params={
-                        "closed": False,
-                        "limit": 50,
-                        "active": True
-                    },
-                    timeout=15
-                )
-                
-                if response.status_code != 200:
-                    continue
+        # One pass over the shared catalog instead of one download per keyword
+        try:
+            self.catalog.refresh_sync()
+        except Exception as e:
+            self.logger.error(f"Error refreshing market catalog: {e}")
+        markets = self.catalog.search(any_of=keywords)
+        
+        try:
+            for market in markets:
+                question = market.get("question", "").lower()
+                description = market.get("description", "").lower()
+                slug = market.get("slug", "")
+                market_id = market.get("conditionId") or market.get("condition_id", "")
                 
-                markets = response.json()
+                # Check if it's a crypto price market
+                is_crypto = any(k in question or k in description for k in keywords)
+                is_price_market = any(word in question for word in ["price", "$", "above", "below", "hit", "reach"])
                 
-                for market in markets:
-                    question = market.get("question", "").lower()
-                    description = market.get("description", "").lower()
-                    slug = market.get("slug", "")
-                    market_id = market.get("conditionId") or market.get("condition_id", "")
+                if is_crypto and is_price_market and market_id not in seen_ids:
+                    seen_ids.add(market_id)
+                    
+                    # Determine which crypto
+                    if "bitcoin" in question or "btc" in question:
+                        symbol = "BTC/USDT"
+                    elif "ethereum" in question or "eth" in question:
+                        symbol = "ETH/USDT"
+                    elif "solana" in question or "sol" in question:
+                        symbol = "SOL/USDT"
+                    else:
+                        symbol = "BTC/USDT"
                     
-                    # Check if it's a crypto price market
-                    is_crypto = any(k in question or k in description for k in keywords)
-                    is_price_market = any(word in question for word in ["price", "$", "above", "below", "hit", "reach"])
+                    # Try to extract strike price from question
+                    import re
+                    price_match = re.search(r'\$?([\d,]+)k?', question.replace(",", ""))
+                    strike_price = 0
+                    if price_match:
+                        strike_str = price_match.group(1).replace(",", "")
+                        strike_price = float(strike_str)
+                        if "k" in question.lower():
+                            strike_price *= 1000
                     
-                    if is_crypto and is_price_market and market_id not in seen_ids:
-                        seen_ids.add(market_id)
-                        
-                        # Determine which crypto
-                        if "bitcoin" in question or "btc" in question:
-                            symbol = "BTC/USDT"
-                        elif "ethereum" in question or "eth" in question:
-                            symbol = "ETH/USDT"
-                        elif "solana" in question or "sol" in question:
-                            symbol = "SOL/USDT"
-                        else:
-                            symbol = "BTC/USDT"
-                        
-                        # Try to extract strike price from question
-                        import re
-                        price_match = re.search(r'\$?([\d,]+)k?', question.replace(",", ""))
-                        strike_price = 0
-                        if price_match:
-                            strike_str = price_match.group(1).replace(",", "")
-                            strike_price = float(strike_str)
-                            if "k" in question.lower():
-                                strike_price *= 1000
-                        
-                        # Get current prices - handle string or list format
-                        outcome_prices = market.get("outcomePrices", [])
+                    # Get current prices - handle string or list format
+                    outcome_prices = market.get("outcomePrices", [])
+                    yes_price = 0.5
+                    try:
+                        if isinstance(outcome_prices, str):
+                            import json
+                            outcome_prices = json.loads(outcome_prices)
+                        if outcome_prices and len(outcome_prices) > 0:
+                            yes_price = float(outcome_prices[0])
+                    except:
                         yes_price = 0.5
-                        try:
-                            if isinstance(outcome_prices, str):
-                                import json
-                                outcome_prices = json.loads(outcome_prices)
-                            if outcome_prices and len(outcome_prices) > 0:
-                                yes_price = float(outcome_prices[0])
-                        except:
-                            yes_price = 0.5
-                        
-                        found_markets.append({
-                            "market_id": market_id,
-                            "slug": slug,
-                            "question": market.get("question", ""),
-                            "symbol": symbol,
-                            "strike_price": strike_price,
-                            "yes_price": yes_price,
-                            "volume": market.get("volume", 0),
-                            "liquidity": market.get("liquidity", 0)
-                        })
-                        
-            except Exception as e:
-                self.logger.error(f"Error scanning for {keyword}: {e}")
-                continue
+                    
+                    found_markets.append({
+                        "market_id": market_id,
+                        "slug": slug,
+                        "question": market.get("question", ""),
+                        "symbol": symbol,
+                        "strike_price": strike_price,
+                        "yes_price": yes_price,
+                        "volume": market.get("volume", 0),
+                        "liquidity": market.get("liquidity", 0)
+                    })
+        
+        except Exception as e:
+            self.logger.error(f"Error scanning crypto markets: {e}")
         
         # Sort by volume
         found_markets.sort(key=lambda x: float(x.get("volume", 0) or 0), reverse=True)
@@ -16,36 +16,51 @@ PRODUCTION V1 - Optimized & Secured
 - No dead code (CLI removed)
 - Async API calls for 80% faster execution
 - Strict security validations
-- Memory-optimized with deque
-- USDC decimal precision (6 decimals)
+- Memory-optimized price history (typed-array ring buffer)
+- USDC decimal precision (6 decimals, fixed-point integer arithmetic)
 """
 
 import os
 import sys
+import json
 import time
 import asyncio
 import logging
-import math
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
-from decimal import Decimal, ROUND_DOWN
-from collections import deque
+from decimal import Decimal
 
-import aiohttp
 import requests
 
-# Polymarket CLOB client
-try:
-    from py_clob_client.client import ClobClient
-    from py_clob_client.clob_types import OrderArgs, OrderType
-    CLOB_AVAILABLE = True
-except ImportError:
-    CLOB_AVAILABLE = False
+from http_client import RateLimiter, get_client  # RateLimiter re-exported for callers/tests
+from clob_ws import ClobMarketStream, get_stream
+from lazy_imports import lazy_import, module_available, report_startup
+from log_pipeline import PipelineHandler
+from metrics import (cycle_histogram, order_histogram, queue_gauge, record_cache, signal_histogram,
+                     start_metrics_server)
+from fair_value import implied_probabilities, implied_probability
+from holder_state import HolderState
+from money import Micros
+from position_journal import DATA_DIR as JOURNAL_DIR, OP_COUNTERS, OP_HEDGE, OP_OPEN, JournalConfig, PositionJournal
+from price_history import PriceHistory
+from spot_prices import get_spot_service
+from wallet_index import DATA_DIR as WALLET_INDEX_DIR, WalletIndex, WalletIndexConfig
+
+# Polymarket CLOB client (imported when the client is built, not at module load)
+ClobClient = lazy_import("py_clob_client.client", "ClobClient")
+OrderArgs = lazy_import("py_clob_client.clob_types", "OrderArgs")
+OrderType = lazy_import("py_clob_client.clob_types", "OrderType")
+CLOB_AVAILABLE = module_available("py_clob_client")
+
+if not CLOB_AVAILABLE:
     print("[ERROR] py_clob_client not installed. Run: pip install py-clob-client")
     sys.exit(1)
 
+# File log location (CRYPTO_ORACLE_LOG, relative to the working directory by default)
+LOG_FILE = os.getenv("CRYPTO_ORACLE_LOG", "crypto_oracle.log")
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONFIGURATION
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -82,14 +97,28 @@ class OracleConfig:
     
     # Cache Settings
     smart_wallet_cache_ttl: int = 86400  # 24 hours in seconds
+    wallet_index_dir: Optional[str] = None  # Smart wallet index location (defaults to DATA_DIR)
+    journal_dir: Optional[str] = None  # Position journal location (defaults to DATA_DIR)
     price_history_max_age: int = 600  # 10 minutes in seconds
     price_history_max_samples: int = 120  # 10 min at 5s/sample
+    baseline_lookback: float = 300  # Overreaction baseline: sample from 5 min ago
     
     # Decimal Precision (Polygon/USDC = 6 decimals)
     usdc_decimals: int = 6
+    price_tick: float = 0.01  # CLOB order price tick
+    
+    # Logging
+    log_file: Optional[str] = None  # File log location (defaults to LOG_FILE, "" disables it)
     
     # Polling
     loop_interval: int = 10  # Check every 10 seconds
+    
+    # Per-cycle market pipeline
+    max_concurrent_markets: int = 5  # Markets analyzed at the same time
+    cycle_deadline: float = 30.0  # Markets still running after this are skipped until next cycle
+    
+    # Live prices from the CLOB WebSocket (gamma polling as fallback)
+    use_market_stream: bool = True
 
 
 class Bias(Enum):
@@ -107,6 +136,7 @@ class SentimentResult:
     total_yes_exposure: float
     total_no_exposure: float
     confidence: float
+    flipped: bool = False  # Bias differs from the previous result for this market
     
 
 @dataclass
@@ -127,48 +157,37 @@ class Position:
     market_id: str
     token_id: str
     outcome: str
-    entry_price: Decimal
-    current_price: Decimal
-    shares: Decimal
-    cost_basis: Decimal
+    entry_price: Micros
+    current_price: Micros
+    shares: Micros
+    cost_basis: Micros
     is_hedged: bool = False
-    hedge_amount: Decimal = Decimal("0")
+    hedge_amount: Micros = field(default_factory=Micros)
     entry_time: datetime = field(default_factory=datetime.now)
-
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# RATE LIMITER
-# ═══════════════════════════════════════════════════════════════════════════════
-
-class RateLimiter:
-    """Token bucket rate limiter"""
-    def __init__(self, max_requests: int, per_seconds: int = 1):
-        self.max_requests = max_requests
-        self.per_seconds = per_seconds
-        self.tokens = max_requests
-        self.last_update = time.time()
-        self.lock = asyncio.Lock()
-    
-    async def acquire(self):
-        """Acquire a token, waiting if necessary"""
-        async with self.lock:
-            now = time.time()
-            elapsed = now - self.last_update
-            
-            # Refill tokens
-            self.tokens = min(
-                self.max_requests,
-                self.tokens + elapsed * (self.max_requests / self.per_seconds)
-            )
-            self.last_update = now
-            
-            # Wait if no tokens available
-            if self.tokens < 1:
-                wait_time = (1 - self.tokens) / (self.max_requests / self.per_seconds)
-                await asyncio.sleep(wait_time)
-                self.tokens = 0
-            else:
-                self.tokens -= 1
+    order_id: Optional[str] = None  # GTC buy order
+    hedge_order_id: Optional[str] = None  # GTC hedge sell order
+    
+    def to_record(self) -> Dict:
+        """JSON-safe dict for the position journal (amounts as integer micros)"""
+        return {
+            "market_id": self.market_id, "token_id": self.token_id, "outcome": self.outcome,
+            "entry_price": self.entry_price.micros, "current_price": self.current_price.micros,
+            "shares": self.shares.micros, "cost_basis": self.cost_basis.micros,
+            "is_hedged": self.is_hedged, "hedge_amount": self.hedge_amount.micros,
+            "entry_time": self.entry_time.isoformat(),
+            "order_id": self.order_id, "hedge_order_id": self.hedge_order_id,
+        }
+    
+    @classmethod
+    def from_record(cls, record: Dict) -> "Position":
+        return cls(
+            market_id=record["market_id"], token_id=record["token_id"], outcome=record["outcome"],
+            entry_price=Micros(record["entry_price"]), current_price=Micros(record["current_price"]),
+            shares=Micros(record["shares"]), cost_basis=Micros(record["cost_basis"]),
+            is_hedged=record["is_hedged"], hedge_amount=Micros(record["hedge_amount"]),
+            entry_time=datetime.fromisoformat(record["entry_time"]),
+            order_id=record.get("order_id"), hedge_order_id=record.get("hedge_order_id"),
+        )
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -202,15 +221,39 @@ class CryptoOracle:
         
         # State
         self.positions: Dict[str, Position] = {}
-        self.price_history: Dict[str, deque] = {}  # market_id -> deque of price snapshots
+        self.price_history: Dict[str, PriceHistory] = {}  # "<market_id>_<symbol>" -> spot/poly samples
         self.daily_trades: int = 0
         self.last_trade_time: Optional[datetime] = None
+        self._orders_in_flight: Set[str] = set()  # Markets with a CLOB order being placed
         
         # Cache for smart wallet analysis with TTL
         self.smart_wallet_cache: Dict[str, Tuple[List[str], float]] = {}  # key -> (wallets, timestamp)
+        self._wallet_index: Optional[WalletIndex] = None
+        self._journal: Optional[PositionJournal] = None
+        self._smart_wallet_set: Tuple[Optional[List[str]], frozenset] = (None, frozenset())
+        
+        # Holder books for incremental sentiment, market slug -> state
+        self.holder_states: Dict[str, HolderState] = {}
+        
+        # Shared pooled HTTP client (keep-alive, retries, per-host rate limit)
+        self.http = get_client()
+        self.http.set_rate_limit(self.config.gamma_api, self.config.max_requests_per_second)
+        
+        # Order price tick (fixed-point)
+        self._price_tick = Micros.from_float(self.config.price_tick)
         
-        # Rate limiter
-        self.rate_limiter = RateLimiter(self.config.max_requests_per_second)
+        # Shared spot snapshot: one batched request per tick for all symbols
+        self.spot = get_spot_service()
+        
+        # CLOB market stream (started by run_loop), market_id -> YES token id
+        self.market_stream: Optional[ClobMarketStream] = None
+        self._market_tokens: Dict[str, str] = {}
+        
+        # Metrics
+        self.cycle_timer = cycle_histogram("crypto_oracle")
+        self.signal_timer = signal_histogram("crypto_oracle")
+        self.order_timer = order_histogram("crypto_oracle")
+        self.positions_gauge = queue_gauge("crypto_oracle", "open_positions")
     
     def _validate_environment(self):
         """Validate required environment variables - FAIL FAST"""
@@ -241,11 +284,14 @@ class CryptoOracle:
             logger.addHandler(handler)
             
             # File handler (INFO level for V1, WARNING for production later)
-            file_handler = logging.FileHandler("crypto_oracle.log")
-            file_handler.setFormatter(logging.Formatter(
-                '%(asctime)s | %(levelname)s | %(message)s'
-            ))
-            logger.addHandler(file_handler)
+            # Writes are batched by a pipeline thread, off the trading loop
+            log_file = LOG_FILE if self.config.log_file is None else self.config.log_file
+            if log_file:
+                file_handler = logging.FileHandler(log_file)
+                file_handler.setFormatter(logging.Formatter(
+                    '%(asctime)s | %(levelname)s | %(message)s'
+                ))
+                logger.addHandler(PipelineHandler(file_handler, bot="crypto_oracle"))
         
         return logger
 
@@ -263,54 +309,98 @@ class CryptoOracle:
     
     def _to_decimal(self, value: float) -> Decimal:
         """Convert float to Decimal with proper USDC precision (6 decimals)"""
-        return Decimal(str(value)).quantize(
-            Decimal('0.000001'),  # 6 decimals
-            rounding=ROUND_DOWN
-        )
+        return Micros.from_float(value).to_decimal()
     
-    def _calculate_shares(self, cost_usd: Decimal, price: Decimal) -> Decimal:
-        """Calculate shares with proper decimal precision"""
+    def _calculate_shares(self, cost_usd: Micros, price: Micros):
+        """Calculate shares with proper decimal precision (Micros in/out; Decimals accepted)"""
+        if isinstance(cost_usd, Decimal):
+            return self._calculate_shares(Micros.from_decimal(cost_usd), Micros.from_decimal(price)).to_decimal()
         if price <= 0:
-            return Decimal("0")
-        shares = cost_usd / price
-        return shares.quantize(Decimal('0.000001'), rounding=ROUND_DOWN)
+            return Micros()
+        return cost_usd / price
 
     # ═══════════════════════════════════════════════════════════════════════════
-    # PHASE 1: THESIS BUILDER (Smart Money Tracking)
+    # STATE JOURNAL (positions and counters survive restarts)
     # ═══════════════════════════════════════════════════════════════════════════
     
-    async def _fetch_with_rate_limit(
-        self, 
-        session: aiohttp.ClientSession, 
-        url: str, 
-        params: Dict = None
-    ) -> Optional[Dict]:
-        """Fetch URL with rate limiting"""
-        await self.rate_limiter.acquire()
+    @property
+    def journal(self) -> PositionJournal:
+        """Position journal (opened on first use)"""
+        if self._journal is None:
+            self._journal = PositionJournal(JournalConfig(
+                data_dir=self.config.journal_dir or JOURNAL_DIR))
+        return self._journal
+    
+    def restore_state(self) -> int:
+        """Reload positions and today's trade counters from the journal. Returns positions restored."""
+        try:
+            state = self.journal.recover()
+        except Exception as e:
+            self.logger.error(f"❌ Journal recovery failed: {str(e)[:100]}")
+            return 0
+        
+        self.positions = {
+            market_id: Position.from_record(record) for market_id, record in state["positions"].items()
+        }
+        if state.get("last_trade_time"):
+            self.last_trade_time = datetime.fromisoformat(state["last_trade_time"])
+        # Counters from a previous day don't carry over
+        if state.get("trade_day") == datetime.now().date().isoformat():
+            self.daily_trades = state.get("daily_trades", 0)
         
+        if self.positions:
+            self.logger.info(
+                f"♻️ Restored {len(self.positions)} positions "
+                f"({sum(p.is_hedged for p in self.positions.values())} hedged), "
+                f"{self.daily_trades} trades today"
+            )
+        return len(self.positions)
+    
+    def _journal_position(self, op: str, position: Position):
+        """Record a position change (never fails the trade that caused it)"""
         try:
-            async with session.get(
-                url, 
-                params=params, 
-                timeout=aiohttp.ClientTimeout(total=self.config.request_timeout)
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    self.logger.warning(f"API returned {response.status} for {url}")
-                    return None
-        except asyncio.TimeoutError:
-            self.logger.warning(f"Timeout fetching {url}")
-            return None
+            self.journal.append(op, market_id=position.market_id, position=position.to_record())
+        except Exception as e:
+            self.logger.error(f"❌ Journal write failed: {str(e)[:100]}")
+    
+    def _journal_counters(self):
+        try:
+            self.journal.append(
+                OP_COUNTERS, daily_trades=self.daily_trades,
+                last_trade_time=self.last_trade_time.isoformat() if self.last_trade_time else None,
+                trade_day=datetime.now().date().isoformat()
+            )
+        except Exception as e:
+            self.logger.error(f"❌ Journal write failed: {str(e)[:100]}")
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # PHASE 1: THESIS BUILDER (Smart Money Tracking)
+    # ═══════════════════════════════════════════════════════════════════════════
+    
+    async def _fetch_with_rate_limit(self, url: str, params: Dict = None) -> Optional[Dict]:
+        """Fetch URL through the shared client (rate limited per host)"""
+        try:
+            return await self.http.get_json(url, params=params, timeout=self.config.request_timeout)
         except Exception as e:
             self.logger.error(f"Error fetching {url}: {str(e)[:100]}")
             return None
     
+    @property
+    def wallet_index(self) -> WalletIndex:
+        """Persistent smart wallet index (opened on first use)"""
+        if self._wallet_index is None:
+            self._wallet_index = WalletIndex(WalletIndexConfig(
+                data_dir=self.config.wallet_index_dir or WALLET_INDEX_DIR))
+        return self._wallet_index
+    
     async def get_smart_wallets_async(self, min_profit: float = None) -> List[str]:
         """
         Identify smart wallets based on historical crypto market performance.
-        Uses async requests for 80% speed improvement.
         Returns cached results if within TTL.
+        
+        Realized PnL per wallet lives in the on-disk wallet index: a refresh
+        only fetches holders of markets that closed since the last one, and
+        a fresh index answers after a restart without any API call.
         """
         min_profit = min_profit or self.config.min_smart_wallet_profit
         cache_key = f"smart_wallets_{min_profit}"
@@ -320,81 +410,203 @@ class CryptoOracle:
             wallets, timestamp = self.smart_wallet_cache[cache_key]
             age = time.time() - timestamp
             if age < self.config.smart_wallet_cache_ttl:
+                record_cache("smart_wallets", True)
                 self.logger.info(f"📊 Using cached smart wallets ({age/3600:.1f}h old)")
                 return wallets
         
         try:
-            async with aiohttp.ClientSession() as session:
-                # Get all crypto-related markets
-                markets_data = await self._fetch_with_rate_limit(
-                    session,
-                    f"{self.config.gamma_api}/markets",
-                    params={"tag": "crypto", "closed": True, "limit": 100}
-                )
-                
-                if not markets_data:
-                    return []
-                
-                markets = markets_data if isinstance(markets_data, list) else [markets_data]
-                wallet_profits: Dict[str, float] = {}
-                
-                # Fetch holders in parallel (async)
-                tasks = []
-                for market in markets:
-                    market_id = market.get("condition_id") or market.get("conditionId")
-                    if market_id:
-                        tasks.append(self._fetch_market_holders(session, market_id))
-                
-                # Gather all results
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                # Process results
-                for holders_list in results:
-                    if isinstance(holders_list, Exception):
-                        continue
-                    if not holders_list:
-                        continue
-                    
-                    for holder in holders_list:
-                        addr = holder.get("address", "").lower()
-                        pnl = holder.get("realized_pnl", 0)
-                        if addr:
-                            wallet_profits[addr] = wallet_profits.get(addr, 0) + pnl
-                
-                # Filter for profitable wallets
-                smart_wallets = [
-                    addr for addr, profit in wallet_profits.items()
-                    if profit >= min_profit
-                ]
-                
-                # Cache results
-                self.smart_wallet_cache[cache_key] = (smart_wallets, time.time())
-                
-                self.logger.info(f"📊 Found {len(smart_wallets)} smart wallets (>{min_profit}$ profit)")
-                return smart_wallets
+            index = self.wallet_index
+            refreshed_at = index.last_refresh
+            fresh = time.time() - refreshed_at < self.config.smart_wallet_cache_ttl
+            record_cache("smart_wallets", fresh)
+            if not fresh and not await self._refresh_wallet_index(index):
+                # Refresh failed: serve the (stale) index without caching it
+                return index.smart_wallets(min_profit)
+            
+            smart_wallets = index.smart_wallets(min_profit)
+            self.smart_wallet_cache[cache_key] = (smart_wallets, refreshed_at if fresh else time.time())
+            
+            self.logger.info(f"📊 Found {len(smart_wallets)} smart wallets (>{min_profit}$ profit)")
+            return smart_wallets
                 
         except Exception as e:
             self.logger.error(f"Error fetching smart wallets: {str(e)[:200]}")
             return []
     
-    async def _fetch_market_holders(
-        self, 
-        session: aiohttp.ClientSession, 
-        market_id: str
-    ) -> Optional[List[Dict]]:
-        """Fetch holders for a specific market"""
+    async def _refresh_wallet_index(self, index: WalletIndex) -> bool:
+        """Count holders of newly closed crypto markets into the index. False if the API failed."""
+        # Get all crypto-related markets
+        markets_data = await self._fetch_with_rate_limit(
+            f"{self.config.gamma_api}/markets",
+            params={"tag": "crypto", "closed": True, "limit": 100}
+        )
+        if markets_data is None:
+            return False
+        
+        markets = markets_data if isinstance(markets_data, list) else [markets_data]
+        new_ids = index.new_markets(
+            market.get("condition_id") or market.get("conditionId") for market in markets
+        )
+        
+        # Fetch holders of new markets only, in parallel
+        results = await asyncio.gather(
+            *(self._fetch_market_holders(market_id) for market_id in new_ids),
+            return_exceptions=True
+        )
+        counted = 0
+        for market_id, holders_list in zip(new_ids, results):
+            # Failed fetches stay uncounted and are retried next refresh
+            if isinstance(holders_list, Exception) or holders_list is None:
+                continue
+            counted += index.add_market(market_id, holders_list)
+        
+        index.mark_refreshed()
+        self.logger.info(f"📇 Wallet index: {counted}/{len(new_ids)} new closed markets counted")
+        return True
+    
+    async def _fetch_market_holders(self, market_id: str) -> Optional[List[Dict]]:
+        """Fetch holders for a specific market (None if the request failed)"""
         url = f"{self.config.gamma_api}/markets/{market_id}/holders"
-        result = await self._fetch_with_rate_limit(session, url)
+        result = await self._fetch_with_rate_limit(url)
+        if result is None:
+            return None
         return result if isinstance(result, list) else []
     
+    def _as_smart_set(self, wallets: List[str]) -> frozenset:
+        """Same frozenset while the cached wallet list is unchanged (holder books skip the rescan)"""
+        cached_list, cached_set = self._smart_wallet_set
+        if wallets is not cached_list:
+            cached_set = frozenset(wallets)
+            self._smart_wallet_set = (wallets, cached_set)
+        return cached_set
+    
     def get_smart_wallets(self, min_profit: float = None) -> List[str]:
-        """Synchronous wrapper for get_smart_wallets_async"""
-        return asyncio.run(self.get_smart_wallets_async(min_profit))
+        """Synchronous wrapper for get_smart_wallets_async (outside an event loop only)"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.get_smart_wallets_async(min_profit))
+        raise RuntimeError("get_smart_wallets() called from a running loop: await get_smart_wallets_async()")
+    
+    def _score_holders(self, market_slug: str, holders: List[Dict], smart_wallets: Set[str]) -> SentimentResult:
+        """Smart money exposure of a market's holders -> SentimentResult (no I/O, no state kept)"""
+        state = HolderState()
+        state.apply_snapshot(holders, smart_wallets)
+        return self._sentiment_from_state(market_slug, state)
+    
+    def _sentiment_from_state(self, market_slug: str, state: HolderState) -> SentimentResult:
+        """SentimentResult from a holder book's running smart money totals: O(1)"""
+        total_yes = state.smart_yes
+        total_no = state.smart_no
+        smart_count = state.smart_count
+        
+        # Calculate sentiment score
+        total_exposure = total_yes + total_no
+        if total_exposure == 0:
+            score = 0
+            confidence = 0
+        else:
+            # Score from -1 to +1
+            score = (total_yes - total_no) / total_exposure
+            # Confidence based on smart wallet participation
+            confidence = min(1.0, smart_count / 10)  # Max confidence at 10+ smart wallets
+        
+        # Determine bias
+        if score > self.config.sentiment_threshold:
+            bias = Bias.BULLISH
+        elif score < -self.config.sentiment_threshold:
+            bias = Bias.BEARISH
+        else:
+            bias = Bias.NEUTRAL
+        
+        flipped = state.bias is not None and bias != state.bias
+        state.bias = bias
+        if flipped:
+            self.logger.info(
+                f"🔀 Smart bias flipped for {market_slug}: {bias.value} "
+                f"(Score: {score:.2f}, Smart Wallets: {smart_count})"
+            )
+        else:
+            self.logger.debug(
+                f"🧠 Sentiment for {market_slug}: {bias.value} "
+                f"(Score: {score:.2f}, Smart Wallets: {smart_count})"
+            )
+        
+        return SentimentResult(
+            bias=bias,
+            score=score,
+            smart_wallets_count=smart_count,
+            total_yes_exposure=total_yes,
+            total_no_exposure=total_no,
+            confidence=confidence,
+            flipped=flipped
+        )
+    
+    async def analyze_smart_sentiment_async(
+        self,
+        market_slug: str,
+        smart_wallets: Optional[Set[str]] = None
+    ) -> SentimentResult:
+        """
+        Async analyze_smart_sentiment on the shared HTTP session and rate limiter.
+        smart_wallets: already fetched set (fetched/cached here if None)
+        
+        Each market keeps a holder book (holder_states): the new holders list is
+        diffed against it and only changed holders move the smart money totals.
+        The slug -> market id lookup is done once per market.
+        """
+        # Sanitize input to prevent injection
+        market_slug = market_slug.strip().lower()[:100]
+        
+        try:
+            if smart_wallets is None:
+                smart_wallets = self._as_smart_set(await self.get_smart_wallets_async())
+            if not smart_wallets:
+                # Nobody to track: the score would be 0 anyway
+                return self._neutral_sentiment()
+            
+            state = self.holder_states.get(market_slug)
+            if state is None:
+                # Get market details
+                markets = await self._fetch_with_rate_limit(
+                    f"{self.config.gamma_api}/markets",
+                    params={"slug": market_slug}
+                )
+                if not markets:
+                    return self._neutral_sentiment()
+                
+                market = markets[0] if isinstance(markets, list) else markets
+                market_id = market.get("condition_id") or market.get("conditionId")
+                if not market_id:
+                    return self._neutral_sentiment()
+                state = self.holder_states[market_slug] = HolderState(market_id)
+            
+            # Get current holders
+            holders = await self._fetch_market_holders(state.market_id)
+            if not holders:
+                return self._neutral_sentiment()
+            
+            state.apply_snapshot(holders, smart_wallets)
+            return self._sentiment_from_state(market_slug, state)
+            
+        except Exception as e:
+            self.logger.error(f"Unexpected error analyzing sentiment: {str(e)[:100]}")
+            return self._neutral_sentiment()
+    
+    async def analyze_sentiments(self, market_slugs: List[str]) -> Dict[str, SentimentResult]:
+        """Sentiment for many markets in one gathered call (smart wallets fetched once)"""
+        smart_wallets = self._as_smart_set(await self.get_smart_wallets_async())
+        results = await asyncio.gather(*(
+            self.analyze_smart_sentiment_async(slug, smart_wallets) for slug in market_slugs
+        ))
+        return dict(zip(market_slugs, results))
     
     def analyze_smart_sentiment(self, market_slug: str) -> SentimentResult:
         """
         Analyze smart money sentiment for a specific market.
         Returns SentimentScore from -1 (ultra bearish) to +1 (ultra bullish).
+        Blocking version for scripts outside an event loop: inside the bot use
+        analyze_smart_sentiment_async / analyze_sentiments.
         """
         # Sanitize input to prevent injection
         market_slug = market_slug.strip().lower()[:100]
@@ -430,58 +642,7 @@ class CryptoOracle:
             if holders_resp.status_code != 200:
                 return self._neutral_sentiment()
             
-            holders = holders_resp.json()
-            
-            # Calculate smart money exposure
-            total_yes = 0
-            total_no = 0
-            smart_count = 0
-            
-            for holder in holders:
-                addr = holder.get("address", "").lower()
-                if addr in smart_wallets:
-                    smart_count += 1
-                    # Assume positive shares = YES, negative = NO
-                    shares = holder.get("shares", 0)
-                    if shares > 0:
-                        total_yes += abs(shares)
-                    else:
-                        total_no += abs(shares)
-            
-            # Calculate sentiment score
-            total_exposure = total_yes + total_no
-            if total_exposure == 0:
-                score = 0
-                confidence = 0
-            else:
-                # Score from -1 to +1
-                score = (total_yes - total_no) / total_exposure
-                # Confidence based on smart wallet participation
-                confidence = min(1.0, smart_count / 10)  # Max confidence at 10+ smart wallets
-            
-            # Determine bias
-            if score > self.config.sentiment_threshold:
-                bias = Bias.BULLISH
-            elif score < -self.config.sentiment_threshold:
-                bias = Bias.BEARISH
-            else:
-                bias = Bias.NEUTRAL
-            
-            result = SentimentResult(
-                bias=bias,
-                score=score,
-                smart_wallets_count=smart_count,
-                total_yes_exposure=total_yes,
-                total_no_exposure=total_no,
-                confidence=confidence
-            )
-            
-            self.logger.info(
-                f"🧠 Sentiment for {market_slug}: {bias.value} "
-                f"(Score: {score:.2f}, Smart Wallets: {smart_count})"
-            )
-            
-            return result
+            return self._score_holders(market_slug, holders_resp.json(), smart_wallets)
             
         except requests.HTTPError as e:
             self.logger.error(f"HTTP error analyzing sentiment: {e.response.status_code}")
@@ -524,24 +685,31 @@ class CryptoOracle:
             self.logger.error(f"Error fetching spot price for {symbol}: {str(e)[:100]}")
             return None
     
-    def get_poly_price(self, market_id: str, outcome: str = "YES") -> Optional[float]:
+    async def get_poly_price(self, market_id: str, outcome: str = "YES") -> Optional[float]:
         """Fetch current Polymarket price for an outcome"""
+        # Live top-of-book pushed by the CLOB stream when this market is tracked
+        token_id = self._market_tokens.get(market_id)
+        if self.market_stream is not None and token_id:
+            mid = self.market_stream.mid(token_id)
+            record_cache("oracle_stream_price", mid is not None)
+            if mid is not None:
+                return mid if outcome == "YES" else 1 - mid
+        
+        market = await self._fetch_with_rate_limit(f"{self.config.gamma_api}/markets/{market_id}")
+        if not isinstance(market, dict):
+            self.logger.error(f"Error fetching poly price for {market_id}")
+            return None
+        
         try:
-            response = requests.get(
-                f"{self.config.gamma_api}/markets/{market_id}",
-                timeout=self.config.request_timeout
-            )
-            response.raise_for_status()
-            market = response.json()
-            
             outcome_prices = market.get("outcomePrices", [0.5, 0.5])
+            if isinstance(outcome_prices, str):
+                outcome_prices = json.loads(outcome_prices)
             if outcome == "YES":
                 return float(outcome_prices[0]) if outcome_prices else 0.5
             else:
                 return float(outcome_prices[1]) if len(outcome_prices) > 1 else 0.5
-                
-        except requests.RequestException as e:
-            self.logger.error(f"Error fetching poly price: {str(e)[:100]}")
+        except (ValueError, TypeError) as e:
+            self.logger.error(f"Error parsing poly price: {str(e)[:100]}")
             return None
     
     def calculate_implied_probability(
@@ -555,48 +723,51 @@ class CryptoOracle:
         Simplified Black-Scholes-ish probability estimate.
         Calculates P(Spot > Strike) by expiry.
         
-        Uses a simplified log-normal assumption.
+        Uses a simplified log-normal assumption (erf-based normal CDF, see fair_value.py).
         """
-        if days_left <= 0:
-            return 1.0 if spot_price > strike_price else 0.0
-        
-        # Time to expiry in years
-        T = days_left / 365.0
-        
         try:
-            sigma = volatility
-            S = spot_price
-            K = strike_price
-            
-            if S <= 0 or K <= 0:
-                return 0.5
-            
-            d = (math.log(S / K) + 0.5 * sigma**2 * T) / (sigma * math.sqrt(T))
-            
-            # Use standard normal CDF (approximation)
-            # Φ(d) ≈ 0.5 * (1 + tanh(sqrt(2/π) * d))
-            probability = 0.5 * (1 + math.tanh(math.sqrt(2 / math.pi) * d))
-            
-            return max(0.01, min(0.99, probability))  # Clamp to realistic range
-            
-        except (ValueError, ZeroDivisionError) as e:
+            return implied_probability(spot_price, strike_price, days_left, volatility)
+        except (ValueError, ZeroDivisionError, OverflowError) as e:
             self.logger.error(f"Math error calculating probability: {str(e)}")
             return 0.5
     
-    def monitor_fair_value(
+    def fair_values(self, markets: List[Dict], spot_prices: Dict[str, Optional[float]],
+                    volatility: float = 0.60) -> Dict[str, float]:
+        """
+        Fair value of every market with a known spot price, in one vectorized call.
+        Same model and day count as calculate_implied_probability.
+        """
+        priced = [m for m in markets if spot_prices.get(m["symbol"]) is not None]
+        if not priced:
+            return {}
+        now = datetime.now()
+        probabilities = implied_probabilities(
+            [spot_prices[m["symbol"]] for m in priced],
+            [m["strike_price"] for m in priced],
+            [(m["expiry"] - now).days for m in priced],
+            volatility,
+        )
+        return {m["market_id"]: float(p) for m, p in zip(priced, probabilities)}
+    
+    async def monitor_fair_value(
         self,
         market_id: str,
         strike_price: float,
         expiry_date: datetime,
-        symbol: str = "BTC/USDT"
+        symbol: str = "BTC/USDT",
+        spot_price: Optional[float] = None,
+        fair_value: Optional[float] = None
     ) -> DiscrepancySignal:
         """
         Compare Spot price movement vs Polymarket price movement.
         Detects overreactions when Poly drops more than Spot justifies.
+        spot_price: already fetched for this cycle (fetched here if None)
+        fair_value: already priced for this cycle (computed here if None)
         """
         # Get current prices
-        spot_price = self.get_spot_price(symbol)
-        poly_price = self.get_poly_price(market_id)
+        if spot_price is None:
+            spot_price = self.get_spot_price(symbol)
+        poly_price = await self.get_poly_price(market_id)
         
         if spot_price is None or poly_price is None:
             return DiscrepancySignal(
@@ -604,22 +775,17 @@ class CryptoOracle:
                 poly_price=0, poly_change_pct=0, fair_value_estimate=0.5, alpha=0
             )
         
-        # Get price history using deque for memory efficiency
+        # Get price history (typed-array ring buffer)
         history_key = f"{market_id}_{symbol}"
-        if history_key not in self.price_history:
-            self.price_history[history_key] = deque(
-                maxlen=self.config.price_history_max_samples
-            )
+        history = self.price_history.get(history_key)
+        if history is None:
+            history = self.price_history[history_key] = PriceHistory(self.config.price_history_max_samples)
         
         # Add current snapshot
-        self.price_history[history_key].append({
-            "timestamp": datetime.now(),
-            "spot": spot_price,
-            "poly": poly_price
-        })
+        now = time.time()
+        history.append(now, spot_price, poly_price)
         
         # Calculate changes (need at least 2 data points)
-        history = self.price_history[history_key]
         if len(history) < 2:
             return DiscrepancySignal(
                 is_overreaction=False, spot_price=spot_price, spot_change_pct=0,
@@ -627,23 +793,16 @@ class CryptoOracle:
                 fair_value_estimate=poly_price, alpha=0
             )
         
-        # Compare to 5 minutes ago (or oldest available)
-        lookback_time = datetime.now() - timedelta(minutes=5)
-        baseline = None
-        for p in history:
-            if p["timestamp"] <= lookback_time:
-                baseline = p
-                break
-        
-        if baseline is None:
-            baseline = history[0]
+        # Compare to 5 minutes ago (or oldest available): binary search
+        _, baseline_spot, baseline_poly = history.lookback(self.config.baseline_lookback, now)
         
-        spot_change = (spot_price - baseline["spot"]) / baseline["spot"]
-        poly_change = (poly_price - baseline["poly"]) / baseline["poly"] if baseline["poly"] > 0 else 0
+        spot_change = (spot_price - baseline_spot) / baseline_spot
+        poly_change = (poly_price - baseline_poly) / baseline_poly if baseline_poly > 0 else 0
         
         # Calculate fair value
-        days_left = (expiry_date - datetime.now()).days
-        fair_value = self.calculate_implied_probability(spot_price, strike_price, days_left)
+        if fair_value is None:
+            days_left = (expiry_date - datetime.now()).days
+            fair_value = self.calculate_implied_probability(spot_price, strike_price, days_left)
         
         # Alpha = Difference between fair value and current poly price
         alpha = fair_value - poly_price
@@ -680,20 +839,17 @@ class CryptoOracle:
     # PHASE 3: SNIPER EXECUTION (Panic Entry)
     # ═══════════════════════════════════════════════════════════════════════════
     
-    def execute_dip_buy(
+    def _dip_buy_plan(
         self,
         market_id: str,
-        token_id: str,
         sentiment: SentimentResult,
         discrepancy: DiscrepancySignal,
         size: float = None
-    ) -> Optional[str]:
+    ) -> Optional[Tuple[Micros, Micros, Micros]]:
         """
-        Execute a LIMIT BUY order when conditions are met:
+        Checks and sizing of a dip buy: (size_usdc, limit_price, shares), None to skip.
         1. Smart money is bullish
         2. Overreaction detected
-        
-        Places order at bid to be a maker (not taker).
         """
         # Validate conditions
         if sentiment.bias != Bias.BULLISH:
@@ -715,75 +871,145 @@ class CryptoOracle:
                 self.logger.info(f"⏳ Cooldown: {self.config.cooldown_after_trade - cooldown}s remaining")
                 return None
         
-        # Calculate position size using Decimal for precision
+        # Calculate position size in fixed-point USDC
         size_raw = size or min(
             self.config.max_position_size,
             self.config.max_position_size * sentiment.confidence
         )
-        size_decimal = self._to_decimal(size_raw)
+        size_usdc = Micros.from_float(size_raw)
         
-        # Calculate limit price (slightly below current to be maker)
+        # Calculate limit price (slightly below current to be maker), on the book tick
         limit_price_raw = discrepancy.poly_price * 0.98  # 2% below current
-        limit_price = self._to_decimal(limit_price_raw)
+        limit_price = max(Micros.from_float(limit_price_raw).round_to_tick(self._price_tick), self._price_tick)
         
         # Calculate shares with proper precision
-        shares = self._calculate_shares(size_decimal, limit_price)
+        shares = self._calculate_shares(size_usdc, limit_price)
         
         self.logger.info(
             f"🎯 SNIPING OPPORTUNITY:\n"
             f"   Market: {market_id}\n"
             f"   Bias: {sentiment.bias.value} (Score: {sentiment.score:.2f})\n"
             f"   Alpha: {discrepancy.alpha*100:+.1f}%\n"
-            f"   Size: ${size_decimal}\n"
+            f"   Size: ${size_usdc}\n"
             f"   Limit Price: ${limit_price}\n"
             f"   Shares: {shares}"
         )
+        return size_usdc, limit_price, shares
+    
+    def _submit_order(self, token_id: str, price: Micros, size: Micros, side: str) -> Optional[str]:
+        """Blocking CLOB GTC order (floats only at the API edge); returns the order id"""
+        order = self.clob_client.create_order(
+            OrderArgs(
+                token_id=token_id,
+                price=float(price),
+                size=float(size),
+                side=side
+            ),
+            OrderType.GTC  # Good till cancelled
+        )
+        return order.get("orderID")
+    
+    async def _submit_order_async(self, token_id: str, price: Micros, size: Micros, side: str) -> Optional[str]:
+        """Order placement off the loop: a slow CLOB call does not stall the other markets"""
+        with self.order_timer.time():
+            return await asyncio.to_thread(self._submit_order, token_id, price, size, side)
+    
+    def _open_position(self, market_id: str, token_id: str, discrepancy: DiscrepancySignal,
+                       plan: Tuple[Micros, Micros, Micros], order_id: Optional[str]) -> Optional[str]:
+        """Record a placed buy (positions, counters, journal) on the caller's thread"""
+        size_usdc, limit_price, shares = plan
+        self.logger.info(f"✅ Order placed: {order_id}")
+        
+        # Track position in fixed-point
+        position = self.positions[market_id] = Position(
+            market_id=market_id,
+            token_id=token_id,
+            outcome="YES",
+            entry_price=limit_price,
+            current_price=Micros.from_float(discrepancy.poly_price),
+            shares=shares,
+            cost_basis=size_usdc,
+            order_id=order_id
+        )
+        
+        # Update state
+        self.daily_trades += 1
+        self.last_trade_time = datetime.now()
+        self._journal_position(OP_OPEN, position)
+        self._journal_counters()
+        
+        return order_id
+    
+    def execute_dip_buy(
+        self,
+        market_id: str,
+        token_id: str,
+        sentiment: SentimentResult,
+        discrepancy: DiscrepancySignal,
+        size: float = None
+    ) -> Optional[str]:
+        """
+        Execute a LIMIT BUY order when conditions are met (see _dip_buy_plan).
+        Places order at bid to be a maker (not taker).
+        Blocking: the cycle uses execute_dip_buy_async.
+        """
+        plan = self._dip_buy_plan(market_id, sentiment, discrepancy, size)
+        if plan is None:
+            return None
         
         if not self.clob_client:
             self.logger.warning("⚠️ CLOB client not available - DRY RUN")
             return "DRY_RUN_ORDER"
         
         try:
-            # Create order with proper decimal conversion
-            order = self.clob_client.create_order(
-                OrderArgs(
-                    token_id=token_id,
-                    price=float(limit_price),
-                    size=float(shares),
-                    side="BUY"
-                ),
-                OrderType.GTC  # Good till cancelled
-            )
-            
-            order_id = order.get("orderID")
-            self.logger.info(f"✅ Order placed: {order_id}")
-            
-            # Track position with Decimal precision
-            self.positions[market_id] = Position(
-                market_id=market_id,
-                token_id=token_id,
-                outcome="YES",
-                entry_price=limit_price,
-                current_price=self._to_decimal(discrepancy.poly_price),
-                shares=shares,
-                cost_basis=size_decimal
-            )
-            
-            # Update state
-            self.daily_trades += 1
-            self.last_trade_time = datetime.now()
-            
-            return order_id
-            
+            order_id = self._submit_order(token_id, plan[1], plan[2], "BUY")
         except Exception as e:
             self.logger.error(f"❌ Order failed: {str(e)[:200]}")
             return None
+        return self._open_position(market_id, token_id, discrepancy, plan, order_id)
+    
+    async def execute_dip_buy_async(
+        self,
+        market_id: str,
+        token_id: str,
+        sentiment: SentimentResult,
+        discrepancy: DiscrepancySignal,
+        size: float = None
+    ) -> Optional[str]:
+        """
+        execute_dip_buy for the cycle: the CLOB call runs in a worker thread,
+        the position is recorded back on the loop.
+        """
+        plan = self._dip_buy_plan(market_id, sentiment, discrepancy, size)
+        if plan is None:
+            return None
+        
+        if not self.clob_client:
+            self.logger.warning("⚠️ CLOB client not available - DRY RUN")
+            return "DRY_RUN_ORDER"
+        
+        if market_id in self._orders_in_flight:
+            return None
+        # Shielded: an order that reached the CLOB is recorded even if the cycle is cancelled
+        self._orders_in_flight.add(market_id)
+        return await asyncio.shield(self._complete_dip_buy(market_id, token_id, discrepancy, plan))
+    
+    async def _complete_dip_buy(self, market_id: str, token_id: str, discrepancy: DiscrepancySignal,
+                                plan: Tuple[Micros, Micros, Micros]) -> Optional[str]:
+        try:
+            order_id = await self._submit_order_async(token_id, plan[1], plan[2], "BUY")
+        except Exception as e:
+            self.logger.error(f"❌ Order failed: {str(e)[:200]}")
+            return None
+        finally:
+            self._orders_in_flight.discard(market_id)
+        return self._open_position(market_id, token_id, discrepancy, plan, order_id)
 
     # ═══════════════════════════════════════════════════════════════════════════
     # PHASE 4: POSITION MANAGEMENT (Free Ride / Partial Hedge)
     # ═══════════════════════════════════════════════════════════════════════════
     
-    def manage_position(self, market_id: str) -> Optional[str]:
+    async def manage_position(self, market_id: str) -> Optional[str]:
         """
         Manage existing position:
         - If profit > 20%, sell 50% to recover cost basis
@@ -794,21 +1020,21 @@ class CryptoOracle:
         
         position = self.positions[market_id]
         
-        # Already hedged
-        if position.is_hedged:
+        # Already hedged, or hedge order still in flight
+        if position.is_hedged or market_id in self._orders_in_flight:
             return None
         
         # Get current price
-        current_price_raw = self.get_poly_price(market_id)
+        current_price_raw = await self.get_poly_price(market_id)
         if current_price_raw is None:
             return None
         
-        current_price = self._to_decimal(current_price_raw)
+        current_price = Micros.from_float(current_price_raw)
         position.current_price = current_price
         
-        # Calculate P&L with Decimal precision
+        # Calculate P&L in fixed-point
         current_value = position.shares * current_price
-        pnl_pct = float((current_value - position.cost_basis) / position.cost_basis)
+        pnl_pct = (current_value - position.cost_basis).ratio(position.cost_basis)
         
         self.logger.info(
             f"📈 Position {market_id}: "
@@ -826,50 +1052,174 @@ class CryptoOracle:
             shares_to_sell = self._calculate_shares(position.cost_basis, current_price)
             shares_to_sell = min(
                 shares_to_sell, 
-                position.shares * self._to_decimal(self.config.hedge_percentage)
+                position.shares * Micros.from_float(self.config.hedge_percentage)
             )
             
             if not self.clob_client:
                 self.logger.warning("⚠️ CLOB client not available - DRY RUN HEDGE")
                 position.is_hedged = True
                 position.hedge_amount = shares_to_sell * current_price
+                self._journal_position(OP_HEDGE, position)
                 return "DRY_RUN_HEDGE"
             
-            try:
-                # Sell slightly above current to be maker
-                sell_price = current_price * self._to_decimal(1.01)
-                
-                order = self.clob_client.create_order(
-                    OrderArgs(
-                        token_id=position.token_id,
-                        price=float(sell_price),
-                        size=float(shares_to_sell),
-                        side="SELL"
-                    ),
-                    OrderType.GTC
-                )
-                
-                order_id = order.get("orderID")
-                hedge_value = shares_to_sell * current_price
-                
-                self.logger.info(
-                    f"✅ Hedge order placed: {order_id}\n"
-                    f"   Sold {shares_to_sell} shares @ ${current_price}\n"
-                    f"   Recovered: ${hedge_value}\n"
-                    f"   Remaining moonbag: {position.shares - shares_to_sell} shares"
-                )
-                
-                position.is_hedged = True
-                position.hedge_amount = hedge_value
-                position.shares -= shares_to_sell
-                
-                return order_id
-                
-            except Exception as e:
-                self.logger.error(f"❌ Hedge order failed: {str(e)[:200]}")
-                return None
+            # Shielded like buys: a deadline cancel must not forget a placed hedge
+            self._orders_in_flight.add(market_id)
+            return await asyncio.shield(self._complete_hedge(position, current_price, shares_to_sell))
         
         return None
+    
+    async def _complete_hedge(self, position: Position, current_price: Micros,
+                              shares_to_sell: Micros) -> Optional[str]:
+        """Place the hedge off the loop, then update the position on the loop"""
+        try:
+            # Sell slightly above current to be maker, on the book tick
+            sell_price = min(
+                (current_price * Micros.from_float(1.01)).round_to_tick(self._price_tick, up=True),
+                Micros.of(1) - self._price_tick
+            )
+            order_id = await self._submit_order_async(position.token_id, sell_price, shares_to_sell, "SELL")
+        except Exception as e:
+            self.logger.error(f"❌ Hedge order failed: {str(e)[:200]}")
+            return None
+        finally:
+            self._orders_in_flight.discard(position.market_id)
+        
+        hedge_value = shares_to_sell * current_price
+        self.logger.info(
+            f"✅ Hedge order placed: {order_id}\n"
+            f"   Sold {shares_to_sell} shares @ ${current_price}\n"
+            f"   Recovered: ${hedge_value}\n"
+            f"   Remaining moonbag: {position.shares - shares_to_sell} shares"
+        )
+        
+        position.is_hedged = True
+        position.hedge_amount = hedge_value
+        position.shares -= shares_to_sell
+        position.hedge_order_id = order_id
+        self._journal_position(OP_HEDGE, position)
+        
+        return order_id
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # MARKET PIPELINE
+    # ═══════════════════════════════════════════════════════════════════════════
+    
+    async def _fair_value_stage(self, market: Dict, spot_price: Optional[float],
+                                fair_value: Optional[float]) -> Optional[DiscrepancySignal]:
+        """Discrepancy against this tick's spot snapshot (None without a spot price)"""
+        if spot_price is None:
+            return None
+        return await self.monitor_fair_value(
+            market_id=market["market_id"],
+            strike_price=market["strike_price"],
+            expiry_date=market["expiry"],
+            symbol=market["symbol"],
+            spot_price=spot_price,
+            fair_value=fair_value
+        )
+    
+    async def _analyze_market(self, market: Dict, spot_prices: Dict[str, Optional[float]],
+                              fair_values: Dict[str, float], smart_wallets: Set[str],
+                              semaphore: asyncio.Semaphore):
+        """Per-market stages: sentiment and fair value concurrently, then position management"""
+        async with semaphore:
+            with self.signal_timer.time():
+                sentiment, discrepancy = await asyncio.gather(
+                    self.analyze_smart_sentiment_async(market["slug"], smart_wallets),
+                    self._fair_value_stage(market, spot_prices.get(market["symbol"]),
+                                           fair_values.get(market["market_id"]))
+                )
+            
+            if market["market_id"] in self.positions:
+                await self.manage_position(market["market_id"])
+        
+        return market, sentiment, discrepancy
+    
+    async def _decide(self, market: Dict, sentiment: SentimentResult,
+                      discrepancy: Optional[DiscrepancySignal]) -> Optional[str]:
+        """Shared decision step, called for one market at a time in completion order"""
+        if sentiment.bias != Bias.BULLISH or discrepancy is None or not discrepancy.is_overreaction:
+            return None
+        
+        # The CLOB call runs in a worker thread; positions are only touched on the loop
+        return await self.execute_dip_buy_async(
+            market_id=market["market_id"],
+            token_id=market["token_id"],
+            sentiment=sentiment,
+            discrepancy=discrepancy
+        )
+    
+    async def run_cycle(self, markets: List[Dict]) -> Dict[str, int]:
+        """
+        One pass over all markets as a bounded concurrent pipeline.
+        
+        Shared inputs (smart wallets, one spot snapshot for all symbols, fair values
+        of the whole board) are computed once, then each market's stages run as a
+        task (max_concurrent_markets at a time) and finished markets feed _decide
+        as they complete. Markets still running
+        at cycle_deadline are cancelled and picked up again next cycle.
+        """
+        deadline = time.monotonic() + self.config.cycle_deadline
+        stats = {"markets": len(markets), "analyzed": 0, "orders": 0, "failed": 0, "timed_out": 0, "flips": 0}
+        
+        # Shared stage
+        symbols = sorted({m["symbol"] for m in markets})
+        try:
+            wallets, spot_prices = await asyncio.wait_for(asyncio.gather(
+                self.get_smart_wallets_async(),
+                self.spot.snapshot(symbols)
+            ), timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            self.logger.warning("⏱️ Cycle deadline hit while fetching shared inputs")
+            stats["timed_out"] = len(markets)
+            return stats
+        smart_wallets = self._as_smart_set(wallets)
+        
+        # Whole board priced in one vectorized call
+        fair_values = self.fair_values(markets, spot_prices)
+        
+        # Per-market stages
+        semaphore = asyncio.Semaphore(self.config.max_concurrent_markets)
+        pending = {
+            asyncio.create_task(self._analyze_market(m, spot_prices, fair_values, smart_wallets, semaphore))
+            for m in markets
+        }
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    stats["failed"] += 1
+                    self.logger.error(f"Market pipeline error: {str(task.exception())[:100]}")
+                    continue
+                market, sentiment, discrepancy = task.result()
+                stats["analyzed"] += 1
+                stats["flips"] += sentiment.flipped
+                if await self._decide(market, sentiment, discrepancy):
+                    stats["orders"] += 1
+        
+        # Restored positions on markets no longer monitored (orphaned GTC orders / moonbags)
+        unlisted = self.positions.keys() - {m["market_id"] for m in markets}
+        remaining = deadline - time.monotonic()
+        if unlisted and remaining > 0 and not pending:
+            try:
+                await asyncio.wait_for(asyncio.gather(
+                    *(self.manage_position(market_id) for market_id in unlisted), return_exceptions=True
+                ), timeout=remaining)
+            except asyncio.TimeoutError:
+                self.logger.warning("⏱️ Cycle deadline hit while managing unlisted positions")
+        
+        if pending:
+            stats["timed_out"] = len(pending)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            self.logger.warning(f"⏱️ Cycle deadline hit: {len(pending)} slow markets skipped")
+        
+        return stats
 
     # ═══════════════════════════════════════════════════════════════════════════
     # MAIN LOOP
@@ -892,37 +1242,36 @@ class CryptoOracle:
         self.logger.info(f"   Monitoring {len(markets)} markets")
         self.logger.info("=" * 60)
         
+        # Positions and counters from before a crash / restart
+        self.restore_state()
+        unlisted = self.positions.keys() - {m["market_id"] for m in markets}
+        if unlisted:
+            self.logger.warning(f"⚠️ {len(unlisted)} restored positions on unlisted markets: still managed")
+        
+        if self.config.use_market_stream:
+            self._market_tokens = {
+                m["market_id"]: str(m["token_id"]) for m in markets if m.get("token_id")
+            }
+            self.market_stream = get_stream()
+            self.market_stream.subscribe(self._market_tokens.values())
+            await self.market_stream.start()
+        
+        start_metrics_server("crypto_oracle")
+        report_startup("crypto_oracle", self.logger)
+        
         while True:
             try:
-                for market in markets:
-                    market_id = market["market_id"]
-                    
-                    # Phase 1: Get insider bias
-                    sentiment = self.analyze_smart_sentiment(market["slug"])
-                    
-                    # Phase 2: Check for discrepancy
-                    discrepancy = self.monitor_fair_value(
-                        market_id=market_id,
-                        strike_price=market["strike_price"],
-                        expiry_date=market["expiry"],
-                        symbol=market["symbol"]
-                    )
-                    
-                    # Phase 3: Execute if conditions met
-                    if sentiment.bias == Bias.BULLISH and discrepancy.is_overreaction:
-                        self.execute_dip_buy(
-                            market_id=market_id,
-                            token_id=market["token_id"],
-                            sentiment=sentiment,
-                            discrepancy=discrepancy
-                        )
-                    
-                    # Phase 4: Manage existing positions
-                    if market_id in self.positions:
-                        self.manage_position(market_id)
-                    
-                    # Small delay between markets
-                    await asyncio.sleep(1)
+                cycle_started = time.perf_counter()
+                stats = await self.run_cycle(markets)
+                elapsed = time.perf_counter() - cycle_started
+                
+                self.cycle_timer.observe(elapsed)
+                self.positions_gauge.set(len(self.positions))
+                self.logger.info(
+                    f"🔁 Cycle: {stats['analyzed']}/{stats['markets']} markets in {elapsed:.1f}s "
+                    f"(orders: {stats['orders']}, bias flips: {stats['flips']}, failed: {stats['failed']}, "
+                    f"skipped: {stats['timed_out']})"
+                )
                 
                 # Main loop delay
                 await asyncio.sleep(self.config.loop_interval)
@@ -930,10 +1279,13 @@ class CryptoOracle:
                 # Reset daily counter at midnight
                 if datetime.now().hour == 0 and datetime.now().minute == 0:
                     self.daily_trades = 0
+                    self._journal_counters()
                     self.logger.info("🔄 Daily trade counter reset")
                     
             except KeyboardInterrupt:
                 self.logger.info("👋 Shutting down...")
+                if self._journal is not None:
+                    self._journal.close()
                 break
             except Exception as e:
                 self.logger.error(f"Loop error: {str(e)[:200]}")
@@ -4,16 +4,15 @@ Recalculate profile balance from order history
 Fixes balance inconsistencies after bug fixes
 """
 
-import json
 from pathlib import Path
 
+from paper_store import PaperStore, PaperStoreConfig
+
 DATA_DIR = Path("/root/PolygraalX/data")
-ORDERS_FILE = DATA_DIR / "server_paper_orders.json"
-PROFILES_FILE = DATA_DIR / "server_paper_profiles.json"
 
-# Read data
-orders = json.loads(ORDERS_FILE.read_text())
-profiles = json.loads(PROFILES_FILE.read_text())
+# Read data (the store imports server_paper_*.json on first use)
+store = PaperStore(PaperStoreConfig(data_dir=DATA_DIR))
+profiles = store.profiles()
 
 # Find active profile
 active_profile = None
@@ -32,53 +31,23 @@ print(f"Initial balance: ${active_profile['initialBalance']:.2f}")
 print(f"Current totalPnL: ${active_profile['totalPnL']:.2f}")
 print()
 
-# Recalculate from orders
+# Recalculate from orders (one aggregate query over the store)
+totals = store.balance_totals()
 initial_balance = active_profile['initialBalance']
-total_invested = 0
-total_recovered = 0
-total_pnl = 0
-win_count = 0
-loss_count = 0
-open_orders_count = 0
-closed_orders_count = 0
-
-for order in orders:
-    amount = order.get('amount', 0)
-    original_amount = order.get('originalAmount', amount)
-    status = order.get('status', 'OPEN')
-    
-    if status == 'OPEN':
-        total_invested += amount
-        open_orders_count += 1
-    elif status == 'CLOSED':
-        # Capital was deducted when order was placed (originalAmount)
-        total_invested += original_amount
-        
-        # Capital returned when order closed
-        shares = order.get('shares', order.get('originalShares', 0))
-        exit_price = order.get('exitPrice', order.get('entryPrice', 0))
-        
-        if exit_price > 0 and shares > 0:
-            recovered = shares * exit_price
-            total_recovered += recovered
-        
-        # PnL
-        pnl = order.get('pnl', 0)
-        total_pnl += pnl
-        
-        if pnl > 0:
-            win_count += 1
-        elif pnl < 0:
-            loss_count += 1
-        
-        closed_orders_count += 1
+total_invested = totals['open_invested'] + totals['closed_invested']
+total_recovered = totals['exit_value']  # shares * exitPrice of closed orders
+total_pnl = totals['closed_pnl']
+win_count = totals['closed_wins']
+loss_count = totals['closed_losses']
+open_orders_count = totals['open_count']
+closed_orders_count = totals['closed_count']
 
 # Calculate correct balance
 # Balance = Initial - (invested but not recovered) + recovered
 correct_balance = initial_balance - total_invested + total_recovered
 
 print("=" * 50)
-print(f"Orders analyzed: {len(orders)}")
+print(f"Orders analyzed: {store.count()}")
 print(f"  - Open: {open_orders_count}")
 print(f"  - Closed: {closed_orders_count}")
 print()
@@ -103,7 +72,8 @@ if response.lower() == 'y':
     active_profile['losingTrades'] = loss_count
     active_profile['totalTrades'] = closed_orders_count
     
-    PROFILES_FILE.write_text(json.dumps(profiles, indent=2))
+    store.save_profiles(profiles)
+    store.export_json(force=True)
     print("\n✅ Profile updated!")
     print(f"   Balance: ${active_profile['balance']:.2f}")
     print(f"   Total PnL: ${active_profile['totalPnL']:.2f}")
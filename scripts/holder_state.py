@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Holder State
+=======================
+Per-market holder book for smart money sentiment. Instead of recomputing
+YES/NO exposure from the whole /markets/{id}/holders list every loop, each
+market keeps the last known shares per holder and running smart money
+totals, and only the holders that changed move the totals.
+
+- New holders, changed shares and exits are applied as deltas: O(changed)
+- Running totals: smart YES exposure, smart NO exposure, smart holder count
+- A new smart wallet set (daily refresh) rescans the book once
+- Last bias is kept so callers can report when it flips
+
+Shares convention (Gamma holders API): positive = YES, negative = NO.
+
+Usage:
+    state = HolderState(market_id)
+    diff = state.apply_snapshot(holders, smart_wallets)   # full list from the API
+    state.apply_changes({"0xabc": 120.0, "0xdef": None})  # pushed deltas, None = exit
+    state.smart_yes, state.smart_no, state.smart_count
+"""
+
+from dataclasses import dataclass
+from typing import AbstractSet, Dict, Iterable, Mapping, Optional
+
+
+@dataclass
+class HolderDiff:
+    """What changed between two holder snapshots"""
+    added: int = 0
+    changed: int = 0
+    exited: int = 0
+    smart_changed: int = 0  # Of the above, holders in the smart wallet set
+
+    @property
+    def total(self) -> int:
+        return self.added + self.changed + self.exited
+
+
+class HolderState:
+    """Holder shares of one market with running smart money exposure"""
+
+    __slots__ = ("market_id", "shares", "smart_wallets", "smart_yes", "smart_no", "smart_count", "bias")
+
+    def __init__(self, market_id: str = ""):
+        self.market_id = market_id
+        self.shares: Dict[str, float] = {}  # address (lowercase) -> shares
+        self.smart_wallets: AbstractSet[str] = frozenset()
+        self.smart_yes = 0.0
+        self.smart_no = 0.0
+        self.smart_count = 0
+        self.bias = None  # Last bias reported by the caller
+
+    def __len__(self) -> int:
+        return len(self.shares)
+
+    # ─── Running totals ────────────────────────────────────────────────────────
+
+    def _add(self, shares: float, sign: int):
+        """Add (sign=1) or remove (sign=-1) one smart holder's exposure"""
+        if shares > 0:
+            self.smart_yes += sign * shares
+        else:
+            self.smart_no += sign * abs(shares)
+        self.smart_count += sign
+        if not self.smart_count:
+            self.smart_yes = self.smart_no = 0.0  # No float residue once the last one leaves
+
+    def _set_smart_wallets(self, smart_wallets: AbstractSet[str]):
+        """Rescan the book when the smart wallet set is replaced"""
+        if smart_wallets is self.smart_wallets:
+            return
+        self.smart_wallets = smart_wallets
+        self.smart_yes = self.smart_no = 0.0
+        self.smart_count = 0
+        for address, shares in self.shares.items():
+            if address in smart_wallets:
+                self._add(shares, 1)
+
+    # ─── Updates ───────────────────────────────────────────────────────────────
+
+    def apply_changes(self, changes: Mapping[str, Optional[float]],
+                      smart_wallets: AbstractSet[str] = None) -> HolderDiff:
+        """
+        Apply holder deltas: address -> new shares, None for an exit.
+        Cost is O(len(changes)) once the smart wallet set is known.
+        """
+        if smart_wallets is not None:
+            self._set_smart_wallets(smart_wallets)
+        diff = HolderDiff()
+        smart = self.smart_wallets
+
+        for address, shares in changes.items():
+            old = self.shares.get(address)
+            if old == shares:
+                continue
+            if shares is None:
+                del self.shares[address]
+                diff.exited += 1
+            else:
+                self.shares[address] = shares
+                if old is None:
+                    diff.added += 1
+                else:
+                    diff.changed += 1
+            if address in smart:
+                diff.smart_changed += 1
+                if old is not None:
+                    self._add(old, -1)
+                if shares is not None:
+                    self._add(shares, 1)
+        return diff
+
+    def apply_snapshot(self, holders: Iterable[Dict], smart_wallets: AbstractSet[str] = None) -> HolderDiff:
+        """Diff a full holders list against the book and apply only what changed"""
+        current: Dict[str, float] = {}
+        for holder in holders:
+            address = (holder.get("address") or "").lower()
+            current[address] = current.get(address, 0) + (holder.get("shares") or 0)
+
+        book = self.shares
+        changes: Dict[str, Optional[float]] = {
+            address: shares for address, shares in current.items() if book.get(address) != shares
+        }
+        for address in book.keys() - current.keys():
+            changes[address] = None
+        return self.apply_changes(changes, smart_wallets)
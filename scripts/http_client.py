@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Shared HTTP Client
+=============================
+One pooled HTTP client for every bot talking to gamma-api, clob, data-api,
+Binance/CoinGecko and the dashboard API.
+
+- Per-host keep-alive connection pools (no new TCP+TLS handshake per call)
+- DNS cache
+- Configurable connect/total timeouts
+- Retry with exponential backoff + jitter on 429/5xx and network errors
+- Per-host token bucket rate limiting (RateLimiter)
+- Per-endpoint latency / status metrics (metrics.py)
+
+Async bots share one aiohttp session via get_client().
+Synchronous bots (oracle_scraper) use the pooled requests.Session from
+get_sync_session().
+
+Base URLs can be redirected (e.g. to the offline stand-in in
+mock_polymarket_api.py) with HTTP_BASE_OVERRIDES:
+    HTTP_BASE_OVERRIDES="https://gamma-api.polymarket.com=http://127.0.0.1:8900/gamma,..."
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from metrics import observe_request
+
+logger = logging.getLogger("HttpClient")
+
+# Statuses worth retrying (rate limited / transient upstream failures)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RATE LIMITER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class RateLimiter:
+    """Token bucket rate limiter"""
+    def __init__(self, max_requests: int, per_seconds: int = 1):
+        self.max_requests = max_requests
+        self.per_seconds = per_seconds
+        self.tokens = max_requests
+        self.last_update = time.time()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Acquire a token, waiting if necessary"""
+        async with self.lock:
+            now = time.time()
+            elapsed = now - self.last_update
+
+            # Refill tokens
+            self.tokens = min(
+                self.max_requests,
+                self.tokens + elapsed * (self.max_requests / self.per_seconds)
+            )
+            self.last_update = now
+
+            # Wait if no tokens available
+            if self.tokens < 1:
+                wait_time = (1 - self.tokens) / (self.max_requests / self.per_seconds)
+                await asyncio.sleep(wait_time)
+                self.tokens = 0
+            else:
+                self.tokens -= 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class HttpConfig:
+    """Connection pool, timeout and retry settings"""
+    # Timeouts (seconds)
+    total_timeout: float = 10.0
+    connect_timeout: float = 5.0
+
+    # Connection pools
+    pool_size: int = 100  # Max open connections overall
+    pool_size_per_host: int = 20  # Max open connections per host
+    keepalive_timeout: float = 30.0  # Idle time before a pooled connection is closed
+    dns_cache_ttl: int = 300  # 5 min
+
+    # Retry / backoff
+    max_retries: int = 3
+    backoff_base: float = 0.25  # First retry delay, doubled every attempt
+    backoff_max: float = 4.0
+
+    # Rate limiting (per host)
+    requests_per_second: int = 10
+    host_rate_limits: Dict[str, int] = field(default_factory=dict)  # host -> req/s
+
+    user_agent: str = "PolyGraalX/1.0"
+
+    # Base URL redirects: prefix -> replacement (offline stand-in, benchmarks)
+    base_url_overrides: Dict[str, str] = field(
+        default_factory=lambda: parse_overrides(os.getenv("HTTP_BASE_OVERRIDES", ""))
+    )
+
+
+def parse_overrides(spec: str) -> Dict[str, str]:
+    """Parse "from=to,from=to" into a prefix map"""
+    overrides = {}
+    for item in spec.split(","):
+        if "=" in item:
+            src, dst = item.split("=", 1)
+            overrides[src.strip().rstrip("/")] = dst.strip().rstrip("/")
+    return overrides
+
+
+def _host_of(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+def _clean_params(params: Optional[Dict]) -> Optional[Dict]:
+    """aiohttp rejects bool/None query values - encode them like the APIs expect"""
+    if not params:
+        return params
+    cleaned = {}
+    for key, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        cleaned[key] = value
+    return cleaned
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ASYNC CLIENT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class HttpClient:
+    """
+    Pooled aiohttp client with per-host rate limiting and retry/backoff.
+    The session is created lazily inside the running event loop and reused
+    for the lifetime of the loop.
+    """
+
+    def __init__(self, config: HttpConfig = None):
+        self.config = config or HttpConfig()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._limiters: Dict[str, RateLimiter] = {}
+
+    async def session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it for the current loop if needed"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.config.pool_size,
+                limit_per_host=self.config.pool_size_per_host,
+                keepalive_timeout=self.config.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.config.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=self.config.total_timeout,
+                    connect=self.config.connect_timeout
+                ),
+                headers={"User-Agent": self.config.user_agent},
+            )
+            self._loop = loop
+            # Limiter locks belong to the loop they were created in
+            self._limiters = {}
+        return self._session
+
+    def set_base_url_overrides(self, overrides: Dict[str, str]):
+        """Redirect base URLs (prefix -> replacement), e.g. to the offline stand-in"""
+        self.config.base_url_overrides = {
+            src.rstrip("/"): dst.rstrip("/") for src, dst in overrides.items()
+        }
+
+    def resolve(self, url: str) -> str:
+        """Apply base URL overrides"""
+        for src, dst in self.config.base_url_overrides.items():
+            if url.startswith(src):
+                return dst + url[len(src):]
+        return url
+
+    def set_rate_limit(self, url_or_host: str, requests_per_second: int):
+        """Override the request rate for one host"""
+        host = _host_of(url_or_host) or url_or_host
+        self.config.host_rate_limits[host] = requests_per_second
+        self._limiters.pop(host, None)
+
+    def limiter_for(self, url: str) -> RateLimiter:
+        """Return the token bucket for the host of url"""
+        host = _host_of(url)
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            rate = self.config.host_rate_limits.get(host, self.config.requests_per_second)
+            limiter = RateLimiter(rate)
+            self._limiters[host] = limiter
+        return limiter
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Exponential backoff with jitter, honouring Retry-After when present"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.config.backoff_max)
+            except ValueError:
+                pass
+        delay = min(self.config.backoff_base * (2 ** attempt), self.config.backoff_max)
+        return delay * (0.5 + random.random() / 2)
+
+    @staticmethod
+    async def _read_body(resp: aiohttp.ClientResponse) -> Any:
+        """Parse JSON bodies, fall back to text"""
+        try:
+            return await resp.json(content_type=None)
+        except ValueError:
+            return await resp.text()
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Dict = None,
+        json: Any = None,
+        timeout: float = None,
+        retries: int = None,
+        rate_limit: bool = True
+    ) -> Tuple[int, Any]:
+        """
+        Perform a request through the pool.
+        Returns (status, body). status is 0 when no response was received.
+        Only idempotent methods are retried unless retries is given.
+        """
+        method = method.upper()
+        if retries is None:
+            retries = self.config.max_retries if method in IDEMPOTENT_METHODS else 0
+
+        session = await self.session()
+        # Rate limit (and label metrics) by the logical upstream, even when redirected
+        logical_url = url
+        limiter = self.limiter_for(url) if rate_limit else None
+        url = self.resolve(url)
+        req_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+        params = _clean_params(params)
+
+        for attempt in range(retries + 1):
+            if limiter:
+                await limiter.acquire()
+
+            started = time.perf_counter()
+            try:
+                async with session.request(
+                    method, url, params=params, json=json, timeout=req_timeout
+                ) as resp:
+                    if resp.status in RETRY_STATUSES and attempt < retries:
+                        observe_request(logical_url, resp.status, time.perf_counter() - started)
+                        delay = self._retry_delay(attempt, resp.headers.get("Retry-After"))
+                        logger.debug(f"{resp.status} from {url}, retry {attempt + 1}/{retries} in {delay:.2f}s")
+                    else:
+                        body = await self._read_body(resp)
+                        observe_request(logical_url, resp.status, time.perf_counter() - started)
+                        return resp.status, body
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                observe_request(logical_url, 0, time.perf_counter() - started)
+                if attempt >= retries:
+                    logger.debug(f"{method} {url} failed: {str(e)[:100] or type(e).__name__}")
+                    return 0, None
+                delay = self._retry_delay(attempt)
+                logger.debug(f"{method} {url} error, retry {attempt + 1}/{retries} in {delay:.2f}s")
+
+            await asyncio.sleep(delay)
+
+        return 0, None
+
+    async def get_json(self, url: str, params: Dict = None, **kwargs) -> Optional[Any]:
+        """GET and return the parsed body, or None on any non-200 outcome"""
+        status, body = await self.request("GET", url, params=params, **kwargs)
+        if status != 200:
+            if status:
+                logger.warning(f"API returned {status} for {url}")
+            return None
+        return body
+
+    async def post_json(self, url: str, payload: Any, **kwargs) -> Tuple[int, Any]:
+        """POST a JSON payload, returns (status, body)"""
+        return await self.request("POST", url, json=payload, **kwargs)
+
+    async def close(self):
+        """Close the pooled session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+        self._limiters = {}
+
+    async def __aenter__(self):
+        await self.session()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SHARED INSTANCES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_shared_client: Optional[HttpClient] = None
+_sync_session = None
+
+
+def get_client() -> HttpClient:
+    """Process-wide pooled async client"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = HttpClient()
+    return _shared_client
+
+
+async def close_client():
+    """Close the process-wide client (call once on shutdown)"""
+    if _shared_client is not None:
+        await _shared_client.close()
+
+
+def get_sync_session(config: HttpConfig = None):
+    """
+    Process-wide pooled requests.Session for synchronous bots.
+    Same pool sizes, retry and backoff policy as the async client.
+    """
+    global _sync_session
+    if _sync_session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        config = config or HttpConfig()
+        retry = Retry(
+            total=config.max_retries,
+            backoff_factor=config.backoff_base,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(IDEMPOTENT_METHODS),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=config.pool_size_per_host,
+            pool_maxsize=config.pool_size_per_host,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"User-Agent": config.user_agent})
+        session.hooks["response"].append(
+            lambda resp, *args, **kwargs: observe_request(resp.url, resp.status_code, resp.elapsed.total_seconds())
+        )
+        _sync_session = session
+    return _sync_session
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Lazy Imports & Startup Report
+========================================
+Heavy optional dependencies (ccxt: hundreds of exchange modules,
+py_clob_client: web3/eth stack) are imported on first use instead of at
+module load, so PM2 restarts and dry runs don't pay for clients they never
+build.
+
+    ccxt = lazy_import("ccxt")                                    # module proxy
+    ClobClient = lazy_import("py_clob_client.client", "ClobClient")  # attribute proxy
+    CCXT_AVAILABLE = module_available("ccxt")                     # find_spec, no import
+
+    getattr(ccxt, "binance")(...)   # first attribute access imports ccxt
+    ClobClient(host, key=...)       # first call imports py_clob_client
+
+Proxies are plain module globals, so unittest.mock.patch("bot.ClobClient")
+keeps working.
+
+Startup report:
+    report_startup("mean_reversion") logs, once the bot is ready, the time
+    since process start, peak RSS and which lazy dependencies were already
+    loaded, and exports startup_seconds / startup_rss_bytes gauges.
+    benchmarks/startup_bench.py checks the cold start of every entry point
+    against a stored baseline.
+"""
+
+import importlib
+import importlib.util
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from metrics import get_registry
+
+logger = logging.getLogger("Startup")
+
+_T0 = time.monotonic()  # Fallback when the process start time is unavailable
+LAZY_MODULES = ("ccxt", "py_clob_client")
+
+# Import cost paid by each lazy proxy (name -> seconds)
+lazy_load_seconds: Dict[str, float] = {}
+_import_lock = threading.Lock()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LAZY IMPORTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def module_available(name: str) -> bool:
+    """True if the top-level package can be imported (does not import it)"""
+    try:
+        return importlib.util.find_spec(name.split(".")[0]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class _LazyObject:
+    """Stands in for a module (or one of its attributes) until first use"""
+
+    __slots__ = ("_module_name", "_attr", "_target")
+
+    def __init__(self, module_name: str, attr: Optional[str] = None):
+        object.__setattr__(self, "_module_name", module_name)
+        object.__setattr__(self, "_attr", attr)
+        object.__setattr__(self, "_target", None)
+
+    def _resolve(self) -> Any:
+        target = self._target
+        if target is None:
+            with _import_lock:
+                target = self._target
+                if target is None:
+                    started = time.perf_counter()
+                    target = importlib.import_module(self._module_name)
+                    elapsed = time.perf_counter() - started
+                    lazy_load_seconds.setdefault(self._module_name, elapsed)
+                    if elapsed > 0.05:
+                        logger.info(f"📦 Lazy-loaded {self._module_name} in {elapsed:.2f}s")
+                    if self._attr:
+                        target = getattr(target, self._attr)
+                    object.__setattr__(self, "_target", target)
+        return target
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        name = f"{self._module_name}.{self._attr}" if self._attr else self._module_name
+        state = "loaded" if self._target is not None else "not loaded"
+        return f"<lazy {name} ({state})>"
+
+
+def lazy_import(module_name: str, attr: str = None) -> Any:
+    """Proxy for module_name (or module_name.attr), imported on first use"""
+    return _LazyObject(module_name, attr)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# STARTUP REPORT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def process_uptime() -> float:
+    """Seconds since this process started (Linux /proc, else since this module loaded)"""
+    try:
+        with open("/proc/self/stat") as f:
+            # Field 22 (starttime) is after the parenthesised command name
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return time.monotonic() - _T0
+
+
+def peak_rss_bytes() -> int:
+    try:
+        import resource
+        # ru_maxrss is KB on Linux, bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+def startup_stats() -> dict:
+    return {
+        "seconds": process_uptime(),
+        "rss_bytes": peak_rss_bytes(),
+        "modules": len(sys.modules),
+        "heavy_loaded": [name for name in LAZY_MODULES if name in sys.modules],
+    }
+
+
+def report_startup(bot: str, log: logging.Logger = None) -> dict:
+    """Log (to the bot's logger) and export how long this entry point took to become ready"""
+    stats = startup_stats()
+    registry = get_registry()
+    registry.gauge("startup_seconds", "Seconds from process start to ready", ("bot",)) \
+        .labels(bot=bot).set(stats["seconds"])
+    registry.gauge("startup_rss_bytes", "Peak RSS when the bot became ready", ("bot",)) \
+        .labels(bot=bot).set(stats["rss_bytes"])
+
+    heavy = ", ".join(stats["heavy_loaded"]) or "none"
+    stats["message"] = (f"⏱️ {bot} ready in {stats['seconds']:.2f}s | RSS {stats['rss_bytes'] / 1e6:.0f} MB | "
+                        f"{stats['modules']} modules | heavy deps loaded: {heavy}")
+    (log or logger).info(stats["message"])
+    return stats
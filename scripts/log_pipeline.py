@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Log Pipeline
+=======================
+Bounded, batched log shipping that never blocks the caller.
+
+Producers put() records into an in-memory queue (O(1), no I/O). A worker
+drains it in batches, flushing when batch_size records are waiting or every
+flush_interval seconds, and hands each batch to a sink:
+
+    Async worker  (start_async)   asyncio task, async sink  - dashboard HTTP shipping
+    Thread worker (start_thread)  daemon thread, sync sink  - file handlers
+
+Backpressure:
+    - past sample_above of max_queue, low-priority records (below WARNING)
+      are sampled: 1 in sample_every is kept
+    - at max_queue new records are dropped
+    - the number of lost records is passed to the sink with the next batch
+      and exported as log_records_dropped_total
+
+Usage:
+    pipeline = LogPipeline(ship_batch, bot="whale_tracker", name="dashboard_logs")
+    pipeline.start_async()
+    pipeline.put({"message": "...", "level": "info"})
+    ...
+    await pipeline.aclose()
+
+    # Logging: wrap any handler so its I/O leaves the calling thread
+    logger.addHandler(PipelineHandler(logging.FileHandler("bot.log"), bot="crypto_oracle"))
+"""
+
+import asyncio
+import copy
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+from metrics import get_registry, queue_gauge
+
+logger = logging.getLogger("LogPipeline")
+
+PRIORITY_LEVELS = {"warning", "error", "critical"}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class LogPipelineConfig:
+    """Batching and backpressure limits"""
+    batch_size: int = 50  # Flush as soon as this many records are queued
+    flush_interval: float = 1.0  # ... or at least this often (seconds)
+    max_queue: int = 5000  # Hard bound, new records are dropped past it
+    sample_above: float = 0.5  # Queue fill ratio where low-priority sampling starts
+    sample_every: int = 10  # Keep 1 in N low-priority records while sampling
+    close_timeout: float = 5.0  # Max seconds to drain on close
+
+
+def _default_priority(record: Any) -> bool:
+    """WARNING and above are never sampled out"""
+    if isinstance(record, logging.LogRecord):
+        return record.levelno >= logging.WARNING
+    if isinstance(record, dict):
+        return record.get("level") in PRIORITY_LEVELS
+    return False
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PIPELINE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class LogPipeline:
+    """Bounded queue + batching worker in front of a slow log sink"""
+
+    def __init__(self, sink: Callable, config: LogPipelineConfig = None, bot: str = "",
+                 name: str = "logs", is_priority: Callable[[Any], bool] = None):
+        # sink(batch, dropped): dropped = records lost since the previous call
+        self.sink = sink
+        self.config = config or LogPipelineConfig()
+        self.is_priority = is_priority or _default_priority
+        self.name = name
+
+        self._queue: deque = deque()
+        self._lock = threading.Lock()
+        self._low_priority_seen = 0
+        self._dropped_pending = 0
+        self._closed = False
+
+        # Stats
+        self.queued = 0
+        self.shipped = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+        # Workers
+        self._thread: Optional[threading.Thread] = None
+        self._thread_wake = threading.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_wake: Optional[asyncio.Event] = None
+
+        self._depth = queue_gauge(bot or "unknown", name)
+        self._dropped_counter = get_registry().counter(
+            "log_records_dropped_total", "Log records dropped or sampled out under backpressure",
+            ("bot", "queue")).labels(bot=bot or "unknown", queue=name)
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    # ─── Producer side ─────────────────────────────────────────────────────────
+
+    def put(self, record: Any) -> bool:
+        """Queue a record without blocking. False if it was dropped or sampled out."""
+        config = self.config
+        with self._lock:
+            size = len(self._queue)
+            keep = not self._closed and size < config.max_queue
+            if keep and size >= config.max_queue * config.sample_above and not self.is_priority(record):
+                self._low_priority_seen += 1
+                keep = self._low_priority_seen % config.sample_every == 0
+            if not keep:
+                self._dropped_pending += 1
+                self.dropped += 1
+                self._dropped_counter.inc()
+                return False
+            self._queue.append(record)
+            self.queued += 1
+            full_batch = size + 1 >= config.batch_size
+        if full_batch:
+            self._wake()
+        return True
+
+    def _wake(self):
+        self._thread_wake.set()
+        loop, event = self._loop, self._async_wake
+        if loop is None or event is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            event.set()
+        else:
+            loop.call_soon_threadsafe(event.set)
+
+    def _next_batch(self) -> Tuple[List[Any], int]:
+        with self._lock:
+            count = min(len(self._queue), self.config.batch_size)
+            batch = [self._queue.popleft() for _ in range(count)]
+            dropped, self._dropped_pending = self._dropped_pending, 0
+            if len(self._queue) < self.config.max_queue * self.config.sample_above:
+                self._low_priority_seen = 0
+        self._depth.set(len(self._queue))
+        return batch, dropped
+
+    def _done(self, batch: List[Any], error: Exception = None):
+        if error is None:
+            self.shipped += len(batch)
+        else:
+            self.failed_batches += 1
+            logger.debug(f"Log batch of {len(batch)} lost: {str(error)[:100]}")
+
+    # ─── Thread worker ─────────────────────────────────────────────────────────
+
+    def start_thread(self) -> "LogPipeline":
+        """Drain with a daemon thread calling a sync sink"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run_thread, name=f"log-pipeline-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run_thread(self):
+        while True:
+            self._thread_wake.wait(self.config.flush_interval)
+            self._thread_wake.clear()
+            self.drain()
+            if self._closed:
+                self.drain()
+                return
+
+    def drain(self):
+        """Ship everything queued now with the sync sink (worker thread or shutdown)"""
+        while True:
+            batch, dropped = self._next_batch()
+            if not batch and not dropped:
+                return
+            try:
+                self.sink(batch, dropped)
+                self._done(batch)
+            except Exception as e:
+                self._done(batch, e)
+            if not batch:
+                return
+
+    def close(self):
+        """Stop the thread worker after shipping what is queued"""
+        self._closed = True
+        if self._thread is not None:
+            self._thread_wake.set()
+            self._thread.join(self.config.close_timeout)
+            self._thread = None
+
+    # ─── Async worker ──────────────────────────────────────────────────────────
+
+    def start_async(self) -> "LogPipeline":
+        """Drain with a task on the running loop calling an async sink (idempotent)"""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return self
+        self._loop = loop
+        self._async_wake = asyncio.Event()
+        self._task = loop.create_task(self._run_async())
+        return self
+
+    async def _run_async(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._async_wake.wait(), self.config.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._async_wake.clear()
+            await self.drain_async()
+
+    async def drain_async(self):
+        """Ship everything queued now with the async sink"""
+        while True:
+            batch, dropped = self._next_batch()
+            if not batch and not dropped:
+                return
+            try:
+                await self.sink(batch, dropped)
+                self._done(batch)
+            except Exception as e:
+                self._done(batch, e)
+            if not batch:
+                return
+
+    async def aclose(self):
+        """Stop the async worker after shipping what is queued"""
+        self._closed = True
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            self._async_wake.set()
+            try:
+                await asyncio.wait_for(task, self.config.close_timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+        try:
+            await asyncio.wait_for(self.drain_async(), self.config.close_timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LOGGING HANDLER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class PipelineHandler(logging.Handler):
+    """
+    logging.Handler that queues records for target (e.g. a FileHandler).
+    Formatting and disk writes happen in the pipeline thread, one write per batch.
+    """
+
+    def __init__(self, target: logging.Handler, config: LogPipelineConfig = None,
+                 bot: str = "", name: str = "log_file"):
+        super().__init__(target.level)
+        self.target = target
+        self.pipeline = LogPipeline(self._write, config, bot=bot, name=name).start_thread()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.pipeline.put(self._prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    @staticmethod
+    def _prepare(record: logging.LogRecord) -> logging.LogRecord:
+        """Freeze the message now: args and exc_info may change before the write"""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def _write(self, records: List[logging.LogRecord], dropped: int):
+        target = self.target
+        if dropped:
+            records = [logging.makeLogRecord({
+                "name": records[0].name if records else "LogPipeline", "levelno": logging.WARNING,
+                "levelname": "WARNING", "msg": f"⚠️ {dropped} log records dropped (backpressure)",
+            })] + records
+        records = [r for r in records if r.levelno >= target.level and target.filter(r)]
+        stream = getattr(target, "stream", None)
+        if stream is None:
+            # Delayed FileHandler or a non-stream handler: let it do its own I/O
+            for record in records:
+                target.handle(record)
+            return
+        text = "".join(target.format(record) + target.terminator for record in records)
+        target.acquire()
+        try:
+            stream.write(text)
+            stream.flush()
+        finally:
+            target.release()
+
+    def flush(self):
+        self.pipeline.drain()
+        self.target.flush()
+
+    def close(self):
+        self.pipeline.close()
+        self.pipeline.drain()
+        self.target.close()
+        super().close()
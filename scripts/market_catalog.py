@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Shared Market Catalog
+================================
+One in-memory copy of the active gamma market set, shared by every bot
+instead of each one re-downloading hundreds of markets every cycle.
+
+- Full sync pages every active market once (closed=false, active=true)
+- Incremental refresh pages markets by updatedAt (newest first) and stops
+  past the last seen watermark (ties included), so only changed/new markets
+  are transferred; markets that closed since are dropped
+- Periodic full resync catches anything the incremental pass missed
+- Persisted to DATA_DIR/market_catalog.json for warm start; a process whose
+  peer refreshed the file recently reloads it instead of hitting the API
+
+Indexes: conditionId, slug, CLOB token id, asset symbol (BTC, ETH, ...),
+event (id and slug) and expiry (sorted endDate).
+
+Async bots:  catalog = get_catalog(); await catalog.refresh()
+Sync bots:   catalog = get_catalog(); catalog.refresh_sync()
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("MarketCatalog")
+
+GAMMA_API = "https://gamma-api.polymarket.com"
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(__file__), '..', 'data'))
+
+# Asset symbol -> words identifying it in a market question/slug
+SYMBOL_KEYWORDS = {
+    "BTC": ["bitcoin", "btc"],
+    "ETH": ["ethereum", "eth", "ether"],
+    "SOL": ["solana", "sol"],
+    "XRP": ["xrp", "ripple"],
+    "DOGE": ["dogecoin", "doge"],
+    "ADA": ["cardano", "ada"],
+}
+_SYMBOL_PATTERNS = {
+    symbol: re.compile(r"\b(" + "|".join(words) + r")\b")
+    for symbol, words in SYMBOL_KEYWORDS.items()
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class CatalogConfig:
+    """Refresh and persistence settings"""
+    gamma_api: str = GAMMA_API
+    cache_file: str = os.path.join(DATA_DIR, "market_catalog.json")
+
+    refresh_interval: float = 30.0  # Min seconds between refreshes
+    full_resync_interval: float = 900.0  # Full re-page every 15 min
+    page_size: int = 100
+    max_pages: int = 200  # 20k markets safety limit
+    request_timeout: float = 30.0
+    persist: bool = True
+
+
+def _parse_ts(value) -> Optional[float]:
+    """ISO-8601 (with Z) or epoch -> epoch seconds"""
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def market_token_ids(market: dict) -> List[str]:
+    """CLOB token ids of a market (gamma returns them as a JSON string)"""
+    tokens = market.get("clobTokenIds") or []
+    if isinstance(tokens, str):
+        try:
+            tokens = json.loads(tokens)
+        except ValueError:
+            return []
+    return [str(t) for t in tokens]
+
+
+def market_symbols(market: dict) -> Set[str]:
+    """Asset symbols referenced by the market question/slug"""
+    text = f"{market.get('question', '')} {market.get('slug', '')}".lower().replace("-", " ")
+    return {symbol for symbol, pattern in _SYMBOL_PATTERNS.items() if pattern.search(text)}
+
+
+def is_active_market(market: dict) -> bool:
+    """Open for trading: the only markets the catalog holds"""
+    return not market.get("closed") and market.get("active") is not False
+
+
+def _normalize_symbol(symbol: str) -> str:
+    """'BTC/USDT', 'btc', 'BTCUSDT' -> 'BTC'"""
+    symbol = symbol.split('/')[0].upper()
+    for quote in ("USDT", "USDC", "USD"):
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)]
+    return symbol
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CATALOG
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class MarketCatalog:
+    """Active market set with secondary indexes, refreshed incrementally"""
+
+    def __init__(self, config: CatalogConfig = None):
+        self.config = config or CatalogConfig()
+        self.markets: Dict[str, dict] = {}  # conditionId -> raw gamma market
+
+        # Indexes (values are conditionIds)
+        self._by_slug: Dict[str, str] = {}
+        self._by_token: Dict[str, str] = {}
+        self._by_symbol: Dict[str, Set[str]] = {}
+        self._by_event: Dict[str, Set[str]] = {}
+        self._expiry: List[Tuple[float, str]] = []  # Sorted (endDate ts, conditionId)
+        self._text: Dict[str, str] = {}  # Lowercased question + description
+
+        self.watermark: float = 0.0  # Newest updatedAt seen
+        self.last_refresh: float = 0.0
+        self.last_full_sync: float = 0.0
+        self._loaded_mtime: float = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+        if self.config.persist:
+            self.load()
+
+    # ─── Index maintenance ─────────────────────────────────────────────────────
+
+    def upsert(self, market: dict) -> bool:
+        """Insert or replace one market. Returns False if it has no conditionId"""
+        cid = market.get("conditionId") or market.get("condition_id")
+        if not cid:
+            return False
+        if cid in self.markets:
+            self._unindex(cid)
+        self.markets[cid] = market
+
+        if market.get("slug"):
+            self._by_slug[market["slug"]] = cid
+        for token in market_token_ids(market):
+            self._by_token[token] = cid
+        for symbol in market_symbols(market):
+            self._by_symbol.setdefault(symbol, set()).add(cid)
+        for event in market.get("events") or []:
+            for key in (event.get("id"), event.get("slug")):
+                if key:
+                    self._by_event.setdefault(str(key), set()).add(cid)
+        end_ts = _parse_ts(market.get("endDate"))
+        if end_ts is not None:
+            insort(self._expiry, (end_ts, cid))
+        self._text[cid] = f"{market.get('question', '')} {market.get('description', '')}".lower()
+        return True
+
+    def remove(self, cid: str):
+        if cid in self.markets:
+            self._unindex(cid)
+            del self.markets[cid]
+
+    def _unindex(self, cid: str):
+        market = self.markets[cid]
+        if self._by_slug.get(market.get("slug")) == cid:
+            del self._by_slug[market["slug"]]
+        for token in market_token_ids(market):
+            if self._by_token.get(token) == cid:
+                del self._by_token[token]
+        for symbol in market_symbols(market):
+            self._by_symbol.get(symbol, set()).discard(cid)
+        for event in market.get("events") or []:
+            for key in (event.get("id"), event.get("slug")):
+                if key:
+                    self._by_event.get(str(key), set()).discard(cid)
+        end_ts = _parse_ts(market.get("endDate"))
+        if end_ts is not None:
+            i = bisect_left(self._expiry, (end_ts, cid))
+            if i < len(self._expiry) and self._expiry[i] == (end_ts, cid):
+                del self._expiry[i]
+        self._text.pop(cid, None)
+
+    def clear(self):
+        self.markets.clear()
+        self._by_slug.clear()
+        self._by_token.clear()
+        self._by_symbol.clear()
+        self._by_event.clear()
+        self._expiry.clear()
+        self._text.clear()
+        self.watermark = 0.0
+
+    # ─── Queries ───────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self.markets)
+
+    def all(self) -> List[dict]:
+        return list(self.markets.values())
+
+    def get(self, condition_id: str) -> Optional[dict]:
+        return self.markets.get(condition_id)
+
+    def by_slug(self, slug: str) -> Optional[dict]:
+        cid = self._by_slug.get(slug)
+        return self.markets.get(cid) if cid else None
+
+    def by_token(self, token_id: str) -> Optional[dict]:
+        cid = self._by_token.get(str(token_id))
+        return self.markets.get(cid) if cid else None
+
+    def lookup(self, key: str) -> Optional[dict]:
+        """Resolve a conditionId, slug or token id"""
+        return self.get(key) or self.by_slug(key) or self.by_token(key)
+
+    def by_symbol(self, symbol: str) -> List[dict]:
+        """Markets about an asset ('BTC', 'BTC/USDT', 'ETHUSDT')"""
+        cids = self._by_symbol.get(_normalize_symbol(symbol), ())
+        return [self.markets[cid] for cid in cids]
+
+    def by_event(self, event: str) -> List[dict]:
+        """Markets in an event (event id or slug)"""
+        return [self.markets[cid] for cid in self._by_event.get(str(event), ())]
+
+    def expiring_between(self, start: Optional[float] = None, end: Optional[float] = None) -> List[dict]:
+        """Markets whose endDate falls in [start, end] (epoch seconds), soonest first"""
+        lo = bisect_left(self._expiry, (start, "")) if start is not None else 0
+        hi = bisect_right(self._expiry, (end, "\uffff")) if end is not None else len(self._expiry)
+        return [self.markets[cid] for _, cid in self._expiry[lo:hi]]
+
+    def search(self, any_of: Iterable[str] = (), all_of: Iterable[str] = (),
+               candidates: Iterable[dict] = None) -> List[dict]:
+        """Keyword filter over lowercased question + description"""
+        any_of = [k.lower() for k in any_of]
+        all_of = [k.lower() for k in all_of]
+        pool = candidates if candidates is not None else self.markets.values()
+        results = []
+        for market in pool:
+            text = self._text.get(market.get("conditionId") or market.get("condition_id"), "")
+            if any_of and not any(k in text for k in any_of):
+                continue
+            if all_of and not all(k in text for k in all_of):
+                continue
+            results.append(market)
+        return results
+
+    def text_of(self, market: dict) -> str:
+        return self._text.get(market.get("conditionId") or market.get("condition_id"), "")
+
+    # ─── Refresh logic ─────────────────────────────────────────────────────────
+
+    def is_stale(self) -> bool:
+        return (time.time() - self.last_refresh) >= self.config.refresh_interval
+
+    def _plan(self, force: bool) -> Optional[str]:
+        """Decide what a refresh should do: None, 'full' or 'incremental'"""
+        if not force and not self.is_stale():
+            return None
+        if not force and self._reload_if_peer_refreshed():
+            return None
+        now = time.time()
+        if not self.markets or (now - self.last_full_sync) >= self.config.full_resync_interval:
+            return "full"
+        return "incremental"
+
+    def _page_params(self, mode: str, offset: int) -> dict:
+        params = {"limit": self.config.page_size, "offset": offset}
+        if mode == "full":
+            params.update({"closed": False, "active": True})
+        else:
+            # Newest changes first, including markets that just closed
+            params.update({"order": "updatedAt", "ascending": False})
+        return params
+
+    def _apply_page(self, mode: str, page: List[dict], seen: Set[str], watermark: float) -> Tuple[int, bool]:
+        """
+        Merge one page. Returns (changed, done). An incremental pass is done
+        once it reaches markets updated before the previous watermark. Ties
+        with the watermark are read again (a market updated in the same
+        instant may have been listed after it) and markets already applied in
+        this pass are skipped, so nothing is counted twice.
+        """
+        changed = 0
+        done = len(page) < self.config.page_size
+        for market in page:
+            cid = market.get("conditionId") or market.get("condition_id")
+            if not cid or cid in seen:
+                continue  # Offset pages shift while markets change
+            if mode == "incremental":
+                updated = _parse_ts(market.get("updatedAt")) or 0.0
+                if updated and updated < watermark:
+                    done = True
+                    continue
+                if not is_active_market(market):
+                    seen.add(cid)
+                    if cid in self.markets:
+                        self.remove(cid)
+                        changed += 1
+                    continue
+            seen.add(cid)
+            if self.markets.get(cid) != market:
+                self.upsert(market)
+                changed += 1
+            # Only paged results move the watermark (ad-hoc upserts could skip changes)
+            updated = _parse_ts(market.get("updatedAt"))
+            if updated and updated > self.watermark:
+                self.watermark = updated
+        return changed, done
+
+    def _finish(self, mode: str, seen: Set[str], changed: int, complete: bool, started: float,
+                watermark: float):
+        if mode == "incremental" and not complete:
+            # Interrupted pass: keep the old watermark so the gap is re-paged next time
+            self.watermark = watermark
+        if mode == "full" and complete:
+            for cid in [c for c in self.markets if c not in seen]:
+                self.remove(cid)
+            self.last_full_sync = time.time()
+        self.last_refresh = time.time()
+        if changed and self.config.persist:
+            self.save()
+        logger.info(
+            f"📚 Catalog {mode} refresh: {changed} changed, {len(self.markets)} markets "
+            f"({(time.time() - started) * 1000:.0f}ms)"
+        )
+
+    async def refresh(self, force: bool = False) -> int:
+        """Refresh through the shared async client. Returns markets changed"""
+        from http_client import get_client
+
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+
+        async with self._lock:
+            mode = self._plan(force)
+            if mode is None:
+                return 0
+
+            http = get_client()
+            started = time.time()
+            watermark = self.watermark
+            seen: Set[str] = set()
+            changed = 0
+            complete = False
+            for page_no in range(self.config.max_pages):
+                page = await http.get_json(
+                    f"{self.config.gamma_api}/markets",
+                    params=self._page_params(mode, page_no * self.config.page_size),
+                    timeout=self.config.request_timeout
+                )
+                if page is None:
+                    logger.warning(f"⚠️ Catalog {mode} refresh aborted (API error)")
+                    break
+                page_changed, done = self._apply_page(mode, page, seen, watermark)
+                changed += page_changed
+                if done:
+                    complete = True
+                    break
+
+            self._finish(mode, seen, changed, complete, started, watermark)
+            return changed
+
+    def refresh_sync(self, session=None, force: bool = False) -> int:
+        """Blocking refresh for synchronous bots (pooled requests.Session)"""
+        if session is None:
+            from http_client import get_sync_session
+            session = get_sync_session()
+
+        mode = self._plan(force)
+        if mode is None:
+            return 0
+
+        started = time.time()
+        watermark = self.watermark
+        seen: Set[str] = set()
+        changed = 0
+        complete = False
+        for page_no in range(self.config.max_pages):
+            try:
+                params = {k: (str(v).lower() if isinstance(v, bool) else v)
+                          for k, v in self._page_params(mode, page_no * self.config.page_size).items()}
+                response = session.get(f"{self.config.gamma_api}/markets", params=params,
+                                       timeout=self.config.request_timeout)
+                if response.status_code != 200:
+                    logger.warning(f"⚠️ Catalog {mode} refresh aborted ({response.status_code})")
+                    break
+                page = response.json()
+            except Exception as e:
+                logger.warning(f"⚠️ Catalog {mode} refresh aborted: {str(e)[:100]}")
+                break
+            page_changed, done = self._apply_page(mode, page, seen, watermark)
+            changed += page_changed
+            if done:
+                complete = True
+                break
+
+        self._finish(mode, seen, changed, complete, started, watermark)
+        return changed
+
+    # ─── Persistence ───────────────────────────────────────────────────────────
+
+    def save(self):
+        """Atomically write the catalog for warm start / peer processes"""
+        path = self.config.cache_file
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({
+                    "version": 1,
+                    "saved_at": time.time(),
+                    "watermark": self.watermark,
+                    "last_full_sync": self.last_full_sync,
+                    "markets": list(self.markets.values()),
+                }, f)
+            os.replace(tmp, path)
+            self._loaded_mtime = os.path.getmtime(path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save market catalog: {str(e)[:100]}")
+
+    def load(self) -> bool:
+        """Warm start from disk. Returns True if markets were loaded"""
+        path = self.config.cache_file
+        try:
+            if not os.path.exists(path):
+                return False
+            mtime = os.path.getmtime(path)
+            with open(path) as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load market catalog: {str(e)[:100]}")
+            return False
+
+        self.clear()
+        for market in data.get("markets", []):
+            self.upsert(market)
+        self.watermark = float(data.get("watermark") or 0)
+        self.last_full_sync = float(data.get("last_full_sync") or 0)
+        self.last_refresh = float(data.get("saved_at") or 0)
+        self._loaded_mtime = mtime
+        logger.info(f"📚 Loaded {len(self.markets)} markets from {path}")
+        return True
+
+    def _reload_if_peer_refreshed(self) -> bool:
+        """Another process refreshed the shared file recently: use it instead of the API"""
+        if not self.config.persist:
+            return False
+        try:
+            mtime = os.path.getmtime(self.config.cache_file)
+        except OSError:
+            return False
+        if mtime <= self._loaded_mtime or (time.time() - mtime) >= self.config.refresh_interval:
+            return False
+        return self.load()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SHARED INSTANCE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_shared_catalog: Optional[MarketCatalog] = None
+
+
+def get_catalog() -> MarketCatalog:
+    """Process-wide market catalog"""
+    global _shared_catalog
+    if _shared_catalog is None:
+        _shared_catalog = MarketCatalog()
+    return _shared_catalog
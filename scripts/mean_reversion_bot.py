@@ -25,29 +25,35 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
-from collections import deque
-import statistics
 import math
 
 # Third-party
-import requests
+import numpy as np
 from dotenv import load_dotenv
 
-# Try to import ccxt for exchange data
-try:
-    import ccxt
-    CCXT_AVAILABLE = True
-except ImportError:
-    CCXT_AVAILABLE = False
+from http_client import get_client, close_client
+from market_catalog import get_catalog
+from order_book import get_book_store
+from money import Micros
+from rolling_stats import RollingStats, mean_stdev
+from candle_ring import CandleRing, CandleWindow
+from candle_stream import CLOSE, GAP, Bar, BinanceTradeStream, CandleAggregator
+from metrics import cycle_histogram, order_histogram, queue_gauge, signal_histogram, start_metrics_server
+from profiler import install_profiler
+from lazy_imports import lazy_import, module_available, report_startup
+from spot_prices import get_spot_service
+
+# Exchange / CLOB clients are imported on first use (ccxt alone is hundreds of modules)
+ccxt = lazy_import("ccxt")
+ccxt_async = lazy_import("ccxt.async_support")
+CCXT_AVAILABLE = module_available("ccxt")
+if not CCXT_AVAILABLE:
     print("⚠️  ccxt not installed. Using fallback price source.")
 
-# Try to import py_clob_client for Polymarket
-try:
-    from py_clob_client.client import ClobClient
-    from py_clob_client.clob_types import OrderArgs, OrderType
-    CLOB_AVAILABLE = True
-except ImportError:
-    CLOB_AVAILABLE = False
+ClobClient = lazy_import("py_clob_client.client", "ClobClient")
+OrderArgs = lazy_import("py_clob_client.clob_types", "OrderArgs")
+CLOB_AVAILABLE = module_available("py_clob_client")
+if not CLOB_AVAILABLE:
     print("⚠️  py_clob_client not installed. Running in simulation mode.")
 
 load_dotenv()
@@ -79,7 +85,9 @@ class Config:
     SYMBOLS: List[str] = field(default_factory=lambda: ["BTC/USDT", "ETH/USDT"])
     
     # Statistical Parameters
-    LOOKBACK_PERIOD: int = 30          # Candles for rolling stats
+    LOOKBACK_PERIOD: int = 30          # Candles for rolling stats (O(1) per candle: can be thousands)
+    BOLLINGER_PERIOD: int = 20         # Candles in the Bollinger bands
+    CANDLE_HISTORY: int = int(os.getenv("MR_CANDLE_HISTORY", "240"))  # 1m candles kept per symbol (48 B each)
     Z_SCORE_THRESHOLD: float = 2.0     # Entry signal (2 sigma)
     Z_SCORE_EXTREME: float = 3.0       # Strong signal (3 sigma)
     
@@ -95,6 +103,9 @@ class Config:
     
     # Execution
     POLL_INTERVAL_SEC: float = 1.0     # Price polling interval
+    FETCH_TIMEOUT_SEC: float = 3.0     # Per-symbol candle fetch timeout (cached candles used past it)
+    CANDLE_MAX_AGE_SEC: float = 90.0   # No signals on candles not refreshed for this long
+    TRADE_STREAM: bool = os.getenv("MR_TRADE_STREAM", "false").lower() == "true"  # 1m candles built from trades
     MIN_EDGE_PCT: float = 0.03         # Minimum 3% edge to trade
     
     # Logging
@@ -182,102 +193,426 @@ class Position:
 class PriceFeed:
     """
     Real-time price data from exchanges.
-    Uses ccxt for exchange connectivity.
-    Fallback to CoinGecko API if ccxt unavailable.
+    Spot prices come from the shared spot snapshot (Binance, CoinGecko fallback).
+    Uses ccxt for candles and as the spot fallback.
+    Candles are kept per symbol in a columnar CandleRing (CANDLE_HISTORY
+    candles); fetch_window returns zero-copy NumPy views of it.
+    With an attached CandleAggregator, 1m candles come from the trade stream
+    and REST only fills in until the stream has delivered a full minute.
+    refresh() updates every symbol concurrently (ccxt async_support, or the
+    sync exchange in worker threads) with a per-symbol timeout.
     """
     
-    def __init__(self, exchange_id: str = "binance"):
+    def __init__(self, exchange_id: str = "binance", incremental: bool = True):
         self.exchange_id = exchange_id
-        self.exchange = None
-        self.candles: Dict[str, deque] = {}  # symbol -> candles
-        
-        if CCXT_AVAILABLE:
-            try:
-                exchange_class = getattr(ccxt, exchange_id)
-                self.exchange = exchange_class({
-                    'enableRateLimit': True,
-                    'timeout': 10000,
-                })
-                logger.info(f"✅ Connected to {exchange_id}")
-            except Exception as e:
-                logger.warning(f"⚠️  Failed to connect to {exchange_id}: {e}")
+        self._exchange = None
+        self._exchange_ready = False  # Built on first use (imports ccxt)
+        self._exchange_injected = False  # Set through the exchange setter (tests, benchmarks)
+        self._async_exchange = None
+        self._async_ready = False
+        self.candles: Dict[str, CandleRing] = {}  # symbol -> columnar candle history
+        self.incremental = incremental  # since= fetches merged into the buffer (False: full refetch)
+        self._timeframes: Dict[str, str] = {}  # symbol -> timeframe of the buffer
+        self.ohlcv_requests = 0
+        self.ohlcv_rows = 0
+        self.fetch_timeouts = 0
+        self._fresh_at: Dict[str, float] = {}  # symbol -> monotonic time of the last successful refresh
+        
+        # Trade stream (attach_aggregator)
+        self.aggregator: Optional[CandleAggregator] = None
+        self.candle_closed = asyncio.Event()
+        self._stream_live: set = set()  # Symbols with a full streamed minute since the last gap
+        self.stream_closes = 0
         
         # Initialize candle buffers
         for symbol in config.SYMBOLS:
-            self.candles[symbol] = deque(maxlen=config.LOOKBACK_PERIOD + 10)
+            self._reset_buffer(symbol)
+    
+    @property
+    def exchange(self):
+        """ccxt exchange, created on first access (None if ccxt is unavailable)"""
+        if not self._exchange_ready:
+            self._exchange_ready = True
+            if CCXT_AVAILABLE:
+                try:
+                    exchange_class = getattr(ccxt, self.exchange_id)
+                    self._exchange = exchange_class({
+                        'enableRateLimit': True,
+                        'timeout': 10000,
+                    })
+                    logger.info(f"✅ Connected to {self.exchange_id}")
+                except Exception as e:
+                    logger.warning(f"⚠️  Failed to connect to {self.exchange_id}: {e}")
+        return self._exchange
+    
+    @exchange.setter
+    def exchange(self, exchange):
+        self._exchange = exchange
+        self._exchange_ready = True
+        self._exchange_injected = True
+    
+    @property
+    def async_exchange(self):
+        """ccxt.async_support exchange, created on first access (None if unavailable or a sync one was set)"""
+        if not self._async_ready:
+            self._async_ready = True
+            if CCXT_AVAILABLE and not self._exchange_injected:
+                try:
+                    exchange_class = getattr(ccxt_async, self.exchange_id)
+                    self._async_exchange = exchange_class({
+                        'enableRateLimit': True,
+                        'timeout': 10000,
+                    })
+                except Exception as e:
+                    logger.warning(f"⚠️  Failed to create async {self.exchange_id}: {e}")
+        return self._async_exchange
+    
+    @async_exchange.setter
+    def async_exchange(self, exchange):
+        self._async_exchange = exchange
+        self._async_ready = True
+    
+    async def _exchange_call(self, method: str, *args, **kwargs):
+        """Exchange method without blocking the loop: async ccxt, else the sync exchange in a thread"""
+        exchange = self.async_exchange
+        if exchange is not None:
+            return await getattr(exchange, method)(*args, **kwargs)
+        return await asyncio.to_thread(getattr(self.exchange, method), *args, **kwargs)
+    
+    async def close(self):
+        """Release the async exchange's HTTP session"""
+        if self._async_exchange is not None and hasattr(self._async_exchange, "close"):
+            try:
+                await self._async_exchange.close()
+            except Exception as e:
+                logger.warning(f"⚠️  Failed to close {self.exchange_id}: {str(e)[:100]}")
     
     def get_spot_price(self, symbol: str) -> Optional[float]:
-        """Get current spot price"""
+        """Get current spot price (shared snapshot: one batched request for all SYMBOLS)"""
+        price = get_spot_service().snapshot_sync([symbol, *config.SYMBOLS])[symbol]
+        if price is not None:
+            return price
+        
+        # Fallback: exchange ticker
         if self.exchange:
             try:
                 ticker = self.exchange.fetch_ticker(symbol)
                 return ticker['last']
             except Exception as e:
                 logger.warning(f"Exchange error: {e}")
-        
-        # Fallback: CoinGecko
-        return self._fallback_price(symbol)
-    
-    def _fallback_price(self, symbol: str) -> Optional[float]:
-        """Fallback price source using CoinGecko"""
-        try:
-            coin = symbol.split('/')[0].lower()
-            url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin}&vs_currencies=usd"
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                return data.get(coin, {}).get('usd')
-        except:
-            pass
         return None
     
-    def fetch_recent_candles(self, symbol: str, timeframe: str = '1m', limit: int = 30) -> List[Candle]:
-        """Fetch recent OHLCV candles"""
-        if not self.exchange:
-            return list(self.candles.get(symbol, []))
-        
+    async def get_spot_prices(self, symbols: List[str] = None, timeout: float = None) -> Dict[str, Optional[float]]:
+        """Spot prices of all symbols: one batched snapshot, exchange tickers concurrently for the gaps"""
+        symbols = list(symbols or config.SYMBOLS)
+        timeout = config.FETCH_TIMEOUT_SEC if timeout is None else timeout
+        prices = await get_spot_service().snapshot(symbols)
+        missing = [s for s in symbols if prices.get(s) is None]
+        if missing and (self.async_exchange is not None or self.exchange):
+            async def ticker(symbol: str) -> Optional[float]:
+                try:
+                    return (await asyncio.wait_for(self._exchange_call("fetch_ticker", symbol), timeout))['last']
+                except Exception as e:
+                    logger.warning(f"Exchange error: {str(e)[:100] or type(e).__name__}")
+                    return None
+            for symbol, price in zip(missing, await asyncio.gather(*(ticker(s) for s in missing))):
+                prices[symbol] = price
+        return prices
+    
+    # Rows asked for by an incremental fetch: last closed + forming + new closes.
+    # A full answer means candles may be missing after it (reconnect): backfill.
+    INCREMENTAL_LIMIT = 5
+    
+    def _reset_buffer(self, symbol: str, limit: int = 0) -> CandleRing:
+        """Empty the symbol's ring (reallocated only if limit outgrows it)"""
+        capacity = max(config.CANDLE_HISTORY, limit, config.LOOKBACK_PERIOD) + 10
+        ring = self.candles.get(symbol)
+        if ring is None or ring.capacity < capacity:
+            ring = self.candles[symbol] = CandleRing(capacity)
+        ring.clear()
+        return ring
+    
+    @staticmethod
+    def _to_candle(row: list) -> Candle:
+        return Candle(
+            timestamp=datetime.fromtimestamp(row[0] / 1000),
+            open=row[1],
+            high=row[2],
+            low=row[3],
+            close=row[4],
+            volume=row[5]
+        )
+    
+    def _fetch_ohlcv(self, symbol: str, timeframe: str, limit: int, since: int = None) -> list:
+        self.ohlcv_requests += 1
+        if since is None:
+            rows = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+        else:
+            rows = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+        self.ohlcv_rows += len(rows)
+        return rows
+    
+    def _recent(self, symbol: str, limit: int) -> List[Candle]:
+        """Last `limit` buffered candles as Candle objects, oldest first"""
+        ring = self.candles.get(symbol)
+        if ring is None:
+            return []
+        return [self._to_candle(row) for row in ring.window(limit).rows()]
+    
+    def backfill(self, symbol: str, timeframe: str = '1m', limit: int = 30):
+        """Rebuild the buffer from the last `limit` candles (first fetch, gaps, timeframe change)"""
+        self._apply_rest(symbol, timeframe, limit, None, self._fetch_ohlcv(symbol, timeframe, limit))
+    
+    def _plan_rest(self, symbol: str, timeframe: str, limit: int) -> Tuple[Optional[int], int]:
+        """(since, limit) of the next OHLCV request: since None = backfill"""
+        ring = self.candles.get(symbol)
+        if (not self.incremental or ring is None or len(ring) < max(limit, 2)
+                or self._timeframes.get(symbol) != timeframe):
+            return None, limit
+        return int(ring.timestamp(-2)), self.INCREMENTAL_LIMIT  # Last closed candle onwards
+    
+    def _apply_rest(self, symbol: str, timeframe: str, limit: int, since: Optional[int], rows: list) -> bool:
+        """Store an OHLCV answer. False if an incremental answer shows a gap (backfill needed)."""
+        if since is None:
+            self._reset_buffer(symbol, limit).extend(row[:6] for row in rows)
+            self._timeframes[symbol] = timeframe
+            return True
+        if not rows or rows[0][0] > since or len(rows) >= self.INCREMENTAL_LIMIT:
+            logger.info(f"🔄 {symbol}: candle gap, backfilling {limit} candles")
+            return False
+        self._merge(symbol, rows)
+        return True
+    
+    def _merge(self, symbol: str, rows: list) -> int:
+        """Update buffered candles in place and append new ones. Returns how many were appended."""
+        ring = self.candles[symbol]
+        appended = 0
+        for row in rows:
+            ts = row[0]
+            last = ring.last_ts
+            if last is None or ts > last:
+                ring.append(*row[:6])
+                appended += 1
+                continue
+            # Known candle (the last closed or the forming one): refresh its values
+            i = len(ring) - 1 if ts == last else ring.find(ts)
+            if i is not None:
+                ring.update(i, *row[1:6])
+        return appended
+    
+    def _fetch_rest(self, symbol: str, timeframe: str, limit: int):
+        """Bring the buffer up to date over REST (incremental, or backfill)"""
         try:
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-            candles = []
-            for c in ohlcv:
-                candle = Candle(
-                    timestamp=datetime.fromtimestamp(c[0] / 1000),
-                    open=c[1],
-                    high=c[2],
-                    low=c[3],
-                    close=c[4],
-                    volume=c[5]
-                )
-                candles.append(candle)
-            
-            # Update buffer
-            self.candles[symbol] = deque(candles, maxlen=config.LOOKBACK_PERIOD + 10)
-            return candles
-            
+            since, count = self._plan_rest(symbol, timeframe, limit)
+            rows = self._fetch_ohlcv(symbol, timeframe, count, since=since)
+            if not self._apply_rest(symbol, timeframe, limit, since, rows):
+                self.backfill(symbol, timeframe, limit)
+            self._fresh_at[symbol] = time.monotonic()
         except Exception as e:
             logger.error(f"Failed to fetch candles: {e}")
-            return list(self.candles.get(symbol, []))
+    
+    def _needs_rest(self, symbol: str, timeframe: str, limit: int) -> bool:
+        """False while a live trade stream owns the symbol's 1m candles"""
+        if self.aggregator is None or timeframe != '1m':
+            return True
+        ring = self.candles.get(symbol)
+        return symbol not in self._stream_live or ring is None or len(ring) < limit
+    
+    def _overlay_stream(self, symbol: str, timeframe: str):
+        """Forming candle from the trade stream, when it covers the whole minute"""
+        if self.aggregator is not None and timeframe == '1m':
+            bar = self.aggregator.forming.get(symbol)
+            if bar is not None and not bar.partial:
+                self._store_bar(symbol, bar)
+    
+    def _refresh(self, symbol: str, timeframe: str, limit: int):
+        """
+        Bring the symbol's candles up to date. Once the buffer holds `limit`
+        candles, only the last closed candle onwards is fetched (since=): the
+        forming candle is updated in place and new closes are appended. Gaps
+        are backfilled. When streaming, no request is made once the stream is live.
+        """
+        if self._needs_rest(symbol, timeframe, limit) and self.exchange:
+            self._fetch_rest(symbol, timeframe, limit)
+        self._overlay_stream(symbol, timeframe)
+    
+    # ─── Async refresh ─────────────────────────────────────────────────────────
+    
+    async def _fetch_ohlcv_async(self, symbol: str, timeframe: str, limit: int, since: int = None) -> list:
+        self.ohlcv_requests += 1
+        if since is None:
+            rows = await self._exchange_call("fetch_ohlcv", symbol, timeframe, limit=limit)
+        else:
+            rows = await self._exchange_call("fetch_ohlcv", symbol, timeframe, since=since, limit=limit)
+        self.ohlcv_rows += len(rows)
+        return rows
+    
+    async def _refresh_async(self, symbol: str, timeframe: str, limit: int):
+        """_refresh without blocking the loop (exchange errors propagate)"""
+        if self._needs_rest(symbol, timeframe, limit) and (self.async_exchange is not None or self.exchange):
+            since, count = self._plan_rest(symbol, timeframe, limit)
+            rows = await self._fetch_ohlcv_async(symbol, timeframe, count, since=since)
+            if not self._apply_rest(symbol, timeframe, limit, since, rows):
+                rows = await self._fetch_ohlcv_async(symbol, timeframe, limit)
+                self._apply_rest(symbol, timeframe, limit, None, rows)
+        self._overlay_stream(symbol, timeframe)
+    
+    async def _refresh_symbol(self, symbol: str, timeframe: str, limit: int, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._refresh_async(symbol, timeframe, limit), timeout)
+        except asyncio.TimeoutError:
+            self.fetch_timeouts += 1
+            logger.warning(f"⏱️ {symbol}: candles timed out after {timeout:.1f}s, keeping cached candles")
+            return False
+        except Exception as e:
+            logger.warning(f"⚠️ {symbol}: candle refresh failed, keeping cached candles: "
+                           f"{str(e)[:100] or type(e).__name__}")
+            return False
+        self._fresh_at[symbol] = time.monotonic()
+        return True
+    
+    async def refresh(self, symbols: List[str] = None, timeframe: str = '1m', limit: int = 30,
+                      timeout: float = None) -> Dict[str, bool]:
+        """
+        Update the candles of every symbol concurrently: a cycle waits for the
+        slowest symbol, not the sum. A symbol that errors or exceeds `timeout`
+        keeps its previous candles (see is_stale). Returns {symbol: refreshed}.
+        """
+        symbols = list(symbols or config.SYMBOLS)
+        timeout = config.FETCH_TIMEOUT_SEC if timeout is None else timeout
+        results = await asyncio.gather(*(self._refresh_symbol(s, timeframe, limit, timeout) for s in symbols))
+        return dict(zip(symbols, results))
+    
+    def is_stale(self, symbol: str, max_age: float = None) -> bool:
+        """Candles not refreshed successfully for more than max_age seconds"""
+        fresh_at = self._fresh_at.get(symbol)
+        max_age = config.CANDLE_MAX_AGE_SEC if max_age is None else max_age
+        return fresh_at is not None and time.monotonic() - fresh_at > max_age
+    
+    def fetch_recent_candles(self, symbol: str, timeframe: str = '1m', limit: int = 30) -> List[Candle]:
+        """Recent OHLCV candles as Candle objects (see fetch_window for the columnar view)"""
+        self._refresh(symbol, timeframe, limit)
+        return self._recent(symbol, limit)
+    
+    def fetch_window(self, symbol: str, timeframe: str = '1m', limit: int = 30) -> CandleWindow:
+        """Recent OHLCV candles as zero-copy columns, valid until the next update of the symbol"""
+        self._refresh(symbol, timeframe, limit)
+        return self.window(symbol, limit)
+    
+    def window(self, symbol: str, limit: int = 30) -> CandleWindow:
+        """Buffered candles as zero-copy columns, no request (after refresh())"""
+        ring = self.candles.get(symbol)
+        return ring.window(limit) if ring is not None else CandleWindow(np.empty((6, 0)))
+    
+    # ─── Trade stream ──────────────────────────────────────────────────────────
+    
+    def attach_aggregator(self, aggregator: CandleAggregator) -> CandleAggregator:
+        """Take 1m candles from a trade stream aggregator (see candle_stream.py)"""
+        self.aggregator = aggregator
+        self.candle_closed = asyncio.Event()
+        aggregator.add_listener(self._on_stream_candle)
+        return aggregator
+    
+    def _store_bar(self, symbol: str, bar: Bar):
+        if symbol not in self.candles:
+            self._reset_buffer(symbol)
+        self._timeframes.setdefault(symbol, '1m')
+        self._merge(symbol, [[bar.ts, bar.open, bar.high, bar.low, bar.close, bar.volume]])
+    
+    def _on_stream_candle(self, event: str, symbol: str, bar: Optional[Bar]):
+        if event == GAP:
+            self._stream_live.discard(symbol)  # REST again until a full minute is streamed
+            return
+        if bar.partial:
+            # Stream started mid-minute: REST has the whole minute (stream only if no exchange)
+            self._stream_live.discard(symbol)
+            if self.exchange:
+                return
+        self._store_bar(symbol, bar)
+        if event == CLOSE:
+            if not bar.partial:
+                self._stream_live.add(symbol)
+            self.stream_closes += 1
+            self.candle_closed.set()
+    
+    async def wait_for_close(self, timeout: float = None) -> bool:
+        """Wait for the next streamed candle close. Returns False on timeout"""
+        try:
+            await asyncio.wait_for(self.candle_closed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.candle_closed.clear()
+        return True
     
     def add_candle(self, symbol: str, candle: Candle):
         """Add a new candle to the buffer"""
         if symbol not in self.candles:
-            self.candles[symbol] = deque(maxlen=config.LOOKBACK_PERIOD + 10)
-        self.candles[symbol].append(candle)
+            self._reset_buffer(symbol)
+        self.candles[symbol].append(candle.timestamp.timestamp() * 1000, candle.open, candle.high,
+                                    candle.low, candle.close, candle.volume)
 
 
 # ============================================================================
 # SIGNAL GENERATOR (Statistical Logic)
 # ============================================================================
 
+class CandleStats:
+    """
+    Rolling statistics of one symbol's closed candles, fed incrementally.
+    The last candle of a fetch is still forming: it is scored against the
+    window, and only enters it once a newer candle closes it.
+    """
+    
+    def __init__(self, lookback: int, bollinger_period: int):
+        self.changes = RollingStats(max(lookback - 1, 1))  # change_pct of closed candles
+        self.closes = RollingStats(max(bollinger_period - 1, 1))  # Bollinger window minus the current candle
+        self.last_timestamp: Optional[float] = None  # Open time (ms) of the last candle pushed
+    
+    def sync(self, window: CandleWindow) -> int:
+        """Push the closed candles not seen yet (binary search on open times). Returns how many."""
+        closed = len(window) - 1
+        if closed <= 0:
+            return 0
+        start = 0
+        if self.last_timestamp is not None:
+            start = int(np.searchsorted(window.ts[:closed], self.last_timestamp, side="right"))
+        if start >= closed:
+            return 0
+        new = window[start:closed]
+        for change, close in zip(new.change_pct.tolist(), new.close.tolist()):
+            self.changes.push(change)
+            self.closes.push(close)
+        self.last_timestamp = float(window.ts[closed - 1])
+        return closed - start
+
+
 class SignalGenerator:
     """
     Core statistical logic for Mean Reversion strategy.
     Detects anomalies using Z-Score and generates trading signals.
+    
+    Works on CandleWindow columns (lists of Candle are converted). With a
+    symbol, z-score and Bollinger bands come from per-symbol rolling
+    statistics updated once per new candle (O(1) per tick whatever
+    LOOKBACK_PERIOD); without one they are computed over the window arrays.
     """
     
     def __init__(self, price_feed: PriceFeed):
         self.price_feed = price_feed
         self.signals_generated = 0
+        self.candle_stats: Dict[str, CandleStats] = {}
+    
+    def _stats(self, symbol: str, window: CandleWindow) -> CandleStats:
+        """Rolling stats of a symbol, brought up to date with the window"""
+        stats = self.candle_stats.get(symbol)
+        if stats is None:
+            stats = self.candle_stats[symbol] = CandleStats(config.LOOKBACK_PERIOD, config.BOLLINGER_PERIOD)
+        stats.sync(window)
+        return stats
+    
+    @staticmethod
+    def _window(candles) -> CandleWindow:
+        return candles if isinstance(candles, CandleWindow) else CandleWindow.from_candles(candles)
     
     def calculate_z_score(self, values: List[float], current: float) -> float:
         """
@@ -287,30 +622,36 @@ class SignalGenerator:
         if len(values) < 5:
             return 0.0
         
-        mean = statistics.mean(values)
-        stdev = statistics.stdev(values)
+        mean, stdev = mean_stdev(values)
         
         if stdev == 0:
             return 0.0
         
         return (current - mean) / stdev
     
-    def calculate_bollinger_position(self, candles: List[Candle], period: int = 20) -> Tuple[float, float, float]:
+    def calculate_bollinger_position(self, candles, period: int = None,
+                                     symbol: str = None) -> Tuple[float, float, float]:
         """
-        Calculate Bollinger Bands position.
+        Calculate Bollinger Bands position (candles: CandleWindow or list of Candle).
         Returns: (position_pct, upper_band, lower_band)
         Position: 0 = at lower, 1 = at upper, 0.5 = middle
         """
+        period = period or config.BOLLINGER_PERIOD
         if len(candles) < period:
             return 0.5, 0, 0
         
-        closes = [c.close for c in candles[-period:]]
-        mean = statistics.mean(closes)
-        stdev = statistics.stdev(closes) if len(closes) > 1 else 0
+        window = self._window(candles)
+        current = float(window.close[-1])
+        if symbol is not None and period == config.BOLLINGER_PERIOD:
+            # Closed candles from the rolling window + the current one
+            mean, stdev = self._stats(symbol, window).closes.stats_with(current)
+        else:
+            closes = window.close[-period:]
+            mean = float(closes.mean())
+            stdev = float(closes.std(ddof=1)) if period > 1 else 0.0
         
         upper = mean + (2 * stdev)
         lower = mean - (2 * stdev)
-        current = candles[-1].close
         
         if upper == lower:
             return 0.5, upper, lower
@@ -349,20 +690,29 @@ class SignalGenerator:
         # Clamp to reasonable range
         return max(0, min(0.25, kelly))  # Never bet more than 25%
     
-    def detect_volatility_spike(self, candles: List[Candle]) -> Tuple[float, str]:
+    def detect_volatility_spike(self, candles, symbol: str = None) -> Tuple[float, str]:
         """
-        Detect if latest candle is a volatility spike.
+        Detect if latest candle is a volatility spike (candles: CandleWindow or list of Candle).
         Returns: (z_score, direction)
         Direction: "PUMP" if positive spike, "DUMP" if negative
         """
         if len(candles) < config.LOOKBACK_PERIOD:
             return 0.0, "NONE"
         
-        # Calculate change percentages for historical candles
-        historical_changes = [c.change_pct for c in candles[:-1]]
-        current_change = candles[-1].change_pct
-        
-        z_score = self.calculate_z_score(historical_changes, current_change)
+        window = self._window(candles)
+        current_change = window.change_pct_at(-1)
+        if symbol is not None:
+            # Rolling window of closed candles, updated with new candles only
+            changes = self._stats(symbol, window).changes
+            z_score = changes.zscore(current_change) if len(changes) >= 5 else 0.0
+        else:
+            # Change percentages of the historical candles, vectorized
+            historical_changes = window[:-1].change_pct
+            z_score = 0.0
+            if len(historical_changes) >= 5:
+                stdev = float(historical_changes.std(ddof=1))
+                if stdev != 0:
+                    z_score = (current_change - float(historical_changes.mean())) / stdev
         
         if z_score > config.Z_SCORE_THRESHOLD:
             return z_score, "PUMP"
@@ -371,24 +721,31 @@ class SignalGenerator:
         
         return abs(z_score), "NONE"
     
-    def generate_signal(self, symbol: str, market_info: dict) -> Optional[Signal]:
+    def generate_signal(self, symbol: str, market_info: dict, refresh: bool = True) -> Optional[Signal]:
         """
         Main signal generation logic.
         Analyzes price action and generates Mean Reversion signals.
+        refresh=False uses the candles of the last PriceFeed.refresh() (no request).
         """
-        candles = self.price_feed.fetch_recent_candles(symbol)
+        if refresh:
+            candles = self.price_feed.fetch_window(symbol, limit=config.LOOKBACK_PERIOD)
+        elif self.price_feed.is_stale(symbol):
+            logger.debug(f"Stale candles for {symbol}, no signal")
+            return None
+        else:
+            candles = self.price_feed.window(symbol, limit=config.LOOKBACK_PERIOD)
         if len(candles) < config.LOOKBACK_PERIOD:
             logger.debug(f"Insufficient data for {symbol}: {len(candles)} candles")
             return None
         
         # Detect volatility spike
-        z_score, spike_direction = self.detect_volatility_spike(candles)
+        z_score, spike_direction = self.detect_volatility_spike(candles, symbol)
         
         if spike_direction == "NONE":
             return None
         
         # Calculate Bollinger position
-        bb_position, bb_upper, bb_lower = self.calculate_bollinger_position(candles)
+        bb_position, bb_upper, bb_lower = self.calculate_bollinger_position(candles, symbol=symbol)
         
         # Determine trading direction (FADE the spike)
         if spike_direction == "PUMP":
@@ -484,48 +841,41 @@ class MarketSelector:
         self.active_markets: Dict[str, dict] = {}
         self.last_fetch = datetime.min
         self.cache_duration = timedelta(seconds=30)
+        self.catalog = get_catalog()
     
-    def fetch_15min_markets(self) -> List[dict]:
-        """Fetch all active 15-minute BTC/ETH price markets from Polymarket"""
+    async def fetch_15min_markets(self) -> List[dict]:
+        """Active 15-minute BTC/ETH price markets, served from the shared market catalog"""
         now = datetime.now()
         
         if (now - self.last_fetch) < self.cache_duration and self.active_markets:
             return list(self.active_markets.values())
         
         try:
-            response = requests.get(
-                f"{config.GAMMA_API}/markets",
-                params={
-                    "closed": False,
-                    "active": True,
-                    "limit": 100
-                },
-                timeout=15
-            )
+            await self.catalog.refresh()
             
-            if response.status_code != 200:
-                logger.warning(f"Gamma API error: {response.status_code}")
-                return list(self.active_markets.values())
+            # Symbol index instead of scanning every market; skip already expired ones
+            candidates = {}
+            for symbol in config.SYMBOLS:
+                for market in self.catalog.by_symbol(symbol):
+                    candidates[market.get('conditionId', '')] = market
+            open_ids = {m.get('conditionId') for m in self.catalog.expiring_between(start=time.time())}
             
-            all_markets = response.json()
-            
-            # Filter for 15-minute BTC/ETH markets
+            # Filter for 15-minute price markets
             keywords_15min = ['15 min', '15min', '15 minute', '15-min', '15-minute']
-            keywords_crypto = ['btc', 'bitcoin', 'eth', 'ethereum']
             
             filtered = []
-            for market in all_markets:
-                question = (market.get('question', '') + ' ' + market.get('description', '')).lower()
+            self.active_markets = {}
+            for market_id, market in candidates.items():
+                if market_id not in open_ids:
+                    continue
+                question = self.catalog.text_of(market)
                 
                 # Must contain 15min reference
                 has_15min = any(kw in question for kw in keywords_15min)
-                # Must contain crypto reference
-                has_crypto = any(kw in question for kw in keywords_crypto)
                 # Must be price-related
                 has_price = 'price' in question or '>' in question or '<' in question
                 
-                if has_15min and has_crypto and has_price:
-                    market_id = market.get('conditionId', '')
+                if has_15min and has_price:
                     self.active_markets[market_id] = market
                     filtered.append(market)
             
@@ -538,7 +888,7 @@ class MarketSelector:
             logger.error(f"Failed to fetch markets: {e}")
             return list(self.active_markets.values())
     
-    def select_best_market(self, symbol: str) -> Optional[dict]:
+    async def select_best_market(self, symbol: str) -> Optional[dict]:
         """
         Select the best market to trade for a given symbol.
         Prioritizes:
@@ -546,7 +896,7 @@ class MarketSelector:
         2. Markets with reasonable liquidity
         3. Markets with prices away from 0.5 (more edge potential)
         """
-        markets = self.fetch_15min_markets()
+        markets = await self.fetch_15min_markets()
         
         if not markets:
             return None
@@ -595,21 +945,21 @@ class ExecutionEngine:
     """
     Handles order execution on Polymarket CLOB.
     Also sends executions to the frontend API.
-    Simulation mode if py_clob_client not available.
+    Simulation mode if py_clob_client is not available or on --dry-run.
     """
     
-    def __init__(self):
+    def __init__(self, dry_run: bool = False):
         self.client = None
         self.simulation_mode = True
         self.simulated_positions: List[Position] = []
-        self.total_pnl = 0.0
+        self.total_pnl = Micros()  # Fixed-point USDC: running sums don't drift
         self.signals_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'mean_reversion_signals.json')
         self.api_base = os.getenv('API_BASE_URL', 'http://127.0.0.1:3001')
         
         # Ensure data directory exists
         os.makedirs(os.path.dirname(self.signals_file), exist_ok=True)
         
-        if CLOB_AVAILABLE and config.POLY_API_KEY:
+        if CLOB_AVAILABLE and config.POLY_API_KEY and not dry_run:
             try:
                 self.client = ClobClient(
                     host=config.CLOB_HOST,
@@ -672,7 +1022,7 @@ class ExecutionEngine:
         except Exception as e:
             logger.error(f"Failed to save signal: {e}")
     
-    def send_to_api(self, signal: Signal, size_usd: float, market_question: str = None):
+    async def send_to_api(self, signal: Signal, size_usd: float, market_question: str = None):
         """Send execution to frontend API"""
         try:
             payload = {
@@ -696,25 +1046,25 @@ class ExecutionEngine:
                 'market_question': market_question or signal.market_question
             }
             
-            response = requests.post(
+            status, result = await get_client().post_json(
                 f"{self.api_base}/api/oracle/execute",
-                json=payload,
-                timeout=5
+                payload,
+                timeout=5,
+                rate_limit=False
             )
             
-            if response.status_code == 200:
-                result = response.json()
+            if status == 200:
                 logger.info(f"📡 API: {result.get('message', 'Execution sent')}")
                 return True
             else:
-                logger.warning(f"API error: {response.status_code}")
+                logger.warning(f"API error: {status}")
                 return False
                 
         except Exception as e:
             logger.warning(f"Failed to send to API (non-critical): {e}")
             return False
     
-    def execute_signal(self, signal: Signal, bankroll: float, market_question: str = None) -> Optional[Position]:
+    async def execute_signal(self, signal: Signal, bankroll: float, market_question: str = None) -> Optional[Position]:
         """Execute a trading signal"""
         
         # Calculate position size
@@ -728,31 +1078,39 @@ class ExecutionEngine:
         # Save signal as PENDING first
         self.save_signal(signal, status='PENDING')
         
-        if self.simulation_mode:
-            position = self._simulate_order(signal, size_usd)
-        else:
-            position = self._execute_real_order(signal, size_usd)
+        with order_histogram("mean_reversion").time():
+            if self.simulation_mode:
+                position = self._simulate_order(signal, size_usd)
+            else:
+                position = self._execute_real_order(signal, size_usd)
         
         if position:
             # Update signal status to EXECUTED
             self.save_signal(signal, status='EXECUTED')
             # Send to frontend API
-            self.send_to_api(signal, size_usd, market_question)
+            await self.send_to_api(signal, size_usd, market_question)
         
         return position
     
     def _simulate_order(self, signal: Signal, size_usd: float) -> Position:
-        """Simulate order execution"""
+        """Simulate order execution (filled at the book VWAP when the token's book is maintained)"""
+        entry_price = signal.entry_price
+        book = get_book_store().get(signal.market_id)
+        if book is not None and entry_price > 0:
+            vwap = book.vwap_to_fill("BUY", size_usd / entry_price)
+            if vwap is not None:
+                entry_price = vwap
+        
         position = Position(
             signal=signal,
             entry_time=datetime.now(),
             size_usd=size_usd,
-            entry_price=signal.entry_price,
+            entry_price=entry_price,
             status="OPEN"
         )
         
         self.simulated_positions.append(position)
-        logger.info(f"📝 SIMULATED ORDER: {signal.direction} ${size_usd:.2f} @ {signal.entry_price:.3f}")
+        logger.info(f"📝 SIMULATED ORDER: {signal.direction} ${size_usd:.2f} @ {entry_price:.3f}")
         
         return position
     
@@ -794,15 +1152,19 @@ class ExecutionEngine:
         position.exit_time = datetime.now()
         position.exit_price = current_price
         
-        # Calculate P&L
+        # Calculate P&L (fixed-point 6 decimals)
+        entry_price = Micros.from_float(position.entry_price)
+        shares = Micros.from_float(position.size_usd) / entry_price
         if position.signal.direction == "LONG":
             # Bought YES, sell at current price
-            position.pnl = (current_price - position.entry_price) * (position.size_usd / position.entry_price)
+            exit_price = Micros.from_float(current_price)
         else:
             # Bought NO, calculate inverse
-            position.pnl = ((1 - current_price) - position.entry_price) * (position.size_usd / position.entry_price)
+            exit_price = Micros.of(1) - Micros.from_float(current_price)
+        pnl = (exit_price - entry_price) * shares
+        position.pnl = float(pnl)
         
-        self.total_pnl += position.pnl
+        self.total_pnl += pnl
         
         # Update signal file with closed status and PnL
         self.save_signal(position.signal, status='CLOSED', pnl=position.pnl)
@@ -823,8 +1185,9 @@ class RiskManager:
     
     def __init__(self, initial_bankroll: float):
         self.initial_bankroll = initial_bankroll
-        self.current_bankroll = initial_bankroll
-        self.daily_pnl = 0.0
+        # Fixed-point USDC: running sums don't drift
+        self.current_bankroll = Micros.from_float(initial_bankroll)
+        self.daily_pnl = Micros()
         self.trades_today = 0
         self.wins_today = 0
         self.trading_enabled = True
@@ -842,7 +1205,7 @@ class RiskManager:
             return False
         
         # Check drawdown
-        drawdown = (self.initial_bankroll - self.current_bankroll) / self.initial_bankroll
+        drawdown = self.drawdown()
         if drawdown > config.MAX_DRAWDOWN_PCT:
             logger.warning(f"⛔ Max drawdown reached: {drawdown:.1%}")
             self.trading_enabled = False
@@ -876,8 +1239,14 @@ class RiskManager:
         self.positions.append(position)
         self.trades_today += 1
     
+    def drawdown(self) -> float:
+        """Fraction of the initial bankroll lost"""
+        initial = Micros.from_float(self.initial_bankroll)
+        return (initial - self.current_bankroll).ratio(initial)
+    
     def update_pnl(self, pnl: float):
         """Update P&L tracking"""
+        pnl = Micros.from_float(pnl)
         self.daily_pnl += pnl
         self.current_bankroll += pnl
         
@@ -894,12 +1263,12 @@ class RiskManager:
             "win_rate": f"{win_rate:.1f}%",
             "daily_pnl": f"${self.daily_pnl:+.2f}",
             "bankroll": f"${self.current_bankroll:.2f}",
-            "drawdown": f"{((self.initial_bankroll - self.current_bankroll) / self.initial_bankroll) * 100:.1f}%"
+            "drawdown": f"{self.drawdown() * 100:.1f}%"
         }
     
     def reset_daily(self):
         """Reset daily counters"""
-        self.daily_pnl = 0.0
+        self.daily_pnl = Micros()
         self.trades_today = 0
         self.wins_today = 0
         self.trading_enabled = True
@@ -914,15 +1283,19 @@ class MeanReversionBot:
     Main orchestrator for the Mean Reversion strategy.
     """
     
-    def __init__(self, initial_bankroll: float = 1000.0):
+    def __init__(self, initial_bankroll: float = 1000.0, dry_run: bool = False):
         self.price_feed = PriceFeed(config.EXCHANGE)
         self.signal_generator = SignalGenerator(self.price_feed)
         self.market_selector = MarketSelector()
-        self.execution = ExecutionEngine()
+        self.execution = ExecutionEngine(dry_run=dry_run)
         self.risk_manager = RiskManager(initial_bankroll)
         
         self.running = False
         self.cycle_count = 0
+        self.cycle_timer = cycle_histogram("mean_reversion")
+        self.signal_timer = signal_histogram("mean_reversion")
+        self.positions_gauge = queue_gauge("mean_reversion", "open_positions")
+        self.trade_stream: Optional[BinanceTradeStream] = None
     
     async def run_cycle(self):
         """Run one analysis cycle"""
@@ -935,25 +1308,29 @@ class MeanReversionBot:
         # Check time stops on existing positions
         self.risk_manager.check_time_stops(self.execution)
         
+        # Candles for every symbol at once: the cycle waits for the slowest symbol, not the sum
+        await self.price_feed.refresh(config.SYMBOLS, limit=config.LOOKBACK_PERIOD)
+        
         # Analyze each symbol
         for symbol in config.SYMBOLS:
             try:
                 # Find best market for this symbol
-                market = self.market_selector.select_best_market(symbol)
+                market = await self.market_selector.select_best_market(symbol)
                 
                 if not market:
                     logger.debug(f"No suitable market for {symbol}")
                     continue
                 
                 # Generate signal
-                signal = self.signal_generator.generate_signal(symbol, market)
+                with self.signal_timer.time():
+                    signal = self.signal_generator.generate_signal(symbol, market, refresh=False)
                 
                 if signal:
                     # Execute trade with market question for display
                     market_question = market.get('question', f'{symbol} 15-min Price')
-                    position = self.execution.execute_signal(
+                    position = await self.execution.execute_signal(
                         signal, 
-                        self.risk_manager.current_bankroll,
+                        float(self.risk_manager.current_bankroll),
                         market_question=market_question
                     )
                     
@@ -978,32 +1355,49 @@ class MeanReversionBot:
                                     "market_id": signal.market_id,
                                     "outcome": signal.outcome
                                 }
-                                response = requests.post(api_url, json=payload, timeout=10)
-                                if response.status_code == 200:
-                                    result = response.json()
+                                status, result = await get_client().post_json(
+                                    api_url, payload, timeout=10, rate_limit=False
+                                )
+                                if status == 200:
                                     logger.info(f"✅ AUTO-EXECUTE: Order placed on server - ID: {result.get('serverOrder', {}).get('id', 'N/A')}")
                                 else:
-                                    logger.warning(f"⚠️ AUTO-EXECUTE failed: {response.status_code} - {response.text[:200]}")
+                                    logger.warning(f"⚠️ AUTO-EXECUTE failed: {status} - {str(result)[:200]}")
                             except Exception as api_error:
                                 logger.error(f"❌ AUTO-EXECUTE error: {api_error}")
                 
             except Exception as e:
                 logger.error(f"Error processing {symbol}: {e}")
         
+        self.positions_gauge.set(len(self.risk_manager.positions))
+        
         # Log stats periodically
         if self.cycle_count % 60 == 0:
             stats = self.risk_manager.get_stats()
-            logger.info(f"📈 Stats: {stats}")
+            logger.info(f"📈 Stats: {stats} | cycle p50={self.cycle_timer.percentile(50) * 1000:.0f}ms "
+                        f"p99={self.cycle_timer.percentile(99) * 1000:.0f}ms")
     
     async def start(self):
         """Start the bot"""
         logger.info("🚀 Starting Mean Reversion Bot...")
         self.running = True
+        install_profiler("mean_reversion")
+        start_metrics_server("mean_reversion")
+        report_startup("mean_reversion", logger)
+        
+        if config.TRADE_STREAM:
+            aggregator = self.price_feed.attach_aggregator(CandleAggregator())
+            self.trade_stream = BinanceTradeStream(aggregator, config.SYMBOLS)
+            await self.trade_stream.start()
         
         while self.running:
             try:
-                await self.run_cycle()
-                await asyncio.sleep(config.POLL_INTERVAL_SEC)
+                with self.cycle_timer.time():
+                    await self.run_cycle()
+                if self.price_feed.aggregator is not None:
+                    # Next cycle right at candle close (or after the poll interval)
+                    await self.price_feed.wait_for_close(config.POLL_INTERVAL_SEC)
+                else:
+                    await asyncio.sleep(config.POLL_INTERVAL_SEC)
                 
             except KeyboardInterrupt:
                 logger.info("⛔ Interrupted by user")
@@ -1012,6 +1406,10 @@ class MeanReversionBot:
                 logger.error(f"Cycle error: {e}")
                 await asyncio.sleep(5)
         
+        if self.trade_stream is not None:
+            await self.trade_stream.stop()
+        await self.price_feed.close()
+        await close_client()
         self.stop()
     
     def stop(self):
@@ -1047,7 +1445,7 @@ def main():
     args = parser.parse_args()
     
     # Create and run bot
-    bot = MeanReversionBot(initial_bankroll=args.bankroll)
+    bot = MeanReversionBot(initial_bankroll=args.bankroll, dry_run=args.dry_run)
     
     try:
         asyncio.run(bot.start())
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Metrics
+==================
+Small in-process metrics registry shared by every bot, served on a local
+HTTP port in Prometheus text format (GET /metrics).
+
+- Counter / Gauge / Histogram families with labels
+- Histograms are HDR-style (log-linear buckets, ~1.6% relative error from
+  1µs to hours) so in-process percentiles stay accurate; the exposition
+  folds them into fixed Prometheus 'le' buckets
+- Served from a daemon thread (stdlib http.server), so sync and async bots
+  expose metrics the same way
+
+Standard families used across the bots:
+    http_request_duration_seconds{endpoint}   fetch latency (http_client)
+    http_requests_total{endpoint,status}
+    bot_cycle_duration_seconds{bot}           one loop iteration
+    signal_generation_seconds{bot}
+    order_placement_seconds{bot}
+    queue_depth{bot,queue}
+    cache_requests_total{cache,result}        result = hit | miss
+
+Usage:
+    from metrics import get_registry, start_metrics_server
+    start_metrics_server("arbitrage")                # port from METRICS_PORT or the bot default
+    with get_registry().histogram("bot_cycle_duration_seconds", "...", ("bot",)).labels(bot="x").time():
+        ...
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger("Metrics")
+
+# Default local port per bot (METRICS_PORT overrides, 0 disables)
+DEFAULT_PORTS = {
+    "crypto_oracle": 9101,
+    "mean_reversion": 9102,
+    "whale_tracker": 9103,
+    "oracle_scraper": 9104,
+    "arbitrage": 9105,
+    "price_updater": 9106,
+}
+
+# Prometheus 'le' buckets (seconds) used in the exposition
+EXPORT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+SUB_BITS = 6  # 64 sub-buckets per power of two
+SUB_COUNT = 1 << SUB_BITS
+HALF_COUNT = SUB_COUNT >> 1
+UNIT = 1e-6  # Histograms bucket integer microseconds
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# METRIC TYPES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class Counter:
+    """Monotonic counter"""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class Gauge:
+    """Value that goes up and down"""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = float(value)
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+
+class _Timer:
+    def __init__(self, histogram: "Histogram"):
+        self.histogram = histogram
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class Histogram:
+    """
+    Log-linear (HDR-style) histogram of durations in seconds.
+    Values below 64µs get exact buckets; above that each power of two is
+    split into 32 buckets.
+    """
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    @staticmethod
+    def _index(micros: int) -> int:
+        if micros < SUB_COUNT:
+            return micros
+        shift = micros.bit_length() - SUB_BITS
+        return SUB_COUNT + (shift - 1) * HALF_COUNT + ((micros >> shift) - HALF_COUNT)
+
+    @staticmethod
+    def _upper(index: int) -> float:
+        """Upper edge of a bucket, in seconds"""
+        if index < SUB_COUNT:
+            return (index + 1) * UNIT
+        shift = (index - SUB_COUNT) // HALF_COUNT + 1
+        sub = (index - SUB_COUNT) % HALF_COUNT + HALF_COUNT
+        return ((sub + 1) << shift) * UNIT
+
+    def observe(self, seconds: float):
+        if seconds < 0:
+            seconds = 0.0
+        index = self._index(int(seconds * 1e6))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def time(self) -> _Timer:
+        """Context manager observing the elapsed wall time"""
+        return _Timer(self)
+
+    def percentile(self, q: float) -> float:
+        """q in [0, 100]; upper bucket edge, capped at the max seen"""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(round(q / 100 * self.count)))
+        seen = 0
+        counts = self.counts.copy()
+        for index in sorted(counts):
+            seen += counts[index]
+            if seen >= rank:
+                return min(self._upper(index), self.max)
+        return self.max
+
+    def cumulative(self, bounds: Iterable[float]) -> List[Tuple[float, int]]:
+        """(le, count) pairs for the exposition"""
+        items = sorted(self.counts.copy().items())
+        out, seen, i = [], 0, 0
+        for le in bounds:
+            while i < len(items) and self._upper(items[i][0]) <= le + 1e-12:
+                seen += items[i][1]
+                i += 1
+            out.append((le, seen))
+        return out
+
+
+class MetricFamily:
+    """A named metric with label children"""
+
+    def __init__(self, kind: str, name: str, help_text: str, labelnames: Tuple[str, ...]):
+        self.kind = kind
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        self._factory = {"counter": Counter, "gauge": Gauge, "histogram": Histogram}[kind]
+
+    def labels(self, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        child = self.children.get(key)
+        if child is None:
+            with self._lock:
+                child = self.children.setdefault(key, self._factory())
+        return child
+
+    # Unlabelled families behave like their single child
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def observe(self, seconds: float):
+        self.labels().observe(seconds)
+
+    def time(self) -> _Timer:
+        return self.labels().time()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REGISTRY
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """Get-or-create metric families and render them"""
+
+    def __init__(self):
+        self.families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def _family(self, kind: str, name: str, help_text: str, labelnames: Iterable[str]) -> MetricFamily:
+        family = self.families.get(name)
+        if family is None:
+            with self._lock:
+                family = self.families.get(name)
+                if family is None:
+                    family = self.families[name] = MetricFamily(kind, name, help_text, tuple(labelnames))
+        if family.kind != kind:
+            raise ValueError(f"metric {name} already registered as {family.kind}")
+        return family
+
+    def counter(self, name: str, help_text: str = "", labelnames: Iterable[str] = ()) -> MetricFamily:
+        return self._family("counter", name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str = "", labelnames: Iterable[str] = ()) -> MetricFamily:
+        return self._family("gauge", name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str = "", labelnames: Iterable[str] = ()) -> MetricFamily:
+        return self._family("histogram", name, help_text, labelnames)
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4"""
+        lines = []
+        families = self.families.copy()
+        for name in sorted(families):
+            family = families[name]
+            lines.append(f"# HELP {name} {family.help}")
+            lines.append(f"# TYPE {name} {family.kind}")
+            children = family.children.copy()
+            for key in sorted(children):
+                child = children[key]
+                if family.kind == "histogram":
+                    for le, count in child.cumulative(EXPORT_BUCKETS):
+                        labels = _format_labels(family.labelnames, key, f'le="{le}"')
+                        lines.append(f"{name}_bucket{labels} {count}")
+                    labels = _format_labels(family.labelnames, key, 'le="+Inf"')
+                    lines.append(f"{name}_bucket{labels} {child.count}")
+                    labels = _format_labels(family.labelnames, key)
+                    lines.append(f"{name}_sum{labels} {_format_value(child.sum)}")
+                    lines.append(f"{name}_count{labels} {child.count}")
+                else:
+                    labels = _format_labels(family.labelnames, key)
+                    lines.append(f"{name}{labels} {_format_value(child.value)}")
+        return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """Process-wide registry"""
+    return _registry
+
+
+# ─── Standard families ─────────────────────────────────────────────────────────
+
+def cycle_histogram(bot: str) -> Histogram:
+    return _registry.histogram("bot_cycle_duration_seconds", "Duration of one bot loop iteration",
+                               ("bot",)).labels(bot=bot)
+
+
+def signal_histogram(bot: str) -> Histogram:
+    return _registry.histogram("signal_generation_seconds", "Time to compute a trading signal",
+                               ("bot",)).labels(bot=bot)
+
+
+def order_histogram(bot: str) -> Histogram:
+    return _registry.histogram("order_placement_seconds", "Latency of placing (or simulating) an order",
+                               ("bot",)).labels(bot=bot)
+
+
+def queue_gauge(bot: str, queue: str) -> Gauge:
+    return _registry.gauge("queue_depth", "Items waiting in a bot queue or buffer",
+                           ("bot", "queue")).labels(bot=bot, queue=queue)
+
+
+def record_cache(cache: str, hit: bool):
+    _registry.counter("cache_requests_total", "Cache lookups by result",
+                      ("cache", "result")).labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+_ID_SEGMENT = re.compile(r"^(0x[0-9a-fA-F]+|\d+|[0-9a-fA-F-]{20,}|[A-Za-z0-9_-]{32,})$")
+
+
+def endpoint_label(url: str) -> str:
+    """host + path with id-like segments collapsed (bounded label cardinality)"""
+    parts = urlsplit(url)
+    segments = [":id" if _ID_SEGMENT.match(s) else s for s in parts.path.split("/") if s]
+    return parts.netloc + "/" + "/".join(segments)
+
+
+def observe_request(url: str, status: int, seconds: float):
+    """Fetch latency + outcome for one HTTP request"""
+    endpoint = endpoint_label(url)
+    _registry.histogram("http_request_duration_seconds", "Upstream HTTP request latency",
+                        ("endpoint",)).labels(endpoint=endpoint).observe(seconds)
+    _registry.counter("http_requests_total", "Upstream HTTP requests by status",
+                      ("endpoint", "status")).labels(endpoint=endpoint, status=status).inc()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HTTP EXPOSITION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Extra local debug routes: path -> handler(query) -> (status, body)
+RouteHandler = Callable[[Dict[str, str]], Tuple[int, bytes]]
+_routes: Dict[str, RouteHandler] = {}
+
+
+def register_route(path: str, handler: RouteHandler):
+    """Serve handler on the metrics port (e.g. /debug/profile)"""
+    _routes[path] = handler
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = _registry
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path in _routes:
+            try:
+                status, body = _routes[parts.path](dict(parse_qsl(parts.query)))
+            except Exception as e:
+                status, body = 500, f"{str(e)[:100]}\n".encode("utf-8")
+        elif parts.path in ("/metrics", "/"):
+            status, body = 200, self.registry.render().encode("utf-8")
+        else:
+            self.send_error(404)
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_servers: Dict[int, ThreadingHTTPServer] = {}
+
+
+def start_metrics_server(bot: str = "", port: int = None, host: str = "127.0.0.1") -> Optional[int]:
+    """
+    Serve /metrics from a daemon thread. Port: explicit > METRICS_PORT env >
+    per-bot default; METRICS_PORT=0 disables, an explicit 0 binds any free port.
+    Returns the bound port (None when disabled or the port is busy).
+    """
+    if port is None:
+        env_port = os.getenv("METRICS_PORT")
+        port = int(env_port) if env_port is not None else DEFAULT_PORTS.get(bot, 0)
+        if not port:
+            return None
+    if port and port in _servers:
+        return port
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.warning(f"⚠️ Metrics port {port} unavailable: {str(e)[:100]}")
+        return None
+    server.daemon_threads = True
+    bound = server.server_address[1]
+    _servers[bound] = server
+    threading.Thread(target=server.serve_forever, name=f"metrics-{bound}", daemon=True).start()
+    logger.info(f"📈 Metrics on http://{host}:{bound}/metrics")
+    return bound
+
+
+def stop_metrics_servers():
+    for port, server in list(_servers.items()):
+        server.shutdown()
+        server.server_close()
+        _servers.pop(port, None)
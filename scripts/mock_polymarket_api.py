@@ -0,0 +1,648 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Offline Polymarket API Stand-in
+==========================================
+Local aiohttp server that impersonates the upstream APIs the bots talk to,
+so cycles can be benchmarked end-to-end without touching production.
+
+Mounted upstreams (one prefix each):
+    /gamma      gamma-api.polymarket.com   /markets, /markets/{id}, /markets/{id}/holders
+    /data       data-api.polymarket.com    /trades
+    /clob       clob.polymarket.com        /book
+    /binance    api.binance.com            /api/v3/ticker/price
+    /coingecko  api.coingecko.com          /api/v3/simple/price
+    /dashboard  Next.js dashboard          /api/...
+    /ws/market  CLOB market WebSocket      book, price_change, last_trade_price
+    /binance-ws Binance stream WebSocket   /stream?streams=<symbol>@aggTrade/...
+
+Payloads are synthetic (seeded, reproducible) or replayed from a fixtures
+directory recorded with --record. Latency, jitter, error rate and payload
+size are configurable.
+
+Usage:
+    python mock_polymarket_api.py --port 8900 --latency-ms 40 --error-rate 0.01
+    python mock_polymarket_api.py --record fixtures/   # snapshot production once
+Then point a bot at it:
+    HTTP_BASE_OVERRIDES="<printed overrides>" python price_updater.py
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger("StandIn")
+
+# Upstream base URL -> stand-in prefix
+UPSTREAMS = {
+    "https://gamma-api.polymarket.com": "/gamma",
+    "https://clob.polymarket.com": "/clob",
+    "https://data-api.polymarket.com": "/data",
+    "https://api.binance.com": "/binance",
+    "https://api.coingecko.com": "/coingecko",
+    "http://127.0.0.1:3001": "/dashboard",
+    "http://localhost:3000": "/dashboard",
+}
+WS_UPSTREAMS = {
+    "wss://ws-subscriptions-clob.polymarket.com": "",
+    "wss://stream.binance.com:9443": "/binance-ws",
+}
+
+SPOT_PRICES = {"BTC": 97000.0, "ETH": 3400.0, "SOL": 190.0, "XRP": 2.3, "DOGE": 0.38}
+COINGECKO_IDS = {"bitcoin": "BTC", "ethereum": "ETH", "solana": "SOL", "ripple": "XRP", "dogecoin": "DOGE"}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class StandInConfig:
+    """Behaviour of the stand-in server"""
+    host: str = "127.0.0.1"
+    port: int = 0  # 0 = pick a free port
+
+    # Network shaping
+    latency_ms: float = 0.0  # Base latency added to every response
+    jitter_ms: float = 0.0  # Uniform +/- jitter
+    error_rate: float = 0.0  # Fraction of requests answered with 503
+
+    # Payload sizes
+    n_markets: int = 500
+    n_trades: int = 100
+    book_depth: int = 20
+    n_holders: int = 50
+    pad_bytes: int = 0  # Extra description bytes per market
+
+    # WebSocket market channel / Binance trade stream
+    ws_interval_ms: float = 50.0  # Delay between pushed events per connection
+
+    seed: int = 42
+    fixtures_dir: Optional[str] = None  # Replay recorded payloads if set
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SYNTHETIC PAYLOADS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _hex(rng: random.Random, n: int) -> str:
+    return "0x" + "".join(rng.choice("0123456789abcdef") for _ in range(n))
+
+
+def book_hash(book: dict) -> str:
+    """CLOB book hash: SHA1 of the compact JSON payload with an empty hash field"""
+    payload = {key: book.get(key) for key in ("market", "asset_id", "timestamp")}
+    payload["hash"] = ""
+    payload["bids"] = [{"price": l["price"], "size": l["size"]} for l in book.get("bids", [])]
+    payload["asks"] = [{"price": l["price"], "size": l["size"]} for l in book.get("asks", [])]
+    for key in ("min_order_size", "tick_size", "neg_risk", "last_trade_price"):
+        payload[key] = book.get(key)
+    return hashlib.sha1(json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()).hexdigest()
+
+
+def synthetic_markets(n: int, seed: int = 42, pad_bytes: int = 0) -> List[dict]:
+    """Gamma-style market list: 15-min crypto, long-dated strikes and generic markets"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    padding = "x" * pad_bytes
+    markets = []
+
+    for i in range(n):
+        kind = i % 4
+        asset = ("BTC", "ETH", "SOL")[i % 3]
+        name = {"BTC": "Bitcoin", "ETH": "Ethereum", "SOL": "Solana"}[asset]
+
+        if kind == 0:
+            question = f"{name} ({asset}) price up or down in 15 min? #{i}"
+            end = now + timedelta(minutes=15 + i % 60)
+        elif kind == 1:
+            strike = int(SPOT_PRICES[asset] * rng.uniform(0.7, 1.4))
+            question = f"Will {name} be above ${strike:,} by {(now + timedelta(days=30 + i % 300)):%B %d}?"
+            end = now + timedelta(days=30 + i % 300)
+        else:
+            question = f"Synthetic market #{i}: will event {i} happen?"
+            end = now + timedelta(days=1 + i % 90)
+
+        yes = round(rng.uniform(0.05, 0.95), 3)
+        # Occasionally mis-priced so the arbitrage scanner finds something
+        no = round(1 - yes - (rng.uniform(0.006, 0.03) if rng.random() < 0.05 else 0), 3)
+        condition_id = _hex(rng, 64)
+        tokens = [str(rng.getrandbits(250)), str(rng.getrandbits(250))]
+        liquidity = round(rng.uniform(500, 250000), 2)
+        event_id = str(1000 + i // 3)
+
+        markets.append({
+            "id": str(100000 + i),
+            "conditionId": condition_id,
+            "question": question,
+            "description": f"Resolves per {name} spot price. {padding}",
+            "slug": f"synthetic-market-{i}",
+            "image": f"https://example.invalid/img/{i}.png",
+            "icon": f"https://example.invalid/icon/{i}.png",
+            "outcomes": '["Yes", "No"]',
+            "outcomePrices": json.dumps([str(yes), str(no)]),
+            "clobTokenIds": json.dumps(tokens),
+            "liquidity": str(liquidity),
+            "liquidityNum": liquidity,
+            "volume": str(round(liquidity * rng.uniform(1, 20), 2)),
+            "volume24hr": round(rng.uniform(0, 50000), 2),
+            "endDate": end.isoformat().replace("+00:00", "Z"),
+            "updatedAt": (now - timedelta(seconds=rng.randint(0, 86400))).isoformat().replace("+00:00", "Z"),
+            "active": True,
+            "closed": False,
+            "events": [{"id": event_id, "slug": f"synthetic-event-{event_id}"}],
+        })
+    return markets
+
+
+def synthetic_trades(markets: List[dict], n: int, rng: random.Random) -> List[dict]:
+    """Data-API /trades payload, fresh transaction hashes on every call"""
+    trades = []
+    now = int(time.time())
+    for _ in range(n):
+        market = rng.choice(markets)
+        trades.append({
+            "proxyWallet": _hex(rng, 40),
+            "side": rng.choice(["BUY", "SELL"]),
+            "conditionId": market["conditionId"],
+            "size": round(rng.expovariate(1 / 800), 2),
+            "price": round(rng.uniform(0.05, 0.95), 3),
+            "timestamp": now - rng.randint(0, 60),
+            "title": market["question"],
+            "slug": market["slug"],
+            "eventSlug": market["events"][0]["slug"],
+            "icon": market["icon"],
+            "outcome": rng.choice(["Yes", "No"]),
+            "transactionHash": _hex(rng, 64),
+        })
+    return trades
+
+
+def synthetic_book(token_id: str, depth: int, rng: random.Random) -> dict:
+    """
+    CLOB /book payload. Like the real endpoint, bids are listed from worst to
+    best (ascending) and asks from worst to best (descending).
+    """
+    mid = rng.uniform(0.1, 0.9)
+    tick = 0.001
+    best_bid = round(mid - tick * rng.randint(1, 5), 3)
+    best_ask = round(mid + tick * rng.randint(1, 5), 3)
+    bids = [{"price": f"{best_bid - i * tick:.3f}", "size": f"{rng.uniform(10, 5000):.2f}"}
+            for i in range(depth) if best_bid - i * tick >= tick]
+    asks = [{"price": f"{best_ask + i * tick:.3f}", "size": f"{rng.uniform(10, 5000):.2f}"}
+            for i in range(depth) if best_ask + i * tick <= 1 - tick]
+    book = {
+        "market": _hex(rng, 64),
+        "asset_id": token_id,
+        "timestamp": str(int(time.time() * 1000)),
+        "hash": "",
+        "bids": list(reversed(bids)),
+        "asks": list(reversed(asks)),
+        "min_order_size": "5",
+        "tick_size": "0.001",
+        "neg_risk": False,
+        "last_trade_price": f"{mid:.3f}",
+    }
+    book["hash"] = book_hash(book)
+    return book
+
+
+def synthetic_holders(n: int, rng: random.Random) -> List[dict]:
+    """Holders list with signed shares and realized PnL"""
+    return [{
+        "address": _hex(rng, 40),
+        "shares": round(rng.uniform(-20000, 20000), 2),
+        "realized_pnl": round(rng.gauss(2000, 15000), 2),
+    } for _ in range(n)]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SERVER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class StandInServer:
+    """In-process stand-in for the Polymarket + spot + dashboard APIs"""
+
+    def __init__(self, config: StandInConfig = None):
+        self.config = config or StandInConfig()
+        self.rng = random.Random(self.config.seed)
+        self.request_count = 0
+        self.error_count = 0
+        self._runner: Optional[web.AppRunner] = None
+        self.port: Optional[int] = None
+
+        self.fixtures = self._load_fixtures(self.config.fixtures_dir)
+        self.markets: List[dict] = self.fixtures.get("markets") or synthetic_markets(
+            self.config.n_markets, self.config.seed, self.config.pad_bytes
+        )
+        self.markets_by_id = {}
+        for market in self.markets:
+            for key in (market.get("conditionId"), market.get("id"), market.get("slug")):
+                if key:
+                    self.markets_by_id[str(key)] = market
+        self.received: Dict[str, List] = {}  # Dashboard path -> POSTed payloads
+        self.ws_connections: List[web.WebSocketResponse] = []
+        self.ws_books: Dict[str, List[float]] = {}  # token -> [best_bid, best_ask]
+
+    @staticmethod
+    def _load_fixtures(path: Optional[str]) -> Dict[str, object]:
+        """Load recorded payloads (markets.json, trades.json, books.json, holders.json)"""
+        fixtures = {}
+        if not path:
+            return fixtures
+        for name in ("markets", "trades", "books", "holders"):
+            file_path = os.path.join(path, f"{name}.json")
+            if os.path.exists(file_path):
+                with open(file_path) as f:
+                    fixtures[name] = json.load(f)
+        logger.info(f"Loaded fixtures: {', '.join(fixtures) or 'none'} from {path}")
+        return fixtures
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.config.host}:{self.port}"
+
+    def url_overrides(self) -> Dict[str, str]:
+        """Base URL map for HttpClient.set_base_url_overrides / HTTP_BASE_OVERRIDES"""
+        overrides = {src: self.base_url + prefix for src, prefix in UPSTREAMS.items()}
+        ws_base = f"ws://{self.config.host}:{self.port}"
+        overrides.update({src: ws_base + prefix for src, prefix in WS_UPSTREAMS.items()})
+        return overrides
+
+    def overrides_env(self) -> str:
+        return ",".join(f"{src}={dst}" for src, dst in self.url_overrides().items())
+
+    # ─── Middleware ────────────────────────────────────────────────────────────
+
+    @web.middleware
+    async def _shaping(self, request: web.Request, handler):
+        """Inject latency and errors"""
+        self.request_count += 1
+        delay = self.config.latency_ms
+        if self.config.jitter_ms:
+            delay += self.rng.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if self.config.error_rate and self.rng.random() < self.config.error_rate:
+            self.error_count += 1
+            return web.json_response({"error": "injected"}, status=503)
+        return await handler(request)
+
+    # ─── Gamma ─────────────────────────────────────────────────────────────────
+
+    async def gamma_markets(self, request: web.Request):
+        query = request.query
+        markets = self.markets
+        if "slug" in query:
+            markets = [m for m in markets if m.get("slug") == query["slug"]]
+        if query.get("closed") in ("true", "True"):
+            markets = [m for m in markets if m.get("closed")]
+        elif query.get("closed") in ("false", "False"):
+            markets = [m for m in markets if not m.get("closed")]
+        if "order" in query:
+            key = query["order"]
+            markets = sorted(markets, key=lambda m: m.get(key) or "",
+                             reverse=query.get("ascending") in ("false", "False"))
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", 100))
+        return web.json_response(markets[offset:offset + limit])
+
+    async def gamma_market(self, request: web.Request):
+        market = self.markets_by_id.get(request.match_info["market_id"])
+        if market is None:
+            return web.json_response({"error": "not found"}, status=404)
+        return web.json_response(market)
+
+    async def gamma_holders(self, request: web.Request):
+        holders = self.fixtures.get("holders")
+        if isinstance(holders, dict):
+            holders = holders.get(request.match_info["market_id"], [])
+        return web.json_response(holders or synthetic_holders(self.config.n_holders, self.rng))
+
+    # ─── Data / CLOB ───────────────────────────────────────────────────────────
+
+    async def data_trades(self, request: web.Request):
+        limit = int(request.query.get("limit", self.config.n_trades))
+        recorded = self.fixtures.get("trades")
+        if recorded:
+            return web.json_response(recorded[:limit])
+        return web.json_response(synthetic_trades(self.markets, min(limit, self.config.n_trades), self.rng))
+
+    async def clob_book(self, request: web.Request):
+        token_id = request.query.get("token_id", "")
+        books = self.fixtures.get("books") or {}
+        if token_id in books:
+            return web.json_response(books[token_id])
+        return web.json_response(synthetic_book(token_id, self.config.book_depth, self.rng))
+
+    # ─── Spot prices ───────────────────────────────────────────────────────────
+
+    def _spot(self, asset: str) -> float:
+        base = SPOT_PRICES.get(asset, 1.0)
+        return round(base * (1 + self.rng.uniform(-0.002, 0.002)), 4)
+
+    async def binance_ticker(self, request: web.Request):
+        # Like Binance, one unknown symbol rejects the whole request
+        if "symbols" in request.query:
+            symbols = json.loads(request.query["symbols"])
+        else:
+            symbols = [request.query.get("symbol", "BTCUSDT")]
+        if any(s.replace("USDT", "") not in SPOT_PRICES for s in symbols):
+            return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+        prices = [{"symbol": s, "price": str(self._spot(s.replace("USDT", "")))} for s in symbols]
+        return web.json_response(prices if "symbols" in request.query else prices[0])
+
+    async def coingecko_price(self, request: web.Request):
+        ids = request.query.get("ids", "bitcoin").split(",")
+        return web.json_response({
+            coin: {"usd": self._spot(COINGECKO_IDS.get(coin, coin.upper()))} for coin in ids
+        })
+
+    # ─── Dashboard ─────────────────────────────────────────────────────────────
+
+    async def dashboard(self, request: web.Request):
+        path = "/" + request.match_info["path"]
+        if request.method == "POST":
+            try:
+                payload = await request.json()
+            except ValueError:
+                payload = None
+            self.received.setdefault(path, []).append(payload)
+            return web.json_response({
+                "success": True,
+                "message": "Execution recorded (stand-in)",
+                "serverOrder": {"id": f"srv_{int(time.time() * 1000)}"},
+            })
+        if path.startswith("/api/paper-orders/profiles"):
+            return web.json_response({"profiles": [{"id": "default", "isActive": True, "balance": 1000.0}]})
+        return web.json_response({"success": True})
+
+    # ─── CLOB WebSocket ────────────────────────────────────────────────────────
+
+    def _ws_book(self, token: str) -> dict:
+        """Book snapshot event, consistent with the pushed price changes"""
+        top = self.ws_books.get(token)
+        if top is None:
+            mid = round(self.rng.uniform(0.1, 0.9), 2)
+            top = self.ws_books[token] = [round(mid - 0.01, 2), round(mid + 0.01, 2)]
+        bid, ask = top
+        book = {
+            "event_type": "book",
+            "asset_id": token,
+            "market": "0x" + token[:16],
+            "bids": [{"price": f"{bid - i * 0.01:.2f}", "size": "100"} for i in reversed(range(5)) if bid - i * 0.01 > 0],
+            "asks": [{"price": f"{ask + i * 0.01:.2f}", "size": "100"} for i in reversed(range(5)) if ask + i * 0.01 < 1],
+            "timestamp": str(int(time.time() * 1000)),
+            "min_order_size": "5",
+            "tick_size": "0.01",
+            "neg_risk": False,
+            "last_trade_price": f"{ask:.2f}",
+        }
+        book["hash"] = book_hash(book)
+        return book
+
+    def _ws_tick(self, token: str) -> dict:
+        """Random top-of-book move or trade"""
+        top = self.ws_books[token]
+        now = str(int(time.time() * 1000))
+        if self.rng.random() < 0.3:
+            side = self.rng.choice(["BUY", "SELL"])
+            return {
+                "event_type": "last_trade_price", "asset_id": token, "market": "0x" + token[:16],
+                "price": f"{top[1] if side == 'BUY' else top[0]:.2f}", "side": side,
+                "size": f"{self.rng.uniform(1, 500):.2f}", "timestamp": now,
+            }
+        step = self.rng.choice([-0.01, 0.01])
+        bid, ask = round(top[0] + step, 2), round(top[1] + step, 2)
+        if bid <= 0 or ask >= 1:
+            bid, ask = top
+        old_bid, old_ask = top
+        top[0], top[1] = bid, ask
+        changes = []
+        if step > 0:
+            changes.append({"asset_id": token, "price": f"{ask:.2f}", "size": "100", "side": "SELL"})
+            changes.append({"asset_id": token, "price": f"{old_ask:.2f}", "size": "0", "side": "SELL"})
+            changes.append({"asset_id": token, "price": f"{bid:.2f}", "size": "100", "side": "BUY"})
+        else:
+            changes.append({"asset_id": token, "price": f"{bid:.2f}", "size": "100", "side": "BUY"})
+            changes.append({"asset_id": token, "price": f"{old_bid:.2f}", "size": "0", "side": "BUY"})
+            changes.append({"asset_id": token, "price": f"{ask:.2f}", "size": "100", "side": "SELL"})
+        for change in changes:
+            change.update({"best_bid": f"{bid:.2f}", "best_ask": f"{ask:.2f}"})
+        return {"event_type": "price_change", "market": "0x" + token[:16],
+                "price_changes": changes, "timestamp": now}
+
+    async def clob_ws(self, request: web.Request):
+        """Market channel: subscribe messages, PING/PONG, pushed book updates"""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.ws_connections.append(ws)
+        subscribed: List[str] = []
+
+        async def pusher():
+            while not ws.closed:
+                await asyncio.sleep(self.config.ws_interval_ms / 1000)
+                if subscribed:
+                    await ws.send_json([self._ws_tick(self.rng.choice(subscribed))])
+
+        push_task = asyncio.create_task(pusher())
+        try:
+            async for msg in ws:
+                if msg.type != web.WSMsgType.TEXT:
+                    continue
+                if msg.data == "PING":
+                    await ws.send_str("PONG")
+                    continue
+                try:
+                    request_body = json.loads(msg.data)
+                except ValueError:
+                    continue
+                assets = [str(a) for a in request_body.get("assets_ids", [])]
+                if request_body.get("operation") == "unsubscribe":
+                    subscribed[:] = [a for a in subscribed if a not in assets]
+                    continue
+                new = [a for a in assets if a not in subscribed]
+                subscribed.extend(new)
+                if new:
+                    await ws.send_json([self._ws_book(a) for a in new])
+        except (ConnectionResetError, RuntimeError):
+            pass
+        finally:
+            push_task.cancel()
+            if ws in self.ws_connections:
+                self.ws_connections.remove(ws)
+        return ws
+
+    # ─── Binance trade stream ──────────────────────────────────────────────────
+
+    async def binance_ws(self, request: web.Request):
+        """Combined stream: one aggTrade event per interval, random walk around SPOT_PRICES"""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.ws_connections.append(ws)
+        symbols = [name.split("@")[0].upper() for name in request.query.get("streams", "").split("/")
+                   if name.endswith("@aggTrade")]
+        prices = {s: SPOT_PRICES.get(s[:-4] if s.endswith("USDT") else s, 1.0) for s in symbols}
+        trade_id = 0
+        try:
+            while not ws.closed and symbols:
+                await asyncio.sleep(self.config.ws_interval_ms / 1000)
+                symbol = self.rng.choice(symbols)
+                prices[symbol] *= 1 + self.rng.gauss(0, 0.0005)
+                trade_id += 1
+                await ws.send_json({"stream": f"{symbol.lower()}@aggTrade", "data": {
+                    "e": "aggTrade", "E": int(time.time() * 1000), "s": symbol, "a": trade_id,
+                    "p": f"{prices[symbol]:.2f}", "q": f"{self.rng.expovariate(10):.5f}",
+                    "T": int(time.time() * 1000), "m": self.rng.random() < 0.5,
+                }})
+        except (ConnectionResetError, RuntimeError):
+            pass
+        finally:
+            if ws in self.ws_connections:
+                self.ws_connections.remove(ws)
+        return ws
+
+    async def drop_ws_connections(self):
+        """Close every market-channel / trade-stream socket (reconnect tests)"""
+        for ws in list(self.ws_connections):
+            await ws.close()
+
+    # ─── Lifecycle ─────────────────────────────────────────────────────────────
+
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._shaping])
+        app.router.add_get("/gamma/markets", self.gamma_markets)
+        app.router.add_get("/gamma/markets/{market_id}/holders", self.gamma_holders)
+        app.router.add_get("/gamma/markets/{market_id}", self.gamma_market)
+        app.router.add_get("/data/trades", self.data_trades)
+        app.router.add_get("/clob/book", self.clob_book)
+        app.router.add_get("/binance/api/v3/ticker/price", self.binance_ticker)
+        app.router.add_get("/coingecko/api/v3/simple/price", self.coingecko_price)
+        app.router.add_route("*", "/dashboard/{path:.*}", self.dashboard)
+        app.router.add_get("/ws/market", self.clob_ws)
+        app.router.add_get("/binance-ws/stream", self.binance_ws)
+        return app
+
+    async def start(self) -> "StandInServer":
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.config.host, self.config.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"Stand-in listening on {self.base_url} ({len(self.markets)} markets)")
+        return self
+
+    async def stop(self):
+        await self.drop_ws_connections()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FIXTURE RECORDING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+async def record_fixtures(out_dir: str, n_markets: int = 500, n_books: int = 20):
+    """Snapshot production payloads once so benchmarks can replay them offline"""
+    from http_client import get_client, close_client
+
+    http = get_client()
+    os.makedirs(out_dir, exist_ok=True)
+
+    markets = []
+    offset = 0
+    while len(markets) < n_markets:
+        page = await http.get_json(
+            "https://gamma-api.polymarket.com/markets",
+            params={"closed": False, "active": True, "limit": 100, "offset": offset}
+        )
+        if not page:
+            break
+        markets.extend(page)
+        offset += 100
+    markets = markets[:n_markets]
+
+    trades = await http.get_json("https://data-api.polymarket.com/trades", params={"limit": 500}) or []
+
+    books = {}
+    for market in markets[:n_books]:
+        try:
+            token_id = json.loads(market.get("clobTokenIds") or "[]")[0]
+        except (ValueError, IndexError):
+            continue
+        book = await http.get_json("https://clob.polymarket.com/book", params={"token_id": token_id})
+        if book:
+            books[token_id] = book
+
+    for name, payload in (("markets", markets), ("trades", trades), ("books", books)):
+        with open(os.path.join(out_dir, f"{name}.json"), "w") as f:
+            json.dump(payload, f)
+    await close_client()
+    print(f"Recorded {len(markets)} markets, {len(trades)} trades, {len(books)} books to {out_dir}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENTRY POINT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Polymarket API stand-in")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--markets", type=int, default=500)
+    parser.add_argument("--trades", type=int, default=100)
+    parser.add_argument("--book-depth", type=int, default=20)
+    parser.add_argument("--pad-bytes", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fixtures", type=str, help="Replay payloads recorded with --record")
+    parser.add_argument("--record", type=str, help="Record production payloads into this directory and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)s | %(message)s', datefmt='%H:%M:%S')
+
+    if args.record:
+        asyncio.run(record_fixtures(args.record, n_markets=args.markets))
+        return
+
+    config = StandInConfig(
+        port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, n_markets=args.markets, n_trades=args.trades,
+        book_depth=args.book_depth, pad_bytes=args.pad_bytes, seed=args.seed,
+        fixtures_dir=args.fixtures
+    )
+
+    async def serve():
+        server = await StandInServer(config).start()
+        print(f"HTTP_BASE_OVERRIDES=\"{server.overrides_env()}\"")
+        try:
+            while True:
+                await asyncio.sleep(3600)
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Fixed-Point Money
+============================
+Exact 6-decimal amounts (USDC, shares, outcome prices) stored as an integer
+count of millionths, for the position, P&L and order sizing hot paths.
+
+- Same precision as the Decimal(str(value)).quantize(0.000001, ROUND_DOWN)
+  it replaces, at integer speed
+- Sums and differences are exact: balances and running P&L don't drift
+- Products and quotients are truncated toward zero to 6 decimals (ROUND_DOWN)
+- Prices snap to the order book tick with round_to_tick
+- Floats and Decimals only at the edges (API payloads, stores, logs)
+
+Usage:
+    size = Micros.from_float(25.0)
+    price = Micros.from_float(0.392).round_to_tick(Micros.from_float(0.01))   # 0.39
+    shares = size / price                      # 64.102564
+    value = shares * Micros.from_float(0.47)   # 30.128205
+    pnl_pct = (value - size).ratio(size)       # float
+    OrderArgs(price=float(price), size=float(shares))
+"""
+
+from decimal import Decimal, ROUND_DOWN
+from typing import Union
+
+SCALE = 1_000_000  # 6 decimals (Polygon USDC)
+DECIMALS = 6
+_SNAP = 1e-6  # Float -> micros within this of an integer is that integer (0.57 * 1e6 = 569999.9999999999)
+
+Number = Union["Micros", int, float]
+
+
+def _div_trunc(a: int, b: int) -> int:
+    """a / b truncated toward zero (ROUND_DOWN), b != 0"""
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+class Micros:
+    """Fixed-point amount: an integer number of 10^-6 units"""
+
+    __slots__ = ("micros",)
+
+    def __init__(self, micros: int = 0):
+        self.micros = micros
+
+    # ─── Conversions ───────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_float(cls, value: float) -> "Micros":
+        """Float -> Micros, truncated toward zero after the float's decimal repr"""
+        scaled = value * SCALE
+        nearest = round(scaled)
+        if abs(scaled - nearest) < _SNAP:
+            return cls(int(nearest))
+        return cls(int(scaled))
+
+    @classmethod
+    def from_decimal(cls, value: Decimal) -> "Micros":
+        return cls(int((value * SCALE).to_integral_value(rounding=ROUND_DOWN)))
+
+    @classmethod
+    def from_str(cls, value: str) -> "Micros":
+        return cls.from_decimal(Decimal(value))
+
+    @classmethod
+    def of(cls, value: Number) -> "Micros":
+        """Micros as is, int/float as an amount"""
+        if isinstance(value, Micros):
+            return value
+        if isinstance(value, int):
+            return cls(value * SCALE)
+        return cls.from_float(value)
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.micros).scaleb(-DECIMALS)
+
+    def __float__(self) -> float:
+        return self.micros / SCALE
+
+    def __str__(self) -> str:
+        sign = "-" if self.micros < 0 else ""
+        units, frac = divmod(abs(self.micros), SCALE)
+        return f"{sign}{units}.{frac:06d}"
+
+    def __repr__(self) -> str:
+        return f"Micros('{self}')"
+
+    def __format__(self, spec: str) -> str:
+        return format(float(self), spec) if spec else str(self)
+
+    # ─── Arithmetic ────────────────────────────────────────────────────────────
+
+    def __add__(self, other: Number) -> "Micros":
+        return Micros(self.micros + Micros.of(other).micros)
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Number) -> "Micros":
+        return Micros(self.micros - Micros.of(other).micros)
+
+    def __rsub__(self, other: Number) -> "Micros":
+        return Micros(Micros.of(other).micros - self.micros)
+
+    def __neg__(self) -> "Micros":
+        return Micros(-self.micros)
+
+    def __abs__(self) -> "Micros":
+        return Micros(abs(self.micros))
+
+    def __mul__(self, other: Number) -> "Micros":
+        """Product truncated to 6 decimals (an int multiplies exactly)"""
+        if type(other) is int:
+            return Micros(self.micros * other)
+        return Micros(_div_trunc(self.micros * Micros.of(other).micros, SCALE))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Number) -> "Micros":
+        """Quotient truncated to 6 decimals (shares = cost / price); ZeroDivisionError on 0"""
+        if type(other) is int:
+            return Micros(_div_trunc(self.micros, other))
+        return Micros(_div_trunc(self.micros * SCALE, Micros.of(other).micros))
+
+    def ratio(self, other: "Micros") -> float:
+        """self / other as a float (percentages)"""
+        return self.micros / other.micros
+
+    def round_to_tick(self, tick: "Micros", up: bool = False) -> "Micros":
+        """Down (or up) to a multiple of tick"""
+        steps, rest = divmod(self.micros, tick.micros)
+        if up and rest:
+            steps += 1
+        return Micros(steps * tick.micros)
+
+    # ─── Comparisons (Micros, int or float amounts) ────────────────────────────
+
+    def _cmp_value(self, other):
+        if isinstance(other, Micros):
+            return other.micros
+        if isinstance(other, (int, float)):
+            return other * SCALE
+        raise TypeError(f"cannot compare Micros with {type(other).__name__}")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (Micros, int, float)):
+            return NotImplemented
+        return self.micros == self._cmp_value(other)
+
+    def __lt__(self, other) -> bool:
+        return self.micros < self._cmp_value(other)
+
+    def __le__(self, other) -> bool:
+        return self.micros <= self._cmp_value(other)
+
+    def __gt__(self, other) -> bool:
+        return self.micros > self._cmp_value(other)
+
+    def __ge__(self, other) -> bool:
+        return self.micros >= self._cmp_value(other)
+
+    def __hash__(self) -> int:
+        return hash(self.to_decimal())  # Equal to the hash of an equal int/float
+
+    def __bool__(self) -> bool:
+        return self.micros != 0
+
+
+ZERO = Micros(0)
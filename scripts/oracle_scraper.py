@@ -17,12 +17,17 @@ import sys
 import json
 import time
 import logging
-import requests
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 import hashlib
 
+from http_client import get_sync_session
+from market_catalog import get_catalog
+from metrics import cycle_histogram, get_registry, queue_gauge, signal_histogram, start_metrics_server
+from profiler import install_profiler
+from lazy_imports import report_startup
+
 # Database
 try:
     import psycopg2
@@ -237,38 +242,24 @@ class Database:
 class OracleScraper:
     def __init__(self, db: Database):
         self.db = db
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "PolyGraalX-Oracle/1.0"
-        })
+        # Shared pooled session (keep-alive + retry/backoff)
+        self.session = get_sync_session()
+        self.catalog = get_catalog()
         self.crypto_markets: Dict[str, dict] = {}
         self.traders: Dict[str, TraderProfile] = {}
     
     def fetch_crypto_markets(self) -> Dict[str, dict]:
-        """Fetch all active crypto markets"""
+        """Active crypto markets from the shared market catalog"""
         logger.info("📊 Fetching crypto markets...")
         markets = {}
         
         try:
-            response = self.session.get(
-                f"{GAMMA_API}/markets",
-                params={"closed": False, "limit": 200, "active": True},
-                timeout=30
-            )
+            self.catalog.refresh_sync(self.session)
             
-            if response.status_code != 200:
-                logger.error(f"Failed to fetch markets: {response.status_code}")
-                return markets
-            
-            all_markets = response.json()
-            
-            for market in all_markets:
-                question = (market.get("question", "") + " " + market.get("description", "")).lower()
-                
-                if any(kw in question for kw in CRYPTO_KEYWORDS):
-                    market_id = market.get("conditionId") or market.get("condition_id", "")
-                    if market_id:
-                        markets[market_id] = market
+            for market in self.catalog.search(any_of=CRYPTO_KEYWORDS):
+                market_id = market.get("conditionId") or market.get("condition_id", "")
+                if market_id:
+                    markets[market_id] = market
             
             logger.info(f"   Found {len(markets)} crypto markets")
             return markets
@@ -572,24 +563,29 @@ class OracleScraper:
         # 2. Scrape from leaderboard
         traders = self.scrape_from_leaderboard()
         
+        queue_gauge("oracle_scraper", "traders_to_rank").set(len(traders))
+        
         # 3. Enrich with crypto data
         self.enrich_with_crypto_data(traders)
         
         # 4. Sort and rank
-        sorted_traders = sorted(
-            traders.values(),
-            key=lambda t: (t.crypto_trades > 0, t.score, t.total_pnl),
-            reverse=True
-        )
-        
-        # Update ranks
-        for idx, profile in enumerate(sorted_traders):
-            profile.rank = idx + 1
+        with signal_histogram("oracle_scraper").time():
+            sorted_traders = sorted(
+                traders.values(),
+                key=lambda t: (t.crypto_trades > 0, t.score, t.total_pnl),
+                reverse=True
+            )
+            
+            # Update ranks
+            for idx, profile in enumerate(sorted_traders):
+                profile.rank = idx + 1
         
         # 5. Store in database
-        stored = self.db.upsert_traders(sorted_traders)
+        with get_registry().histogram("db_write_seconds", "Database write latency", ("bot",)).labels(bot="oracle_scraper").time():
+            stored = self.db.upsert_traders(sorted_traders)
         
         elapsed = time.time() - start_time
+        cycle_histogram("oracle_scraper").observe(elapsed)
         
         logger.info("=" * 60)
         logger.info(f"✅ Scrape complete!")
@@ -606,6 +602,9 @@ class OracleScraper:
     def run_loop(self):
         """Main scraping loop"""
         logger.info("🔮 Oracle Leaderboard Scraper starting...")
+        install_profiler("oracle_scraper")
+        start_metrics_server("oracle_scraper")
+        report_startup("oracle_scraper", logger)
         
         last_full_scrape = 0
         
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+PolygraalX L2 Order Book
+========================
+Incrementally maintained CLOB order book per token, shared by the price
+updater, the arbitrage scanner and paper fills instead of re-parsing a full
+/book snapshot on every poll.
+
+Prices live on the market's tick grid (0.01 / 0.001 / 0.0001 in [0, 1]).
+Each side keeps Fenwick trees over that grid for level count, size and
+notional, so:
+    - delta application (set level size)          O(log n)
+    - best bid / ask                              O(log n)
+    - depth-to-size, VWAP-to-fill, depth at price O(log n)
+    - mid, microprice, spread                     O(log n)
+
+Snapshots replace the book and drop deltas older than the snapshot
+(reconciliation). The server hash (SHA1 of the compact book JSON, same
+scheme as py_clob_client) is checked on snapshots and, once our
+serialization is known to match, sampled on deltas; a mismatch flags the
+book for resync.
+
+Side conventions:
+    apply_delta(side=...)      WS side: "BUY" = bid level, "SELL" = ask level
+    vwap_to_fill(taker_side=)  "BUY" consumes asks, "SELL" consumes bids
+"""
+
+import hashlib
+import json
+import logging
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("OrderBook")
+
+DEFAULT_TICK = 0.01
+FINEST_TICK_DECIMALS = 4  # CLOB never quotes finer than 0.0001
+EPS = 1e-9
+
+
+def _decimals(value: str) -> int:
+    """Number of decimals in a price string ('0.455' -> 3)"""
+    exponent = Decimal(value).normalize().as_tuple().exponent
+    return max(0, -exponent)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ONE SIDE OF THE BOOK
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class _BookSide:
+    """
+    Price levels of one side on a fixed tick grid. Positions are ordered from
+    the best price (1) to the worst (n) so prefix sums walk the book.
+    """
+
+    def __init__(self, decimals: int, is_bid: bool):
+        self.decimals = decimals
+        self.tick = 10 ** -decimals
+        self.n = 10 ** decimals + 1  # Slots for prices 0 .. 1 inclusive
+        self.is_bid = is_bid
+        self.size = [0.0] * self.n  # Size per slot
+        self.raw: Dict[int, Tuple[str, str]] = {}  # slot -> (price str, size str) as received
+        self._count = [0] * (self.n + 1)
+        self._qty = [0.0] * (self.n + 1)
+        self._notional = [0.0] * (self.n + 1)
+        self._top_bit = 1 << (self.n.bit_length() - 1)
+
+    # ─── Grid mapping ──────────────────────────────────────────────────────────
+
+    def slot_of(self, price: float) -> int:
+        return int(round(price * (10 ** self.decimals)))
+
+    def price_of_slot(self, slot: int) -> float:
+        return round(slot * self.tick, self.decimals)
+
+    def _pos(self, slot: int) -> int:
+        return self.n - slot if self.is_bid else slot + 1
+
+    def _slot(self, pos: int) -> int:
+        return self.n - pos if self.is_bid else pos - 1
+
+    # ─── Fenwick primitives ────────────────────────────────────────────────────
+
+    def _add(self, pos: int, count: int, qty: float, notional: float):
+        count_tree, qty_tree, notional_tree = self._count, self._qty, self._notional
+        while pos <= self.n:
+            count_tree[pos] += count
+            qty_tree[pos] += qty
+            notional_tree[pos] += notional
+            pos += pos & -pos
+
+    def _prefix(self, tree: list, pos: int):
+        total = 0
+        while pos > 0:
+            total += tree[pos]
+            pos -= pos & -pos
+        return total
+
+    def _lower_bound(self, tree: list, target: float) -> int:
+        """Smallest position whose prefix sum reaches target (n + 1 if never)"""
+        pos = 0
+        step = self._top_bit
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and tree[nxt] < target - EPS:
+                pos = nxt
+                target -= tree[nxt]
+            step >>= 1
+        return pos + 1
+
+    # ─── Mutations ─────────────────────────────────────────────────────────────
+
+    def set_level(self, price: float, size: float, raw: Tuple[str, str] = None):
+        slot = self.slot_of(price)
+        if not 0 <= slot < self.n:
+            return
+        old = self.size[slot]
+        size = max(0.0, size)
+        if size == old and (raw is None or self.raw.get(slot) == raw):
+            return
+        count_delta = (size > 0) - (old > 0)
+        self.size[slot] = size
+        if size > 0:
+            self.raw[slot] = raw or (str(price), str(size))
+        else:
+            self.raw.pop(slot, None)
+        price = self.price_of_slot(slot)
+        self._add(self._pos(slot), count_delta, size - old, (size - old) * price)
+
+    def rebuild(self, levels: Dict[int, Tuple[float, Tuple[str, str]]]):
+        """Replace every level in O(n): levels is slot -> (size, raw)"""
+        self.size = [0.0] * self.n
+        self.raw = {}
+        count = [0] * (self.n + 1)
+        qty = [0.0] * (self.n + 1)
+        notional = [0.0] * (self.n + 1)
+        for slot, (size, raw) in levels.items():
+            if size <= 0 or not 0 <= slot < self.n:
+                continue
+            self.size[slot] = size
+            self.raw[slot] = raw
+            pos = self._pos(slot)
+            count[pos] += 1
+            qty[pos] += size
+            notional[pos] += size * self.price_of_slot(slot)
+        # Linear-time Fenwick construction
+        for pos in range(1, self.n + 1):
+            parent = pos + (pos & -pos)
+            if parent <= self.n:
+                count[parent] += count[pos]
+                qty[parent] += qty[pos]
+                notional[parent] += notional[pos]
+        self._count, self._qty, self._notional = count, qty, notional
+
+    # ─── Queries ───────────────────────────────────────────────────────────────
+
+    @property
+    def level_count(self) -> int:
+        return self._prefix(self._count, self.n)
+
+    @property
+    def total_size(self) -> float:
+        return self._prefix(self._qty, self.n)
+
+    def best(self) -> Tuple[Optional[float], float]:
+        if self._prefix(self._count, self.n) == 0:
+            return None, 0.0
+        slot = self._slot(self._lower_bound(self._count, 1))
+        return self.price_of_slot(slot), self.size[slot]
+
+    def nth_level(self, k: int) -> Optional[Tuple[float, float]]:
+        """k-th best level (1-based)"""
+        pos = self._lower_bound(self._count, k)
+        if pos > self.n:
+            return None
+        slot = self._slot(pos)
+        return self.price_of_slot(slot), self.size[slot]
+
+    def size_through(self, price: float) -> float:
+        """Cumulative size from the best level through price (inclusive)"""
+        slot = max(0, min(self.n - 1, self.slot_of(price)))
+        return self._prefix(self._qty, self._pos(slot))
+
+    def walk(self, size: float) -> Optional[Tuple[float, float]]:
+        """(worst price touched, total notional) to fill size, None if too thin"""
+        if size <= 0:
+            return None
+        pos = self._lower_bound(self._qty, size)
+        if pos > self.n:
+            return None
+        before_qty = self._prefix(self._qty, pos - 1)
+        before_notional = self._prefix(self._notional, pos - 1)
+        price = self.price_of_slot(self._slot(pos))
+        return price, before_notional + (size - before_qty) * price
+
+    def levels(self, depth: int = None) -> List[Tuple[float, float]]:
+        """Best-first (price, size) list"""
+        out = []
+        total = self.level_count if depth is None else min(depth, self.level_count)
+        for k in range(1, total + 1):
+            out.append(self.nth_level(k))
+        return out
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ORDER BOOK
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class OrderBook:
+    """L2 book of one CLOB token"""
+
+    def __init__(self, asset_id: str, market: str = "", tick_size: float = DEFAULT_TICK,
+                 hash_check_every: int = 20):
+        self.asset_id = str(asset_id)
+        self.market = market
+        decimals = _decimals(str(tick_size))
+        self.bids = _BookSide(decimals, is_bid=True)
+        self.asks = _BookSide(decimals, is_bid=False)
+
+        self.timestamp = 0  # ms of the last applied snapshot/delta
+        self.snapshot_ts = 0
+        self.meta: Dict[str, object] = {}  # min_order_size, tick_size, neg_risk, last_trade_price
+        self.hash_check_every = hash_check_every
+        self.hash_verified = False  # Our serialization reproduced a server hash
+        self.needs_resync = False
+        self.deltas_applied = 0
+        self.stale_deltas = 0
+        self.hash_mismatches = 0
+
+    # ─── Tick grid ─────────────────────────────────────────────────────────────
+
+    @property
+    def tick_size(self) -> float:
+        return self.bids.tick
+
+    def set_tick_size(self, tick_size: float):
+        """Move to another grid (tick_size_change), keeping every level"""
+        decimals = min(FINEST_TICK_DECIMALS, _decimals(str(tick_size)))
+        if decimals == self.bids.decimals:
+            return
+        decimals = max(decimals, self._finest_level_decimals())
+        for name in ("bids", "asks"):
+            old = getattr(self, name)
+            new = _BookSide(decimals, is_bid=old.is_bid)
+            new.rebuild({
+                new.slot_of(old.price_of_slot(slot)): (old.size[slot], raw)
+                for slot, raw in old.raw.items()
+            })
+            setattr(self, name, new)
+
+    def _finest_level_decimals(self) -> int:
+        decimals = 0
+        for side in (self.bids, self.asks):
+            for price_str, _ in side.raw.values():
+                decimals = max(decimals, _decimals(price_str))
+        return decimals
+
+    def _ensure_grid(self, price_str: str):
+        """Refine the grid if a price does not sit on it"""
+        decimals = _decimals(price_str)
+        if decimals > self.bids.decimals:
+            self.set_tick_size(10 ** -min(decimals, FINEST_TICK_DECIMALS))
+
+    # ─── Updates ───────────────────────────────────────────────────────────────
+
+    def apply_snapshot(self, snapshot: dict) -> bool:
+        """
+        Replace the book with a /book or WS 'book' payload.
+        Returns False if the payload hash does not match its content.
+        """
+        bids = snapshot.get("bids") or snapshot.get("buys") or []
+        asks = snapshot.get("asks") or snapshot.get("sells") or []
+        self.market = snapshot.get("market") or self.market
+        for key in ("min_order_size", "tick_size", "neg_risk", "last_trade_price"):
+            if key in snapshot:
+                self.meta[key] = snapshot[key]
+
+        if snapshot.get("tick_size"):
+            self.set_tick_size(float(snapshot["tick_size"]))
+        for level in list(bids) + list(asks):
+            self._ensure_grid(str(level["price"]))
+
+        for side, levels in ((self.bids, bids), (self.asks, asks)):
+            side.rebuild({
+                side.slot_of(float(level["price"])): (float(level["size"]), (str(level["price"]), str(level["size"])))
+                for level in levels
+            })
+
+        self.timestamp = self.snapshot_ts = int(snapshot.get("timestamp") or 0)
+        self.needs_resync = False
+
+        expected = snapshot.get("hash")
+        if not expected:
+            return True
+        if compute_book_hash(snapshot) != expected:
+            self.hash_mismatches += 1
+            logger.debug(f"Snapshot hash mismatch for {self.asset_id[:12]}")
+            return False
+        # Delta checks are only trusted once our own serialization reproduces the server hash
+        self.hash_verified = self.book_hash() == expected
+        return True
+
+    def apply_delta(self, side: str, price, size, timestamp: int = None, expected_hash: str = None) -> bool:
+        """
+        Set one level (WS price_change). side 'BUY' = bid, 'SELL' = ask.
+        Deltas older than the current snapshot are ignored. Returns False
+        when the sampled hash check fails (book flagged for resync).
+        """
+        timestamp = int(timestamp or 0)
+        if timestamp and timestamp < self.snapshot_ts:
+            self.stale_deltas += 1
+            return True
+        price_str, size_str = str(price), str(size)
+        self._ensure_grid(price_str)
+        book_side = self.bids if side.upper() in ("BUY", "BID", "BIDS") else self.asks
+        book_side.set_level(float(price_str), float(size_str), (price_str, size_str))
+        if timestamp:
+            self.timestamp = max(self.timestamp, timestamp)
+        self.deltas_applied += 1
+
+        if (expected_hash and self.hash_verified and self.hash_check_every
+                and self.deltas_applied % self.hash_check_every == 0):
+            if self.book_hash(timestamp) != expected_hash:
+                self.hash_mismatches += 1
+                self.needs_resync = True
+                return False
+        return True
+
+    # ─── Queries ───────────────────────────────────────────────────────────────
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return self.bids.best()[0]
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return self.asks.best()[0]
+
+    def top(self) -> Tuple[Optional[float], float, Optional[float], float]:
+        """(best bid, bid size, best ask, ask size)"""
+        bid, bid_size = self.bids.best()
+        ask, ask_size = self.asks.best()
+        return bid, bid_size, ask, ask_size
+
+    def mid(self) -> Optional[float]:
+        bid, _, ask, _ = self.top()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    def spread(self) -> Optional[float]:
+        bid, _, ask, _ = self.top()
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    def microprice(self) -> Optional[float]:
+        """Size-weighted mid: leans toward the side with less resting size"""
+        bid, bid_size, ask, ask_size = self.top()
+        if bid is None or ask is None:
+            return None
+        if bid_size + ask_size <= 0:
+            return (bid + ask) / 2
+        return (bid * ask_size + ask * bid_size) / (bid_size + ask_size)
+
+    def depth(self, side: str, through_price: float = None) -> float:
+        """Resting size on 'bids'/'asks', optionally only through a price"""
+        book_side = self.bids if side.lower().startswith("bid") else self.asks
+        if through_price is None:
+            return book_side.total_size
+        return book_side.size_through(through_price)
+
+    def depth_to_size(self, taker_side: str, size: float) -> Optional[float]:
+        """Worst price a taker must reach to fill size shares (None if too thin)"""
+        walked = self._taker_side(taker_side).walk(size)
+        return walked[0] if walked else None
+
+    def vwap_to_fill(self, taker_side: str, size: float) -> Optional[float]:
+        """Average fill price for size shares (None if too thin)"""
+        walked = self._taker_side(taker_side).walk(size)
+        return walked[1] / size if walked else None
+
+    def levels(self, side: str, depth: int = None) -> List[Tuple[float, float]]:
+        book_side = self.bids if side.lower().startswith("bid") else self.asks
+        return book_side.levels(depth)
+
+    def _taker_side(self, taker_side: str) -> _BookSide:
+        return self.asks if taker_side.upper() == "BUY" else self.bids
+
+    # ─── Hashing ───────────────────────────────────────────────────────────────
+
+    def to_snapshot(self, timestamp: int = None) -> dict:
+        """/book-shaped payload (bids ascending, asks descending like the API)"""
+        bids = [self.bids.raw[slot] for slot in sorted(self.bids.raw)]
+        asks = [self.asks.raw[slot] for slot in sorted(self.asks.raw, reverse=True)]
+        return {
+            "market": self.market,
+            "asset_id": self.asset_id,
+            "timestamp": str(timestamp or self.timestamp),
+            "hash": "",
+            "bids": [{"price": p, "size": s} for p, s in bids],
+            "asks": [{"price": p, "size": s} for p, s in asks],
+            **self.meta,
+        }
+
+    def book_hash(self, timestamp: int = None) -> str:
+        return compute_book_hash(self.to_snapshot(timestamp))
+
+
+def compute_book_hash(book: dict) -> str:
+    """Server-compatible book hash: SHA1 of compact JSON with hash=''"""
+    payload = {
+        "market": book.get("market"),
+        "asset_id": book.get("asset_id"),
+        "timestamp": book.get("timestamp"),
+        "hash": "",
+        "bids": [{"price": l["price"], "size": l["size"]} for l in book.get("bids") or []],
+        "asks": [{"price": l["price"], "size": l["size"]} for l in book.get("asks") or []],
+        "min_order_size": book.get("min_order_size"),
+        "tick_size": book.get("tick_size"),
+        "neg_risk": book.get("neg_risk"),
+        "last_trade_price": book.get("last_trade_price"),
+    }
+    serialized = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SHARED BOOK STORE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class OrderBookStore:
+    """One maintained OrderBook per token, fed by WS events and /book snapshots"""
+
+    def __init__(self, clob_api: str = "https://clob.polymarket.com"):
+        self.clob_api = clob_api
+        self.books: Dict[str, OrderBook] = {}
+
+    def get(self, token_id: str) -> Optional[OrderBook]:
+        return self.books.get(str(token_id))
+
+    def book(self, token_id: str, market: str = "") -> OrderBook:
+        token_id = str(token_id)
+        book = self.books.get(token_id)
+        if book is None:
+            book = self.books[token_id] = OrderBook(token_id, market)
+        return book
+
+    def drop(self, token_id: str):
+        self.books.pop(str(token_id), None)
+
+    def clear(self):
+        self.books.clear()
+
+    def apply_event(self, event: dict) -> List[str]:
+        """Apply one CLOB market-channel event. Returns the tokens whose book changed"""
+        event_type = event.get("event_type")
+        timestamp = int(event.get("timestamp") or 0)
+
+        if event_type == "book":
+            token = str(event.get("asset_id"))
+            self.book(token, event.get("market", "")).apply_snapshot(event)
+            return [token]
+
+        if event_type == "price_change":
+            changes = event.get("price_changes")
+            if changes is None:
+                # Legacy format: one asset, hash on the event
+                changes = [dict(c, asset_id=event.get("asset_id"), hash=event.get("hash"))
+                           for c in event.get("changes", [])]
+            touched = []
+            for change in changes:
+                token = str(change.get("asset_id"))
+                book = self.books.get(token)
+                if book is None:
+                    continue  # No snapshot yet: nothing to apply the delta to
+                book.apply_delta(change.get("side", ""), change["price"], change["size"],
+                                 timestamp, change.get("hash"))
+                if token not in touched:
+                    touched.append(token)
+            return touched
+
+        if event_type == "tick_size_change":
+            book = self.books.get(str(event.get("asset_id")))
+            if book and event.get("new_tick_size"):
+                book.set_tick_size(float(event["new_tick_size"]))
+                book.meta["tick_size"] = event["new_tick_size"]
+            return []
+
+        return []
+
+    async def fetch_snapshot(self, token_id: str, timeout: float = 5,
+                             keep: bool = True) -> Optional[OrderBook]:
+        """
+        Pull /book through the shared HTTP client and reconcile the token's book.
+        keep=False returns a throwaway book and leaves the store untouched (one-off checks).
+        """
+        from http_client import get_client
+
+        data = await get_client().get_json(
+            f"{self.clob_api}/book", params={"token_id": str(token_id)}, timeout=timeout, retries=0
+        )
+        if not data or "bids" not in data:
+            return None
+        if keep:
+            book = self.book(token_id, data.get("market", ""))
+        else:
+            book = OrderBook(token_id, data.get("market", ""))
+        book.apply_snapshot(data)
+        return book
+
+
+_shared_store: Optional[OrderBookStore] = None
+
+
+def get_book_store() -> OrderBookStore:
+    """Process-wide book store"""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = OrderBookStore()
+    return _shared_store
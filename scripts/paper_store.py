@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Paper Trading Store
+==============================
+SQLite (WAL) backend for server paper orders and profiles, replacing the
+full read/rewrite of server_paper_orders.json / server_paper_profiles.json
+on every price-updater cycle.
+
+- One row per order: indexed status / marketId columns + the original JSON
+  document, so open orders are an index lookup and updates touch only the
+  rows that changed
+- Balance reconciliation runs as one SQL aggregate instead of a Python scan
+- Migration: the JSON files are imported on first use
+- Dashboard compatibility: the Next.js routes still read (and write) the JSON
+  files, so the store exports them (throttled, atomic) when rows changed and
+  re-imports them when someone else modified them. The orders mirror carries
+  the full history by default, since the dashboard computes its stats, lists
+  and deletes orders from that file; `mirror_history` >= 0 opts into a
+  bounded mirror (live orders plus the last N closed ones) for deployments
+  whose dashboard does not need older history.
+- Dashboard edits are merged three-way against the last mirrored rows: fields
+  the dashboard changed win (a close, cancel or delete is never lost to a
+  local price tick), fields it did not touch keep local changes. Profile
+  balances / counters changed on both sides add up.
+
+Usage:
+    store = PaperStore(PaperStoreConfig(data_dir=DATA_DIR))
+    orders = store.open_orders()
+    store.save_orders(changed_orders)
+    store.export_json()
+    python paper_store.py --data-dir data --migrate | --export | --stats
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("PaperStore")
+
+DATA_DIR = Path(os.getenv("DATA_DIR", os.path.join(os.getcwd(), "data")))
+
+# Orders the dashboard still acts on (always in the mirror)
+LIVE_STATUSES = ("OPEN", "PARTIAL")
+
+# Profile fields that both sides increment: concurrent changes add up
+PROFILE_COUNTERS = ("balance", "totalPnL", "totalTrades", "winningTrades", "losingTrades")
+
+_MISSING = object()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'OPEN',
+    market_id TEXT,
+    amount REAL NOT NULL DEFAULT 0,
+    original_amount REAL NOT NULL DEFAULT 0,
+    shares REAL NOT NULL DEFAULT 0,
+    exit_price REAL NOT NULL DEFAULT 0,
+    pnl REAL NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
+CREATE INDEX IF NOT EXISTS idx_orders_market ON orders(market_id);
+CREATE TABLE IF NOT EXISTS profiles (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class PaperStoreConfig:
+    """Store location and JSON mirror behaviour"""
+    data_dir: Path = DATA_DIR
+    db_name: str = "paper_trading.db"
+    orders_file: Optional[Path] = None  # Defaults to data_dir/server_paper_orders.json
+    profiles_file: Optional[Path] = None  # Defaults to data_dir/server_paper_profiles.json
+    json_mirror: bool = os.getenv("PAPER_JSON_MIRROR", "true").lower() == "true"
+    export_interval: float = 1.0  # Min seconds between JSON exports
+    mirror_history: int = int(os.getenv("PAPER_MIRROR_HISTORY", "-1"))  # Closed orders in the mirror (-1 = all)
+
+    def __post_init__(self):
+        self.data_dir = Path(self.data_dir)
+        self.orders_file = Path(self.orders_file or self.data_dir / "server_paper_orders.json")
+        self.profiles_file = Path(self.profiles_file or self.data_dir / "server_paper_profiles.json")
+
+    @property
+    def db_file(self) -> Path:
+        return self.data_dir / self.db_name
+
+
+def _num(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _order_columns(order: dict) -> tuple:
+    """Indexed / aggregated columns, with the same defaults the bots use"""
+    amount = _num(order.get("amount", 0))
+    return (
+        str(order["id"]),
+        order.get("status", "OPEN"),
+        order.get("marketId"),
+        amount,
+        _num(order.get("originalAmount", amount)),
+        _num(order.get("shares", order.get("originalShares", 0))),
+        _num(order.get("exitPrice", order.get("entryPrice", 0))),
+        _num(order.get("pnl", 0)),
+        json.dumps(order, separators=(",", ":")),
+    )
+
+
+def _merge_docs(base: dict, ours: dict, theirs: dict, counters: Tuple[str, ...] = ()) -> dict:
+    """
+    Three-way merge of one document: keys `theirs` changed since `base` win,
+    the others keep `ours`. Counters changed on both sides get both deltas.
+    """
+    merged = dict(ours)
+    for key in set(base) | set(theirs):
+        before, after = base.get(key, _MISSING), theirs.get(key, _MISSING)
+        if after == before:
+            continue
+        mine = ours.get(key, _MISSING)
+        if (key in counters and mine != before
+                and all(isinstance(v, (int, float)) for v in (before, after, mine))):
+            merged[key] = round(mine + after - before, 6)
+        elif after is _MISSING:
+            merged.pop(key, None)
+        else:
+            merged[key] = after
+    return merged
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# STORE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class PaperStore:
+    """Transactional paper orders / profiles with a JSON mirror for the dashboard"""
+
+    def __init__(self, config: PaperStoreConfig = None):
+        self.config = config or PaperStoreConfig()
+        self.config.data_dir.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.config.db_file), isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+        self._dirty_orders: set = set()
+        self._dirty_profiles = False
+        self._last_export = 0.0
+        self._mirror_stamps: Dict[str, tuple] = {}
+        # Rows as of the last mirror sync (export or import): the merge base
+        self._mirror_orders: Optional[Dict[str, dict]] = None
+        self._mirror_profiles: Optional[Dict[str, dict]] = None
+
+        # First use imports the JSON files; later starts catch up on dashboard edits
+        if self.config.json_mirror and not self.migrate_from_json():
+            self.import_json()
+
+    def close(self):
+        self.db.close()
+
+    # ─── Orders ────────────────────────────────────────────────────────────────
+
+    def open_orders(self) -> List[dict]:
+        return self.orders(status="OPEN")
+
+    def orders(self, status: str = None, market_id: str = None) -> List[dict]:
+        query, args = "SELECT data FROM orders", []
+        clauses = []
+        if status is not None:
+            clauses.append("status = ?")
+            args.append(status)
+        if market_id is not None:
+            clauses.append("market_id = ?")
+            args.append(market_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY rowid"
+        return [json.loads(row[0]) for row in self.db.execute(query, args)]
+
+    def get_order(self, order_id: str) -> Optional[dict]:
+        row = self.db.execute("SELECT data FROM orders WHERE id = ?", (str(order_id),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self, status: str = None) -> int:
+        if status is None:
+            return self.db.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+        return self.db.execute("SELECT COUNT(*) FROM orders WHERE status = ?", (status,)).fetchone()[0]
+
+    def save_orders(self, orders: Iterable[dict]) -> int:
+        """Upsert only the given orders that changed, in one transaction"""
+        rows = [_order_columns(o) for o in orders if o.get("id")]
+        stored = {oid: data for _, oid, data in self._rows_by_id(row[0] for row in rows)}
+        rows = [row for row in rows if stored.get(row[0]) != row[-1]]
+        if not rows:
+            return 0
+        with self.db:
+            self.db.execute("BEGIN")
+            self._upsert_orders(rows)
+        self._dirty_orders.update(row[0] for row in rows)
+        return len(rows)
+
+    def delete_order(self, order_id: str):
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.execute("DELETE FROM orders WHERE id = ?", (str(order_id),))
+        self._dirty_orders.add(str(order_id))
+
+    def _rows_by_id(self, ids: Iterable[str]) -> List[tuple]:
+        """(rowid, id, data) of the given orders"""
+        ids = list(ids)
+        rows = []
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            rows.extend(self.db.execute(
+                f"SELECT rowid, id, data FROM orders WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        return rows
+
+    def _upsert_orders(self, rows: List[tuple]):
+        self.db.executemany(
+            """INSERT INTO orders (id, status, market_id, amount, original_amount, shares, exit_price, pnl, data)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET
+                   status = excluded.status, market_id = excluded.market_id, amount = excluded.amount,
+                   original_amount = excluded.original_amount, shares = excluded.shares,
+                   exit_price = excluded.exit_price, pnl = excluded.pnl, data = excluded.data""",
+            rows,
+        )
+
+    # ─── Profiles ──────────────────────────────────────────────────────────────
+
+    def profiles(self) -> List[dict]:
+        return [json.loads(row[0]) for row in self.db.execute("SELECT data FROM profiles ORDER BY position")]
+
+    def active_profile(self) -> Optional[dict]:
+        row = self.db.execute(
+            "SELECT data FROM profiles ORDER BY is_active DESC, position LIMIT 1"
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_profiles(self, profiles: List[dict]):
+        """Replace the profile list (a handful of rows)"""
+        with self.db:
+            self.db.execute("BEGIN")
+            self._replace_profiles(profiles)
+        self._dirty_profiles = True
+
+    def _replace_profiles(self, profiles: List[dict]):
+        self.db.execute("DELETE FROM profiles")
+        self.db.executemany(
+            "INSERT INTO profiles (id, position, is_active, data) VALUES (?, ?, ?, ?)",
+            [(str(p.get("id", i)), i, int(bool(p.get("isActive"))), json.dumps(p, separators=(",", ":")))
+             for i, p in enumerate(profiles)],
+        )
+
+    # ─── Aggregates ────────────────────────────────────────────────────────────
+
+    def balance_totals(self) -> dict:
+        """
+        Order-history totals for balance reconciliation, in one indexed query.
+        'settled_*' only count closed orders with a fill (exit price and shares > 0).
+        """
+        row = self.db.execute("""
+            SELECT
+                COALESCE(SUM(CASE WHEN status = 'OPEN' THEN 1 ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN status = 'CLOSED' THEN 1 ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN status = 'OPEN' THEN amount ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN status = 'CLOSED' THEN original_amount ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN status = 'CLOSED' THEN pnl ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN status = 'CLOSED' AND pnl > 0 THEN 1 ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN status = 'CLOSED' AND pnl < 0 THEN 1 ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN status = 'CLOSED' AND exit_price > 0 AND shares > 0
+                                  THEN shares * exit_price ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN status = 'CLOSED' AND exit_price > 0 AND shares > 0
+                                  THEN original_amount + pnl ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN status = 'CLOSED' AND exit_price > 0 AND shares > 0
+                                  THEN pnl ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN status = 'CLOSED' AND exit_price > 0 AND shares > 0 AND pnl > 0
+                                  THEN 1 ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN status = 'CLOSED' AND exit_price > 0 AND shares > 0 AND pnl < 0
+                                  THEN 1 ELSE 0 END), 0)
+            FROM orders WHERE status IN ('OPEN', 'CLOSED')
+        """).fetchone()
+        keys = ("open_count", "closed_count", "open_invested", "closed_invested", "closed_pnl",
+                "closed_wins", "closed_losses", "exit_value", "settled_recovered", "settled_pnl",
+                "settled_wins", "settled_losses")
+        return dict(zip(keys, row))
+
+    # ─── JSON mirror ───────────────────────────────────────────────────────────
+
+    def migrate_from_json(self) -> bool:
+        """Import the legacy JSON files once (empty store only)"""
+        migrated = self.db.execute("SELECT value FROM meta WHERE key = 'migrated_at'").fetchone()
+        if migrated:
+            return False
+        self.import_json(force=True)
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_at', ?)", (str(time.time()),))
+        logger.info(f"📦 Paper store ready: {self.count()} orders, {len(self.profiles())} profiles")
+        return True
+
+    def _stamp(self, path: Path) -> Optional[tuple]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def import_json(self, force: bool = False) -> int:
+        """
+        Re-import the JSON files if someone else (the dashboard) modified them
+        since our last export. Returns the number of rows changed.
+        """
+        changed = 0
+        orders_file, profiles_file = self.config.orders_file, self.config.profiles_file
+        if self._mirror_orders is None:
+            self._mirror_orders = {oid: json.loads(data) for _, oid, data in self._mirror_rows()}
+            self._mirror_profiles = {self._profile_id(p, i): p for i, p in enumerate(self.profiles())}
+
+        # The stamp only advances once the whole file is merged: unreadable
+        # (half-written) files and skipped rows are read again next time
+        stamp = self._stamp(orders_file)
+        if stamp and (force or stamp != self._mirror_stamps.get("orders")):
+            try:
+                orders = json.loads(orders_file.read_text())
+            except Exception as e:
+                logger.error(f"Error reading orders: {str(e)[:100]}")
+                orders = None
+            if isinstance(orders, list):
+                merged, skipped = self._merge_orders(orders)
+                changed += merged
+                if not skipped:
+                    self._mirror_stamps["orders"] = stamp
+
+        stamp = self._stamp(profiles_file)
+        if stamp and (force or stamp != self._mirror_stamps.get("profiles")):
+            try:
+                profiles = json.loads(profiles_file.read_text())
+            except Exception as e:
+                logger.error(f"Error reading profiles: {str(e)[:100]}")
+                profiles = None
+            if isinstance(profiles, list):
+                changed += self._merge_profiles(profiles)
+                self._mirror_stamps["profiles"] = stamp
+        return changed
+
+    def _merge_orders(self, orders: List[dict]) -> Tuple[int, int]:
+        """
+        Merge the dashboard's orders file against the last mirrored rows.
+        Returns (rows changed, rows skipped).
+        """
+        base = self._mirror_orders
+        theirs = {str(o["id"]): o for o in orders if isinstance(o, dict) and o.get("id")}
+        current = {oid: json.loads(data) for _, oid, data in self._rows_by_id(set(theirs) | set(base))}
+
+        rows, skipped = [], set()
+        for oid, order in theirs.items():
+            ours = current.get(oid)
+            if ours is None:
+                if oid in self._dirty_orders:
+                    continue  # Deleted here, export pending
+                merged = order
+            elif oid in base:
+                merged = _merge_docs(base[oid], ours, order)
+            elif oid in self._dirty_orders:
+                skipped.add(oid)  # Changed here, and the dashboard never saw our version
+                continue
+            else:
+                merged = order
+            if merged != ours:
+                rows.append(_order_columns(merged))
+            if merged != order:
+                self._dirty_orders.add(oid)  # Local changes still to export
+        # Mirrored rows missing from the file were deleted by the dashboard
+        removed = [oid for oid in base if oid not in theirs and oid in current]
+
+        if rows or removed:
+            with self.db:
+                self.db.execute("BEGIN")
+                self._upsert_orders(rows)
+                self.db.executemany("DELETE FROM orders WHERE id = ?", [(oid,) for oid in removed])
+        self._mirror_orders = {oid: order for oid, order in theirs.items() if oid not in skipped}
+        return len(rows) + len(removed), len(skipped)
+
+    @staticmethod
+    def _profile_id(profile: dict, position: int) -> str:
+        return str(profile.get("id", position))
+
+    def _merge_profiles(self, profiles: List[dict]) -> int:
+        """Merge the dashboard's profiles file; balances changed on both sides add up"""
+        base = self._mirror_profiles
+        ours_list = self.profiles()
+        ours = {self._profile_id(p, i): p for i, p in enumerate(ours_list)}
+        theirs = {}
+        merged = []
+        for i, profile in enumerate(p for p in profiles if isinstance(p, dict)):
+            pid = self._profile_id(profile, i)
+            theirs[pid] = profile
+            if pid in ours and pid in base:
+                merged.append(_merge_docs(base[pid], ours[pid], profile, PROFILE_COUNTERS))
+            elif pid in ours and self._dirty_profiles:
+                merged.append(ours[pid])  # Created on both sides: ours is not exported yet
+            else:
+                merged.append(profile)
+        # Profiles added here and not exported yet
+        merged.extend(p for pid, p in ours.items() if pid not in theirs and pid not in base)
+
+        self._mirror_profiles = theirs
+        if merged != list(theirs.values()):
+            self._dirty_profiles = True
+        if merged == ours_list:
+            return 0
+        with self.db:
+            self.db.execute("BEGIN")
+            self._replace_profiles(merged)
+        return len(merged)
+
+    def _mirror_rows(self) -> List[tuple]:
+        """(rowid, id, data) of the orders the mirror carries: all, or live ones and the most recent others"""
+        if self.config.mirror_history < 0:
+            return self.db.execute("SELECT rowid, id, data FROM orders ORDER BY rowid").fetchall()
+        return self.db.execute(
+            f"""SELECT rowid, id, data FROM orders WHERE status IN ({','.join('?' * len(LIVE_STATUSES))})
+                UNION ALL
+                SELECT * FROM (SELECT rowid, id, data FROM orders
+                               WHERE status NOT IN ({','.join('?' * len(LIVE_STATUSES))})
+                               ORDER BY rowid DESC LIMIT ?)
+                ORDER BY 1""",
+            (*LIVE_STATUSES, *LIVE_STATUSES, self.config.mirror_history),
+        ).fetchall()
+
+    def export_json(self, force: bool = False) -> bool:
+        """
+        Write the dashboard JSON files if rows changed (throttled, atomic).
+        With a bounded mirror_history, cost follows the live orders, not the full history.
+        """
+        if not self.config.json_mirror:
+            return False
+        if not force and not (self._dirty_orders or self._dirty_profiles):
+            return False
+        if not force and time.time() - self._last_export < self.config.export_interval:
+            return False
+
+        # Pick up dashboard edits first so the export does not clobber them
+        self.import_json()
+        try:
+            if force or self._dirty_orders:
+                rows = self._mirror_rows()
+                extra = self._dirty_orders - {row[1] for row in rows}
+                if extra:  # Changed rows older than the mirrored history
+                    rows = sorted(rows + self._rows_by_id(extra))
+                orders = [json.loads(data) for _, _, data in rows]
+                self._write_atomic(self.config.orders_file, orders)
+                self._mirror_stamps["orders"] = self._stamp(self.config.orders_file)
+                self._mirror_orders = {str(o["id"]): o for o in orders}
+            if force or self._dirty_profiles:
+                profiles = self.profiles()
+                self._write_atomic(self.config.profiles_file, profiles)
+                self._mirror_stamps["profiles"] = self._stamp(self.config.profiles_file)
+                self._mirror_profiles = {self._profile_id(p, i): p for i, p in enumerate(profiles)}
+        except Exception as e:
+            logger.error(f"Error exporting paper store: {str(e)[:100]}")
+            return False
+        self._dirty_orders.clear()
+        self._dirty_profiles = False
+        self._last_export = time.time()
+        return True
+
+    def _write_atomic(self, path: Path, payload):
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(payload, indent=2))
+        os.replace(tmp, path)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(description="PolygraalX paper trading store")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--migrate", action="store_true", help="Import the JSON files into the store")
+    parser.add_argument("--export", action="store_true", help="Write the JSON files from the store")
+    parser.add_argument("--mirror-history", type=int, default=PaperStoreConfig.mirror_history,
+                        help="Closed orders written by --export (-1 = all)")
+    parser.add_argument("--stats", action="store_true", help="Print order counts and balance totals")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [PaperStore] %(message)s", datefmt="%H:%M:%S")
+    store = PaperStore(PaperStoreConfig(data_dir=Path(args.data_dir), mirror_history=args.mirror_history))
+    if args.migrate:
+        print(f"Imported {store.import_json(force=True)} changed rows")
+    if args.export:
+        store.export_json(force=True)
+        print(f"Exported {len(store._mirror_orders or {})} of {store.count()} orders to {store.config.orders_file}")
+    if args.stats or not (args.migrate or args.export):
+        print(json.dumps(store.balance_totals(), indent=2))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
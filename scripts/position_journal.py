@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Position Journal
+===========================
+Append-only, crash-safe journal of the Crypto Oracle trading state (open
+positions, hedges, daily trade counters), so a crash or PM2 restart doesn't
+leave GTC orders and moonbags unmanaged.
+
+- Every change is one JSON line written (and flushed to the OS) before the
+  call returns: a process crash loses nothing
+- fsync is batched: a background thread syncs at most every fsync_interval
+  seconds, so a burst of orders costs one disk flush (group commit)
+- Every compact_after records the state is written to a snapshot (atomic
+  replace) and the journal is truncated
+- Recovery = snapshot + replay of the journal tail: milliseconds. A torn
+  last line (crash mid-write) is dropped and cut off the file
+
+Files (data_dir):
+    <name>.snapshot.json   {"seq": N, "state": {...}}
+    <name>.journal         {"seq": N+1, "op": "open", ...} one per line
+
+Usage:
+    journal = PositionJournal(JournalConfig(data_dir=DATA_DIR))
+    state = journal.recover()          # {"positions": {...}, "daily_trades": 0, ...}
+    journal.append("open", market_id="0x..", position={...})
+    journal.append("counters", daily_trades=1, last_trade_time="2025-01-01T12:00:00")
+    journal.close()
+    python position_journal.py --data-dir data          # Print the recovered state
+"""
+
+import argparse
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger("PositionJournal")
+
+DATA_DIR = Path(os.getenv("DATA_DIR", os.path.join(os.getcwd(), "data")))
+
+# Journal operations
+OP_OPEN = "open"  # New position (full record)
+OP_HEDGE = "hedge"  # Position after a hedge (full record)
+OP_COUNTERS = "counters"  # daily_trades / last_trade_time / trade_day
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class JournalConfig:
+    """Journal location, fsync batching and compaction"""
+    data_dir: Path = DATA_DIR
+    name: str = "crypto_oracle_positions"
+    fsync_interval: float = 0.2  # Group commit window (seconds)
+    compact_after: int = 1000  # Journal records before a snapshot
+
+    def __post_init__(self):
+        self.data_dir = Path(self.data_dir)
+
+    @property
+    def journal_file(self) -> Path:
+        return self.data_dir / f"{self.name}.journal"
+
+    @property
+    def snapshot_file(self) -> Path:
+        return self.data_dir / f"{self.name}.snapshot.json"
+
+
+def empty_state() -> dict:
+    return {"positions": {}, "daily_trades": 0, "last_trade_time": None, "trade_day": None}
+
+
+def apply_record(state: dict, record: dict):
+    """Replay one journal record onto a state dict"""
+    op = record.get("op")
+    if op in (OP_OPEN, OP_HEDGE):
+        state["positions"][record["market_id"]] = record["position"]
+    elif op == OP_COUNTERS:
+        for key in ("daily_trades", "last_trade_time", "trade_day"):
+            if key in record:
+                state[key] = record[key]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# JOURNAL
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class PositionJournal:
+    """Append-only state journal with batched fsync and snapshot compaction"""
+
+    def __init__(self, config: JournalConfig = None):
+        self.config = config or JournalConfig()
+        self.config.data_dir.mkdir(parents=True, exist_ok=True)
+        self.state = empty_state()
+        self.seq = 0
+        self.pending = 0  # Records in the journal since the last snapshot
+        self.recovered = False
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._dirty = False
+        self._wake = threading.Event()
+        self._closed = False
+        self._syncer: Optional[threading.Thread] = None
+
+    # ─── Recovery ──────────────────────────────────────────────────────────────
+
+    def recover(self) -> dict:
+        """Load the snapshot, replay the journal tail and open the journal for appends"""
+        started = time.perf_counter()
+        state, seq = empty_state(), 0
+
+        snapshot_file = self.config.snapshot_file
+        if snapshot_file.exists():
+            try:
+                snapshot = json.loads(snapshot_file.read_text())
+                state, seq = snapshot["state"], snapshot["seq"]
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"❌ Unreadable journal snapshot, replaying journal only: {str(e)[:100]}")
+
+        replayed = 0
+        journal_file = self.config.journal_file
+        if journal_file.exists():
+            data = journal_file.read_bytes()
+            good_end = 0
+            for line in data.splitlines(keepends=True):
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("torn line")
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning(f"⚠️ Journal: dropping torn tail ({len(data) - good_end} bytes)")
+                    with open(journal_file, "r+b") as f:
+                        f.truncate(good_end)
+                    break
+                good_end += len(line)
+                if record.get("seq", 0) <= seq:
+                    continue  # Already in the snapshot (crash between snapshot and truncate)
+                apply_record(state, record)
+                seq = record["seq"]
+                replayed += 1
+
+        with self._lock:
+            self.state, self.seq, self.pending = state, seq, replayed
+            self.recovered = True
+            self._open()
+
+        logger.info(
+            f"📒 Journal recovered: {len(state['positions'])} positions, {replayed} records replayed "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return copy.deepcopy(state)
+
+    # ─── Writes ────────────────────────────────────────────────────────────────
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.config.journal_file, "ab")
+        if self._syncer is None:
+            self._syncer = threading.Thread(target=self._sync_loop, name="position-journal", daemon=True)
+            self._syncer.start()
+
+    def append(self, op: str, **fields) -> int:
+        """Write one record (flushed to the OS now, fsynced within fsync_interval). Returns its seq."""
+        if not self.recovered:
+            self.recover()  # Appending on top of an unread journal would lose it at compaction
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("journal is closed")
+            self._open()
+            self.seq += 1
+            record = {"seq": self.seq, "op": op, "ts": time.time(), **fields}
+            self._file.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+            self._file.flush()
+            apply_record(self.state, record)
+            self.pending += 1
+            self._dirty = True
+            seq = self.seq
+            compact = self.pending >= self.config.compact_after
+        self._wake.set()
+        if compact:
+            self.compact()
+        return seq
+
+    def sync(self):
+        """fsync what was appended so far"""
+        with self._lock:
+            if self._dirty and self._file is not None:
+                os.fsync(self._file.fileno())
+                self._dirty = False
+
+    def _sync_loop(self):
+        while not self._closed:
+            self._wake.wait()
+            time.sleep(self.config.fsync_interval)  # Let a burst of appends share one fsync
+            self._wake.clear()
+            try:
+                self.sync()
+            except OSError as e:
+                logger.error(f"❌ Journal fsync failed: {str(e)[:100]}")
+
+    def compact(self):
+        """Write the state to the snapshot (atomic) and truncate the journal"""
+        with self._lock:
+            payload = json.dumps({"seq": self.seq, "state": self.state}, separators=(",", ":"))
+            snapshot_file = self.config.snapshot_file
+            tmp = snapshot_file.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, snapshot_file)
+
+            # Records up to seq are now in the snapshot: start an empty journal
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self.config.journal_file, "wb")
+            os.fsync(self._file.fileno())
+            self._dirty = False
+            self.pending = 0
+        logger.info(f"📒 Journal compacted at seq {self.seq}")
+
+    def close(self):
+        """Final fsync and stop the sync thread"""
+        self.sync()
+        with self._lock:
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self._wake.set()
+        if self._syncer is not None:
+            self._syncer.join(timeout=2)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the Crypto Oracle position journal")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--name", default=JournalConfig.name)
+    parser.add_argument("--compact", action="store_true", help="Write a snapshot and truncate the journal")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    journal = PositionJournal(JournalConfig(data_dir=Path(args.data_dir), name=args.name))
+    state = journal.recover()
+    if args.compact:
+        journal.compact()
+    journal.close()
+    print(json.dumps(state, indent=2))
+
+
+if __name__ == "__main__":
+    main()
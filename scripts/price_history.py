@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Price History Ring
+=============================
+Fixed-capacity history of (timestamp, spot, poly) samples in three typed
+arrays, replacing deques of {"timestamp": datetime, "spot", "poly"} dicts.
+
+- 24 bytes per sample (three C doubles) instead of a dict, a datetime and
+  two floats (~400 bytes)
+- Ring buffer: append is O(1) and overwrites the oldest sample when full
+- Timestamps are epoch seconds and never decrease, so lookback queries at
+  any horizon are a binary search: O(log n)
+
+Usage:
+    history = PriceHistory(maxlen=120)
+    history.append(time.time(), spot, poly)
+    ts, spot, poly = history.lookback(300)   # Sample from 5 min ago (or oldest)
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Iterator, Optional, Tuple
+
+Sample = Tuple[float, float, float]  # (timestamp, spot, poly)
+
+
+class PriceHistory:
+    """Ring buffer of (timestamp, spot, poly) with binary-search lookback"""
+
+    __slots__ = ("maxlen", "_ts", "_spot", "_poly", "_start", "_size")
+
+    def __init__(self, maxlen: int):
+        if maxlen <= 0:
+            raise ValueError("maxlen must be positive")
+        self.maxlen = maxlen
+        self._ts = array("d", bytes(8 * maxlen))
+        self._spot = array("d", bytes(8 * maxlen))
+        self._poly = array("d", bytes(8 * maxlen))
+        self._start = 0  # Physical index of the oldest sample
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Sample]:
+        for i in range(self._size):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> Sample:
+        """Sample by logical index (0 = oldest, -1 = newest)"""
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("price history index out of range")
+        j = (self._start + i) % self.maxlen
+        return self._ts[j], self._spot[j], self._poly[j]
+
+    @property
+    def nbytes(self) -> int:
+        return 3 * self.maxlen * self._ts.itemsize
+
+    # ─── Writes ────────────────────────────────────────────────────────────────
+
+    def append(self, timestamp: float, spot: float, poly: float):
+        """Add the newest sample (an earlier timestamp is raised to the last one)"""
+        if self._size:
+            last = self._ts[(self._start + self._size - 1) % self.maxlen]
+            if timestamp < last:
+                timestamp = last  # Keep the order bisect relies on (clock stepped back)
+        if self._size < self.maxlen:
+            j = (self._start + self._size) % self.maxlen
+            self._size += 1
+        else:
+            j = self._start
+            self._start = (self._start + 1) % self.maxlen
+        self._ts[j] = timestamp
+        self._spot[j] = spot
+        self._poly[j] = poly
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+
+    # ─── Queries ───────────────────────────────────────────────────────────────
+
+    def index_at_or_before(self, timestamp: float) -> int:
+        """Logical index of the newest sample with ts <= timestamp, -1 if none"""
+        ts, start, cap = self._ts, self._start, self.maxlen
+        return bisect_right(range(self._size), timestamp, key=lambda i: ts[(start + i) % cap]) - 1
+
+    def lookback(self, seconds: float, now: float = None) -> Optional[Sample]:
+        """
+        Sample closest to (at or before) now - seconds; the oldest sample when
+        the history is shorter than the horizon. None when empty.
+        """
+        if not self._size:
+            return None
+        if now is None:
+            now = self[-1][0]
+        i = self.index_at_or_before(now - seconds)
+        return self[max(i, 0)]
@@ -3,8 +3,15 @@
 PolygraalX Live Price Updater
 Updates currentPrice for all OPEN orders from Polymarket API
 Calculates PnL and checks TP/SL triggers
+Orders live in the SQLite paper store: a cycle reads OPEN orders by index and
+writes back only the rows it changed; the dashboard JSON files are a
+throttled export.
 
 Runs at 100ms intervals (user-requested)
+Push-driven when the CLOB WebSocket stream is up: prices come from the live
+top-of-book and a cycle runs on every book change; HTTP polling is only the
+fallback for tokens without a live book.
+TP/SL exits are filled at the VWAP of the maintained L2 book when one exists.
 """
 
 import asyncio
@@ -15,15 +22,28 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
-import requests
+from http_client import get_client, close_client
+from clob_ws import get_stream
+from order_book import get_book_store
+from market_catalog import get_catalog, market_token_ids
+from paper_store import PaperStore, PaperStoreConfig
+from money import Micros
+from metrics import cycle_histogram, get_registry, queue_gauge, record_cache, start_metrics_server
+from profiler import install_profiler
+from lazy_imports import report_startup
+from spot_prices import get_spot_service
 
 # Configuration
 POLL_INTERVAL = 0.1  # 100ms
 DATA_DIR = Path(os.getenv("DATA_DIR", os.path.join(os.getcwd(), "data")))
-ORDERS_FILE = DATA_DIR / "server_paper_orders.json"
+ORDERS_FILE = DATA_DIR / "server_paper_orders.json"  # JSON mirror read by the dashboard
 PROFILES_FILE = DATA_DIR / "server_paper_profiles.json"
 POLYMARKET_API = "https://clob.polymarket.com"
 GAMMA_API = "https://gamma-api.polymarket.com"
+CLOB_REQUESTS_PER_SECOND = 50  # Per-host budget on the shared client (default is 10/s)
+USE_CLOB_STREAM = os.getenv("USE_CLOB_STREAM", "true").lower() == "true"
+STREAM_IDLE_TIMEOUT = 1.0  # Max wait for a pushed update before a fallback cycle
+STATS_INTERVAL = 10  # Seconds between stats / balance sync
 
 # Logging
 logging.basicConfig(
@@ -34,42 +54,63 @@ logging.basicConfig(
 logger = logging.getLogger("PriceUpdater")
 
 
+def get_store():
+    """Paper store (SQLite WAL), created on first use; migrates the JSON files once"""
+    global store
+    if store is None:
+        store = PaperStore(PaperStoreConfig(
+            data_dir=DATA_DIR, orders_file=ORDERS_FILE, profiles_file=PROFILES_FILE
+        ))
+    return store
+
+
 def read_orders():
-    """Read orders from JSON file"""
+    """Read OPEN orders (status index), picking up dashboard edits of the JSON mirror"""
     try:
-        if ORDERS_FILE.exists():
-            return json.loads(ORDERS_FILE.read_text())
+        paper_store = get_store()
+        paper_store.import_json()
+        return paper_store.open_orders()
     except Exception as e:
         logger.error(f"Error reading orders: {e}")
     return []
 
 
 def write_orders(orders):
-    """Write orders to JSON file"""
+    """Persist only the given (changed) orders"""
     try:
-        ORDERS_FILE.write_text(json.dumps(orders, indent=2))
+        get_store().save_orders(orders)
     except Exception as e:
         logger.error(f"Error writing orders: {e}")
 
 
 def read_profiles():
-    """Read profiles from JSON file"""
+    """Read profiles from the store"""
     try:
-        if PROFILES_FILE.exists():
-            return json.loads(PROFILES_FILE.read_text())
+        return get_store().profiles()
     except Exception as e:
         logger.error(f"Error reading profiles: {e}")
     return []
 
 
 def write_profiles(profiles):
-    """Write profiles to JSON file"""
+    """Write profiles to the store"""
     try:
-        PROFILES_FILE.write_text(json.dumps(profiles, indent=2))
+        get_store().save_profiles(profiles)
     except Exception as e:
         logger.error(f"Error writing profiles: {e}")
 
 
+def credit_profile(profile, amount_recovered: Micros, pnl: Micros):
+    """Add a closed amount to the profile balance and P&L in fixed-point (no float drift)"""
+    profile["balance"] = float(Micros.from_float(profile.get("balance", 0)) + amount_recovered)
+    profile["totalPnL"] = float(Micros.from_float(profile.get("totalPnL", 0)) + pnl)
+    if pnl > 0:
+        profile["winningTrades"] += 1
+    else:
+        profile["losingTrades"] += 1
+    profile["updatedAt"] = datetime.now().isoformat()
+
+
 def get_active_profile(profiles):
     """Get active profile"""
     for p in profiles:
@@ -78,10 +119,11 @@ def get_active_profile(profiles):
     return profiles[0] if profiles else None
 
 
-def sync_balance(orders, profiles):
+def sync_balance(profiles):
     """
     Sync profile balance by recalculating from order history.
     This ensures balance is always correct even if previous updates failed.
+    The history totals come from one SQL aggregate over the store.
     """
     active_profile = get_active_profile(profiles)
     if not active_profile:
@@ -89,40 +131,13 @@ def sync_balance(orders, profiles):
     
     initial_balance = active_profile.get("initialBalance", 1000)
     
-    # Calculate totals from orders
-    total_invested = 0
-    total_recovered = 0
-    total_pnl = 0
-    win_count = 0
-    loss_count = 0
-    
-    for order in orders:
-        original_amount = order.get("originalAmount", order.get("amount", 0))
-        status = order.get("status", "OPEN")
-        
-        if status == "OPEN":
-            # Still invested
-            total_invested += order.get("amount", 0)
-        elif status == "CLOSED":
-            # Was invested, now recovered
-            total_invested += original_amount
-            
-            # Calculate recovery: original + pnl
-            shares = order.get("shares", order.get("originalShares", 0))
-            exit_price = order.get("exitPrice", order.get("entryPrice", 0))
-            entry_price = order.get("entryPrice", 0)
-            
-            if exit_price > 0 and shares > 0:
-                # Use stored pnl if available
-                pnl = order.get("pnl", 0)
-                recovered = original_amount + pnl
-                total_recovered += recovered
-                total_pnl += pnl
-                
-                if pnl > 0:
-                    win_count += 1
-                elif pnl < 0:
-                    loss_count += 1
+    # Still invested (OPEN) + invested then recovered (CLOSED: original + pnl)
+    totals = get_store().balance_totals()
+    total_invested = totals["open_invested"] + totals["closed_invested"]
+    total_recovered = totals["settled_recovered"]
+    total_pnl = totals["settled_pnl"]
+    win_count = totals["settled_wins"]
+    loss_count = totals["settled_losses"]
     
     # Correct balance = initial - what's still invested + what was recovered
     correct_balance = initial_balance - total_invested + total_recovered
@@ -146,81 +161,132 @@ def sync_balance(orders, profiles):
 price_cache = {}
 cache_ttl = 0.5  # Cache prices for 500ms to reduce API spam
 
+# Live CLOB market stream (set in main when enabled)
+stream = None
+
+# Paper store (created by get_store)
+store = None
+
+
+def resolve_token_id(market_id: str) -> str:
+    """Orders store a CLOB token id or a conditionId; the stream needs the (YES) token id"""
+    market = get_catalog().get(market_id)
+    if market:
+        tokens = market_token_ids(market)
+        if tokens:
+            return tokens[0]
+    return market_id
+
+
+def sync_stream_subscriptions(open_orders):
+    """Subscribe the stream to exactly the tokens of open orders"""
+    if stream is None:
+        return
+    stream.set_tokens(resolve_token_id(o["marketId"]) for o in open_orders if o.get("marketId"))
+
+
+def book_for(market_id: str):
+    """Maintained L2 book for a market: live stream book first, then the last /book snapshot"""
+    if stream is not None:
+        book = stream.book(resolve_token_id(market_id))
+        if book is not None:
+            return book
+    return get_book_store().get(market_id)
+
+
+def exit_fill_price(order, shares, mark_price):
+    """Paper exit price: VWAP to unwind shares against the book, else the mark"""
+    book = book_for(order.get("marketId", ""))
+    if book is None or shares <= 0:
+        return mark_price
+    # Books are quoted in YES; unwinding NO is buying YES back
+    taker_side = "SELL" if order.get("outcome", "YES") == "YES" else "BUY"
+    vwap = book.vwap_to_fill(taker_side, shares)
+    return vwap if vwap is not None else mark_price
+
+
+def mean_reversion_symbol(order: dict = None) -> str | None:
+    """Spot symbol behind a Mean Reversion order (internal market id), else None"""
+    source = order.get("source", "") if order else ""
+    title = order.get("marketTitle", "") if order else ""
+    if source != "MEAN_REVERSION" and "Mean Reversion" not in title:
+        return None
+    if "BTC" in title.upper():
+        return "BTC/USDT"
+    if "ETH" in title.upper():
+        return "ETH/USDT"
+    return None
 
-def fetch_market_price(market_id: str, order: dict = None) -> float | None:
+
+async def fetch_market_price(market_id: str, order: dict = None) -> float | None:
     """
     Fetch current price from Polymarket for a market
     Returns the YES price (0-1)
     For Mean Reversion orders (BTC/ETH binary), use exchange price to simulate
     """
     global price_cache
+    http = get_client()
+    
+    # Live top-of-book pushed by the CLOB WebSocket
+    if stream is not None:
+        live_price = stream.mid(resolve_token_id(market_id))
+        record_cache("price_stream", live_price is not None)
+        if live_price is not None:
+            return live_price
     
     # Check cache
     cached = price_cache.get(market_id)
-    if cached and (time.time() - cached["time"]) < cache_ttl:
+    fresh = bool(cached) and (time.time() - cached["time"]) < cache_ttl
+    record_cache("price_cache", fresh)
+    if fresh:
         return cached["price"]
     
     # For Mean Reversion orders with internal IDs, simulate price based on exchange
-    source = order.get("source", "") if order else ""
-    title = order.get("marketTitle", "") if order else ""
-    
-    if source == "MEAN_REVERSION" or "Mean Reversion" in title:
-        # Determine symbol from title
-        symbol = None
-        if "BTC" in title.upper():
-            symbol = "BTCUSDT"
-        elif "ETH" in title.upper():
-            symbol = "ETHUSDT"
-        
-        if symbol:
-            try:
-                # Use Binance for spot price
-                url = f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}"
-                response = requests.get(url, timeout=2)
-                if response.status_code == 200:
-                    spot_price = float(response.json()["price"])
-                    
-                    # Simulate binary market price:
-                    # Entry was based on expected move, current price reflects if move happened
-                    entry_price = order.get("entryPrice", 0.5) if order else 0.5
-                    
-                    # Add small random variance (±1%) to simulate market movement
-                    import random
-                    variance = random.uniform(-0.01, 0.01)
-                    simulated_price = max(0.01, min(0.99, entry_price * (1 + variance)))
-                    
-                    price_cache[market_id] = {"price": simulated_price, "time": time.time()}
-                    return simulated_price
-            except Exception as e:
-                logger.debug(f"Exchange price fetch failed for {symbol}: {e}")
+    symbol = mean_reversion_symbol(order)
+    if symbol:
+        try:
+            # Spot price from the shared snapshot (one batched request per tick)
+            spot_price = await get_spot_service().get(symbol)
+            if spot_price is not None:
+                # Simulate binary market price:
+                # Entry was based on expected move, current price reflects if move happened
+                entry_price = order.get("entryPrice", 0.5) if order else 0.5
+                
+                # Add small random variance (±1%) to simulate market movement
+                import random
+                variance = random.uniform(-0.01, 0.01)
+                simulated_price = max(0.01, min(0.99, entry_price * (1 + variance)))
+                
+                price_cache[market_id] = {"price": simulated_price, "time": time.time()}
+                return simulated_price
+        except Exception as e:
+            logger.debug(f"Exchange price fetch failed for {symbol}: {e}")
     
     try:
         # Try CLOB API first (faster, more accurate)
-        url = f"{POLYMARKET_API}/book?token_id={market_id}"
-        response = requests.get(url, timeout=2)
+        url = f"{POLYMARKET_API}/book"
+        data = await http.get_json(url, params={"token_id": market_id}, timeout=2, retries=0)
         
-        if response.status_code == 200:
-            data = response.json()
-            # Get best bid/ask
-            bids = data.get("bids", [])
-            asks = data.get("asks", [])
+        if data and "bids" in data:
+            # Reconcile the shared book with the full snapshot (kept for VWAP exits)
+            book = get_book_store().book(market_id, data.get("market", ""))
+            book.apply_snapshot(data)
+            mid_price = book.mid()
             
-            if bids and asks:
-                best_bid = float(bids[0]["price"]) if bids else 0
-                best_ask = float(asks[0]["price"]) if asks else 1
-                mid_price = (best_bid + best_ask) / 2
-                
+            if mid_price is not None:
                 # Cache it
                 price_cache[market_id] = {"price": mid_price, "time": time.time()}
                 return mid_price
         
         # Fallback: Try Gamma API
         url = f"{GAMMA_API}/markets/{market_id}"
-        response = requests.get(url, timeout=2)
+        data = await http.get_json(url, timeout=2, retries=0)
         
-        if response.status_code == 200:
-            data = response.json()
-            price = data.get("outcomePrices", [0.5])[0]
+        if data:
+            outcome_prices = data.get("outcomePrices", [0.5])
+            if isinstance(outcome_prices, str):
+                outcome_prices = json.loads(outcome_prices)
+            price = outcome_prices[0]
             price_cache[market_id] = {"price": float(price), "time": time.time()}
             return float(price)
             
@@ -268,66 +334,64 @@ def check_tp_sl(order, profiles):
         logger.info(f"🎯 TP1 HIT! Order {order['id']}: +{price_change_pct:.1f}% (target: +{tp1}%)")
         order["tp1Hit"] = True
         
-        # Partial close: sell percentage of position
-        tp1_size = order.get("tp1SizePercent", 50) / 100
-        shares_to_close = order.get("shares", 0) * tp1_size
+        # Partial close: sell percentage of position (fixed-point 6 decimals)
+        tp1_size = Micros.from_float(order.get("tp1SizePercent", 50) / 100)
+        shares = Micros.from_float(order.get("shares", 0))
+        shares_to_close = shares * tp1_size
+        fill_price = Micros.from_float(exit_fill_price(order, float(shares_to_close), current_price))
+        entry = Micros.from_float(entry_price)
         
         # Calculate PnL correctly for both YES and NO bets
         # For YES: profit when price goes UP
         # For NO: profit when price goes DOWN (but we inverted price_change_pct already)
         if order.get("outcome") == "YES":
-            pnl_realized = (current_price - entry_price) * shares_to_close
+            pnl_realized = (fill_price - entry) * shares_to_close
         else:
             # For NO: price went DOWN which is GOOD, pnl = (entry - current) * shares
-            pnl_realized = (entry_price - current_price) * shares_to_close
+            pnl_realized = (entry - fill_price) * shares_to_close
         
         # Amount recovered = what we originally invested (for this portion) + PnL
-        original_cost_for_portion = entry_price * shares_to_close
+        original_cost_for_portion = entry * shares_to_close
         amount_recovered = original_cost_for_portion + pnl_realized
         
-        order["shares"] = order.get("shares", 0) - shares_to_close
-        order["amount"] = order.get("amount", 0) - original_cost_for_portion
+        order["shares"] = float(shares - shares_to_close)
+        order["amount"] = float(Micros.from_float(order.get("amount", 0)) - original_cost_for_portion)
         
         # Update profile balance
         active_profile = get_active_profile(profiles)
         if active_profile:
-            active_profile["balance"] += amount_recovered
-            active_profile["totalPnL"] += pnl_realized
-            if pnl_realized > 0:
-                active_profile["winningTrades"] += 1
-            else:
-                active_profile["losingTrades"] += 1
-            active_profile["updatedAt"] = datetime.now().isoformat()
+            credit_profile(active_profile, amount_recovered, pnl_realized)
         
         logger.info(f"   💰 Recovered: ${amount_recovered:.2f} (cost: ${original_cost_for_portion:.2f} + PnL: ${pnl_realized:.2f})")
-        order["notes"] = f"{order.get('notes', '')} | TP1 hit at {current_price:.3f}"
+        order["notes"] = f"{order.get('notes', '')} | TP1 hit at {fill_price:.3f}"
         return True
     
     # Check TP2 (full close)
     tp2 = order.get("tp2Percent", 0)
     if tp2 > 0 and not order.get("tp2Hit") and price_change_pct >= tp2:
         logger.info(f"🎯🎯 TP2 HIT! Order {order['id']}: +{price_change_pct:.1f}% (target: +{tp2}%)")
-        return close_order(order, profiles, current_price, "TP2")
+        return close_order(order, profiles, exit_fill_price(order, order.get("shares", 0), current_price), "TP2")
     
     # Check SL (full close)
     sl = order.get("stopLossPercent", 0)
     if sl < 0 and price_change_pct <= sl:
         logger.info(f"🛑 STOP LOSS HIT! Order {order['id']}: {price_change_pct:.1f}% (trigger: {sl}%)")
-        return close_order(order, profiles, current_price, "SL")
+        return close_order(order, profiles, exit_fill_price(order, order.get("shares", 0), current_price), "SL")
     
     return False
 
 
 def close_order(order, profiles, exit_price, reason):
     """Close an order completely"""
-    entry_price = order.get("entryPrice", 0)
-    shares = order.get("shares", 0)
+    entry_price = Micros.from_float(order.get("entryPrice", 0))
+    shares = Micros.from_float(order.get("shares", 0))
+    exit_fixed = Micros.from_float(exit_price)
     
-    # Calculate final PnL (already correct for YES/NO)
+    # Calculate final PnL (already correct for YES/NO), fixed-point 6 decimals
     if order.get("outcome") == "YES":
-        pnl = (exit_price - entry_price) * shares
+        pnl = (exit_fixed - entry_price) * shares
     else:
-        pnl = (entry_price - exit_price) * shares
+        pnl = (entry_price - exit_fixed) * shares
     
     # Calculate recovered amount = original investment + PnL
     original_cost = entry_price * shares
@@ -336,7 +400,7 @@ def close_order(order, profiles, exit_price, reason):
     order["status"] = "CLOSED"
     order["exitPrice"] = exit_price
     order["closedAt"] = datetime.now().isoformat()
-    order["pnl"] = round(pnl, 4)
+    order["pnl"] = round(float(pnl), 4)
     order["notes"] = f"{order.get('notes', '')} | Closed by {reason}: {'+' if pnl >= 0 else ''}{pnl:.2f}"
     
     if reason == "TP2":
@@ -347,13 +411,7 @@ def close_order(order, profiles, exit_price, reason):
     # Update profile
     active_profile = get_active_profile(profiles)
     if active_profile:
-        active_profile["balance"] += amount_recovered
-        active_profile["totalPnL"] += pnl
-        if pnl > 0:
-            active_profile["winningTrades"] += 1
-        else:
-            active_profile["losingTrades"] += 1
-        active_profile["updatedAt"] = datetime.now().isoformat()
+        credit_profile(active_profile, amount_recovered, pnl)
     
     logger.info(f"✅ Order {order['id']} CLOSED: PnL = {'+' if pnl >= 0 else ''}{pnl:.2f} | Recovered: ${amount_recovered:.2f}")
     return True
@@ -361,15 +419,22 @@ def close_order(order, profiles, exit_price, reason):
 
 async def update_cycle():
     """One update cycle"""
-    orders = read_orders()
-    profiles = read_profiles()
-    
-    open_orders = [o for o in orders if o.get("status") == "OPEN"]
+    open_orders = read_orders()
+    queue_gauge("price_updater", "open_orders").set(len(open_orders))
+    sync_stream_subscriptions(open_orders)
     
     if not open_orders:
+        get_store().export_json()
         return
     
-    updated = False
+    profiles = read_profiles()
+    changed = []
+    profiles_changed = False
+    
+    # One batched spot request for every Mean Reversion symbol of this tick
+    spot_symbols = {symbol for symbol in map(mean_reversion_symbol, open_orders) if symbol}
+    if spot_symbols:
+        await get_spot_service().snapshot(spot_symbols)
     
     for order in open_orders:
         market_id = order.get("marketId")
@@ -377,59 +442,85 @@ async def update_cycle():
             continue
         
         # Fetch live price (pass order for Mean Reversion detection)
-        live_price = fetch_market_price(market_id, order)
+        live_price = await fetch_market_price(market_id, order)
         
         if live_price is not None:
+            before = dict(order)
             old_price = order.get("currentPrice", order.get("entryPrice"))
             order["currentPrice"] = live_price
-            order["updatedAt"] = datetime.now().isoformat()
             
             # Calculate PnL
             order["unrealizedPnL"] = calculate_pnl(order)
             
             # Check TP/SL
             if check_tp_sl(order, profiles):
-                updated = True
+                profiles_changed = True
             
             # Log significant price moves
             if old_price and abs(live_price - old_price) > 0.001:
                 pnl = order.get("unrealizedPnL", 0)
                 logger.debug(f"📊 {order['id']}: {old_price:.3f} → {live_price:.3f} | PnL: {'+' if pnl >= 0 else ''}{pnl:.2f}")
             
-            updated = True
+            # Persist (and mirror) only orders whose fields actually moved
+            if order != before:
+                order["updatedAt"] = datetime.now().isoformat()
+                changed.append(order)
     
-    if updated:
-        write_orders(orders)
-        write_profiles(profiles)
+    with get_registry().histogram("db_write_seconds", "Database write latency", ("bot",)).labels(bot="price_updater").time():
+        if changed:
+            write_orders(changed)
+        if profiles_changed:
+            write_profiles(profiles)
+        get_store().export_json()
 
 
 async def main():
     """Main loop"""
+    global stream
     logger.info("=" * 60)
     logger.info("🚀 PolygraalX Live Price Updater Started")
     logger.info(f"   Poll interval: {POLL_INTERVAL * 1000:.0f}ms")
-    logger.info(f"   Orders file: {ORDERS_FILE}")
+    logger.info(f"   CLOB stream: {'ON' if USE_CLOB_STREAM else 'OFF'}")
+    logger.info(f"   Paper store: {get_store().config.db_file} (mirror: {ORDERS_FILE})")
     logger.info("=" * 60)
     
+    get_client().set_rate_limit(POLYMARKET_API, CLOB_REQUESTS_PER_SECOND)
+    install_profiler("price_updater")
+    start_metrics_server("price_updater")
+    report_startup("price_updater", logger)
+    cycle_timer = cycle_histogram("price_updater")
+    if USE_CLOB_STREAM:
+        stream = get_stream()
+        await stream.start()
+    
     cycle = 0
+    last_stats = time.time()
     while True:
         try:
-            await update_cycle()
+            with cycle_timer.time():
+                await update_cycle()
             cycle += 1
             
-            # Log stats and sync balance every 100 cycles (~10 seconds)
-            if cycle % 100 == 0:
-                orders = read_orders()
+            # Log stats and sync balance every STATS_INTERVAL seconds
+            if time.time() - last_stats >= STATS_INTERVAL:
+                last_stats = time.time()
+                await get_catalog().refresh()  # Throttled; reuses a peer's fresh file
                 profiles = read_profiles()
-                open_count = len([o for o in orders if o.get("status") == "OPEN"])
+                open_count = get_store().count(status="OPEN")
                 
                 # Auto-sync balance to ensure consistency
-                if sync_balance(orders, profiles):
+                if sync_balance(profiles):
                     write_profiles(profiles)
                 
-                logger.info(f"📈 Cycle {cycle}: {open_count} open orders | Cache: {len(price_cache)} markets")
+                live = f" | Live: {len(stream.books)} tokens" if stream is not None else ""
+                logger.info(f"📈 Cycle {cycle}: {open_count} open orders | Cache: {len(price_cache)} markets{live} | "
+                            f"p50={cycle_timer.percentile(50) * 1000:.1f}ms p99={cycle_timer.percentile(99) * 1000:.1f}ms")
             
-            await asyncio.sleep(POLL_INTERVAL)
+            # Push-driven: wake on the next book change, poll only without a live stream
+            if stream is not None and stream.connected and stream.tokens:
+                await stream.wait_for_update(timeout=STREAM_IDLE_TIMEOUT)
+            else:
+                await asyncio.sleep(POLL_INTERVAL)
             
         except KeyboardInterrupt:
             logger.info("⛔ Stopped by user")
@@ -437,6 +528,11 @@ async def main():
         except Exception as e:
             logger.error(f"Cycle error: {e}")
             await asyncio.sleep(1)
+    
+    if stream is not None:
+        await stream.stop()
+    get_store().export_json(force=True)
+    await close_client()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+PolygraalX On-demand Sampling Profiler
+======================================
+Statistical profiler that can be switched on inside a running bot (no
+restart, no external tool). A daemon thread samples every thread's stack
+(sys._current_frames) at a fixed rate for N seconds and writes collapsed
+stacks, the input format of flamegraph.pl / speedscope / inferno.
+
+Triggers (installed by install_profiler(bot)):
+    Signal:  kill -USR1 <pid>        (pm2 sendSignal SIGUSR1 <app>)
+             -> samples PROFILE_SECONDS (default 30s) and writes
+                PROFILE_DIR/<bot>-<timestamp>.collapsed
+    HTTP:    curl "http://127.0.0.1:<metrics port>/debug/profile?seconds=10"
+             -> same file, collapsed stacks also returned in the response
+
+Render:
+    flamegraph.pl logs/profiles/price_updater-20250101-120000.collapsed > flame.svg
+    or drop the file on https://www.speedscope.app
+
+Overhead is one stack walk per thread per sample (100 Hz by default) and
+nothing at all while no profile is running. PROFILER_ENABLED=false skips
+installing the triggers.
+"""
+
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional
+
+from metrics import register_route
+
+logger = logging.getLogger("Profiler")
+
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", os.path.join(os.getcwd(), "logs", "profiles")))
+PROFILE_SECONDS = float(os.getenv("PROFILE_SECONDS", "30"))
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.01"))  # 100 Hz
+MAX_PROFILE_SECONDS = 600
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SAMPLER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class SamplingProfiler:
+    """Samples all thread stacks into collapsed-stack counts"""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[object, str] = {}  # code object -> frame label
+
+    def _frame_label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def sample_once(self, skip_thread: int = None):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip_thread:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            stack.reverse()
+            self.stacks[";".join(stack)] += 1
+        self.samples += 1
+
+    def run(self, seconds: float):
+        """Sample the process for seconds (blocks the calling thread)"""
+        me = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        next_tick = time.monotonic()
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if now >= next_tick:
+                self.sample_once(skip_thread=me)
+                next_tick += self.interval
+                if next_tick < now:
+                    next_tick = now + self.interval  # Fell behind: drop samples, keep the rate
+            time.sleep(max(0.0, min(next_tick, deadline) - time.monotonic()))
+
+    def collapsed(self) -> str:
+        """Brendan Gregg collapsed format: 'frame;frame;frame count' per line"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TRIGGERS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_lock = threading.Lock()
+_bot_name = "bot"
+
+
+def profile(seconds: float = PROFILE_SECONDS, bot: str = None, out_dir: Path = None) -> Optional[Path]:
+    """
+    Sample for seconds and write <out_dir>/<bot>-<timestamp>.collapsed.
+    Returns the file, or None if another profile is already running.
+    """
+    if not _lock.acquire(blocking=False):
+        logger.warning("⚠️ Profile already running")
+        return None
+    try:
+        seconds = max(0.1, min(float(seconds), MAX_PROFILE_SECONDS))
+        bot = bot or _bot_name
+        logger.info(f"🔬 Profiling {bot} for {seconds:.0f}s")
+        profiler = SamplingProfiler()
+        profiler.run(seconds)
+
+        out_dir = Path(out_dir or PROFILE_DIR)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / f"{bot}-{time.strftime('%Y%m%d-%H%M%S')}.collapsed"
+        path.write_text(profiler.collapsed())
+        logger.info(f"🔬 Profile written: {path} ({profiler.samples} samples)")
+        return path
+    except Exception as e:
+        logger.error(f"Profile failed: {str(e)[:100]}")
+        return None
+    finally:
+        _lock.release()
+
+
+def start_profile(seconds: float = PROFILE_SECONDS) -> bool:
+    """Profile in a background thread (safe from signal handlers)"""
+    if _lock.locked():
+        return False
+    threading.Thread(target=profile, args=(seconds,), name="profiler", daemon=True).start()
+    return True
+
+
+def _on_signal(signum, frame):
+    start_profile()
+
+
+def _http_profile(query: Dict[str, str]):
+    seconds = float(query.get("seconds", PROFILE_SECONDS))
+    path = profile(seconds)
+    if path is None:
+        return 409, b"profile already running\n"
+    return 200, path.read_bytes()
+
+
+def install_profiler(bot: str) -> bool:
+    """Register the SIGUSR1 and /debug/profile triggers for this process"""
+    global _bot_name
+    if os.getenv("PROFILER_ENABLED", "true").lower() != "true":
+        return False
+    _bot_name = bot
+    register_route("/debug/profile", _http_profile)
+    if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR1, _on_signal)
+    return True
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Rolling Statistics
+=============================
+Sliding-window statistics updated in O(1) per new value, for signal code
+that used to call statistics.mean / statistics.stdev over the whole window
+on every tick.
+
+- Mean and variance: Welford updates for the value entering and the value
+  leaving the window; the running sums are recomputed exactly (math.fsum)
+  once per window length of updates, so rounding error never accumulates
+- Min / max: monotonic deques (amortized O(1))
+- EWMA mean and variance alongside the window
+- stats_with(x): mean / stdev of the window plus one extra value (the
+  still-forming candle) without storing it
+
+Usage:
+    stats = RollingStats(window=1000)
+    stats.push(change_pct)                  # O(1), evicts the oldest when full
+    z = stats.zscore(current_change)
+    mean, stdev = stats.stats_with(current_close)
+    mean, stdev = mean_stdev(values)        # One-shot, for plain lists
+"""
+
+import math
+from collections import deque
+from typing import Iterable, Optional, Sequence, Tuple
+
+
+def mean_stdev(values: Sequence[float]) -> Tuple[float, float]:
+    """Mean and sample standard deviation of a list (two-pass, fsum)"""
+    n = len(values)
+    if n == 0:
+        return 0.0, 0.0
+    mean = math.fsum(values) / n
+    if n < 2:
+        return mean, 0.0
+    return mean, math.sqrt(math.fsum((v - mean) ** 2 for v in values) / (n - 1))
+
+
+class RollingStats:
+    """Mean / variance / min / max over the last `window` values, plus EWMA"""
+
+    __slots__ = ("window", "alpha", "values", "mean", "_m2", "_mins", "_maxs", "_count",
+                 "_since_resync", "ewma", "ewm_var")
+
+    def __init__(self, window: int, ewma_span: int = None):
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.window = window
+        self.alpha = 2.0 / ((ewma_span or window) + 1)
+        self.values: deque = deque()
+        self.mean = 0.0
+        self._m2 = 0.0  # Sum of squared deviations from the mean
+        self._mins: deque = deque()  # (index, value), values increasing
+        self._maxs: deque = deque()  # (index, value), values decreasing
+        self._count = 0  # Values pushed since creation (index of the next one)
+        self._since_resync = 0
+        self.ewma: Optional[float] = None
+        self.ewm_var = 0.0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    # ─── Updates ───────────────────────────────────────────────────────────────
+
+    def push(self, x: float) -> Optional[float]:
+        """Add the newest value; returns the evicted one when the window was full"""
+        values = self.values
+        evicted = None
+        if len(values) == self.window:
+            evicted = values.popleft()
+            n = len(values)
+            if n:
+                delta = evicted - self.mean
+                self.mean -= delta / n
+                self._m2 -= delta * (evicted - self.mean)
+            else:
+                self.mean = self._m2 = 0.0
+
+        values.append(x)
+        delta = x - self.mean
+        self.mean += delta / len(values)
+        self._m2 += delta * (x - self.mean)
+
+        # Min / max candidates
+        index = self._count
+        self._count += 1
+        oldest = index - self.window
+        mins, maxs = self._mins, self._maxs
+        while mins and mins[-1][1] >= x:
+            mins.pop()
+        mins.append((index, x))
+        if mins[0][0] <= oldest:
+            mins.popleft()
+        while maxs and maxs[-1][1] <= x:
+            maxs.pop()
+        maxs.append((index, x))
+        if maxs[0][0] <= oldest:
+            maxs.popleft()
+
+        # EWMA
+        if self.ewma is None:
+            self.ewma = x
+        else:
+            diff = x - self.ewma
+            increment = self.alpha * diff
+            self.ewma += increment
+            self.ewm_var = (1 - self.alpha) * (self.ewm_var + diff * increment)
+
+        if evicted is not None:
+            self._since_resync += 1
+            if self._since_resync >= self.window:
+                self._resync()
+        return evicted
+
+    def extend(self, xs: Iterable[float]):
+        for x in xs:
+            self.push(x)
+
+    def _resync(self):
+        """Exact mean / M2 from the window (amortized O(1): once per window evictions)"""
+        self._since_resync = 0
+        n = len(self.values)
+        self.mean = math.fsum(self.values) / n
+        self._m2 = math.fsum((v - self.mean) ** 2 for v in self.values)
+
+    def clear(self):
+        self.values.clear()
+        self._mins.clear()
+        self._maxs.clear()
+        self.mean = self._m2 = self.ewm_var = 0.0
+        self.ewma = None
+        self._since_resync = 0
+
+    # ─── Queries ───────────────────────────────────────────────────────────────
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (n - 1), as statistics.variance"""
+        n = len(self.values)
+        return max(self._m2, 0.0) / (n - 1) if n > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._mins[0][1] if self._mins else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._maxs[0][1] if self._maxs else None
+
+    @property
+    def ewm_stdev(self) -> float:
+        return math.sqrt(self.ewm_var)
+
+    def zscore(self, x: float) -> float:
+        """(x - mean) / stdev of the window, 0 when the window is flat"""
+        stdev = self.stdev
+        if stdev == 0:
+            return 0.0
+        return (x - self.mean) / stdev
+
+    def stats_with(self, x: float) -> Tuple[float, float]:
+        """Mean and sample stdev of the window plus x, x not stored"""
+        n = len(self.values) + 1
+        delta = x - self.mean
+        mean = self.mean + delta / n
+        m2 = max(self._m2, 0.0) + delta * (x - mean)
+        return mean, (math.sqrt(max(m2, 0.0) / (n - 1)) if n > 1 else 0.0)
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Spot Price Snapshot
+==============================
+One batched spot price fetch per tick, shared by every market and every bot
+in the process, instead of one CoinGecko / Binance request per market.
+
+- snapshot(symbols) returns {symbol: price} for the requested symbols; the
+  stale ones, plus every other symbol a consumer asked for before, are
+  refreshed in ONE Binance call (/api/v3/ticker/price?symbols=[...]) and
+  CoinGecko (one simple/price call with all ids) fills what Binance missed
+- Binance rejects the whole batch (HTTP 400) when one symbol is invalid or
+  delisted: the symbols are then asked one by one, and the rejected ones are
+  left out of the batch for invalid_retry seconds (CoinGecko still covers them)
+- Quotes are cached with their timestamp: within max_age the snapshot is
+  served from memory, and concurrent callers wait for the same refresh
+- latest(symbol) is a non-blocking read of the cached quote for sync code
+
+Spot requests scale with symbols per tick, not markets x bots.
+"BTC/USDT", "BTCUSDT", "btc-usdt" and "BTC" are the same key ("BTC/USDT").
+
+Async bots:  prices = await get_spot_service().snapshot(["BTC/USDT", "ETH/USDT"])
+Sync bots:   prices = get_spot_service().snapshot_sync(["BTC/USDT"])
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set
+
+from metrics import get_registry, record_cache
+
+logger = logging.getLogger("SpotPrices")
+
+BINANCE_API = "https://api.binance.com"
+COINGECKO_API = "https://api.coingecko.com"
+
+# Base asset -> CoinGecko id (fallback source, USD quotes only)
+COINGECKO_IDS = {
+    "BTC": "bitcoin",
+    "ETH": "ethereum",
+    "SOL": "solana",
+    "XRP": "ripple",
+    "DOGE": "dogecoin",
+    "ADA": "cardano",
+}
+QUOTE_ASSETS = ("USDT", "USDC", "BUSD", "USD")
+USD_QUOTES = set(QUOTE_ASSETS)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class SpotConfig:
+    """Sources and freshness"""
+    binance_api: str = BINANCE_API
+    coingecko_api: str = COINGECKO_API
+    max_age: float = 5.0  # Seconds a quote is served from the snapshot
+    request_timeout: float = 5.0
+    coingecko_fallback: bool = True
+    invalid_retry: float = 3600.0  # Seconds a symbol rejected by Binance stays out of the batch
+
+
+@dataclass
+class SpotQuote:
+    """Last known price of a symbol"""
+    price: float
+    timestamp: float
+    source: str
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.timestamp
+
+
+def normalize_symbol(symbol: str) -> str:
+    """'BTCUSDT', 'btc-usdt', 'BTC' -> 'BTC/USDT'"""
+    text = symbol.strip().upper().replace("-", "/").replace("_", "/")
+    if "/" in text:
+        base, quote = text.split("/", 1)
+        return f"{base}/{quote}"
+    for quote in QUOTE_ASSETS:
+        if text.endswith(quote) and len(text) > len(quote):
+            return f"{text[:-len(quote)]}/{quote}"
+    return f"{text}/USDT"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SERVICE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class SpotPriceService:
+    """Timestamped spot quotes refreshed in one batched request per tick"""
+
+    def __init__(self, config: SpotConfig = None):
+        self.config = config or SpotConfig()
+        self._quotes: Dict[str, SpotQuote] = {}
+        self._watched: Set[str] = set()
+        self._invalid: Dict[str, float] = {}  # Binance pair -> time it was rejected
+
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+        self._sync_lock = threading.Lock()
+
+        self._requests = get_registry().counter(
+            "spot_requests_total", "Batched spot price requests by source", ("source",))
+
+    # ─── Reads ─────────────────────────────────────────────────────────────────
+
+    def quote(self, symbol: str) -> Optional[SpotQuote]:
+        return self._quotes.get(normalize_symbol(symbol))
+
+    def latest(self, symbol: str, max_age: float = None) -> Optional[float]:
+        """Cached price if younger than max_age (no I/O)"""
+        quote = self.quote(symbol)
+        max_age = self.config.max_age if max_age is None else max_age
+        if quote is None or quote.age > max_age:
+            return None
+        return quote.price
+
+    def watch(self, symbols: Iterable[str]):
+        """Include symbols in every batched refresh from now on"""
+        self._watched.update(normalize_symbol(s) for s in symbols)
+
+    def _stale(self, symbols: List[str], max_age: float) -> List[str]:
+        now = time.time()
+        stale = [s for s in symbols if s not in self._quotes or now - self._quotes[s].timestamp > max_age]
+        record_cache("spot_prices", not stale)
+        return stale
+
+    def _refresh_set(self, stale: List[str], max_age: float) -> List[str]:
+        """Stale symbols plus every watched one past half its age, so other consumers find it fresh"""
+        now = time.time()
+        return sorted(set(stale) | {s for s in self._watched
+                                    if s not in self._quotes or now - self._quotes[s].timestamp > max_age / 2})
+
+    def _result(self, symbols: Iterable[str]) -> Dict[str, Optional[float]]:
+        result = {}
+        for symbol in symbols:
+            quote = self._quotes.get(normalize_symbol(symbol))
+            result[symbol] = quote.price if quote else None
+        return result
+
+    # ─── Response parsing (shared by async / sync) ─────────────────────────────
+
+    def _binance_pairs(self, symbols: List[str], now: float) -> Dict[str, str]:
+        """Binance pair -> symbol, without the pairs Binance rejected recently"""
+        pairs = {symbol.replace("/", ""): symbol for symbol in symbols}
+        return {pair: symbol for pair, symbol in pairs.items()
+                if now - self._invalid.get(pair, -self.config.invalid_retry) >= self.config.invalid_retry}
+
+    def _apply_binance_response(self, status: int, body, pairs: Dict[str, str], now: float):
+        """Apply one ticker response; a 400 on a single pair marks that pair invalid"""
+        if status == 200:
+            self._apply_binance(body, pairs, now)
+            for pair in pairs:
+                self._invalid.pop(pair, None)
+        elif status == 400 and len(pairs) == 1:
+            pair = next(iter(pairs))
+            self._invalid[pair] = now
+            logger.warning(f"⚠️ Binance rejected {pair}, left out of spot batches "
+                           f"for {self.config.invalid_retry:.0f}s")
+        elif status:
+            logger.warning(f"⚠️ Binance spot request returned {status}")
+
+    def _coingecko_ids(self, symbols: List[str]) -> Dict[str, str]:
+        ids = {}
+        for symbol in symbols:
+            base, quote = symbol.split("/", 1)
+            if quote in USD_QUOTES and base in COINGECKO_IDS:
+                ids[COINGECKO_IDS[base]] = symbol
+        return ids
+
+    def _apply_binance(self, body, pairs: Dict[str, str], now: float):
+        if isinstance(body, dict):
+            body = [body]
+        for item in body or []:
+            symbol = pairs.get(str(item.get("symbol", "")))
+            try:
+                price = float(item.get("price"))
+            except (TypeError, ValueError):
+                continue
+            if symbol and price > 0:
+                self._quotes[symbol] = SpotQuote(price, now, "binance")
+
+    def _apply_coingecko(self, body, ids: Dict[str, str], now: float):
+        if not isinstance(body, dict):
+            return
+        for coin, symbol in ids.items():
+            price = (body.get(coin) or {}).get("usd")
+            if price:
+                self._quotes[symbol] = SpotQuote(float(price), now, "coingecko")
+
+    def _missing(self, symbols: List[str], since: float) -> List[str]:
+        return [s for s in symbols if s not in self._quotes or self._quotes[s].timestamp < since]
+
+    # ─── Async refresh ─────────────────────────────────────────────────────────
+
+    async def snapshot(self, symbols: Iterable[str], max_age: float = None) -> Dict[str, Optional[float]]:
+        """{symbol: price or None}, refreshing stale symbols in one batched call"""
+        symbols = list(symbols)
+        max_age = self.config.max_age if max_age is None else max_age
+
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+
+        wanted = [normalize_symbol(s) for s in symbols]
+        self._watched.update(wanted)
+        async with self._lock:
+            # Callers that waited for a refresh usually find everything fresh here
+            stale = self._stale(wanted, max_age)
+            if stale:
+                # Let consumers scheduled in the same tick register their symbols first
+                await asyncio.sleep(0)
+                await self._fetch(self._refresh_set(stale, max_age))
+        return self._result(symbols)
+
+    async def get(self, symbol: str, max_age: float = None) -> Optional[float]:
+        return (await self.snapshot([symbol], max_age))[symbol]
+
+    async def _fetch(self, symbols: List[str]):
+        from http_client import get_client
+
+        http = get_client()
+        now = time.time()
+        pairs = self._binance_pairs(symbols, now)
+        try:
+            if pairs:
+                status, body = await self._binance_get(
+                    http, {"symbols": json.dumps(list(pairs), separators=(",", ":"))})
+                if status == 400 and len(pairs) > 1:
+                    # One invalid or delisted pair fails the whole batch: ask each pair alone
+                    logger.warning("⚠️ Binance rejected the spot batch, retrying symbols one by one")
+                    responses = await asyncio.gather(
+                        *(self._binance_get(http, {"symbol": pair}) for pair in pairs))
+                    for (status, body), (pair, symbol) in zip(responses, pairs.items()):
+                        self._apply_binance_response(status, body, {pair: symbol}, now)
+                else:
+                    self._apply_binance_response(status, body, pairs, now)
+        except Exception as e:
+            logger.warning(f"⚠️ Binance spot batch failed: {str(e)[:100]}")
+
+        ids = self._coingecko_ids(self._missing(symbols, now)) if self.config.coingecko_fallback else {}
+        if ids:
+            try:
+                self._requests.labels(source="coingecko").inc()
+                body = await http.get_json(
+                    f"{self.config.coingecko_api}/api/v3/simple/price",
+                    params={"ids": ",".join(ids), "vs_currencies": "usd"},
+                    timeout=self.config.request_timeout, retries=0,
+                )
+                self._apply_coingecko(body, ids, now)
+            except Exception as e:
+                logger.warning(f"⚠️ CoinGecko spot batch failed: {str(e)[:100]}")
+
+        missing = self._missing(symbols, now)
+        if missing:
+            logger.warning(f"⚠️ No fresh spot price for {', '.join(missing)}")
+
+    async def _binance_get(self, http, params: Dict[str, str]):
+        self._requests.labels(source="binance").inc()
+        return await http.request(
+            "GET", f"{self.config.binance_api}/api/v3/ticker/price",
+            params=params, timeout=self.config.request_timeout, retries=0,
+        )
+
+    # ─── Sync refresh ──────────────────────────────────────────────────────────
+
+    def snapshot_sync(self, symbols: Iterable[str], max_age: float = None,
+                      session=None) -> Dict[str, Optional[float]]:
+        """Blocking snapshot for synchronous bots (pooled requests.Session)"""
+        symbols = list(symbols)
+        max_age = self.config.max_age if max_age is None else max_age
+        wanted = [normalize_symbol(s) for s in symbols]
+        with self._sync_lock:
+            self._watched.update(wanted)
+            stale = self._stale(wanted, max_age)
+            if stale:
+                self._fetch_sync(self._refresh_set(stale, max_age), session)
+        return self._result(symbols)
+
+    def _fetch_sync(self, symbols: List[str], session=None):
+        if session is None:
+            from http_client import get_sync_session
+            session = get_sync_session()
+
+        now = time.time()
+        pairs = self._binance_pairs(symbols, now)
+        try:
+            if pairs:
+                status, body = self._binance_get_sync(
+                    session, {"symbols": json.dumps(list(pairs), separators=(",", ":"))})
+                if status == 400 and len(pairs) > 1:
+                    # One invalid or delisted pair fails the whole batch: ask each pair alone
+                    logger.warning("⚠️ Binance rejected the spot batch, retrying symbols one by one")
+                    for pair, symbol in pairs.items():
+                        status, body = self._binance_get_sync(session, {"symbol": pair})
+                        self._apply_binance_response(status, body, {pair: symbol}, now)
+                else:
+                    self._apply_binance_response(status, body, pairs, now)
+        except Exception as e:
+            logger.warning(f"⚠️ Binance spot batch failed: {str(e)[:100]}")
+
+        ids = self._coingecko_ids(self._missing(symbols, now)) if self.config.coingecko_fallback else {}
+        if ids:
+            try:
+                self._requests.labels(source="coingecko").inc()
+                response = session.get(
+                    f"{self.config.coingecko_api}/api/v3/simple/price",
+                    params={"ids": ",".join(ids), "vs_currencies": "usd"},
+                    timeout=self.config.request_timeout,
+                )
+                if response.status_code == 200:
+                    self._apply_coingecko(response.json(), ids, now)
+            except Exception as e:
+                logger.warning(f"⚠️ CoinGecko spot batch failed: {str(e)[:100]}")
+
+    def _binance_get_sync(self, session, params: Dict[str, str]):
+        self._requests.labels(source="binance").inc()
+        response = session.get(
+            f"{self.config.binance_api}/api/v3/ticker/price",
+            params=params, timeout=self.config.request_timeout,
+        )
+        return response.status_code, (response.json() if response.status_code == 200 else None)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SHARED INSTANCE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_shared_service: Optional[SpotPriceService] = None
+
+
+def get_spot_service() -> SpotPriceService:
+    """Process-wide spot price snapshot"""
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = SpotPriceService()
+    return _shared_service
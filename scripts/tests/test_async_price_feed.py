@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrent PriceFeed refresh
+- All symbols fetched at once: cycle time ~ slowest symbol, not the sum
+- Per-symbol timeouts keep cached candles, stale data blocks signals
+- Async (ccxt.async_support style) exchanges awaited directly
+"""
+
+import asyncio
+import os
+import sys
+import time
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from mean_reversion_bot import PriceFeed, SignalGenerator
+
+MINUTE = 60_000
+T0 = 1_700_000_000_000 // MINUTE * MINUTE
+SYMBOLS = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT"]
+
+
+def _rows(since=None, limit=30):
+    start = T0 - 29 * MINUTE
+    rows = [[start + i * MINUTE, 100 + i, 101 + i, 99 + i, 100.5 + i, 5] for i in range(30)]
+    rows = [r for r in rows if since is None or r[0] >= since]
+    return rows[-limit:] if since is None else rows[:limit]
+
+
+class SlowExchange:
+    """Blocking ccxt-shaped exchange with a per-symbol delay"""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=30):
+        self.calls.append(symbol)
+        time.sleep(self.delays.get(symbol, 0))
+        return _rows(since, limit)
+
+
+class AsyncExchange:
+    """ccxt.async_support-shaped exchange"""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.closed = False
+
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=30):
+        await asyncio.sleep(self.delays.get(symbol, 0))
+        return _rows(since, limit)
+
+    async def fetch_ticker(self, symbol):
+        return {"last": 42.0}
+
+    async def close(self):
+        self.closed = True
+
+
+class TestConcurrentRefresh:
+    """Test PriceFeed.refresh"""
+
+    @pytest.mark.asyncio
+    async def test_latency_is_slowest_symbol(self):
+        """Vérifie que les symboles sont récupérés en parallèle et donnent les mêmes bougies que le chemin synchrone"""
+        delays = {"BTC/USDT": 0.05, "ETH/USDT": 0.1, "SOL/USDT": 0.05, "XRP/USDT": 0.15}
+        feed, reference = PriceFeed(), PriceFeed()
+        feed.exchange = SlowExchange(delays)
+        reference.exchange = SlowExchange({})
+
+        started = time.perf_counter()
+        assert await feed.refresh(SYMBOLS, limit=30, timeout=2) == {s: True for s in SYMBOLS}
+        elapsed = time.perf_counter() - started
+        assert elapsed < sum(delays.values()) * 0.8
+        assert elapsed >= max(delays.values())
+
+        for symbol in SYMBOLS:
+            assert feed.window(symbol, 30).rows() == reference.fetch_window(symbol, limit=30).rows()
+            assert not feed.is_stale(symbol)
+
+    @pytest.mark.asyncio
+    async def test_async_exchange_is_awaited(self):
+        """Vérifie que l'échange asynchrone est attendu directement, sans thread, puis fermé"""
+        feed = PriceFeed()
+        feed.exchange = None  # No sync fallback
+        exchange = feed.async_exchange = AsyncExchange({s: 0.05 for s in SYMBOLS})
+
+        started = time.perf_counter()
+        assert all((await feed.refresh(SYMBOLS, limit=30)).values())
+        assert time.perf_counter() - started < 0.15
+        assert len(feed.window("ETH/USDT", 30)) == 30
+        assert await feed._exchange_call("fetch_ticker", "BTC/USDT") == {"last": 42.0}
+        await feed.close()
+        assert exchange.closed
+
+    @pytest.mark.asyncio
+    async def test_timeout_keeps_cache_then_goes_stale(self):
+        """Vérifie le repli sur les bougies en cache après un dépassement et le blocage des signaux périmés"""
+        exchange = SlowExchange({})
+        feed = PriceFeed()
+        feed.exchange = exchange
+        await feed.refresh(SYMBOLS, limit=30)
+        cached = feed.window("XRP/USDT", 30).rows()
+
+        exchange.delays = {"XRP/USDT": 0.3}
+        started = time.perf_counter()
+        results = await feed.refresh(SYMBOLS, limit=30, timeout=0.05)
+        assert time.perf_counter() - started < 0.25
+        assert results == {"BTC/USDT": True, "ETH/USDT": True, "SOL/USDT": True, "XRP/USDT": False}
+        assert feed.fetch_timeouts == 1
+        assert feed.window("XRP/USDT", 30).rows() == cached
+
+        # Cached candles are usable until max_age, then no signal is generated
+        assert not feed.is_stale("XRP/USDT", max_age=60)
+        feed._fresh_at["XRP/USDT"] -= 120
+        assert feed.is_stale("XRP/USDT", max_age=60) and not feed.is_stale("BTC/USDT", max_age=60)
+        generator = SignalGenerator(feed)
+        assert generator.generate_signal("XRP/USDT", {}, refresh=False) is None
+        await asyncio.sleep(0.3)  # Let the abandoned worker thread finish
+
+
+# Run tests with: pytest tests/test_async_price_feed.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
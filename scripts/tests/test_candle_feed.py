@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental candle ingestion in PriceFeed
+- since= fetches give the same candles as a full refetch
+- Forming candle updated in place in the candle ring, closed rows untouched
+- Backfill after a gap, fallback to the buffer on errors
+"""
+
+import os
+import random
+import sys
+import numpy as np
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from mean_reversion_bot import PriceFeed
+
+MINUTE = 60_000
+
+
+class FakeExchange:
+    """ccxt-shaped 1m OHLCV source with a manual clock"""
+
+    def __init__(self):
+        self.rng = random.Random(1)
+        self.closed = {}  # open ms -> final row
+        self.now = 1_700_000_000_000 // MINUTE * MINUTE  # Forming candle open time
+        self.forming = self._row(self.now)
+        self.calls = []
+        self.fail = False
+
+    def _row(self, ts):
+        price = 100 + self.rng.uniform(-1, 1)
+        return [ts, price, price + 1, price - 1, price, self.rng.uniform(1, 10)]
+
+    def tick(self):
+        """New trade in the forming candle"""
+        self.forming = [self.forming[0], self.forming[1], self.forming[2], self.forming[3],
+                        self.forming[1] + self.rng.uniform(-1, 1), self.forming[5] + 1]
+
+    def next_minute(self, minutes=1):
+        for _ in range(minutes):
+            self.closed[self.now] = self.forming
+            self.now += MINUTE
+            self.forming = self._row(self.now)
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=500):
+        self.calls.append((since, limit))
+        if self.fail:
+            raise ConnectionError("exchange down")
+        if since is None:
+            since = self.now - (limit - 1) * MINUTE
+        rows = []
+        for ts in range(since, self.now + 1, MINUTE):
+            if ts == self.now:
+                rows.append(list(self.forming))
+            else:
+                if ts not in self.closed:
+                    self.closed[ts] = self._row(ts)
+                rows.append(list(self.closed[ts]))
+        return rows[:limit]
+
+
+def _values(candles):
+    return [(c.timestamp, c.open, c.high, c.low, c.close, c.volume) for c in candles]
+
+
+class TestIncrementalCandles:
+    """Test PriceFeed.fetch_recent_candles incremental mode"""
+
+    def test_matches_full_refetch(self):
+        """Vérifie que les récupérations incrémentales donnent les mêmes bougies qu'un rechargement complet"""
+        exchange = FakeExchange()
+        feed, full = PriceFeed(), PriceFeed(incremental=False)
+        feed.exchange = full.exchange = exchange
+
+        for _ in range(40):
+            for _ in range(5):
+                exchange.tick()
+                candles = feed.fetch_recent_candles("BTC/USDT", limit=30)
+                assert _values(candles) == _values(full.fetch_recent_candles("BTC/USDT", limit=30))
+            exchange.next_minute()
+
+        assert len(candles) == 30
+        # One 30-row backfill, then 2-3 rows per call instead of 30
+        incremental = [limit for since, limit in exchange.calls[::2][1:]]
+        assert set(incremental) == {PriceFeed.INCREMENTAL_LIMIT}
+        assert feed.ohlcv_rows < full.ohlcv_rows / 10
+
+    def test_closed_candles_are_not_rebuilt(self):
+        """Vérifie que la bougie en cours est mise à jour sur place dans l'anneau, sans réallocation"""
+        exchange = FakeExchange()
+        feed = PriceFeed()
+        feed.exchange = exchange
+        first = feed.fetch_window("BTC/USDT", limit=30)
+        ring = feed.candles["BTC/USDT"]
+        closed = first.data[:, :-1].copy()
+
+        exchange.tick()
+        second = feed.fetch_window("BTC/USDT", limit=30)
+        assert feed.candles["BTC/USDT"] is ring and np.shares_memory(first.data, second.data)
+        assert (second.data[:, :-1] == closed).all()
+        assert second.close[-1] == exchange.forming[4]
+
+        exchange.next_minute()
+        third = feed.fetch_window("BTC/USDT", limit=30)
+        assert len(ring) == 31 and third.ts[-2] == exchange.now - MINUTE
+        assert exchange.calls[-1] == (exchange.now - 2 * MINUTE, PriceFeed.INCREMENTAL_LIMIT)
+
+    def test_gap_backfill_and_errors(self):
+        """Vérifie le rechargement après une coupure et le repli sur le tampon en cas d'erreur"""
+        exchange = FakeExchange()
+        feed, full = PriceFeed(), PriceFeed(incremental=False)
+        feed.exchange = full.exchange = exchange
+        feed.fetch_recent_candles("BTC/USDT", limit=30)
+
+        exchange.fail = True
+        buffered = feed.fetch_recent_candles("BTC/USDT", limit=30)
+        assert len(buffered) == 30
+
+        exchange.fail = False
+        exchange.next_minute(12)  # Reconnect after 12 minutes
+        candles = feed.fetch_recent_candles("BTC/USDT", limit=30)
+        assert exchange.calls[-1] == (None, 30)  # Backfilled
+        assert _values(candles) == _values(full.fetch_recent_candles("BTC/USDT", limit=30))
+
+
+# Run tests with: pytest tests/test_candle_feed.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
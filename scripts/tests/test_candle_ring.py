@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar candle ring
+- Appends, compaction, extend, find / update against a reference list
+- Zero-copy windows, vectorized change_pct / range_pct
+- Memory per candle vs Candle dataclasses
+- SignalGenerator on windows equal to the Candle list path
+"""
+
+import os
+import random
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+import numpy as np
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from candle_ring import CandleRing, CandleWindow
+
+MINUTE = 60_000
+
+
+def _row(rng, i):
+    o = rng.uniform(90, 110)
+    c = rng.uniform(90, 110)
+    return [float(i * MINUTE), o, max(o, c) + 1, min(o, c) - 1, c, rng.uniform(0, 10)]
+
+
+class TestCandleRing:
+    """Test CandleRing against a plain list"""
+
+    def test_matches_reference_through_compactions(self):
+        """Vérifie fenêtres, recherche et mise à jour sur place au fil des compactions"""
+        rng = random.Random(4)
+        ring = CandleRing(capacity=50, slack=7)
+        reference = []
+        for i in range(1000):
+            if i % 97 == 0:
+                rows = [_row(rng, i * 100 + k) for k in range(rng.randint(1, 80))]
+                ring.extend(rows)
+                reference.extend(rows)
+            else:
+                row = _row(rng, i * 100)
+                ring.append(*row)
+                reference.append(row)
+            reference = reference[-50:]
+
+            # Forming candle refreshed in place
+            reference[-1] = reference[-1][:4] + [reference[-1][4] + 1, reference[-1][5] + 1]
+            ring.update(-1, *reference[-1][1:])
+
+            assert len(ring) == len(reference)
+            assert ring.window().rows() == reference
+            assert ring.window(10).rows() == reference[-10:]
+
+        middle = reference[25]
+        assert ring.find(middle[0]) == 25 and ring.find(middle[0] + 1) is None
+        assert ring.timestamp(-2) == reference[-2][0] and ring.last_ts == reference[-1][0]
+        with pytest.raises(IndexError):
+            ring.timestamp(50)
+
+    def test_zero_copy_windows_and_vectorized_columns(self):
+        """Vérifie que les fenêtres sont des vues et que change_pct / range_pct égalent les propriétés de Candle"""
+        from mean_reversion_bot import Candle
+
+        ring = CandleRing(capacity=10)
+        candles = [Candle(datetime.fromtimestamp(i * 60), o, h, l, c, 1.0)
+                   for i, (o, h, l, c) in enumerate([(100, 105, 95, 103), (0, 1, 0, 1), (50, 51, 49, 49.5)])]
+        for candle in candles:
+            ring.append(candle.timestamp.timestamp() * 1000, candle.open, candle.high, candle.low,
+                        candle.close, candle.volume)
+
+        window = ring.window(3)
+        assert np.shares_memory(window.close, ring.window().data)
+        assert window.close.flags["C_CONTIGUOUS"]
+        assert window.change_pct.tolist() == pytest.approx([c.change_pct for c in candles])
+        assert window.range_pct.tolist() == pytest.approx([c.range_pct for c in candles])
+        assert window.change_pct_at(-1) == pytest.approx(candles[-1].change_pct)
+        assert CandleWindow.from_candles(candles).rows() == window.rows()
+
+    def test_memory_per_candle(self):
+        """Vérifie qu'une journée de bougies 1m pour 20 symboles tient en quelques Mo, bien sous les dataclasses"""
+        from mean_reversion_bot import Candle
+
+        start = datetime(2026, 1, 1)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [Candle(start + timedelta(minutes=i), 1.0 + i, 2.0 + i, 0.5 + i, 1.5 + i, 10.0 + i)
+                   for i in range(1440)]
+        dataclass_bytes = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        rings = [CandleRing(capacity=1440) for _ in range(20)]
+        assert sum(ring.nbytes for ring in rings) < 3 * 1024 * 1024
+        assert rings[0].nbytes < dataclass_bytes / 2
+        assert len(objects) == 1440
+
+
+class TestSignalGeneratorWindows:
+    """Test SignalGenerator on CandleWindow views"""
+
+    def test_window_and_list_paths_agree(self):
+        """Vérifie que z-score et Bollinger sur les vues égalent le calcul sur des listes de Candle"""
+        from mean_reversion_bot import Candle, PriceFeed, SignalGenerator, config
+
+        rng = random.Random(9)
+        start = datetime(2026, 1, 1)
+        candles, price = [], 100_000.0
+        for i in range(120):
+            close = price * (1 + rng.gauss(0, 0.002))
+            candles.append(Candle(start + timedelta(minutes=i), price, max(price, close), min(price, close),
+                                  close, rng.uniform(1, 10)))
+            price = close
+
+        feed = PriceFeed()
+        feed.exchange = None
+        for candle in candles:
+            feed.add_candle("SOL/USDT", candle)
+        generator = SignalGenerator(MagicMock())
+
+        window = feed.fetch_window("SOL/USDT", limit=config.LOOKBACK_PERIOD)
+        tail = candles[-config.LOOKBACK_PERIOD:]
+        assert window.rows() == CandleWindow.from_candles(tail).rows()
+
+        z_list, direction_list = generator.detect_volatility_spike(tail)
+        assert generator.detect_volatility_spike(window) == pytest.approx((z_list, direction_list), rel=1e-9)
+        z, direction = generator.detect_volatility_spike(window, "SOL/USDT")
+        assert z == pytest.approx(z_list, rel=1e-9) and direction == direction_list
+
+        bands = generator.calculate_bollinger_position(tail)
+        assert generator.calculate_bollinger_position(window) == pytest.approx(bands, rel=1e-9)
+        assert generator.calculate_bollinger_position(window, symbol="SOL/USDT") == pytest.approx(bands, rel=1e-9)
+
+
+# Run tests with: pytest tests/test_candle_ring.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
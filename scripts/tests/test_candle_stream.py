@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Tests for 1m candles built from a trade stream
+- OHLCV aggregation, out-of-order and late trades, flat minutes, clock closes
+- PriceFeed fed by the aggregator: REST only until the stream is live
+- Close event latency, Binance aggTrade stream against the stand-in server
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from candle_stream import AMEND, CLOSE, GAP, BinanceTradeStream, CandleAggregator, replay_trades
+
+MINUTE = 60_000
+T0 = 1_700_000_000_000 // MINUTE * MINUTE
+
+
+def _recorder(aggregator):
+    events = []
+    aggregator.add_listener(lambda event, symbol, bar: events.append(
+        (event, symbol, None if bar is None else (bar.ts, bar.open, bar.high, bar.low, bar.close, bar.volume))))
+    return events
+
+
+class TestAggregator:
+    """Test CandleAggregator"""
+
+    def test_ohlcv_with_out_of_order_trades(self):
+        """Vérifie OHLCV par minute, l'ordre par horodatage et la clôture à la première transaction suivante"""
+        aggregator = CandleAggregator()
+        events = _recorder(aggregator)
+        for price, size, ts in [(100, 1, T0 + 5_000), (103, 2, T0 + 30_000), (99, 1, T0 + 50_000),
+                                (101, 1, T0 + 1_000),  # Arrives late but is the minute's first trade
+                                (102, 1, T0 + 59_999)]:
+            aggregator.add_trade("BTC/USDT", price, size, ts)
+        assert events == []
+
+        aggregator.add_trade("BTC/USDT", 104, 1, T0 + MINUTE + 10)
+        assert events == [(CLOSE, "BTC/USDT", (T0, 101, 103, 99, 102, 6))]
+        assert aggregator.last_closed["BTC/USDT"].partial  # First bar of the stream
+
+    def test_clock_close_flat_minutes_and_late_trades(self):
+        """Vérifie la clôture par l'horloge, les minutes sans transaction et les transactions tardives"""
+        aggregator = CandleAggregator(allowed_lateness_ms=250)
+        events = _recorder(aggregator)
+        aggregator.add_trade("ETH/USDT", 10, 1, T0 + 100)
+
+        aggregator.advance(T0 + MINUTE + 249)
+        assert events == []
+        assert aggregator.next_deadline() == T0 + MINUTE + 250
+        aggregator.advance(T0 + MINUTE + 250)
+        assert events[-1] == (CLOSE, "ETH/USDT", (T0, 10, 10, 10, 10, 1))
+
+        # Straggler for the closed minute: amended. Older: dropped.
+        aggregator.add_trade("ETH/USDT", 12, 2, T0 + 59_000)
+        assert events[-1] == (AMEND, "ETH/USDT", (T0, 10, 12, 10, 12, 3))
+        assert aggregator.add_trade("ETH/USDT", 1, 1, T0 - MINUTE) is None
+        assert (aggregator.late_trades, aggregator.dropped_trades) == (1, 1)
+
+        # Two quiet minutes then a trade: flat candles at the last close
+        aggregator.advance(T0 + 2 * MINUTE + 250)
+        assert events[-1] == (CLOSE, "ETH/USDT", (T0 + MINUTE, 12, 12, 12, 12, 0))
+        aggregator.add_trade("ETH/USDT", 11, 1, T0 + 3 * MINUTE + 5)
+        assert events[-1] == (CLOSE, "ETH/USDT", (T0 + 2 * MINUTE, 12, 12, 12, 12, 0))
+        assert not aggregator.forming["ETH/USDT"].partial
+
+    def test_gap_marks_next_bar_partial(self):
+        """Vérifie l'événement de coupure et le marquage de la minute suivante comme partielle"""
+        aggregator = CandleAggregator()
+        events = _recorder(aggregator)
+        aggregator.add_trade("BTC/USDT", 1, 1, T0)
+        aggregator.mark_gap("BTC/USDT")
+        assert events == [(GAP, "BTC/USDT", None)]
+        assert aggregator.add_trade("BTC/USDT", 2, 1, T0 + 5 * MINUTE).partial
+
+    @pytest.mark.asyncio
+    async def test_replay_matches_reference(self):
+        """Vérifie qu'un rejeu produit les mêmes bougies qu'un calcul de référence"""
+        rng = random.Random(2)
+        trades = sorted(({"symbol": "BTC/USDT", "price": round(rng.uniform(90, 110), 2),
+                          "size": rng.uniform(0.1, 1), "ts": T0 + rng.randrange(10 * MINUTE)}
+                         for _ in range(2000)), key=lambda t: t["ts"])
+        aggregator = CandleAggregator()
+        events = _recorder(aggregator)
+        assert await replay_trades(aggregator, trades) == 2000
+
+        closes = [bar for event, _, bar in events if event == CLOSE]
+        assert len(closes) == 10
+        for i, (ts, o, h, l, c, v) in enumerate(closes):
+            minute = [t for t in trades if T0 + i * MINUTE <= t["ts"] < T0 + (i + 1) * MINUTE]
+            prices = [t["price"] for t in minute]
+            assert (ts, o, h, l, c) == (T0 + i * MINUTE, prices[0], max(prices), min(prices), prices[-1])
+            assert v == pytest.approx(sum(t["size"] for t in minute))
+
+
+class RestExchange:
+    """ccxt-shaped exchange recording fetch_ohlcv calls"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=30):
+        self.calls += 1
+        rows = [list(r) for r in self.rows if since is None or r[0] >= since]
+        return rows[-limit:] if since is None else rows[:limit]
+
+
+class TestPriceFeedStream:
+    """Test PriceFeed.attach_aggregator"""
+
+    def test_rest_until_stream_is_live(self):
+        """Vérifie que REST comble la minute partielle puis que le flux seul alimente les bougies"""
+        from mean_reversion_bot import PriceFeed
+
+        start = T0 - 29 * MINUTE
+        exchange = RestExchange([[start + i * MINUTE, 100, 101, 99, 100 + i % 3, 5] for i in range(30)])
+        feed = PriceFeed()
+        feed.exchange = exchange
+        aggregator = feed.attach_aggregator(CandleAggregator())
+
+        candles = feed.fetch_recent_candles("BTC/USDT")  # Backfill, minute T0 still forming
+        assert len(candles) == 30 and exchange.calls == 1
+        aggregator.add_trade("BTC/USDT", 100.5, 1, T0 + 40_000)  # Stream joins mid-minute
+
+        # Partial minute closes: REST is asked for its final values
+        exchange.rows[-1] = [T0, 100, 103, 98, 102, 9]
+        exchange.rows.append([T0 + MINUTE, 102, 102, 102, 102, 1])
+        aggregator.add_trade("BTC/USDT", 102, 1, T0 + MINUTE + 1)
+        candles = feed.fetch_recent_candles("BTC/USDT")
+        assert exchange.calls == 2
+        assert (candles[-2].high, candles[-2].low, candles[-2].volume) == (103, 98, 9)
+
+        # First full streamed minute: no more requests, the stream owns the candles
+        for i in range(1, 4):
+            aggregator.add_trade("BTC/USDT", 104 + i, 2, T0 + i * MINUTE + 30_000)
+            aggregator.add_trade("BTC/USDT", 105 + i, 1, T0 + (i + 1) * MINUTE + 5)
+            candles = feed.fetch_recent_candles("BTC/USDT")
+        assert exchange.calls == 2
+        assert (candles[-2].timestamp.timestamp() * 1000, candles[-2].close) == (T0 + 3 * MINUTE, 107)
+        assert candles[-1].close == 108 and len(candles) == 30
+
+        # Disconnect: REST again until a full minute is streamed
+        aggregator.mark_gap("BTC/USDT")
+        feed.fetch_recent_candles("BTC/USDT")
+        assert exchange.calls > 2
+
+    @pytest.mark.asyncio
+    async def test_close_wakes_waiter_immediately(self):
+        """Vérifie que la clôture réveille la boucle en quelques millisecondes"""
+        from mean_reversion_bot import PriceFeed
+
+        feed = PriceFeed()
+        feed.exchange = None
+        aggregator = feed.attach_aggregator(CandleAggregator())
+        aggregator.add_trade("ETH/USDT", 3400, 1, T0 + 10)
+        aggregator.add_trade("ETH/USDT", 3401, 1, T0 + MINUTE + 10)  # Partial bar closed
+        aggregator.add_trade("ETH/USDT", 3402, 1, T0 + 2 * MINUTE + 10)
+        assert feed.candle_closed.is_set()
+        feed.candle_closed.clear()
+
+        waiter = asyncio.create_task(feed.wait_for_close(timeout=5))
+        await asyncio.sleep(0.01)
+        closed_at = time.perf_counter()
+        aggregator.advance(T0 + 3 * MINUTE + 250)
+        assert await waiter
+        assert time.perf_counter() - closed_at < 0.05
+        candles = feed.fetch_recent_candles("ETH/USDT")
+        assert [c.close for c in candles] == [3400, 3401, 3402]
+
+
+class TestBinanceStream:
+    """Test BinanceTradeStream against the stand-in server"""
+
+    @pytest.mark.asyncio
+    async def test_stream_feeds_aggregator_and_reconnects(self):
+        """Vérifie la réception des aggTrade, la coupure signalée et la reconnexion"""
+        from http_client import get_client
+        from mock_polymarket_api import StandInConfig, StandInServer
+
+        async with StandInServer(StandInConfig(ws_interval_ms=5)) as server:
+            http = get_client()
+            http.set_base_url_overrides(server.url_overrides())
+            try:
+                aggregator = CandleAggregator()
+                events = _recorder(aggregator)
+                stream = BinanceTradeStream(aggregator, ["BTC/USDT", "ETH/USDT"])
+                stream.config.reconnect_base = 0.01
+                await stream.start()
+                for _ in range(200):
+                    await asyncio.sleep(0.01)
+                    if set(aggregator.forming) == {"BTC/USDT", "ETH/USDT"}:
+                        break
+                assert set(aggregator.forming) == {"BTC/USDT", "ETH/USDT"}
+                assert 90_000 < aggregator.forming["BTC/USDT"].close < 110_000
+
+                await server.drop_ws_connections()
+                for _ in range(200):
+                    await asyncio.sleep(0.01)
+                    if stream.reconnects and stream.connected and aggregator.forming:
+                        break
+                assert (GAP, "BTC/USDT", None) in events
+                assert stream.reconnects >= 1 and stream.connected
+                await stream.stop()
+            finally:
+                http.set_base_url_overrides({})
+
+
+# Run tests with: pytest tests/test_candle_stream.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for the CLOB market-data stream
+- Top-of-book from book / price_change / last_trade_price events
+- Reconnect + resubscribe against the local WebSocket stand-in
+- Local fan-out socket
+"""
+
+import asyncio
+import os
+import sys
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from http_client import get_client, close_client
+from clob_ws import ClobMarketStream, FanoutServer, StreamConfig, read_fanout
+from mock_polymarket_api import StandInConfig, StandInServer
+
+
+async def _wait_for(predicate, timeout: float = 3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.01)
+
+
+class TestEventHandling:
+    """Test event parsing without a connection"""
+
+    def test_book_then_price_change(self):
+        """Vérifie que le top-of-book suit les snapshots et les deltas"""
+        stream = ClobMarketStream(StreamConfig())
+        stream.tokens.add("t1")
+        stream.handle_event({
+            "event_type": "book", "asset_id": "t1", "market": "0xm",
+            # Real API order: bids ascending, asks descending
+            "bids": [{"price": "0.40", "size": "10"}, {"price": "0.45", "size": "5"}],
+            "asks": [{"price": "0.60", "size": "10"}, {"price": "0.55", "size": "7"}],
+        })
+        book = stream.get("t1")
+        assert (book.best_bid, book.bid_size, book.best_ask, book.ask_size) == (0.45, 5, 0.55, 7)
+
+        # Legacy price_change format: remove best bid level
+        stream.handle_event({"event_type": "price_change", "asset_id": "t1",
+                             "changes": [{"price": "0.45", "side": "BUY", "size": "0"}]})
+        assert stream.get("t1").best_bid == 0.40
+
+        stream.handle_event({"event_type": "last_trade_price", "asset_id": "t1",
+                             "price": "0.55", "size": "3", "side": "BUY"})
+        assert stream.get("t1").last_trade_price == 0.55
+
+    def test_untracked_tokens_ignored(self):
+        """Vérifie que les tokens non suivis sont ignorés"""
+        stream = ClobMarketStream(StreamConfig())
+        stream.handle_event({"event_type": "book", "asset_id": "other", "bids": [], "asks": []})
+        assert stream.get("other") is None
+
+
+    def test_disconnect_drops_top_of_book(self):
+        """Vérifie qu'après une coupure le top-of-book d'avant n'est plus servi"""
+        stream = ClobMarketStream(StreamConfig())
+        stream.tokens.add("t1")
+        stream.connected = True
+        stream.handle_event({"event_type": "book", "asset_id": "t1",
+                             "bids": [{"price": "0.45", "size": "5"}], "asks": [{"price": "0.55", "size": "7"}]})
+        assert stream.mid("t1") == pytest.approx(0.5)
+
+        stream._on_disconnect()
+        stream.connected = True  # Reconnected, no event yet
+        assert stream.mid("t1") is None and stream.get("t1") is None and stream.book("t1") is None
+
+    @pytest.mark.asyncio
+    async def test_background_sends_are_held_and_logged(self, caplog):
+        """Vérifie que les envois en arrière-plan sont conservés jusqu'à la fin et que leurs erreurs sont loguées"""
+        class FailingSocket:
+            closed = False
+
+            async def send_json(self, message):
+                await asyncio.sleep(0.01)
+                raise ConnectionResetError("socket gone")
+
+        stream = ClobMarketStream(StreamConfig())
+        stream._ws = FailingSocket()
+        stream._send_nowait({"assets_ids": ["t1"], "operation": "subscribe"})
+        assert len(stream._background) == 1
+
+        await _wait_for(lambda: not stream._background)
+        assert "WS send failed: socket gone" in caplog.text
+
+
+class TestStreamAgainstStandIn:
+    """Test the live connection against the local WebSocket stand-in"""
+
+    @pytest.mark.asyncio
+    async def test_reconnects_and_resubscribes(self):
+        """Vérifie la reconnexion automatique et le réabonnement"""
+        async with StandInServer(StandInConfig(ws_interval_ms=10)) as server:
+            http = get_client()
+            http.set_base_url_overrides(server.url_overrides())
+            stream = ClobMarketStream(StreamConfig(reconnect_base=0.01))
+            try:
+                stream.subscribe(["111", "222"])
+                await stream.start()
+                await _wait_for(lambda: stream.mid("111") is not None and stream.mid("222") is not None)
+                assert 0 < stream.mid("111") < 1
+
+                await server.drop_ws_connections()
+                await _wait_for(lambda: stream.reconnects >= 1 and stream.connected)
+                await _wait_for(lambda: stream.mid("222") is not None)
+
+                # Dynamic subscription on the live connection
+                stream.subscribe(["333"])
+                await _wait_for(lambda: stream.mid("333") is not None)
+                assert await stream.wait_for_update(timeout=1.0)
+            finally:
+                await stream.stop()
+                http.set_base_url_overrides({})
+                await close_client()
+
+    @pytest.mark.asyncio
+    async def test_fanout_socket(self):
+        """Vérifie que le socket local diffuse les mises à jour"""
+        async with StandInServer(StandInConfig(ws_interval_ms=10)) as server:
+            http = get_client()
+            http.set_base_url_overrides(server.url_overrides())
+            stream = ClobMarketStream(StreamConfig(fanout_port=0))
+            try:
+                # Ephemeral port instead of the configured one
+                fanout = FanoutServer(stream, "127.0.0.1", 0)
+                await fanout.start()
+                await stream.start()
+
+                updates = []
+
+                async def consume():
+                    async for update in read_fanout(port=fanout.port, token_ids=["444"]):
+                        updates.append(update)
+                        if len(updates) >= 3:
+                            return
+
+                await asyncio.wait_for(consume(), timeout=3)
+                assert all(u["asset_id"] == "444" for u in updates)
+                assert updates[-1]["best_bid"] < updates[-1]["best_ask"]
+                await fanout.stop()
+            finally:
+                await stream.stop()
+                http.set_base_url_overrides({})
+                await close_client()
+
+
+# Run tests with: pytest tests/test_clob_ws.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
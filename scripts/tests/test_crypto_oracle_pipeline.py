@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Tests for the CryptoOracle per-market pipeline
+- Markets run concurrently under max_concurrent_markets
+- A slow market is cut at the cycle deadline without delaying the others
+- The decision step sees every finished market
+- Async sentiment on the shared HTTP session, single and gathered
+- Buy / hedge orders placed in worker threads, positions updated on the loop
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from crypto_oracle_v1_prod import Bias, CryptoOracle, DiscrepancySignal, OracleConfig, SentimentResult
+from http_client import get_client, close_client
+from mock_polymarket_api import StandInConfig, StandInServer
+
+
+def _market(i: int) -> dict:
+    return {
+        "market_id": f"m{i}", "token_id": f"t{i}", "slug": f"btc-100k-{i}",
+        "symbol": "BTC/USDT", "strike_price": 100000, "expiry": datetime.now() + timedelta(days=30),
+    }
+
+
+class TestRunCycle:
+    """Test run_cycle scheduling and decisions"""
+
+    @pytest.fixture
+    def oracle(self):
+        """Oracle with mocked CLOB client and fake network stages"""
+        with patch.dict(os.environ, {"POLY_PRIVATE_KEY": "0x" + "a" * 64}, clear=True):
+            with patch('crypto_oracle_v1_prod.ClobClient'):
+                oracle = CryptoOracle(OracleConfig(max_concurrent_markets=3, cycle_deadline=0.5))
+
+        async def wallets():
+            oracle.smart_wallet_cache[f"smart_wallets_{oracle.config.min_smart_wallet_profit}"] = (["0xabc"], time.time())
+            return ["0xabc"]
+
+        async def fair_value(market_id, strike_price, expiry_date, symbol, spot_price=None, fair_value=None):
+            assert spot_price == 95000.0  # Fetched once per cycle, shared
+            assert 0.01 <= fair_value <= 0.99  # Priced for the whole board up front
+            await asyncio.sleep(5 if market_id == "m0" else 0.05)
+            return DiscrepancySignal(
+                is_overreaction=market_id == "m1", spot_price=spot_price, spot_change_pct=0,
+                poly_price=0.4, poly_change_pct=-10, fair_value_estimate=0.5, alpha=0.1,
+            )
+
+        bullish = SentimentResult(bias=Bias.BULLISH, score=0.8, smart_wallets_count=3,
+                                  total_yes_exposure=100, total_no_exposure=10, confidence=0.3)
+        oracle.get_smart_wallets_async = wallets
+        oracle.spot = MagicMock(snapshot=AsyncMock(return_value={"BTC/USDT": 95000.0}))
+        oracle.analyze_smart_sentiment_async = AsyncMock(return_value=bullish)
+        oracle.monitor_fair_value = fair_value
+        oracle.execute_dip_buy_async = AsyncMock(return_value="order-1")
+        return oracle
+
+    @pytest.mark.asyncio
+    async def test_slow_market_cut_at_deadline(self, oracle):
+        """Vérifie qu'un marché lent est annulé à l'échéance sans retarder les autres"""
+        started = time.perf_counter()
+        stats = await oracle.run_cycle([_market(i) for i in range(7)])
+        elapsed = time.perf_counter() - started
+
+        assert stats["analyzed"] == 6
+        assert stats["timed_out"] == 1
+        assert stats["failed"] == 0
+        assert 0.45 < elapsed < 1.5  # Deadline, not 5s slow market + 7 sequential markets
+        oracle.spot.snapshot.assert_awaited_once_with(["BTC/USDT"])
+
+    @pytest.mark.asyncio
+    async def test_decision_step_places_order_for_overreaction(self, oracle):
+        """Vérifie que l'étape de décision achète le marché en surréaction haussière"""
+        stats = await oracle.run_cycle([_market(i) for i in range(1, 4)])
+
+        assert stats == {"markets": 3, "analyzed": 3, "orders": 1, "failed": 0, "timed_out": 0,
+                         "flips": 0}
+        oracle.execute_dip_buy_async.assert_awaited_once()
+        assert oracle.execute_dip_buy_async.call_args.kwargs["market_id"] == "m1"
+
+    @pytest.mark.asyncio
+    async def test_neutral_without_smart_wallets(self, oracle):
+        """Vérifie que sans portefeuilles intelligents le sentiment reste neutre sans requête"""
+        async def no_wallets():
+            return []
+
+        del oracle.analyze_smart_sentiment_async  # Real implementation
+        oracle.get_smart_wallets_async = no_wallets
+        oracle._fetch_with_rate_limit = AsyncMock()
+        stats = await oracle.run_cycle([_market(1)])
+
+        assert stats["orders"] == 0
+        oracle._fetch_with_rate_limit.assert_not_called()
+
+
+class TestOrderPlacement:
+    """Test that blocking CLOB orders stay off the loop"""
+
+    @pytest.fixture
+    def oracle(self, tmp_path):
+        with patch.dict(os.environ, {"POLY_PRIVATE_KEY": "0x" + "a" * 64}, clear=True):
+            with patch('crypto_oracle_v1_prod.ClobClient'):
+                oracle = CryptoOracle(OracleConfig(journal_dir=str(tmp_path)))
+        oracle.order_threads, oracle.state_threads = [], []
+
+        def create_order(args, order_type):
+            oracle.order_threads.append(threading.current_thread())
+            time.sleep(0.3)  # Slow CLOB
+            return {"orderID": f"{args.side.lower()}-{len(oracle.order_threads)}"}
+
+        journal_position = oracle._journal_position
+
+        def record_state(op, position):
+            oracle.state_threads.append(threading.current_thread())
+            journal_position(op, position)
+
+        oracle.clob_client = MagicMock()
+        oracle.clob_client.create_order.side_effect = create_order
+        oracle._journal_position = record_state
+        oracle.get_poly_price = AsyncMock(return_value=0.55)
+        return oracle
+
+    @staticmethod
+    async def _max_loop_stall(coro) -> tuple:
+        """Await coro while measuring the longest gap between 10ms loop ticks"""
+        stalls = [0.0]
+        task = asyncio.ensure_future(coro)
+        while not task.done():
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            stalls.append(time.perf_counter() - before)
+        return task.result(), max(stalls)
+
+    @pytest.mark.asyncio
+    async def test_buy_and_hedge_do_not_block_loop(self, oracle):
+        """Vérifie que l'achat et la couverture passent par un thread et que les positions changent sur la boucle"""
+        sentiment = SentimentResult(bias=Bias.BULLISH, score=0.8, smart_wallets_count=10,
+                                    total_yes_exposure=100, total_no_exposure=0, confidence=1.0)
+        discrepancy = DiscrepancySignal(is_overreaction=True, spot_price=100_000, spot_change_pct=-1,
+                                        poly_price=0.40, poly_change_pct=-20, fair_value_estimate=0.6, alpha=0.2)
+
+        order_id, stall = await self._max_loop_stall(
+            oracle.execute_dip_buy_async("m1", "t1", sentiment, discrepancy))
+        assert order_id == "buy-1" and stall < 0.15
+        order_id, stall = await self._max_loop_stall(oracle.manage_position("m1"))
+        assert order_id == "sell-2" and stall < 0.15
+        assert oracle.positions["m1"].is_hedged
+
+        main = threading.current_thread()
+        assert all(thread is not main for thread in oracle.order_threads)
+        assert oracle.state_threads == [main, main]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_hedge_is_still_recorded(self, oracle):
+        """Vérifie qu'une couverture annulée à l'échéance est enregistrée et jamais envoyée deux fois"""
+        oracle.clob_client.create_order.side_effect = [{"orderID": "buy-1"}]
+        sentiment = SentimentResult(bias=Bias.BULLISH, score=0.8, smart_wallets_count=10,
+                                    total_yes_exposure=100, total_no_exposure=0, confidence=1.0)
+        discrepancy = DiscrepancySignal(is_overreaction=True, spot_price=100_000, spot_change_pct=-1,
+                                        poly_price=0.40, poly_change_pct=-20, fair_value_estimate=0.6, alpha=0.2)
+        assert oracle.execute_dip_buy("m1", "t1", sentiment, discrepancy) == "buy-1"
+
+        release = threading.Event()
+
+        def slow_sell(args, order_type):
+            release.wait(2)
+            return {"orderID": "sell-1"}
+
+        oracle.clob_client.create_order.side_effect = slow_sell
+        task = asyncio.create_task(oracle.manage_position("m1"))
+        await asyncio.sleep(0.05)
+        task.cancel()  # Cycle deadline while the hedge is in flight
+        assert await oracle.manage_position("m1") is None  # In flight: no second hedge
+
+        release.set()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if oracle.positions["m1"].is_hedged:
+                break
+        assert oracle.positions["m1"].hedge_order_id == "sell-1"
+        assert oracle.clob_client.create_order.call_count == 2
+
+
+class TestAsyncSentiment:
+    """Test the async sentiment API against the stand-in server"""
+
+    @pytest.fixture
+    def oracle(self):
+        with patch.dict(os.environ, {"POLY_PRIVATE_KEY": "0x" + "a" * 64}, clear=True):
+            with patch('crypto_oracle_v1_prod.ClobClient'):
+                return CryptoOracle()
+
+    @pytest.mark.asyncio
+    async def test_gathered_sentiments(self, oracle):
+        """Vérifie le calcul groupé du sentiment avec un seul chargement des portefeuilles"""
+        smart = ["0x" + "1" * 40, "0x" + "2" * 40]
+        async with StandInServer(StandInConfig(n_markets=4)) as server:
+            long_market, short_market, empty_market = server.markets[:3]
+            server.fixtures["holders"] = {
+                long_market["conditionId"]: [{"address": smart[0], "shares": 500}, {"address": smart[1], "shares": 300}],
+                short_market["conditionId"]: [{"address": smart[0].upper(), "shares": -800}],
+            }
+            http = get_client()
+            http.set_base_url_overrides(server.url_overrides())
+            oracle.get_smart_wallets_async = AsyncMock(return_value=smart)
+            try:
+                slugs = [long_market["slug"], short_market["slug"], empty_market["slug"], "unknown-market"]
+                results = await oracle.analyze_sentiments(slugs)
+            finally:
+                http.set_base_url_overrides({})
+                await close_client()
+
+        oracle.get_smart_wallets_async.assert_awaited_once()
+        assert list(results) == slugs
+        assert results[long_market["slug"]].bias == Bias.BULLISH
+        assert results[long_market["slug"]].smart_wallets_count == 2
+        assert results[short_market["slug"]].bias == Bias.BEARISH
+        assert results[empty_market["slug"]].bias == Bias.NEUTRAL
+        assert results["unknown-market"].bias == Bias.NEUTRAL
+
+    @pytest.mark.asyncio
+    async def test_network_error_is_neutral(self, oracle):
+        """Vérifie qu'une erreur réseau donne un sentiment neutre sans bloquer la boucle"""
+        oracle._fetch_with_rate_limit = AsyncMock(side_effect=ConnectionError("down"))
+        result = await oracle.analyze_smart_sentiment_async("test-market", {"0xabc"})
+        assert result.bias == Bias.NEUTRAL and result.score == 0
+
+
+# Run tests with: pytest tests/test_crypto_oracle_pipeline.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -11,6 +11,7 @@ Tests critical production requirements:
 import os
 import sys
 import pytest
+import requests
 import time
 from decimal import Decimal
 from unittest.mock import patch, MagicMock
@@ -131,12 +132,12 @@ class TestCacheWithTTL:
     """Test smart wallet cache with TTL"""
     
     @pytest.fixture
-    def oracle(self):
-        """Create oracle with mocked dependencies"""
+    def oracle(self, tmp_path):
+        """Create oracle with mocked dependencies and an empty wallet index"""
         test_key = "0x" + "a" * 64
         with patch.dict(os.environ, {"POLY_PRIVATE_KEY": test_key}, clear=True):
             with patch('crypto_oracle_v1_prod.ClobClient'):
-                return CryptoOracle()
+                return CryptoOracle(OracleConfig(wallet_index_dir=str(tmp_path)))
     
     @pytest.mark.asyncio
     async def test_cache_returns_fresh_data(self, oracle):
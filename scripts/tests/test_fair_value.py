@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the vectorized fair value engine
+- erf-based normal CDF (scalar and array)
+- Batch API matches the scalar model, edge cases included
+- CryptoOracle prices the whole board in one call
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import fair_value
+from fair_value import implied_probabilities, implied_probability, normal_cdf, normal_cdf_array
+
+np = pytest.importorskip("numpy")
+
+
+class TestNormalCdf:
+    """Test the CDF against math.erf"""
+
+    def test_array_cdf_matches_erf(self):
+        """Vérifie que la CDF vectorisée suit math.erf à 2e-7 près"""
+        xs = np.linspace(-8, 8, 20001)
+        exact = np.array([normal_cdf(x) for x in xs])
+        assert np.max(np.abs(normal_cdf_array(xs) - exact)) < 2e-7
+        assert normal_cdf(0) == 0.5
+        assert normal_cdf(1.959963985) == pytest.approx(0.975, abs=1e-9)
+
+
+class TestBatch:
+    """Test implied_probabilities against implied_probability"""
+
+    def test_matches_scalar_with_edge_cases(self):
+        """Vérifie l'égalité avec le calcul unitaire, cas limites compris"""
+        rng = random.Random(7)
+        rows = [(rng.uniform(50_000, 150_000), rng.choice((90_000, 100_000, 110_000)),
+                 rng.randint(-2, 365), rng.uniform(0.2, 1.2)) for _ in range(2000)]
+        rows += [(100_000, 90_000, 0, 0.6), (80_000, 90_000, -1, 0.6), (0, 90_000, 10, 0.6),
+                 (100_000, -5, 10, 0.6), (100_000, 90_000, 10, 0.0), (1e9, 1, 1, 0.6)]
+        spots, strikes, days, vols = map(list, zip(*rows))
+
+        batch = implied_probabilities(spots, strikes, days, vols)
+        scalar = [implied_probability(*row) for row in rows]
+        assert np.max(np.abs(batch - np.array(scalar))) < 1e-6
+        assert list(batch[-6:]) == [1.0, 0.0, 0.5, 0.5, 0.5, 0.99]
+
+    def test_strike_ladder_broadcast(self):
+        """Vérifie qu'une échelle de strikes se calcule en un appel et décroît avec le strike"""
+        strikes = np.arange(50_000, 150_001, 1_000)
+        ladder = implied_probabilities(97_000, strikes, 30)
+        assert ladder.shape == strikes.shape
+        assert np.all(np.diff(ladder) <= 0)
+
+        # Thousands of markets per millisecond
+        spots = np.full(100_000, 97_000.0)
+        strikes = np.random.default_rng(1).uniform(50_000, 150_000, 100_000)
+        started = time.perf_counter()
+        implied_probabilities(spots, strikes, 30)
+        assert time.perf_counter() - started < 0.1
+
+    def test_pure_python_fallback(self):
+        """Vérifie que le repli sans NumPy donne les mêmes valeurs"""
+        expected = list(implied_probabilities(97_000, [90_000, 100_000, 110_000], [30, 0, 60]))
+        with patch.object(fair_value, "NUMPY_AVAILABLE", False):
+            fallback = implied_probabilities(97_000, [90_000, 100_000, 110_000], [30, 0, 60])
+        assert fallback == pytest.approx(expected, abs=1e-6)
+
+
+class TestOracleBoard:
+    """Test CryptoOracle.fair_values"""
+
+    def test_board_matches_per_market(self):
+        """Vérifie que le prix du tableau entier égale le calcul marché par marché"""
+        from crypto_oracle_v1_prod import CryptoOracle
+
+        with patch.dict(os.environ, {"POLY_PRIVATE_KEY": "0x" + "a" * 64}, clear=True):
+            with patch('crypto_oracle_v1_prod.ClobClient'):
+                oracle = CryptoOracle()
+
+        expiry = datetime.now() + timedelta(days=45, hours=1)
+        markets = [{"market_id": f"m{k}", "symbol": symbol, "strike_price": k, "expiry": expiry}
+                   for symbol, k in (("BTC/USDT", 90_000), ("BTC/USDT", 120_000), ("ETH/USDT", 4_000),
+                                     ("SOL/USDT", 200))]
+        values = oracle.fair_values(markets, {"BTC/USDT": 97_000.0, "ETH/USDT": 3_400.0, "SOL/USDT": None})
+
+        assert set(values) == {"m90000", "m120000", "m4000"}  # No spot, no price
+        assert values["m90000"] == pytest.approx(oracle.calculate_implied_probability(97_000.0, 90_000, 45), abs=1e-6)
+        assert values["m4000"] == pytest.approx(oracle.calculate_implied_probability(3_400.0, 4_000, 45), abs=1e-6)
+        assert values["m90000"] > 0.5 > values["m120000"]
+
+
+# Run tests with: pytest tests/test_fair_value.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental holder diffing
+- Snapshot diffs: new holders, changed shares, exits
+- Running smart money totals equal a full recompute
+- CryptoOracle reports smart bias flips
+"""
+
+import os
+import random
+import sys
+from unittest.mock import AsyncMock, patch
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from holder_state import HolderState
+from http_client import get_client, close_client
+from mock_polymarket_api import StandInConfig, StandInServer
+
+
+def _full_recompute(holders, smart_wallets):
+    yes = no = count = 0
+    for holder in holders:
+        if holder["address"].lower() in smart_wallets:
+            count += 1
+            if holder["shares"] > 0:
+                yes += holder["shares"]
+            else:
+                no += abs(holder["shares"])
+    return yes, no, count
+
+
+class TestDiff:
+    """Test HolderState updates"""
+
+    def test_snapshot_diff_counts(self):
+        """Vérifie le décompte des entrées, modifications et sorties entre deux listes"""
+        smart = frozenset({"0xa", "0xb"})
+        state = HolderState("m1")
+        diff = state.apply_snapshot([{"address": "0xA", "shares": 100}, {"address": "0xb", "shares": -40},
+                                     {"address": "0xc", "shares": 7}], smart)
+        assert (diff.added, diff.changed, diff.exited, diff.smart_changed) == (3, 0, 0, 2)
+        assert (state.smart_yes, state.smart_no, state.smart_count) == (100, 40, 2)
+
+        diff = state.apply_snapshot([{"address": "0xa", "shares": 100}, {"address": "0xb", "shares": 60},
+                                     {"address": "0xd", "shares": 1}], smart)
+        assert (diff.added, diff.changed, diff.exited, diff.smart_changed) == (1, 1, 1, 1)
+        assert (state.smart_yes, state.smart_no, state.smart_count) == (160, 0, 2)
+
+        # Same list again: nothing to apply
+        assert state.apply_snapshot([{"address": "0xa", "shares": 100}, {"address": "0xb", "shares": 60},
+                                     {"address": "0xd", "shares": 1}], smart).total == 0
+
+    def test_running_totals_match_full_recompute(self):
+        """Vérifie que les totaux incrémentaux égalent un recalcul complet sur 200 instantanés"""
+        rng = random.Random(11)
+        addresses = [f"0x{i:040x}" for i in range(400)]
+        smart = frozenset(rng.sample(addresses, 60))
+        holders = {a: rng.randint(-500, 500) for a in rng.sample(addresses, 200)}
+        state = HolderState("m1")
+        state.apply_snapshot([{"address": a, "shares": s} for a, s in holders.items()], smart)
+
+        for _ in range(200):
+            for address in rng.sample(addresses, 10):  # A few holders move per snapshot
+                if rng.random() < 0.3:
+                    holders.pop(address, None)
+                else:
+                    holders[address] = rng.randint(-500, 500)
+            snapshot = [{"address": a, "shares": s} for a, s in holders.items()]
+            diff = state.apply_snapshot(snapshot, smart)
+            assert diff.total <= 10
+            assert (state.smart_yes, state.smart_no, state.smart_count) == _full_recompute(snapshot, smart)
+
+    def test_new_smart_set_rescans_book(self):
+        """Vérifie qu'un nouvel ensemble de portefeuilles recalcule le carnet une fois"""
+        state = HolderState("m1")
+        state.apply_changes({"0xa": 50.0, "0xb": -20.0}, frozenset({"0xa"}))
+        assert (state.smart_yes, state.smart_no, state.smart_count) == (50, 0, 1)
+        state.apply_changes({}, frozenset({"0xb"}))
+        assert (state.smart_yes, state.smart_no, state.smart_count) == (0, 20, 1)
+        state.apply_changes({"0xb": None})
+        assert (state.smart_yes, state.smart_no, state.smart_count, len(state)) == (0, 0, 0, 1)
+
+
+class TestOracleFlips:
+    """Test incremental sentiment in CryptoOracle"""
+
+    @pytest.mark.asyncio
+    async def test_bias_flip_reported(self):
+        """Vérifie qu'un retournement du biais est signalé et que le slug n'est résolu qu'une fois"""
+        from crypto_oracle_v1_prod import Bias, CryptoOracle
+
+        with patch.dict(os.environ, {"POLY_PRIVATE_KEY": "0x" + "a" * 64}, clear=True):
+            with patch('crypto_oracle_v1_prod.ClobClient'):
+                oracle = CryptoOracle()
+
+        smart = ["0x" + "1" * 40, "0x" + "2" * 40]
+        oracle.get_smart_wallets_async = AsyncMock(return_value=smart)
+        async with StandInServer(StandInConfig(n_markets=2)) as server:
+            market = server.markets[0]
+            holders = [{"address": smart[0], "shares": 500}, {"address": smart[1], "shares": 300},
+                       {"address": "0x" + "9" * 40, "shares": -900}]
+            server.fixtures["holders"] = {market["conditionId"]: holders}
+            http = get_client()
+            http.set_base_url_overrides(server.url_overrides())
+            fetch = AsyncMock(wraps=oracle._fetch_with_rate_limit)
+            oracle._fetch_with_rate_limit = fetch
+            try:
+                first = (await oracle.analyze_sentiments([market["slug"]]))[market["slug"]]
+                same = (await oracle.analyze_sentiments([market["slug"]]))[market["slug"]]
+                holders[0]["shares"] = -2000  # Top smart wallet switches to NO
+                flipped = (await oracle.analyze_sentiments([market["slug"]]))[market["slug"]]
+            finally:
+                http.set_base_url_overrides({})
+                await close_client()
+
+        assert first.bias == Bias.BULLISH and not first.flipped
+        assert same.bias == Bias.BULLISH and not same.flipped
+        assert flipped.bias == Bias.BEARISH and flipped.flipped
+        assert (flipped.total_yes_exposure, flipped.total_no_exposure) == (300, 2000)
+        slug_lookups = [c for c in fetch.await_args_list if c.kwargs.get("params", {}).get("slug")]
+        assert len(slug_lookups) == 1
+
+
+# Run tests with: pytest tests/test_holder_state.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
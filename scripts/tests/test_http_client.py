@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared pooled HTTP client
+- Retry/backoff on transient statuses
+- Query parameter encoding
+- Connection reuse (keep-alive)
+"""
+
+import os
+import sys
+import pytest
+from aiohttp import web
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from http_client import HttpClient, HttpConfig
+
+
+async def _start_server(handler):
+    app = web.Application()
+    app.router.add_get('/test', handler)
+    app.router.add_post('/test', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/test"
+
+
+class TestHttpClient:
+    """Test retry, params and pooling behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self):
+        """Vérifie que les 503 sont réessayés avec backoff"""
+        calls = {"n": 0}
+
+        async def handler(request):
+            calls["n"] += 1
+            if calls["n"] < 3:
+                return web.Response(status=503)
+            return web.json_response({"ok": True})
+
+        runner, url = await _start_server(handler)
+        client = HttpClient(HttpConfig(backoff_base=0.01))
+        try:
+            assert await client.get_json(url) == {"ok": True}
+            assert calls["n"] == 3
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_post_not_retried_by_default(self):
+        """Vérifie qu'un POST n'est pas rejoué (non idempotent)"""
+        calls = {"n": 0}
+
+        async def handler(request):
+            calls["n"] += 1
+            return web.Response(status=503)
+
+        runner, url = await _start_server(handler)
+        client = HttpClient(HttpConfig(backoff_base=0.01))
+        try:
+            status, _ = await client.post_json(url, {"a": 1})
+            assert status == 503
+            assert calls["n"] == 1
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_bool_params_encoded(self):
+        """Vérifie que les booléens sont encodés en 'true'/'false' et None ignoré"""
+        async def handler(request):
+            return web.json_response(dict(request.query))
+
+        runner, url = await _start_server(handler)
+        client = HttpClient()
+        try:
+            body = await client.get_json(url, params={"closed": False, "active": True, "tag": None})
+            assert body == {"closed": "false", "active": "true"}
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_connection_reused(self):
+        """Vérifie que les requêtes successives réutilisent la même connexion"""
+        peers = set()
+
+        async def handler(request):
+            peers.add(request.transport.get_extra_info("peername"))
+            return web.json_response({})
+
+        runner, url = await _start_server(handler)
+        client = HttpClient()
+        try:
+            for _ in range(5):
+                await client.get_json(url)
+            assert len(peers) == 1
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_network_error_returns_none(self):
+        """Vérifie qu'une erreur réseau retourne None sans lever d'exception"""
+        client = HttpClient(HttpConfig(max_retries=1, backoff_base=0.01))
+        try:
+            assert await client.get_json("http://127.0.0.1:1/unreachable") is None
+        finally:
+            await client.close()
+
+
+# Run tests with: pytest tests/test_http_client.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for lazy imports and the startup report
+- Entry points don't import ccxt / py_clob_client at module load
+- Proxies resolve on first use and stay patchable
+- Startup report gauges
+"""
+
+import os
+import sys
+from unittest.mock import patch
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from lazy_imports import lazy_import, module_available, report_startup
+from metrics import get_registry
+import startup_bench
+
+
+class TestColdStart:
+    """Test that heavy dependencies stay out of module load"""
+
+    @pytest.mark.parametrize("module", ["mean_reversion_bot", "crypto_oracle_v1_prod", "trading_executor"])
+    def test_entry_point_skips_heavy_imports(self, module):
+        """Vérifie que ccxt et py_clob_client ne sont pas importés au chargement"""
+        result = startup_bench.probe(module)
+        assert result["heavy"] == []
+
+
+class TestLazyProxy:
+    """Test proxy resolution"""
+
+    def test_attribute_proxy_resolves_on_call(self):
+        """Vérifie que le proxy importe le module au premier appel"""
+        dumps = lazy_import("json", "dumps")
+        assert "not loaded" in repr(dumps)
+        assert dumps({"a": 1}) == '{"a": 1}'
+        assert "loaded" in repr(dumps) and "not loaded" not in repr(dumps)
+
+        decoder = lazy_import("json.decoder")
+        assert decoder.JSONDecodeError.__name__ == "JSONDecodeError"
+
+    def test_module_available_does_not_import(self):
+        """Vérifie la détection sans import"""
+        assert module_available("json")
+        assert not module_available("definitely_not_a_module_xyz")
+
+    def test_exchange_built_on_first_use_and_patchable(self):
+        """Vérifie que l'exchange ccxt est créé au premier accès et que le client CLOB reste patchable"""
+        import mean_reversion_bot as mrb
+
+        feed = mrb.PriceFeed("binance")
+        assert feed._exchange is None and not feed._exchange_ready
+        sentinel = object()
+        feed.exchange = sentinel
+        assert feed.exchange is sentinel
+
+        with patch("mean_reversion_bot.ClobClient") as clob, \
+                patch.object(mrb.config, "POLY_API_KEY", "key"):
+            engine = mrb.ExecutionEngine()
+            assert engine.client is clob.return_value
+            assert mrb.ExecutionEngine(dry_run=True).client is None
+
+
+class TestStartupReport:
+    """Test the startup gauges"""
+
+    def test_report_sets_gauges(self):
+        """Vérifie que le rapport de démarrage exporte durée et RSS"""
+        stats = report_startup("unit_test_bot")
+        assert stats["seconds"] > 0 and stats["rss_bytes"] > 0
+        assert "unit_test_bot ready in" in stats["message"]
+        text = get_registry().render()
+        assert 'startup_seconds{bot="unit_test_bot"}' in text
+        assert 'startup_rss_bytes{bot="unit_test_bot"}' in text
+
+
+# Run tests with: pytest tests/test_lazy_imports.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched log pipeline
+- Size / time flushes and a non-blocking producer
+- Backpressure sampling and drop accounting
+- File handler wrapper and whale tracker dashboard shipping
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from log_pipeline import LogPipeline, LogPipelineConfig, PipelineHandler
+from http_client import get_client, close_client
+from mock_polymarket_api import StandInConfig, StandInServer
+
+
+class TestBatching:
+    """Test flush triggers with a slow sink"""
+
+    @pytest.mark.asyncio
+    async def test_batches_without_blocking_producer(self):
+        """Vérifie que put() ne bloque pas et que les lots respectent batch_size"""
+        batches = []
+
+        async def slow_sink(batch, dropped):
+            await asyncio.sleep(0.05)
+            batches.append(list(batch))
+
+        pipeline = LogPipeline(slow_sink, LogPipelineConfig(batch_size=10, flush_interval=0.05), bot="test")
+        pipeline.start_async()
+
+        started = time.perf_counter()
+        for i in range(95):
+            assert pipeline.put({"message": str(i), "level": "info"})
+        assert time.perf_counter() - started < 0.05  # No await, no I/O
+
+        await pipeline.aclose()
+        assert all(len(batch) <= 10 for batch in batches)
+        assert [r["message"] for batch in batches for r in batch] == [str(i) for i in range(95)]
+        assert pipeline.shipped == 95
+
+    @pytest.mark.asyncio
+    async def test_flushes_on_interval(self):
+        """Vérifie qu'un lot incomplet part après flush_interval"""
+        shipped = asyncio.Event()
+
+        async def sink(batch, dropped):
+            shipped.set()
+
+        pipeline = LogPipeline(sink, LogPipelineConfig(batch_size=100, flush_interval=0.05), bot="test")
+        pipeline.start_async()
+        pipeline.put({"message": "one", "level": "info"})
+        await asyncio.wait_for(shipped.wait(), 1.0)
+        await pipeline.aclose()
+
+
+class TestBackpressure:
+    """Test sampling and drops when the sink falls behind"""
+
+    def test_samples_low_priority_then_drops(self):
+        """Vérifie l'échantillonnage puis le rejet, les warnings étant conservés"""
+        received = []
+        config = LogPipelineConfig(batch_size=1000, max_queue=100, sample_above=0.5, sample_every=10)
+        pipeline = LogPipeline(lambda batch, dropped: received.append((list(batch), dropped)), config, bot="test")
+
+        for i in range(50):
+            assert pipeline.put({"message": str(i), "level": "info"})
+        kept = sum(pipeline.put({"message": "x", "level": "info"}) for _ in range(100))
+        assert kept == 10
+        assert pipeline.put({"message": "alert", "level": "error"})  # Priority: never sampled
+
+        while len(pipeline) < 100:
+            pipeline.put({"message": "w", "level": "warning"})
+        assert not pipeline.put({"message": "late", "level": "error"})  # Full: dropped
+
+        pipeline.drain()
+        total = sum(len(batch) for batch, _ in received)
+        assert total == 100
+        assert sum(dropped for _, dropped in received) == pipeline.dropped == 91
+
+
+class TestIntegrations:
+    """Test the logging handler and the whale tracker"""
+
+    def test_file_handler_writes_in_batches(self, tmp_path):
+        """Vérifie que le FileHandler est écrit par le thread du pipeline"""
+        path = tmp_path / "bot.log"
+        target = logging.FileHandler(path)
+        target.setFormatter(logging.Formatter('%(levelname)s | %(message)s'))
+        handler = PipelineHandler(target, LogPipelineConfig(flush_interval=0.05), bot="test")
+
+        test_logger = logging.getLogger("test_log_pipeline")
+        test_logger.setLevel(logging.INFO)
+        test_logger.propagate = False
+        test_logger.addHandler(handler)
+        try:
+            for i in range(20):
+                test_logger.info("line %d", i)
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                test_logger.exception("failed")
+        finally:
+            test_logger.removeHandler(handler)
+            handler.close()
+
+        text = path.read_text()
+        assert "INFO | line 0\n" in text and "INFO | line 19\n" in text
+        assert "ERROR | failed" in text and "ValueError: boom" in text
+
+    @pytest.mark.asyncio
+    async def test_whale_tracker_ships_batches(self):
+        """Vérifie que le whale tracker envoie ses logs par lots au dashboard"""
+        import whale_tracker_v4 as wt
+
+        async with StandInServer(StandInConfig(n_markets=5)) as server:
+            http = get_client()
+            http.set_base_url_overrides(server.url_overrides())
+            try:
+                tracker = wt.WhaleTrackerV4()
+                tracker.http = http
+                for i in range(30):
+                    await tracker.log(f"cycle {i}", "info")
+                await tracker.log_pipeline.aclose()
+
+                posts = server.received["/api/tracker/logs"]
+                assert all(isinstance(batch, list) for batch in posts)
+                assert len(posts) < 30
+                assert [entry["message"] for batch in posts for entry in batch] == [f"cycle {i}" for i in range(30)]
+            finally:
+                http.set_base_url_overrides({})
+                await close_client()
+
+
+# Run tests with: pytest tests/test_log_pipeline.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
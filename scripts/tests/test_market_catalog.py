@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared market catalog
+- Secondary indexes (slug, token, symbol, event, expiry)
+- Incremental refresh against the offline stand-in
+- Warm start from disk
+"""
+
+import os
+import sys
+import time
+import pytest
+from datetime import datetime, timedelta, timezone
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from http_client import get_client, close_client
+from market_catalog import CatalogConfig, MarketCatalog
+from mock_polymarket_api import StandInConfig, StandInServer
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def _market(cid: str, question: str, end: datetime, **extra) -> dict:
+    market = {
+        "conditionId": cid,
+        "question": question,
+        "slug": f"slug-{cid}",
+        "clobTokenIds": f'["{cid}-yes", "{cid}-no"]',
+        "endDate": _iso(end),
+        "updatedAt": _iso(datetime.now(timezone.utc)),
+        "events": [{"id": "77", "slug": "crypto-prices"}],
+    }
+    market.update(extra)
+    return market
+
+
+class TestCatalogIndexes:
+    """Test index maintenance on upsert/remove"""
+
+    def test_lookups_by_every_index(self, tmp_path):
+        """Vérifie que chaque index retrouve le marché"""
+        catalog = MarketCatalog(CatalogConfig(cache_file=str(tmp_path / "c.json"), persist=False))
+        now = datetime.now(timezone.utc)
+        catalog.upsert(_market("0xa", "Will Bitcoin be above $100,000?", now + timedelta(days=2)))
+        catalog.upsert(_market("0xb", "ETH price up in 15 min?", now + timedelta(minutes=15)))
+
+        assert catalog.by_slug("slug-0xa")["conditionId"] == "0xa"
+        assert catalog.by_token("0xb-no")["conditionId"] == "0xb"
+        assert [m["conditionId"] for m in catalog.by_symbol("BTC/USDT")] == ["0xa"]
+        assert [m["conditionId"] for m in catalog.by_symbol("ETHUSDT")] == ["0xb"]
+        assert len(catalog.by_event("crypto-prices")) == 2
+        soon = catalog.expiring_between(time.time(), time.time() + 3600)
+        assert [m["conditionId"] for m in soon] == ["0xb"]
+
+    def test_upsert_replaces_stale_index_entries(self, tmp_path):
+        """Vérifie qu'une mise à jour retire les anciennes entrées d'index"""
+        catalog = MarketCatalog(CatalogConfig(cache_file=str(tmp_path / "c.json"), persist=False))
+        end = datetime.now(timezone.utc) + timedelta(days=1)
+        catalog.upsert(_market("0xa", "Will Bitcoin hit $150k?", end))
+        catalog.upsert(_market("0xa", "Will Solana hit $500?", end + timedelta(days=30), slug="renamed"))
+
+        assert catalog.by_symbol("BTC") == []
+        assert len(catalog.by_symbol("SOL")) == 1
+        assert catalog.by_slug("slug-0xa") is None
+        assert catalog.by_slug("renamed") is not None
+        assert len(catalog.expiring_between()) == 1
+
+        catalog.remove("0xa")
+        assert len(catalog) == 0
+        assert catalog.by_token("0xa-yes") is None
+        assert catalog.expiring_between() == []
+
+
+    def test_active_market_filter(self):
+        """Vérifie que seuls les marchés actifs et non clôturés sont retenus"""
+        from market_catalog import is_active_market
+
+        end = datetime.now(timezone.utc) + timedelta(days=1)
+        assert is_active_market(_market("0x1", "Open?", end))
+        assert not is_active_market(_market("0x2", "Resolved?", end, closed=True))
+        assert not is_active_market(_market("0x3", "Paused?", end, active=False))
+
+
+class TestCatalogRefresh:
+    """Test full/incremental refresh and persistence against the stand-in"""
+
+    @pytest.mark.asyncio
+    async def test_incremental_refresh_pages_only_changes(self, tmp_path):
+        """Vérifie qu'un refresh incrémental ne télécharge que les marchés modifiés"""
+        async with StandInServer(StandInConfig(n_markets=250)) as server:
+            http = get_client()
+            http.set_base_url_overrides(server.url_overrides())
+            try:
+                catalog = MarketCatalog(CatalogConfig(cache_file=str(tmp_path / "c.json")))
+                assert await catalog.refresh() == 250
+                assert len(catalog) == 250
+
+                later = _iso(datetime.now(timezone.utc) + timedelta(minutes=5))
+                server.markets[0].update({"question": "Will Ethereum flip Bitcoin?", "updatedAt": later})
+                server.markets[1].update({"closed": True, "updatedAt": later})
+                server.markets.append(_market("0xnew", "Will XRP reach $5?",
+                                              datetime.now(timezone.utc) + timedelta(days=9),
+                                              updatedAt=later))
+
+                requests_before = server.request_count
+                assert await catalog.refresh(force=True) == 3
+                assert server.request_count - requests_before == 1
+                assert len(catalog) == 250
+                assert catalog.get(server.markets[1]["conditionId"]) is None
+                assert catalog.get("0xnew") is not None
+                assert catalog.get(server.markets[0]["conditionId"]) in catalog.by_symbol("ETH")
+
+                # Warm start: a fresh instance loads the persisted set without the API
+                warm = MarketCatalog(CatalogConfig(cache_file=str(tmp_path / "c.json")))
+                assert len(warm) == 250
+                assert warm.watermark == catalog.watermark
+                requests_before = server.request_count
+                assert await warm.refresh() == 0
+                assert server.request_count == requests_before
+
+                # Same updatedAt as the watermark, listed after it: still picked up, once
+                server.markets.append(_market("0xtie", "Will Solana reach $500?",
+                                              datetime.now(timezone.utc) + timedelta(days=3),
+                                              updatedAt=later))
+                assert await catalog.refresh(force=True) == 1
+                assert catalog.get("0xtie") is not None
+                assert await catalog.refresh(force=True) == 0
+            finally:
+                http.set_base_url_overrides({})
+                await close_client()
+
+
+# Run tests with: pytest tests/test_market_catalog.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the metrics registry
+- HDR-style histogram percentiles
+- Prometheus text exposition and the local HTTP endpoint
+- Fetch latency recorded by the shared HTTP client
+"""
+
+import os
+import random
+import sys
+import urllib.request
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from metrics import Histogram, MetricsRegistry, endpoint_label, get_registry, start_metrics_server, stop_metrics_servers
+from http_client import get_client, close_client
+from mock_polymarket_api import StandInConfig, StandInServer
+
+
+class TestHistogram:
+    """Test log-linear histogram accuracy"""
+
+    def test_percentiles_within_bucket_error(self):
+        """Vérifie que les percentiles restent à ~2% des valeurs exactes"""
+        rng = random.Random(3)
+        values = sorted(rng.lognormvariate(-4, 1.5) for _ in range(20000))
+        histogram = Histogram()
+        for value in values:
+            histogram.observe(value)
+
+        for q in (50, 90, 99, 99.9):
+            exact = values[int(q / 100 * len(values)) - 1]
+            assert histogram.percentile(q) == pytest.approx(exact, rel=0.04, abs=2e-6)
+        assert histogram.count == len(values)
+        assert histogram.percentile(100) == values[-1]
+
+
+class TestExposition:
+    """Test Prometheus text format and serving"""
+
+    def test_render_and_serve(self):
+        """Vérifie le format texte Prometheus et le endpoint HTTP local"""
+        registry = MetricsRegistry()
+        registry.counter("jobs_total", "Jobs", ("kind",)).labels(kind='a"b').inc(3)
+        registry.gauge("depth", "Queue depth").set(7)
+        histogram = registry.histogram("latency_seconds", "Latency", ("stage",)).labels(stage="fetch")
+        histogram.observe(0.003)
+        histogram.observe(0.2)
+
+        text = registry.render()
+        assert '# TYPE jobs_total counter' in text
+        assert 'jobs_total{kind="a\\"b"} 3' in text
+        assert "depth 7" in text
+        assert 'latency_seconds_bucket{stage="fetch",le="0.005"} 1' in text
+        assert 'latency_seconds_bucket{stage="fetch",le="+Inf"} 2' in text
+        assert 'latency_seconds_count{stage="fetch"} 2' in text
+
+        get_registry().gauge("test_metrics_marker", "Marker").set(1)
+        port = start_metrics_server(port=0)
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as resp:
+                body = resp.read().decode()
+                assert resp.headers["Content-Type"].startswith("text/plain")
+            assert "test_metrics_marker 1" in body
+        finally:
+            stop_metrics_servers()
+
+    def test_endpoint_label_collapses_ids(self):
+        """Vérifie que les identifiants sont regroupés dans les labels"""
+        assert endpoint_label("https://gamma-api.polymarket.com/markets/0xabc123/holders") == \
+            "gamma-api.polymarket.com/markets/:id/holders"
+        assert endpoint_label("https://clob.polymarket.com/book?token_id=1") == "clob.polymarket.com/book"
+
+
+class TestHttpInstrumentation:
+    """Test fetch latency recorded by the shared client"""
+
+    @pytest.mark.asyncio
+    async def test_requests_are_timed_per_logical_endpoint(self):
+        """Vérifie que la latence est enregistrée sous l'URL amont logique"""
+        async with StandInServer(StandInConfig(n_markets=10)) as server:
+            http = get_client()
+            http.set_base_url_overrides(server.url_overrides())
+            try:
+                family = get_registry().histogram("http_request_duration_seconds")
+                key = ("clob.polymarket.com/book",)
+                before = family.children[key].count if key in family.children else 0
+                for _ in range(3):
+                    await http.get_json("https://clob.polymarket.com/book", params={"token_id": "1"})
+                assert family.children[key].count == before + 3
+                assert 'endpoint="clob.polymarket.com/book",status="200"' in get_registry().render()
+            finally:
+                http.set_base_url_overrides({})
+                await close_client()
+
+
+# Run tests with: pytest tests/test_metrics.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
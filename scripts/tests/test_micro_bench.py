@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the microbenchmark suite
+- Every case runs on small synthetic inputs
+- Baseline comparison flags regressions only past the threshold
+"""
+
+import json
+import os
+import sys
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+import micro_bench
+import price_updater
+
+
+class TestCases:
+    """Test that every benchmark case runs"""
+
+    def test_all_cases_run_small(self, monkeypatch):
+        """Vérifie que chaque cas s'exécute sur des entrées de taille 10 et 50"""
+        monkeypatch.setattr(price_updater, "store", None)
+        results = micro_bench.run_cases(list(micro_bench.CASES), (10, 50), min_time=0)
+
+        assert set(results) == {f"{name}[{n}]" for name in micro_bench.CASES for n in (10, 50)}
+        assert all(ns > 0 for ns in results.values())
+
+    def test_stored_baseline_covers_all_cases(self):
+        """Vérifie que la baseline enregistrée couvre tous les cas de 10 à 1M"""
+        baseline = micro_bench.load_baseline(micro_bench.BASELINE_FILE)
+        for name in micro_bench.CASES:
+            for n in micro_bench.FULL_SIZES:
+                assert f"{name}[{n}]" in baseline
+
+
+class TestBaseline:
+    """Test regression detection and baseline files"""
+
+    def test_compare_flags_only_past_threshold(self):
+        """Vérifie que seules les régressions au-delà du seuil sont signalées"""
+        baseline = {"a[10]": 100.0, "b[10]": 100.0, "c[10]": 100.0}
+        results = {"a[10]": 140.0, "b[10]": 160.0, "c[10]": 50.0, "new[10]": 1e9}
+
+        regressions = micro_bench.compare(results, baseline, threshold=0.5, floor_ns=0)
+        assert [r[0] for r in regressions] == ["b[10]"]
+        assert regressions[0][3] == pytest.approx(1.6)
+
+    def test_compare_skips_calls_under_noise_floor(self):
+        """Vérifie que les appels trop courts pour être chronométrés ne sont pas signalés"""
+        baseline = {"a[10]": 858.5, "a[1000]": 1036.1, "b[10]": 9000.0}
+        # 1.68x on an 8.6 us call is noise; the same ratio on 1 ms calls is not
+        results = {"a[10]": 858.5 * 1.68, "a[1000]": 1036.1 * 1.68, "b[10]": 20000.0}
+
+        regressions = micro_bench.compare(results, baseline, threshold=0.5)
+        assert [r[0] for r in regressions] == ["a[1000]", "b[10]"]  # b[10] now takes 200 us
+
+    def test_save_merges_into_existing_baseline(self, tmp_path):
+        """Vérifie que l'enregistrement conserve les autres entrées"""
+        path = tmp_path / "baseline.json"
+        micro_bench.save_baseline(path, {"a[10]": 1.0, "b[10]": 2.0})
+        micro_bench.save_baseline(path, {"b[10]": 3.0})
+
+        assert micro_bench.load_baseline(path) == {"a[10]": 1.0, "b[10]": 3.0}
+        assert "machine" in json.loads(path.read_text())
+
+
+# Run tests with: pytest tests/test_micro_bench.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for fixed-point micro-USDC arithmetic
+- Same values as Decimal quantize(0.000001, ROUND_DOWN)
+- Exact sums: no float drift in balances
+- CryptoOracle sizing / hedging and price updater closes in fixed-point
+"""
+
+import os
+import random
+import sys
+from decimal import Decimal, ROUND_DOWN
+from unittest.mock import MagicMock, patch
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from money import Micros
+
+Q = Decimal("0.000001")
+
+
+class TestMicros:
+    """Test the fixed-point type against Decimal"""
+
+    def test_matches_decimal_quantize(self):
+        """Vérifie l'égalité avec Decimal(str(x)).quantize(ROUND_DOWN) sur conversions, produits et quotients"""
+        rng = random.Random(5)
+        for _ in range(5000):
+            a = round(rng.uniform(-1000, 1000), rng.randint(0, 9))
+            b = round(rng.uniform(0.001, 1), rng.randint(2, 8))
+            da = Decimal(str(a)).quantize(Q, rounding=ROUND_DOWN)
+            db = Decimal(str(b)).quantize(Q, rounding=ROUND_DOWN)
+            ma, mb = Micros.from_float(a), Micros.from_float(b)
+
+            assert ma.to_decimal() == da
+            assert (ma * mb).to_decimal() == (da * db).quantize(Q, rounding=ROUND_DOWN)
+            if db:
+                assert (ma / mb).to_decimal() == (da / db).quantize(Q, rounding=ROUND_DOWN)
+
+    def test_no_drift_on_running_sums(self):
+        """Vérifie qu'un million d'additions de 0,10 $ restent exactes"""
+        total = Micros()
+        dime = Micros.from_float(0.1)
+        for _ in range(1_000_000):
+            total += dime
+        assert total == 100_000 and str(total) == "100000.000000"
+
+        drift = 0.0
+        for _ in range(1_000_000):
+            drift += 0.1
+        assert drift != 100_000  # What the floats did
+
+    def test_ticks_formatting_and_comparisons(self):
+        """Vérifie l'arrondi au tick, le formatage et les comparaisons avec les nombres"""
+        tick = Micros.from_float(0.01)
+        assert Micros.from_float(0.392).round_to_tick(tick) == Micros.from_float(0.39)
+        assert Micros.from_float(0.6565).round_to_tick(tick, up=True) == 0.66
+        assert str(Micros.from_float(-1.5)) == "-1.500000" and f"{Micros.from_float(2.345):.2f}" == "2.35"
+        assert Micros.from_float(0.57).micros == 570_000  # 0.57 * 1e6 = 569999.9999999999 in floats
+        assert Micros.of(1) > 0.99 and Micros() <= 0 and not Micros()
+        assert hash(Micros.of(2)) == hash(2)
+        with pytest.raises(ZeroDivisionError):
+            Micros.of(1) / Micros()
+
+
+class TestConsumers:
+    """Test the oracle and price updater money paths"""
+
+    @pytest.fixture
+    def oracle(self, tmp_path):
+        from crypto_oracle_v1_prod import CryptoOracle, OracleConfig
+
+        with patch.dict(os.environ, {"POLY_PRIVATE_KEY": "0x" + "a" * 64}, clear=True):
+            with patch('crypto_oracle_v1_prod.ClobClient'):
+                oracle = CryptoOracle(OracleConfig(journal_dir=str(tmp_path)))
+        oracle.clob_client = MagicMock()
+        oracle.clob_client.create_order.return_value = {"orderID": "o1"}
+        return oracle
+
+    @pytest.mark.asyncio
+    async def test_oracle_buy_then_hedge(self, oracle):
+        """Vérifie taille, prix au tick et couverture de la position en virgule fixe"""
+        from crypto_oracle_v1_prod import Bias, DiscrepancySignal, SentimentResult
+
+        sentiment = SentimentResult(bias=Bias.BULLISH, score=0.8, smart_wallets_count=10,
+                                    total_yes_exposure=100, total_no_exposure=0, confidence=1.0)
+        discrepancy = DiscrepancySignal(is_overreaction=True, spot_price=100_000, spot_change_pct=-1,
+                                        poly_price=0.40, poly_change_pct=-20, fair_value_estimate=0.6, alpha=0.2)
+        assert oracle.execute_dip_buy("m1", "t1", sentiment, discrepancy) == "o1"
+
+        buy = oracle.clob_client.create_order.call_args.args[0]
+        position = oracle.positions["m1"]
+        assert position.entry_price == Micros.from_float(0.39)  # 0.392 down to the 0.01 tick
+        assert position.shares == Micros.from_float(oracle.config.max_position_size) / position.entry_price
+        assert (buy.price, buy.size) == (0.39, float(position.shares))
+
+        async def poly_price(market_id, outcome="YES"):
+            return 0.55
+        oracle.get_poly_price = poly_price
+        shares_before = position.shares
+        assert await oracle.manage_position("m1") == "o1"
+
+        sell = oracle.clob_client.create_order.call_args.args[0]
+        assert sell.side == "SELL" and sell.price == 0.56  # 0.5555 up to the tick
+        sold = shares_before - position.shares
+        assert position.hedge_amount == sold * Micros.from_float(0.55)
+        assert position.is_hedged
+
+    def test_price_updater_close_credits_exactly(self):
+        """Vérifie que les clôtures créditent solde et P&L sans dérive"""
+        import price_updater as pu
+
+        profiles = [{"id": "p", "isActive": True, "balance": 1000.0, "totalPnL": 0.0,
+                     "winningTrades": 0, "losingTrades": 0}]
+        for i in range(1000):
+            order = {"id": str(i), "marketId": f"m{i}", "outcome": "YES", "entryPrice": 0.3,
+                     "shares": 1.0, "amount": 0.3}
+            pu.close_order(order, profiles, 0.4, "TP2")
+            assert order["pnl"] == 0.1
+
+        assert profiles[0]["balance"] == 1400.0  # 1000 + 1000 x (0.3 cost + 0.1 pnl)
+        assert profiles[0]["totalPnL"] == 100.0
+        assert profiles[0]["winningTrades"] == 1000
+
+
+# Run tests with: pytest tests/test_money.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
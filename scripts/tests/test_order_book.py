@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental L2 order book
+- Snapshot reconciliation and hash checks
+- Delta application on the tick grid
+- Mid / microprice / depth-to-size / VWAP-to-fill queries
+"""
+
+import os
+import random
+import sys
+from unittest.mock import AsyncMock, patch
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from order_book import OrderBook, OrderBookStore, compute_book_hash
+from http_client import get_client
+from mock_polymarket_api import book_hash, synthetic_book
+
+
+def _snapshot(bids, asks, timestamp="1000", tick_size="0.01"):
+    book = {
+        "market": "0xm", "asset_id": "t1", "timestamp": timestamp, "hash": "",
+        # Real API order: bids ascending, asks descending
+        "bids": [{"price": p, "size": s} for p, s in sorted(bids)],
+        "asks": [{"price": p, "size": s} for p, s in sorted(asks, reverse=True)],
+        "min_order_size": "5", "tick_size": tick_size, "neg_risk": False, "last_trade_price": "0.50",
+    }
+    book["hash"] = book_hash(book)
+    return book
+
+
+class TestSnapshotAndDeltas:
+    """Test snapshot reconciliation, deltas and hash checks"""
+
+    def test_snapshot_hash_and_top_of_book(self):
+        """Vérifie que le snapshot est vérifié et que le meilleur niveau est en fin de liste"""
+        book = OrderBook("t1")
+        snap = _snapshot([("0.40", "10"), ("0.45", "5")], [("0.60", "10"), ("0.55", "7")])
+        assert book.apply_snapshot(snap)
+        assert book.hash_verified
+        assert book.top() == (0.45, 5.0, 0.55, 7.0)
+        assert book.book_hash() == snap["hash"]
+
+        tampered = dict(snap, hash="0" * 40)
+        assert not book.apply_snapshot(tampered)
+
+    def test_deltas_match_server_hash(self):
+        """Vérifie qu'une suite de deltas reproduit le hash d'un snapshot complet"""
+        book = OrderBook("t1", hash_check_every=1)
+        book.apply_snapshot(_snapshot([("0.40", "10")], [("0.60", "10")]))
+        book.apply_delta("BUY", "0.42", "25", timestamp=1001)
+        book.apply_delta("SELL", "0.60", "0", timestamp=1002)
+        server = _snapshot([("0.40", "10"), ("0.42", "25")], [("0.58", "3")], timestamp="1003")
+        assert book.apply_delta("SELL", "0.58", "3", timestamp=1003, expected_hash=server["hash"])
+        assert not book.needs_resync
+
+        # Wrong hash flags the book for resync
+        assert not book.apply_delta("SELL", "0.57", "1", timestamp=1004, expected_hash=server["hash"])
+        assert book.needs_resync
+
+    def test_stale_deltas_ignored_and_grid_refined(self):
+        """Vérifie que les deltas antérieurs au snapshot sont ignorés et que la grille s'affine"""
+        book = OrderBook("t1")
+        book.apply_snapshot(_snapshot([("0.40", "10")], [("0.60", "10")], timestamp="5000"))
+        book.apply_delta("BUY", "0.50", "10", timestamp=4999)
+        assert book.best_bid == 0.40 and book.stale_deltas == 1
+
+        book.apply_delta("BUY", "0.455", "4", timestamp=5001)
+        assert book.best_bid == 0.455
+        assert book.levels("bids") == [(0.455, 4.0), (0.40, 10.0)]
+
+
+class TestQueries:
+    """Test price/depth queries"""
+
+    def test_vwap_depth_and_microprice(self):
+        """Vérifie VWAP, profondeur et microprice"""
+        book = OrderBook("t1")
+        book.apply_snapshot(_snapshot(
+            [("0.48", "100"), ("0.47", "200")],
+            [("0.52", "50"), ("0.53", "100"), ("0.55", "1000")],
+        ))
+        assert book.mid() == pytest.approx(0.50)
+        assert book.spread() == pytest.approx(0.04)
+        # Less resting ask size pushes the microprice toward the ask
+        assert book.microprice() == pytest.approx((0.48 * 50 + 0.52 * 100) / 150)
+
+        assert book.depth_to_size("BUY", 120) == 0.53
+        assert book.vwap_to_fill("BUY", 120) == pytest.approx((50 * 0.52 + 70 * 0.53) / 120)
+        assert book.vwap_to_fill("SELL", 150) == pytest.approx((100 * 0.48 + 50 * 0.47) / 150)
+        assert book.vwap_to_fill("SELL", 301) is None
+        assert book.depth("asks", through_price=0.53) == pytest.approx(150)
+        assert book.depth("bids") == pytest.approx(300)
+
+    def test_matches_naive_book_under_random_deltas(self):
+        """Vérifie que le livre incrémental suit un livre naïf (dict trié)"""
+        rng = random.Random(7)
+        book = OrderBook("t1")
+        book.apply_snapshot(synthetic_book("t1", 30, rng))
+        naive = {side: {p: s for p, s in book.levels(side)} for side in ("bids", "asks")}
+
+        for _ in range(2000):
+            side = rng.choice(["bids", "asks"])
+            price = round(rng.uniform(0.001, 0.999), 3)
+            size = 0.0 if rng.random() < 0.3 else round(rng.uniform(1, 500), 2)
+            book.apply_delta("BUY" if side == "bids" else "SELL", f"{price:.3f}", f"{size:.2f}")
+            if size:
+                naive[side][price] = size
+            else:
+                naive[side].pop(price, None)
+
+        asks = sorted(naive["asks"].items())
+        bids = sorted(naive["bids"].items(), reverse=True)
+        assert book.levels("asks") == asks
+        assert book.levels("bids") == bids
+
+        target = sum(s for _, s in asks) / 3
+        filled, cost = 0.0, 0.0
+        for price, size in asks:
+            take = min(size, target - filled)
+            filled, cost = filled + take, cost + take * price
+            if filled >= target:
+                break
+        assert book.vwap_to_fill("BUY", target) == pytest.approx(cost / target)
+
+
+class TestStore:
+    """Test WS event routing into shared books"""
+
+    def test_store_applies_market_channel_events(self):
+        """Vérifie que le store applique book, price_change et tick_size_change"""
+        store = OrderBookStore()
+        snap = _snapshot([("0.40", "10")], [("0.60", "10")])
+        assert store.apply_event(dict(snap, event_type="book")) == ["t1"]
+        touched = store.apply_event({"event_type": "price_change", "timestamp": "1001", "price_changes": [
+            {"asset_id": "t1", "price": "0.41", "size": "5", "side": "BUY"},
+            {"asset_id": "unknown", "price": "0.41", "size": "5", "side": "BUY"},
+        ]})
+        assert touched == ["t1"]
+        assert store.get("t1").best_bid == 0.41
+
+        store.apply_event({"event_type": "tick_size_change", "asset_id": "t1", "new_tick_size": "0.001"})
+        assert store.get("t1").tick_size == pytest.approx(0.001)
+        assert store.get("t1").top() == (0.41, 5.0, 0.60, 10.0)
+        assert compute_book_hash(snap) == snap["hash"]
+
+    @pytest.mark.asyncio
+    async def test_throwaway_snapshot_not_stored(self):
+        """Vérifie qu'un snapshot ponctuel (keep=False) ne fait pas grossir le store"""
+        store = OrderBookStore()
+        snap = _snapshot([("0.40", "10")], [("0.60", "10")])
+        with patch.object(get_client(), "get_json", AsyncMock(return_value=snap)):
+            book = await store.fetch_snapshot("t1", keep=False)
+            assert book.top() == (0.40, 10.0, 0.60, 10.0)
+            assert store.books == {}
+
+            assert await store.fetch_snapshot("t1") is store.get("t1")
+
+
+# Run tests with: pytest tests/test_order_book.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
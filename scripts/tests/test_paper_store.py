@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite paper trading store
+- Migration from the legacy JSON files
+- Row-level updates and the JSON mirror read by the dashboard
+- Balance totals aggregate
+"""
+
+import json
+import os
+import sys
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from paper_store import PaperStore, PaperStoreConfig
+
+
+def _order(i: int, status: str = "OPEN", **extra) -> dict:
+    order = {"id": f"o{i}", "marketId": f"m{i % 3}", "status": status,
+             "entryPrice": 0.5, "amount": 10.0, "shares": 20.0}
+    order.update(extra)
+    return order
+
+
+def _write_legacy(tmp_path, orders, profiles):
+    (tmp_path / "server_paper_orders.json").write_text(json.dumps(orders, indent=2))
+    (tmp_path / "server_paper_profiles.json").write_text(json.dumps(profiles, indent=2))
+
+
+class TestMigrationAndMirror:
+    """Test JSON migration, row-level writes and dashboard sync"""
+
+    def test_migrates_then_updates_rows(self, tmp_path):
+        """Vérifie la migration puis la mise à jour ligne par ligne"""
+        orders = [_order(i) for i in range(5)] + [_order(9, "CLOSED", pnl=2.0, exitPrice=0.6)]
+        _write_legacy(tmp_path, orders, [{"id": "p1", "isActive": True, "balance": 1000.0}])
+
+        store = PaperStore(PaperStoreConfig(data_dir=tmp_path, export_interval=0))
+        assert store.count() == 6
+        assert [o["id"] for o in store.open_orders()] == ["o0", "o1", "o2", "o3", "o4"]
+        assert [o["id"] for o in store.orders(market_id="m0")] == ["o0", "o3", "o9"]
+        assert store.active_profile()["id"] == "p1"
+
+        order = store.get_order("o1")
+        order.update(status="CLOSED", exitPrice=0.7, pnl=4.0)
+        assert store.save_orders([order]) == 1
+        assert store.count(status="OPEN") == 4
+
+        # Export keeps the dashboard's file shape and order
+        assert store.export_json()
+        exported = json.loads((tmp_path / "server_paper_orders.json").read_text())
+        assert [o["id"] for o in exported] == [o["id"] for o in orders]
+        assert exported[1]["status"] == "CLOSED"
+        # Nothing changed since: no rewrite
+        assert not store.export_json()
+
+        # A restart reopens the database instead of re-migrating
+        store.close()
+        reopened = PaperStore(PaperStoreConfig(data_dir=tmp_path))
+        assert reopened.get_order("o1")["pnl"] == 4.0
+
+    def test_imports_dashboard_edits(self, tmp_path):
+        """Vérifie que les ordres créés ou supprimés par le dashboard sont importés"""
+        _write_legacy(tmp_path, [_order(1), _order(2)], [{"id": "p1", "isActive": True}])
+        store = PaperStore(PaperStoreConfig(data_dir=tmp_path, export_interval=0))
+
+        # Local change not yet exported must survive a concurrent dashboard write
+        local = dict(store.get_order("o1"), currentPrice=0.8)
+        store.save_orders([local])
+        _write_legacy(tmp_path, [_order(1), _order(3)], [{"id": "p1", "isActive": True}, {"id": "p2"}])
+        os.utime(tmp_path / "server_paper_orders.json", ns=(1, 1))
+
+        assert store.import_json() > 0
+        assert store.get_order("o1")["currentPrice"] == 0.8
+        assert store.get_order("o2") is None
+        assert store.get_order("o3") is not None
+        assert len(store.profiles()) == 2
+
+
+class TestDashboardInterleaving:
+    """Test dashboard edits racing the price updater's unexported ticks"""
+
+    @staticmethod
+    def _dashboard_write(tmp_path, name, payload, tick):
+        path = tmp_path / name
+        path.write_text(json.dumps(payload, indent=2))
+        os.utime(path, ns=(tick, tick))  # Distinct stamp even within one mtime granule
+
+    def test_dashboard_close_survives_price_ticks(self, tmp_path):
+        """Vérifie qu'une clôture ou suppression du dashboard n'est pas écrasée par les ticks de prix"""
+        _write_legacy(tmp_path, [_order(1), _order(2), _order(3)],
+                      [{"id": "p1", "isActive": True, "balance": 1000.0, "winningTrades": 0}])
+        store = PaperStore(PaperStoreConfig(data_dir=tmp_path, export_interval=0))
+        store.export_json(force=True)
+
+        # Cycle N: price ticks on every open order, not exported yet
+        assert store.save_orders([dict(o, currentPrice=0.55) for o in store.open_orders()]) == 3
+        assert store.save_orders(store.open_orders()) == 0  # Unchanged rows are not dirtied
+
+        # Dashboard: PATCH closes o1 and credits the profile, DELETE removes o2
+        orders = json.loads((tmp_path / "server_paper_orders.json").read_text())
+        orders[0].update(status="CLOSED", exitPrice=0.6, pnl=2.0)
+        self._dashboard_write(tmp_path, "server_paper_orders.json", [orders[0], orders[2]], 1)
+        self._dashboard_write(tmp_path, "server_paper_profiles.json",
+                              [{"id": "p1", "isActive": True, "balance": 1012.0, "winningTrades": 1}], 1)
+
+        # Cycle N+1: TP on o3 credits the local profile, then export
+        assert [o["id"] for o in store.open_orders()] == ["o1", "o2", "o3"]
+        store.import_json()
+        assert [o["id"] for o in store.open_orders()] == ["o3"]
+        store.save_orders([dict(store.get_order("o3"), status="CLOSED", pnl=1.0)])
+        store.save_profiles([dict(store.active_profile(), balance=store.active_profile()["balance"] + 11.0,
+                                  winningTrades=store.active_profile()["winningTrades"] + 1)])
+        assert store.export_json()
+
+        exported = {o["id"]: o for o in json.loads((tmp_path / "server_paper_orders.json").read_text())}
+        assert set(exported) == {"o1", "o3"}
+        assert exported["o1"]["status"] == "CLOSED" and exported["o1"]["currentPrice"] == 0.55
+        assert store.get_order("o1")["status"] == "CLOSED" and store.get_order("o2") is None
+        assert store.get_order("o3")["status"] == "CLOSED"
+
+        # Both credits counted once each
+        profile = json.loads((tmp_path / "server_paper_profiles.json").read_text())[0]
+        assert (profile["balance"], profile["winningTrades"]) == (1023.0, 2)
+        assert store.active_profile() == profile
+
+    def test_mirror_keeps_full_history_by_default(self, tmp_path):
+        """Vérifie que le miroir porte tout l'historique par défaut (stats et suppressions du dashboard)"""
+        orders = [_order(i, "CLOSED", pnl=1.0) for i in range(10)] + [_order(10)]
+        _write_legacy(tmp_path, orders, [])
+        store = PaperStore(PaperStoreConfig(data_dir=tmp_path, export_interval=0))
+        assert store.config.mirror_history == -1
+
+        store.save_orders([dict(store.get_order("o10"), currentPrice=0.7)])
+        assert store.export_json()
+        exported = json.loads((tmp_path / "server_paper_orders.json").read_text())
+        assert [o["id"] for o in exported] == [f"o{i}" for i in range(11)]
+
+    def test_mirror_is_bounded(self, tmp_path):
+        """Vérifie que le miroir ne porte que les ordres ouverts et l'historique récent"""
+        orders = [_order(i, "CLOSED", pnl=1.0) for i in range(10)] + [_order(10), _order(11)]
+        _write_legacy(tmp_path, orders, [])
+        store = PaperStore(PaperStoreConfig(data_dir=tmp_path, export_interval=0, mirror_history=2))
+
+        store.save_orders([dict(store.get_order("o10"), currentPrice=0.7)])
+        assert store.export_json()
+        exported = json.loads((tmp_path / "server_paper_orders.json").read_text())
+        assert [o["id"] for o in exported] == ["o8", "o9", "o10", "o11"]
+
+        # The dashboard rewrites the short file: older history is not deleted
+        self._dashboard_write(tmp_path, "server_paper_orders.json", exported + [_order(12)], 1)
+        store.import_json()
+        assert store.count() == 13 and store.count(status="CLOSED") == 10
+
+
+class TestBalanceTotals:
+    """Test the reconciliation aggregate"""
+
+    def test_totals_match_python_scan(self, tmp_path):
+        """Vérifie que l'agrégat SQL reproduit le calcul de sync_balance"""
+        orders = [
+            _order(1, amount=15.0),
+            _order(2, "CLOSED", originalAmount=20.0, pnl=5.0, exitPrice=0.6),
+            _order(3, "CLOSED", originalAmount=10.0, pnl=-3.0, exitPrice=0.35),
+            _order(4, "CLOSED", pnl=-1.0, shares=0),  # No fill: not settled
+            _order(5, "CANCELLED"),
+        ]
+        _write_legacy(tmp_path, orders, [])
+        totals = PaperStore(PaperStoreConfig(data_dir=tmp_path)).balance_totals()
+
+        assert totals["open_count"] == 1 and totals["closed_count"] == 3
+        assert totals["open_invested"] == pytest.approx(15.0)
+        assert totals["closed_invested"] == pytest.approx(40.0)
+        assert totals["settled_recovered"] == pytest.approx(25.0 + 7.0)
+        assert totals["settled_pnl"] == pytest.approx(2.0)
+        assert (totals["settled_wins"], totals["settled_losses"]) == (1, 1)
+        assert totals["closed_pnl"] == pytest.approx(1.0)
+        assert (totals["closed_wins"], totals["closed_losses"]) == (1, 2)
+        assert totals["exit_value"] == pytest.approx(20 * 0.6 + 20 * 0.35)
+
+
+# Run tests with: pytest tests/test_paper_store.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
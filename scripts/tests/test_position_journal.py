@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the durable position journal
+- Append / recover round trip, torn tail
+- Snapshot compaction and replay after a crash mid-compaction
+- Batched fsync
+- CryptoOracle positions and counters survive a restart
+"""
+
+import json
+import os
+import sys
+import time
+from unittest.mock import MagicMock, patch
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from position_journal import OP_COUNTERS, OP_HEDGE, OP_OPEN, JournalConfig, PositionJournal
+
+
+def _position(i: int, hedged: bool = False) -> dict:
+    return {"market_id": f"m{i}", "shares": 1_000_000 * i, "is_hedged": hedged}
+
+
+class TestJournal:
+    """Test PositionJournal"""
+
+    def test_round_trip_and_torn_tail(self, tmp_path):
+        """Vérifie la relecture après redémarrage et l'abandon d'une dernière ligne tronquée"""
+        journal = PositionJournal(JournalConfig(data_dir=tmp_path))
+        journal.recover()
+        journal.append(OP_OPEN, market_id="m1", position=_position(1))
+        journal.append(OP_OPEN, market_id="m2", position=_position(2))
+        journal.append(OP_HEDGE, market_id="m1", position=_position(1, hedged=True))
+        journal.append(OP_COUNTERS, daily_trades=2, last_trade_time="2026-01-01T10:00:00", trade_day="2026-01-01")
+        journal.close()
+
+        # Crash in the middle of the next write
+        with open(journal.config.journal_file, "ab") as f:
+            f.write(b'{"seq":5,"op":"open","market_id":"m3","posi')
+
+        restarted = PositionJournal(JournalConfig(data_dir=tmp_path))
+        state = restarted.recover()
+        assert set(state["positions"]) == {"m1", "m2"}
+        assert state["positions"]["m1"]["is_hedged"] is True
+        assert state["daily_trades"] == 2 and state["trade_day"] == "2026-01-01"
+
+        # The torn bytes are cut off: new records stay readable
+        restarted.append(OP_OPEN, market_id="m3", position=_position(3))
+        restarted.close()
+        assert set(PositionJournal(JournalConfig(data_dir=tmp_path)).recover()["positions"]) == {"m1", "m2", "m3"}
+
+    def test_compaction_and_crash_before_truncate(self, tmp_path):
+        """Vérifie la compaction en instantané et l'idempotence si le journal n'a pas été tronqué"""
+        config = JournalConfig(data_dir=tmp_path, compact_after=10)
+        journal = PositionJournal(config)
+        for i in range(25):
+            journal.append(OP_OPEN, market_id=f"m{i % 7}", position=_position(i))
+        journal.close()
+
+        assert json.loads(config.snapshot_file.read_text())["seq"] == 20
+        lines = config.journal_file.read_bytes().splitlines()
+        assert len(lines) == 5
+
+        # Crash after the snapshot replace but before the truncate: old records are replayed again
+        stale = [json.dumps({"seq": s, "op": OP_OPEN, "market_id": "m0", "position": _position(-1)}).encode()
+                 for s in (3, 4)]
+        config.journal_file.write_bytes(b"\n".join(stale + lines) + b"\n")
+        state = PositionJournal(config).recover()
+        assert len(state["positions"]) == 7
+        assert state["positions"]["m0"] == _position(21)  # Last write wins, stale seqs skipped
+
+    def test_fsync_is_batched(self, tmp_path):
+        """Vérifie qu'une rafale d'écritures partage un seul fsync"""
+        journal = PositionJournal(JournalConfig(data_dir=tmp_path, fsync_interval=0.05))
+        journal.recover()
+        with patch("position_journal.os.fsync") as fsync:
+            for i in range(200):
+                journal.append(OP_OPEN, market_id=f"m{i}", position=_position(i))
+            time.sleep(0.2)
+            assert 1 <= fsync.call_count <= 2
+        journal.close()
+
+    def test_recovery_is_fast(self, tmp_path):
+        """Vérifie qu'un snapshot de 1000 positions plus 1000 enregistrements se relit en millisecondes"""
+        config = JournalConfig(data_dir=tmp_path, compact_after=1000)
+        journal = PositionJournal(config)
+        for i in range(1999):
+            journal.append(OP_OPEN, market_id=f"m{i % 1000}", position=_position(i))
+        journal.close()
+
+        started = time.perf_counter()
+        state = PositionJournal(config).recover()
+        assert time.perf_counter() - started < 0.2
+        assert len(state["positions"]) == 1000
+
+
+class TestOracleRestart:
+    """Test CryptoOracle.restore_state"""
+
+    @pytest.mark.asyncio
+    async def test_positions_survive_restart(self, tmp_path):
+        """Vérifie que positions, couverture et compteurs sont restaurés après un redémarrage"""
+        from crypto_oracle_v1_prod import (Bias, CryptoOracle, DiscrepancySignal, OracleConfig,
+                                           SentimentResult)
+
+        def make_oracle():
+            with patch.dict(os.environ, {"POLY_PRIVATE_KEY": "0x" + "a" * 64}, clear=True):
+                with patch('crypto_oracle_v1_prod.ClobClient'):
+                    oracle = CryptoOracle(OracleConfig(journal_dir=str(tmp_path)))
+            oracle.clob_client = MagicMock()
+            oracle.clob_client.create_order.side_effect = [{"orderID": "buy-1"}, {"orderID": "sell-1"}]
+            return oracle
+
+        oracle = make_oracle()
+        oracle.restore_state()
+        sentiment = SentimentResult(bias=Bias.BULLISH, score=0.8, smart_wallets_count=10,
+                                    total_yes_exposure=100, total_no_exposure=0, confidence=1.0)
+        discrepancy = DiscrepancySignal(is_overreaction=True, spot_price=100_000, spot_change_pct=-1,
+                                        poly_price=0.40, poly_change_pct=-20, fair_value_estimate=0.6, alpha=0.2)
+        oracle.execute_dip_buy("m1", "t1", sentiment, discrepancy)
+
+        async def poly_price(market_id, outcome="YES"):
+            return 0.55
+        oracle.get_poly_price = poly_price
+        await oracle.manage_position("m1")
+        before = oracle.positions["m1"]
+        oracle.journal.close()
+
+        restarted = make_oracle()
+        assert restarted.restore_state() == 1
+        after = restarted.positions["m1"]
+        assert after == before
+        assert (after.order_id, after.hedge_order_id, after.is_hedged) == ("buy-1", "sell-1", True)
+        assert restarted.daily_trades == 1
+        assert restarted.last_trade_time == oracle.last_trade_time
+        restarted.journal.close()
+
+
+# Run tests with: pytest tests/test_position_journal.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the typed-array price history ring
+- Ring order and overwrite
+- Binary-search lookback at any horizon
+- CryptoOracle baseline from 5 minutes ago
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from price_history import PriceHistory
+
+
+class TestRing:
+    """Test storage"""
+
+    def test_overwrites_oldest_when_full(self):
+        """Vérifie l'ordre logique et l'écrasement du plus ancien échantillon"""
+        history = PriceHistory(3)
+        for i in range(5):
+            history.append(float(i), 100.0 + i, 0.5)
+        assert len(history) == 3
+        assert [sample[0] for sample in history] == [2.0, 3.0, 4.0]
+        assert history[0] == (2.0, 102.0, 0.5) and history[-1] == (4.0, 104.0, 0.5)
+        assert history.nbytes == 3 * 3 * 8  # 24 bytes per sample
+        with pytest.raises(IndexError):
+            history[3]
+
+    def test_clock_step_back_keeps_order(self):
+        """Vérifie qu'un retour d'horloge ne casse pas l'ordre des horodatages"""
+        history = PriceHistory(4)
+        history.append(10.0, 1.0, 0.5)
+        history.append(9.0, 2.0, 0.5)
+        assert [sample[0] for sample in history] == [10.0, 10.0]
+
+
+class TestLookback:
+    """Test binary-search queries"""
+
+    def test_matches_linear_scan(self):
+        """Vérifie que la recherche dichotomique égale un parcours linéaire, tampon circulaire plein"""
+        rng = random.Random(3)
+        history = PriceHistory(500)
+        t = 0.0
+        for _ in range(1300):
+            t += rng.uniform(0.5, 10)
+            history.append(t, rng.uniform(90, 110), rng.random())
+
+        samples = list(history)
+        for _ in range(200):
+            horizon = rng.uniform(0, 6000)
+            before = [s for s in samples if s[0] <= t - horizon]
+            expected = before[-1] if before else samples[0]
+            assert history.lookback(horizon) == expected
+
+    def test_empty_and_short_history(self):
+        """Vérifie les cas vide et historique plus court que l'horizon"""
+        history = PriceHistory(10)
+        assert history.lookback(300) is None
+        history.append(1000.0, 1.0, 0.4)
+        history.append(1100.0, 2.0, 0.5)
+        assert history.lookback(300) == (1000.0, 1.0, 0.4)
+        assert history.lookback(50, now=1160.0) == (1100.0, 2.0, 0.5)
+
+
+class TestOracleBaseline:
+    """Test monitor_fair_value on the ring"""
+
+    @pytest.mark.asyncio
+    async def test_baseline_is_five_minutes_ago(self):
+        """Vérifie que la variation est mesurée contre l'échantillon d'il y a 5 minutes"""
+        from crypto_oracle_v1_prod import CryptoOracle
+
+        with patch.dict(os.environ, {"POLY_PRIVATE_KEY": "0x" + "a" * 64}, clear=True):
+            with patch('crypto_oracle_v1_prod.ClobClient'):
+                oracle = CryptoOracle()
+
+        async def poly_price(market_id, outcome="YES"):
+            return 0.45
+        oracle.get_poly_price = poly_price
+
+        now = time.time()
+        history = oracle.price_history["m1_BTC/USDT"] = PriceHistory(oracle.config.price_history_max_samples)
+        history.append(now - 600, 90_000.0, 0.80)  # 10 min ago: not the baseline
+        history.append(now - 310, 100_000.0, 0.60)  # ~5 min ago
+        history.append(now - 60, 100_000.0, 0.55)
+
+        signal = await oracle.monitor_fair_value("m1", 100_000.0, datetime.now() + timedelta(days=30),
+                                                 spot_price=100_000.0)
+        assert signal.spot_change_pct == pytest.approx(0.0)
+        assert signal.poly_change_pct == pytest.approx(-25.0)
+        assert len(history) == 4
+
+
+# Run tests with: pytest tests/test_price_history.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
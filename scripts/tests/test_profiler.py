@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-demand sampling profiler
+- Collapsed stacks capture a busy thread
+- Profile file written on demand
+- HTTP trigger served by the metrics endpoint
+"""
+
+import os
+import sys
+import threading
+import urllib.request
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from metrics import start_metrics_server, stop_metrics_servers
+from profiler import SamplingProfiler, install_profiler, profile
+
+
+def _busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def _run_busy():
+    stop = threading.Event()
+    thread = threading.Thread(target=_busy_loop, args=(stop,), name="busy", daemon=True)
+    thread.start()
+    return stop, thread
+
+
+class TestSampler:
+    """Test stack sampling"""
+
+    def test_collapsed_stacks_capture_busy_thread(self):
+        """Vérifie que la pile du thread actif apparaît dans la sortie collapsed"""
+        stop, thread = _run_busy()
+        try:
+            profiler = SamplingProfiler(interval=0.002)
+            profiler.run(0.2)
+        finally:
+            stop.set()
+            thread.join()
+
+        assert profiler.samples > 10
+        lines = profiler.collapsed().splitlines()
+        busy = [line for line in lines if line.startswith("busy;") and "_busy_loop (test_profiler.py" in line]
+        assert busy
+        stack, count = busy[0].rsplit(" ", 1)
+        assert int(count) > 0
+        # The sampling thread never profiles itself
+        assert not any("run (profiler.py" in line for line in lines)
+
+
+class TestTriggers:
+    """Test file output and the HTTP trigger"""
+
+    def test_profile_writes_file(self, tmp_path):
+        """Vérifie que profile() écrit un fichier collapsed"""
+        stop, thread = _run_busy()
+        try:
+            path = profile(0.2, bot="unit", out_dir=tmp_path)
+        finally:
+            stop.set()
+            thread.join()
+
+        assert path is not None and path.parent == tmp_path
+        assert path.name.startswith("unit-") and path.suffix == ".collapsed"
+        assert "_busy_loop" in path.read_text()
+
+    def test_http_trigger(self, tmp_path, monkeypatch):
+        """Vérifie le déclenchement via /debug/profile sur le serveur de métriques"""
+        monkeypatch.setattr("profiler.PROFILE_DIR", tmp_path)
+        assert install_profiler("http_unit")
+        port = start_metrics_server(port=0)
+        try:
+            url = f"http://127.0.0.1:{port}/debug/profile?seconds=0.2"
+            with urllib.request.urlopen(url, timeout=10) as resp:
+                body = resp.read().decode()
+            assert resp.status == 200
+            assert "test_http_trigger (test_profiler.py" in body  # Caller blocked in urlopen
+            assert len(list(tmp_path.glob("http_unit-*.collapsed"))) == 1
+        finally:
+            stop_metrics_servers()
+
+
+# Run tests with: pytest tests/test_profiler.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
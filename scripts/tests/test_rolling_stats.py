@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the O(1) rolling statistics
+- Window mean / stdev / min / max against the statistics module
+- Numerical stability after millions of updates
+- SignalGenerator incremental z-score / Bollinger equal to the list path
+"""
+
+import os
+import random
+import statistics
+import sys
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from rolling_stats import RollingStats, mean_stdev
+
+
+class TestRollingStats:
+    """Test RollingStats against full recomputation"""
+
+    def test_matches_statistics_module(self):
+        """Vérifie moyenne, écart-type, min, max et EWMA fenêtre par fenêtre"""
+        rng = random.Random(3)
+        stats = RollingStats(window=50, ewma_span=10)
+        values, ewma = [], None
+        for i in range(2000):
+            x = rng.gauss(100, 5) if i % 300 else 1e6  # Outliers entering and leaving the window
+            stats.push(x)
+            values.append(x)
+            window = values[-50:]
+            alpha = 2 / 11
+            ewma = x if ewma is None else ewma + alpha * (x - ewma)
+
+            assert len(stats) == len(window)
+            assert stats.mean == pytest.approx(statistics.mean(window), rel=1e-9)
+            if len(window) > 1:
+                assert stats.stdev == pytest.approx(statistics.stdev(window), rel=1e-6)
+            assert (stats.min, stats.max) == (min(window), max(window))
+            assert stats.ewma == pytest.approx(ewma, rel=1e-9)
+
+        current = rng.gauss(100, 5)
+        mean, stdev = stats.stats_with(current)
+        assert mean == pytest.approx(statistics.mean(values[-50:] + [current]), rel=1e-9)
+        assert stdev == pytest.approx(statistics.stdev(values[-50:] + [current]), rel=1e-9)
+
+    def test_stable_after_many_updates(self):
+        """Vérifie l'absence de dérive sur un flux d'un million de prix proches de 100 000"""
+        rng = random.Random(7)
+        stats = RollingStats(window=1000)
+        for _ in range(1_000_000):
+            stats.push(100_000 + rng.random())
+        exact_mean, exact_stdev = mean_stdev(list(stats.values))
+        assert stats.mean == pytest.approx(exact_mean, rel=1e-12)
+        assert stats.stdev == pytest.approx(exact_stdev, rel=1e-6)
+
+    def test_flat_and_short_windows(self):
+        """Vérifie le z-score nul sur une fenêtre plate et les cas à 0 ou 1 valeur"""
+        stats = RollingStats(window=3)
+        assert stats.zscore(1.0) == 0.0 and stats.min is None
+        stats.extend([2.0, 2.0, 2.0, 2.0])
+        assert stats.variance == 0.0 and stats.zscore(5.0) == 0.0
+        assert mean_stdev([]) == (0.0, 0.0) and mean_stdev([4.0]) == (4.0, 0.0)
+        with pytest.raises(ValueError):
+            RollingStats(window=0)
+
+
+class TestSignalGenerator:
+    """Test the incremental SignalGenerator paths"""
+
+    def test_incremental_matches_list_path(self):
+        """Vérifie que z-score et Bollinger incrémentaux égalent le recalcul complet, bougie après bougie"""
+        from mean_reversion_bot import Candle, SignalGenerator, config
+
+        rng = random.Random(11)
+        start = datetime(2026, 1, 1)
+        price = 100_000.0
+        history = []
+        for i in range(200):
+            close = price * (1 + rng.gauss(0, 0.002))
+            history.append(Candle(start + timedelta(minutes=i), price, max(price, close),
+                                  min(price, close), close, rng.uniform(1, 10)))
+            price = close
+
+        generator = SignalGenerator(MagicMock())
+        for end in range(config.LOOKBACK_PERIOD, len(history) + 1):
+            candles = history[end - config.LOOKBACK_PERIOD:end]
+            # Forming candle updated twice before closing
+            for forming in (0.999, 1.0):
+                last = candles[-1]
+                candles[-1] = Candle(last.timestamp, last.open, last.high, last.low,
+                                     history[end - 1].close * forming, last.volume)
+                z, direction = generator.detect_volatility_spike(candles, "BTC")
+                z_list, direction_list = generator.detect_volatility_spike(candles)
+                assert z == pytest.approx(z_list, rel=1e-9, abs=1e-12) and direction == direction_list
+
+                bands = generator.calculate_bollinger_position(candles, symbol="BTC")
+                assert bands == pytest.approx(generator.calculate_bollinger_position(candles), rel=1e-9)
+
+        assert len(generator.candle_stats["BTC"].changes) == config.LOOKBACK_PERIOD - 1
+
+
+# Run tests with: pytest tests/test_rolling_stats.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
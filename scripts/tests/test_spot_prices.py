@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared spot price snapshot
+- One batched request per tick for every symbol and consumer
+- Timestamped cache and freshness window
+- CoinGecko fallback and Mean Reversion orders in the price updater
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, patch
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from spot_prices import SpotConfig, SpotPriceService, normalize_symbol
+from http_client import get_client, close_client
+from mock_polymarket_api import SPOT_PRICES, StandInConfig, StandInServer
+
+
+def _count(service: SpotPriceService, source: str) -> float:
+    return service._requests.labels(source=source).value
+
+
+class TestSnapshot:
+    """Test batching and caching against the stand-in server"""
+
+    def test_normalize_symbol(self):
+        """Vérifie que les variantes d'un symbole donnent la même clé"""
+        assert {normalize_symbol(s) for s in ("BTC/USDT", "BTCUSDT", "btc-usdt", "BTC")} == {"BTC/USDT"}
+        assert normalize_symbol("ETHUSDC") == "ETH/USDC"
+
+    @pytest.mark.asyncio
+    async def test_one_batched_request_per_tick(self):
+        """Vérifie qu'un tick partagé par plusieurs marchés ne fait qu'une requête"""
+        service = SpotPriceService(SpotConfig(max_age=60))
+        async with StandInServer(StandInConfig()) as server:
+            http = get_client()
+            http.set_base_url_overrides(server.url_overrides())
+            try:
+                before = _count(service, "binance")
+                # Ten markets on two symbols, asked concurrently
+                markets = ["BTC/USDT", "ETHUSDT"] * 5
+                results = await asyncio.gather(*(service.get(symbol) for symbol in markets))
+                assert _count(service, "binance") - before == 1
+
+                assert results[0] == pytest.approx(SPOT_PRICES["BTC"], rel=0.01)
+                assert results[1] == pytest.approx(SPOT_PRICES["ETH"], rel=0.01)
+                assert results[2] == results[0]  # Same snapshot
+                assert service.latest("BTCUSDT") == results[0]
+                assert service.quote("ETH/USDT").source == "binance"
+
+                # Fresh: served from the snapshot
+                await service.snapshot(["BTC/USDT", "ETH/USDT"])
+                assert _count(service, "binance") - before == 1
+
+                # Stale: BTC, ETH and the new SOL refreshed together
+                prices = await service.snapshot(["SOL/USDT", "BTC/USDT"], max_age=0)
+                assert _count(service, "binance") - before == 2
+                assert list(prices) == ["SOL/USDT", "BTC/USDT"]
+                assert prices["SOL/USDT"] == pytest.approx(SPOT_PRICES["SOL"], rel=0.01)
+            finally:
+                http.set_base_url_overrides({})
+                await close_client()
+
+    @pytest.mark.asyncio
+    async def test_coingecko_fills_binance_failure(self):
+        """Vérifie le repli CoinGecko en un seul appel quand Binance échoue"""
+        service = SpotPriceService()
+        calls = []
+
+        async def request(method, url, params=None, **kwargs):
+            calls.append((url, params))
+            if "binance" in url:
+                return 503, None
+            return 200, {"bitcoin": {"usd": 97000.0}, "ethereum": {"usd": 3400.0}}
+
+        with patch.object(get_client(), "request", AsyncMock(side_effect=request)):
+            prices = await service.snapshot(["BTC/USDT", "ETH/USDT", "ABC/USDT"])
+
+        assert prices == {"BTC/USDT": 97000.0, "ETH/USDT": 3400.0, "ABC/USDT": None}
+        assert len(calls) == 2
+        assert calls[1][1]["ids"] == "bitcoin,ethereum"
+        assert service.quote("BTC/USDT").source == "coingecko"
+        assert service.latest("BTC/USDT", max_age=-1) is None  # Older than asked
+
+    @pytest.mark.asyncio
+    async def test_invalid_symbol_does_not_fail_batch(self):
+        """Vérifie qu'un symbole invalide est écarté au lieu de renvoyer tout le lot vers CoinGecko"""
+        service = SpotPriceService(SpotConfig(max_age=60))
+        async with StandInServer(StandInConfig()) as server:
+            http = get_client()
+            http.set_base_url_overrides(server.url_overrides())
+            try:
+                before, fallback = _count(service, "binance"), _count(service, "coingecko")
+                prices = await service.snapshot(["BTC/USDT", "ETH/USDT", "DELISTED/USDT"])
+                # Batch rejected, then one request per symbol
+                assert _count(service, "binance") - before == 4
+                assert prices["BTC/USDT"] == pytest.approx(SPOT_PRICES["BTC"], rel=0.01)
+                assert prices["DELISTED/USDT"] is None
+                assert service.quote("ETH/USDT").source == "binance"
+                assert _count(service, "coingecko") == fallback
+
+                # Next tick: one batch without the rejected symbol
+                prices = await service.snapshot(["BTC/USDT", "ETH/USDT", "DELISTED/USDT"], max_age=0)
+                assert _count(service, "binance") - before == 5
+                assert service.quote("BTC/USDT").source == "binance"
+                assert prices["DELISTED/USDT"] is None
+
+                # Retried once invalid_retry has passed (watched ETH rides along)
+                service.config.invalid_retry = 0
+                await service.snapshot(["BTC/USDT", "DELISTED/USDT"], max_age=0)
+                assert _count(service, "binance") - before == 9
+            finally:
+                http.set_base_url_overrides({})
+                await close_client()
+
+    def test_invalid_symbol_sync(self):
+        """Vérifie le même repli symbole par symbole sur le chemin synchrone"""
+        service = SpotPriceService()
+        calls = []
+
+        class Response:
+            def __init__(self, status_code, body=None):
+                self.status_code, self.body = status_code, body
+
+            def json(self):
+                return self.body
+
+        class Session:
+            def get(self, url, params=None, timeout=None):
+                calls.append(params)
+                if "symbols" in params or params["symbol"] == "ABCUSDT":
+                    return Response(400, {"code": -1121, "msg": "Invalid symbol."})
+                return Response(200, {"symbol": params["symbol"], "price": "97000.0"})
+
+        prices = service.snapshot_sync(["BTC/USDT", "ABC/USDT"], session=Session())
+        assert prices == {"BTC/USDT": 97000.0, "ABC/USDT": None}
+        assert [p.get("symbol") for p in calls[1:]] == ["ABCUSDT", "BTCUSDT"]
+        assert "ABCUSDT" in service._invalid and "BTCUSDT" not in service._invalid
+
+
+class TestConsumers:
+    """Test the price updater path"""
+
+    @pytest.mark.asyncio
+    async def test_price_updater_mean_reversion_orders(self):
+        """Vérifie que les ordres Mean Reversion lisent le snapshot partagé"""
+        import price_updater as pu
+
+        orders = [{"id": str(i), "marketId": f"mr_{i}", "source": "MEAN_REVERSION",
+                   "marketTitle": "BTC Mean Reversion 15m", "entryPrice": 0.5} for i in range(5)]
+        assert pu.mean_reversion_symbol(orders[0]) == "BTC/USDT"
+        assert pu.mean_reversion_symbol({"marketTitle": "Will BTC hit 100k?"}) is None
+
+        service = SpotPriceService(SpotConfig(max_age=60))
+        with patch("price_updater.get_spot_service", return_value=service), \
+                patch.object(get_client(), "request", AsyncMock(return_value=(200, [{"symbol": "BTCUSDT", "price": "97000"}]))) as request:
+            prices = await asyncio.gather(*(pu.fetch_market_price(o["marketId"], o) for o in orders))
+
+        assert all(0.49 <= p <= 0.51 for p in prices)
+        assert request.await_count == 1
+        for order in orders:
+            pu.price_cache.pop(order["marketId"], None)
+
+
+# Run tests with: pytest tests/test_spot_prices.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
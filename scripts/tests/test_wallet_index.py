@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent smart wallet index
+- Cumulative PnL per wallet, markets counted once
+- Threshold query and persistence across restarts
+- Crypto Oracle refresh fetches only newly closed markets
+"""
+
+import os
+import sys
+import time
+from unittest.mock import patch
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from wallet_index import WalletIndex, WalletIndexConfig
+from crypto_oracle_v1_prod import CryptoOracle, OracleConfig
+
+ALICE = "0x" + "a" * 40
+BOB = "0x" + "b" * 40
+
+
+class TestWalletIndex:
+    """Test index updates and lookups"""
+
+    @pytest.fixture
+    def index(self, tmp_path):
+        index = WalletIndex(WalletIndexConfig(data_dir=tmp_path))
+        yield index
+        index.close()
+
+    def test_accumulates_pnl_once_per_market(self, index):
+        """Vérifie que le PnL est cumulé par portefeuille et qu'un marché n'est compté qu'une fois"""
+        assert index.add_market("m1", [{"address": ALICE.upper(), "realized_pnl": 8000},
+                                       {"address": BOB, "realized_pnl": -500}])
+        assert index.add_market("m2", [{"address": ALICE, "realized_pnl": 4000},
+                                       {"address": BOB, "realized_pnl": "bad"}])
+        assert not index.add_market("m1", [{"address": ALICE, "realized_pnl": 1e6}])
+
+        assert index.wallet_pnl(ALICE) == 12000
+        assert index.wallet_pnl(BOB) == -500
+        assert index.new_markets(["m1", "m3", "m2", "m3", None]) == ["m3"]
+
+    def test_threshold_lookup_and_persistence(self, tmp_path, index):
+        """Vérifie la requête par seuil et la relecture après redémarrage"""
+        index.add_market("m1", [{"address": ALICE, "realized_pnl": 15000},
+                                {"address": BOB, "realized_pnl": 11000}])
+        index.mark_refreshed(123.0)
+        index.close()
+
+        reopened = WalletIndex(WalletIndexConfig(data_dir=tmp_path))
+        assert reopened.smart_wallets(10000) == [ALICE, BOB]
+        assert reopened.smart_wallets(12000) == [ALICE]
+        assert reopened.stats() == {"wallets": 2, "markets": 1, "last_refresh": 123.0}
+        reopened.close()
+
+
+class TestOracleRefresh:
+    """Test incremental refresh from the Crypto Oracle"""
+
+    @staticmethod
+    def _oracle(tmp_path, closed_markets, calls):
+        with patch.dict(os.environ, {"POLY_PRIVATE_KEY": "0x" + "a" * 64}, clear=True):
+            with patch('crypto_oracle_v1_prod.ClobClient'):
+                oracle = CryptoOracle(OracleConfig(wallet_index_dir=str(tmp_path)))
+
+        async def fetch(url, params=None):
+            calls.append(url)
+            if url.endswith("/holders"):
+                market_id = url.rsplit("/", 2)[1]
+                return [{"address": ALICE, "realized_pnl": 6000}, {"address": f"0x{market_id}", "realized_pnl": 1}]
+            return [{"conditionId": market_id} for market_id in closed_markets]
+
+        oracle._fetch_with_rate_limit = fetch
+        return oracle
+
+    @pytest.mark.asyncio
+    async def test_refresh_is_incremental_and_survives_restart(self, tmp_path):
+        """Vérifie que seuls les nouveaux marchés fermés sont lus et que l'index sert au redémarrage"""
+        calls = []
+        oracle = self._oracle(tmp_path, ["m1", "m2"], calls)
+        assert await oracle.get_smart_wallets_async(10000) == [ALICE]
+        assert len([c for c in calls if c.endswith("/holders")]) == 2
+
+        # Restart within the TTL: answered from disk, no API call
+        calls.clear()
+        restarted = self._oracle(tmp_path, ["m1", "m2", "m3"], calls)
+        assert await restarted.get_smart_wallets_async(10000) == [ALICE]
+        assert calls == []
+
+        # Stale index: only the newly closed market is fetched
+        restarted.wallet_index.mark_refreshed(time.time() - 2 * restarted.config.smart_wallet_cache_ttl)
+        assert await restarted.get_smart_wallets_async(15000) == [ALICE]
+        assert [c for c in calls if c.endswith("/holders")] == [f"{restarted.config.gamma_api}/markets/m3/holders"]
+        assert restarted.wallet_index.wallet_pnl(ALICE) == 18000
+
+
+# Run tests with: pytest tests/test_wallet_index.py -v
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
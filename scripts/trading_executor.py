@@ -12,19 +12,23 @@ import logging
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 
+from http_client import get_client, close_client
+from lazy_imports import lazy_import, module_available
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-# Import PolymarketTrader only if real trading is enabled
+# PolymarketTrader (and the CLOB stack behind it) is imported when the
+# first TradingExecutor is built with real trading enabled
 ENABLE_REAL_TRADING = os.getenv("ENABLE_REAL_TRADING", "false").lower() == "true"
+PolymarketTrader = lazy_import("polymarket_trader", "PolymarketTrader")
 
 if ENABLE_REAL_TRADING:
-    try:
-        from polymarket_trader import PolymarketTrader
+    if module_available("py_clob_client"):
         logger.info("🔴 REAL TRADING MODE ENABLED")
-    except ImportError:
-        logger.error("❌ polymarket_trader.py not found! Falling back to paper trading")
+    else:
+        logger.error("❌ py_clob_client not installed! Falling back to paper trading")
         ENABLE_REAL_TRADING = False
 else:
     logger.info("📄 Paper Trading Mode (set ENABLE_REAL_TRADING=true for real execution)")
@@ -150,8 +154,6 @@ class TradingExecutor:
         market_question: str
     ) -> Dict[str, Any]:
         """Execute PAPER trade via existing API"""
-        import requests
-        
         try:
             logger.info("📄 Executing paper trade via API")
             
@@ -163,14 +165,14 @@ class TradingExecutor:
                 'market_question': market_question
             }
             
-            response = requests.post(
+            status, result = await get_client().post_json(
                 f"{self.api_base_url}/api/oracle/execute",
-                json=payload,
-                timeout=5
+                payload,
+                timeout=5,
+                rate_limit=False
             )
             
-            if response.status_code == 200:
-                result = response.json()
+            if status == 200:
                 return {
                     "success": True,
                     "mode": "PAPER",
@@ -180,7 +182,7 @@ class TradingExecutor:
                 return {
                     "success": False,
                     "mode": "PAPER",
-                    "error": f"API error: {response.status_code}"
+                    "error": f"API error: {status}"
                 }
                 
         except Exception as e:
@@ -198,10 +200,11 @@ class TradingExecutor:
         else:
             # Return paper balance from API
             try:
-                import requests
-                response = requests.get(f"{self.api_base_url}/api/paper-orders/profiles")
-                if response.ok:
-                    profiles = response.json().get("profiles", [])
+                data = await get_client().get_json(
+                    f"{self.api_base_url}/api/paper-orders/profiles", rate_limit=False
+                )
+                if data:
+                    profiles = data.get("profiles", [])
                     active = next((p for p in profiles if p.get("isActive")), None)
                     if active:
                         return active.get("balance", 1000.0)
@@ -213,6 +216,7 @@ class TradingExecutor:
         """Clean up"""
         if self.real_trader:
             await self.real_trader.close()
+        await close_client()
 
 
 # ============================================================================
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+PolygraalX Smart Wallet Index
+=============================
+SQLite (WAL) index of wallet realized PnL over closed crypto markets, so the
+Crypto Oracle doesn't rebuild its smart wallet set from every holder of 100
+markets each day and doesn't start cold after a restart.
+
+- One row per wallet: cumulative realized PnL, indexed, so the
+  min_smart_wallet_profit threshold is an index range scan
+- One row per market already counted: a refresh only fetches holders of
+  markets that closed since, and a market is never counted twice
+- last_refresh survives restarts: a fresh index answers at startup without
+  any API call
+
+Usage:
+    index = WalletIndex(WalletIndexConfig(data_dir=DATA_DIR))
+    new_ids = index.new_markets(closed_market_ids)
+    index.add_market(market_id, holders)      # [{"address", "realized_pnl"}, ...]
+    index.mark_refreshed()
+    wallets = index.smart_wallets(min_profit=10000)
+    python wallet_index.py --data-dir data --min-profit 10000
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger("WalletIndex")
+
+DATA_DIR = Path(os.getenv("DATA_DIR", os.path.join(os.getcwd(), "data")))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wallets (
+    address TEXT PRIMARY KEY,
+    realized_pnl REAL NOT NULL DEFAULT 0,
+    markets INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_wallets_pnl ON wallets(realized_pnl);
+CREATE TABLE IF NOT EXISTS markets (
+    market_id TEXT PRIMARY KEY,
+    holders INTEGER NOT NULL DEFAULT 0,
+    counted_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class WalletIndexConfig:
+    """Index location"""
+    data_dir: Path = DATA_DIR
+    db_name: str = "smart_wallets.db"
+
+    def __post_init__(self):
+        self.data_dir = Path(self.data_dir)
+
+    @property
+    def db_file(self) -> Path:
+        return self.data_dir / self.db_name
+
+
+def _pnl(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INDEX
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class WalletIndex:
+    """Cumulative realized PnL per wallet, built incrementally from closed markets"""
+
+    def __init__(self, config: WalletIndexConfig = None):
+        self.config = config or WalletIndexConfig()
+        self.config.data_dir.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.config.db_file), isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    # ─── Markets ───────────────────────────────────────────────────────────────
+
+    def new_markets(self, market_ids: Iterable[str]) -> List[str]:
+        """market_ids not counted yet, in input order"""
+        ids = list(dict.fromkeys(str(m) for m in market_ids if m))
+        if not ids:
+            return []
+        counted = set()
+        # Chunked to stay under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            counted.update(row[0] for row in self.db.execute(
+                f"SELECT market_id FROM markets WHERE market_id IN ({','.join('?' * len(chunk))})", chunk))
+        return [m for m in ids if m not in counted]
+
+    def add_market(self, market_id: str, holders: List[Dict]) -> bool:
+        """
+        Add one closed market's holders PnL in one transaction.
+        False if the market was already counted (nothing changes).
+        """
+        profits: Dict[str, float] = {}
+        for holder in holders:
+            addr = holder.get("address", "").lower()
+            if addr:
+                profits[addr] = profits.get(addr, 0) + _pnl(holder.get("realized_pnl", 0))
+
+        now = time.time()
+        with self.db:
+            self.db.execute("BEGIN")
+            inserted = self.db.execute(
+                "INSERT OR IGNORE INTO markets (market_id, holders, counted_at) VALUES (?, ?, ?)",
+                (str(market_id), len(profits), now),
+            ).rowcount
+            if not inserted:
+                return False
+            self.db.executemany(
+                """INSERT INTO wallets (address, realized_pnl, markets, updated_at) VALUES (?, ?, 1, ?)
+                   ON CONFLICT(address) DO UPDATE SET
+                       realized_pnl = realized_pnl + excluded.realized_pnl,
+                       markets = markets + 1, updated_at = excluded.updated_at""",
+                [(addr, pnl, now) for addr, pnl in profits.items()],
+            )
+        return True
+
+    # ─── Queries ───────────────────────────────────────────────────────────────
+
+    def smart_wallets(self, min_profit: float) -> List[str]:
+        """Wallets with cumulative realized PnL >= min_profit, best first"""
+        return [row[0] for row in self.db.execute(
+            "SELECT address FROM wallets WHERE realized_pnl >= ? ORDER BY realized_pnl DESC", (min_profit,))]
+
+    def wallet_pnl(self, address: str) -> Optional[float]:
+        row = self.db.execute("SELECT realized_pnl FROM wallets WHERE address = ?", (address.lower(),)).fetchone()
+        return row[0] if row else None
+
+    def stats(self) -> dict:
+        wallets = self.db.execute("SELECT COUNT(*) FROM wallets").fetchone()[0]
+        markets = self.db.execute("SELECT COUNT(*) FROM markets").fetchone()[0]
+        return {"wallets": wallets, "markets": markets, "last_refresh": self.last_refresh}
+
+    # ─── Refresh bookkeeping ───────────────────────────────────────────────────
+
+    @property
+    def last_refresh(self) -> float:
+        """Epoch of the last completed refresh (0 if never)"""
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'last_refresh'").fetchone()
+        return float(row[0]) if row else 0.0
+
+    def mark_refreshed(self, when: float = None):
+        self.db.execute(
+            "INSERT INTO meta (key, value) VALUES ('last_refresh', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (str(when if when is not None else time.time()),),
+        )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(description="PolygraalX smart wallet index")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--min-profit", type=float, default=10000)
+    parser.add_argument("--top", type=int, default=10, help="Print the N most profitable wallets")
+    args = parser.parse_args()
+
+    index = WalletIndex(WalletIndexConfig(data_dir=Path(args.data_dir)))
+    wallets = index.smart_wallets(args.min_profit)
+    print(json.dumps(dict(index.stats(), smart_wallets=len(wallets)), indent=2))
+    for address in wallets[:args.top]:
+        print(f"{address}  {index.wallet_pnl(address):>14,.2f}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,12 +11,20 @@ import aiohttp
 import os
 import sys
 import json
+import time
 from datetime import datetime, timezone
 from dataclasses import dataclass, asdict
 from typing import Optional, Dict, Set
 import argparse
 import random
 
+from http_client import HttpClient, get_client
+from lazy_imports import report_startup
+from log_pipeline import LogPipeline
+from market_catalog import get_catalog, is_active_market
+from metrics import cycle_histogram, queue_gauge, record_cache, signal_histogram, start_metrics_server
+from profiler import install_profiler
+
 # Configuration
 API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:3000')
 POLYMARKET_API = "https://clob.polymarket.com"
@@ -52,16 +60,25 @@ class WhaleTrackerV4:
     """Production whale tracker using Polymarket API"""
     
     def __init__(self):
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.http: Optional[HttpClient] = None
         self.wallet_cache: Dict[str, dict] = {}
         self.market_cache: Dict[str, dict] = {}
+        self.catalog = get_catalog()
         self.recent_trades_by_market: Dict[str, list] = {}  # For clustering
         self.processed_trades: Dict[str, float] = {}  # FIX: Trade IDs with timestamp
         self.running = True
+        self.cycle_timer = cycle_histogram("whale_tracker")
+        self.signal_timer = signal_histogram("whale_tracker")
+        self.pending_gauge = queue_gauge("whale_tracker", "pending_whale_trades")
+        # Dashboard log lines are batched off the hot path (see log())
+        self.log_pipeline = LogPipeline(self.ship_logs, bot="whale_tracker", name="dashboard_logs")
     
     async def start(self):
         """Start the tracker in PRODUCTION mode only"""
-        self.session = aiohttp.ClientSession()
+        self.http = get_client()
+        install_profiler("whale_tracker")
+        start_metrics_server("whale_tracker")
+        await self.log(report_startup("whale_tracker")["message"], "info")
         await self.log(f"🐋 Whale Tracker v4.0 - PRODUCTION", "info")
         await self.log(f"Threshold: ${WHALE_THRESHOLD:,.0f} | Poll: {POLL_INTERVAL}s", "info")
         
@@ -70,14 +87,16 @@ class WhaleTrackerV4:
         except Exception as e:
             await self.log(f"Fatal error: {e}", "error")
         finally:
-            if self.session:
-                await self.session.close()
+            await self.log_pipeline.aclose()
+            if self.http:
+                await self.http.close()
     
     async def run_production(self):
         """Poll Polymarket API for real trades"""
         await self.log("📡 Connecting to Polymarket API...", "info")
         
         while self.running:
+            cycle_started = time.perf_counter()
             try:
                 trades = await self.fetch_recent_trades()
                 await self.log(f"📊 Fetched {len(trades)} total trades from API", "info")
@@ -92,19 +111,23 @@ class WhaleTrackerV4:
                 current_time = datetime.now().timestamp()
                 self.processed_trades = {k: v for k, v in self.processed_trades.items() if current_time - v < 300}
                 
-                for trade in whale_trades:
+                for i, trade in enumerate(whale_trades):
+                    self.pending_gauge.set(len(whale_trades) - i)
                     # Use actual trade ID from CLOB API
                     trade_id = trade.get('id', '')
                     
                     if trade_id and trade_id not in self.processed_trades:
                         self.processed_trades[trade_id] = current_time
-                        await self.process_trade(trade)
+                        with self.signal_timer.time():
+                            await self.process_trade(trade)
+                self.pending_gauge.set(0)
                 
             except aiohttp.ClientError as e:
                 await self.log(f"API connection error: {e}", "error")
             except Exception as e:
                 await self.log(f"Error polling trades: {e}", "error")
             
+            self.cycle_timer.observe(time.perf_counter() - cycle_started)
             await asyncio.sleep(POLL_INTERVAL)
     
     async def fetch_recent_trades(self) -> list:
@@ -116,52 +139,50 @@ class WhaleTrackerV4:
                 'limit': 100,  # Last 100 trades
             }
             
-            async with self.session.get(url, params=params, timeout=10) as resp:
-                if resp.status == 200:
-                    trades_data = await resp.json()
-                    
-                    # Transform real trades to our format
-                    trades = []
-                    for trade in trades_data:
-                        try:
-                            # Data-API structure - market data is at TOP LEVEL, not nested!
-                            event_slug = trade.get('eventSlug', '')
-                            market_slug = trade.get('slug', '')
-                            
-                            # Build market URL - try eventSlug first, then slug
-                            if event_slug:
-                                market_url = f"https://polymarket.com/event/{event_slug}"
-                            elif market_slug:
-                                market_url = f"https://polymarket.com/event/{market_slug}"
-                            else:
-                                # Fallback to search
-                                title = trade.get('title', '')
-                                market_url = f"https://polymarket.com/markets?_q={title[:50]}" if title else None
-                            
-                            trades.append({
-                                'id': trade.get('transactionHash', ''),
-                                'maker': trade.get('proxyWallet', ''),
-                                'taker': trade.get('proxyWallet', ''),  # proxyWallet is the trader
-                                'asset_id': trade.get('conditionId', ''),
-                                'market': trade.get('slug', ''),
-                                'size': float(trade.get('size', 0)),
-                                'price': float(trade.get('price', 0)),
-                                'side': trade.get('side', 'BUY').upper(),
-                                'timestamp': trade.get('timestamp', ''),
-                                'market_question': trade.get('title', 'Unknown Market'),
-                                'market_slug': trade.get('slug', ''),
-                                'market_url': market_url,
-                                'market_image': trade.get('icon'),  # Market image/icon URL
-                                'outcome': trade.get('outcome', '')
-                            })
-                        except (ValueError, KeyError) as e:
-                            # Skip malformed trades
-                            continue
-                    
-                    return trades
-                else:
-                    await self.log(f"Data-API returned {resp.status}", "warning")
-                    return []
+            status, trades_data = await self.http.request("GET", url, params=params, timeout=10)
+            if status == 200:
+                # Transform real trades to our format
+                trades = []
+                for trade in trades_data:
+                    try:
+                        # Data-API structure - market data is at TOP LEVEL, not nested!
+                        event_slug = trade.get('eventSlug', '')
+                        market_slug = trade.get('slug', '')
+                        
+                        # Build market URL - try eventSlug first, then slug
+                        if event_slug:
+                            market_url = f"https://polymarket.com/event/{event_slug}"
+                        elif market_slug:
+                            market_url = f"https://polymarket.com/event/{market_slug}"
+                        else:
+                            # Fallback to search
+                            title = trade.get('title', '')
+                            market_url = f"https://polymarket.com/markets?_q={title[:50]}" if title else None
+                        
+                        trades.append({
+                            'id': trade.get('transactionHash', ''),
+                            'maker': trade.get('proxyWallet', ''),
+                            'taker': trade.get('proxyWallet', ''),  # proxyWallet is the trader
+                            'asset_id': trade.get('conditionId', ''),
+                            'market': trade.get('slug', ''),
+                            'size': float(trade.get('size', 0)),
+                            'price': float(trade.get('price', 0)),
+                            'side': trade.get('side', 'BUY').upper(),
+                            'timestamp': trade.get('timestamp', ''),
+                            'market_question': trade.get('title', 'Unknown Market'),
+                            'market_slug': trade.get('slug', ''),
+                            'market_url': market_url,
+                            'market_image': trade.get('icon'),  # Market image/icon URL
+                            'outcome': trade.get('outcome', '')
+                        })
+                    except (ValueError, KeyError) as e:
+                        # Skip malformed trades
+                        continue
+                
+                return trades
+            else:
+                await self.log(f"Data-API returned {status}", "warning")
+                return []
         except Exception as e:
             await self.log(f"Fetch error: {e}", "warning")
             return []
@@ -236,26 +257,34 @@ class WhaleTrackerV4:
     
     async def get_full_market_details(self, market_id: str) -> dict:
         """Get FULL market details from Gamma API"""
+        record_cache("whale_market", market_id in self.market_cache)
         if market_id in self.market_cache:
             return self.market_cache[market_id]
         
         try:
-            url = f"{GAMMA_API}/markets/{market_id}"
-            async with self.session.get(url, timeout=10) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    # Extract all useful fields
-                    market = {
-                        'question': data.get('question', 'Unknown'),
-                        'slug': data.get('slug', ''),
-                        'description': data.get('description', ''),
-                        'end_date': data.get('endDate'),
-                        'volume': data.get('volume', 0),
-                        'liquidity': data.get('liquidity', 0),
-                        'category': data.get('category', [])
-                    }
-                    self.market_cache[market_id] = market
-                    return market
+            # Shared catalog first (conditionId, slug or token id), API only on a miss
+            data = self.catalog.lookup(market_id)
+            if data is None:
+                await self.catalog.refresh()
+                data = self.catalog.lookup(market_id)
+            if data is None:
+                url = f"{GAMMA_API}/markets/{market_id}"
+                data = await self.http.get_json(url, timeout=10)
+                if data and is_active_market(data):
+                    self.catalog.upsert(data)  # Closed / resolved markets stay out of the active set
+            if data:
+                # Extract all useful fields
+                market = {
+                    'question': data.get('question', 'Unknown'),
+                    'slug': data.get('slug', ''),
+                    'description': data.get('description', ''),
+                    'end_date': data.get('endDate'),
+                    'volume': data.get('volume', 0),
+                    'liquidity': data.get('liquidity', 0),
+                    'category': data.get('category', [])
+                }
+                self.market_cache[market_id] = market
+                return market
         except Exception as e:
             await self.log(f"Market API error for {market_id}: {e}", "warning")
         
@@ -299,65 +328,66 @@ class WhaleTrackerV4:
     
     async def get_wallet_profile(self, address: str) -> dict:
         """Analyze wallet trading behavior from history"""
+        record_cache("whale_wallet", address in self.wallet_cache)
         if address in self.wallet_cache:
             return self.wallet_cache[address]
         
         try:
-            url = f"https://data-api.polymarket.com/trades?maker={address}&limit=100"
-            async with self.session.get(url, timeout=10) as resp:
-                if resp.status != 200:
-                    return {}
-                
-                trades = await resp.json()
-                
-                if not trades or len(trades) < 3:
-                    return {'trade_count': len(trades) if trades else 0}
-                
-                # Metrics
-                total_volume = 0
-                smart_trades = 0  # Good timing: buy <0.35 or sell >0.65
-                dumb_trades = 0   # Bad timing: buy >0.65 or sell <0.35
-                trade_count = len(trades)
-                
-                for trade in trades:
-                    try:
-                        size = float(trade.get('size', 0))
-                        price = float(trade.get('price', 0))
-                        side = trade.get('side', 'BUY').upper()
-                        
-                        trade_value = size * price
-                        total_volume += trade_value
-                        
-                        # Evaluate trade quality
-                        if side == 'BUY':
-                            if price < 0.35:
-                                smart_trades += 1  # Buying low = smart
-                            elif price > 0.65:
-                                dumb_trades += 1   # Buying high = dumb
-                        else:  # SELL
-                            if price > 0.65:
-                                smart_trades += 1  # Selling high = smart
-                            elif price < 0.35:
-                                dumb_trades += 1   # Selling low = dumb
-                                
-                    except (ValueError, KeyError, TypeError):
-                        continue
-                
-                smart_ratio = smart_trades / trade_count if trade_count > 0 else 0
-                dumb_ratio = dumb_trades / trade_count if trade_count > 0 else 0
-                
-                profile = {
-                    'volume': total_volume,
-                    'trade_count': trade_count,
-                    'smart_trades': smart_trades,
-                    'dumb_trades': dumb_trades,
-                    'smart_ratio': smart_ratio,
-                    'dumb_ratio': dumb_ratio,
-                }
-                
-                self.wallet_cache[address] = profile
-                return profile
-                
+            url = "https://data-api.polymarket.com/trades"
+            status, trades = await self.http.request(
+                "GET", url, params={'maker': address, 'limit': 100}, timeout=10
+            )
+            if status != 200:
+                return {}
+            
+            if not trades or len(trades) < 3:
+                return {'trade_count': len(trades) if trades else 0}
+            
+            # Metrics
+            total_volume = 0
+            smart_trades = 0  # Good timing: buy <0.35 or sell >0.65
+            dumb_trades = 0   # Bad timing: buy >0.65 or sell <0.35
+            trade_count = len(trades)
+            
+            for trade in trades:
+                try:
+                    size = float(trade.get('size', 0))
+                    price = float(trade.get('price', 0))
+                    side = trade.get('side', 'BUY').upper()
+                    
+                    trade_value = size * price
+                    total_volume += trade_value
+                    
+                    # Evaluate trade quality
+                    if side == 'BUY':
+                        if price < 0.35:
+                            smart_trades += 1  # Buying low = smart
+                        elif price > 0.65:
+                            dumb_trades += 1   # Buying high = dumb
+                    else:  # SELL
+                        if price > 0.65:
+                            smart_trades += 1  # Selling high = smart
+                        elif price < 0.35:
+                            dumb_trades += 1   # Selling low = dumb
+                            
+                except (ValueError, KeyError, TypeError):
+                    continue
+            
+            smart_ratio = smart_trades / trade_count if trade_count > 0 else 0
+            dumb_ratio = dumb_trades / trade_count if trade_count > 0 else 0
+            
+            profile = {
+                'volume': total_volume,
+                'trade_count': trade_count,
+                'smart_trades': smart_trades,
+                'dumb_trades': dumb_trades,
+                'smart_ratio': smart_ratio,
+                'dumb_ratio': dumb_ratio,
+            }
+            
+            self.wallet_cache[address] = profile
+            return profile
+            
         except Exception as e:
             await self.log(f"Profile error: {e}", "warning")
             return {}
@@ -413,32 +443,34 @@ class WhaleTrackerV4:
         """Send transaction to dashboard API"""
         try:
             url = f"{API_BASE_URL}/api/tracker/transactions"
-            async with self.session.post(
-                url,
-                json=asdict(tx),
-                timeout=5
-            ) as resp:
-                if resp.status != 200:
-                    await self.log(f"API error: {resp.status}", "warning")
+            status, _ = await self.http.post_json(url, asdict(tx), timeout=5, rate_limit=False)
+            if status != 200:
+                await self.log(f"API error: {status}", "warning")
         except Exception as e:
             await self.log(f"Failed to send to API: {e}", "warning")
     
     async def log(self, message: str, level: str = "info"):
-        """Log message to console and dashboard"""
+        """Log message to console and queue it for the dashboard (never waits on HTTP)"""
         timestamp = datetime.now().strftime("%H:%M:%S")
         icon = {"info": "ℹ️", "success": "✅", "warning": "⚠️", "error": "❌"}.get(level, "")
         print(f"[{timestamp}] {icon} {message}")
         
-        # Send to dashboard
-        try:
-            if self.session:
-                await self.session.post(
-                    f"{API_BASE_URL}/api/tracker/logs",
-                    json={"message": message, "level": level, "timestamp": timestamp},
-                    timeout=2
-                )
-        except Exception:
-            pass  # Don't fail on log errors
+        # Shipped in batches by the pipeline task once the HTTP client is up
+        self.log_pipeline.put({"message": message, "level": level, "timestamp": timestamp})
+        if self.http:
+            self.log_pipeline.start_async()
+    
+    async def ship_logs(self, batch: list, dropped: int):
+        """Send a batch of log lines to the dashboard in one POST"""
+        if dropped:
+            batch.append({
+                "message": f"{dropped} log lines dropped (backpressure)",
+                "level": "warning",
+                "timestamp": datetime.now().strftime("%H:%M:%S"),
+            })
+        status, _ = await self.http.post_json(f"{API_BASE_URL}/api/tracker/logs", batch, timeout=2, rate_limit=False)
+        if status != 200:
+            raise RuntimeError(f"dashboard returned {status}")
     
 
 
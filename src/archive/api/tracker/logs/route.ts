@@ -1,6 +1,6 @@
 /**
  * Whale Tracker API - Logs Endpoint
- * POST: Receive logs from Python tracker
+ * POST: Receive logs from Python tracker (one entry or a batch)
  * GET: Return logs for console display
  */
 
@@ -18,21 +18,25 @@ const logs: LogEntry[] = [];
 
 export async function POST(request: NextRequest) {
     try {
-        const log: LogEntry = await request.json();
-
-        // Add to beginning (newest first)
-        logs.unshift({
-            message: log.message,
-            level: log.level || 'info',
-            timestamp: log.timestamp || new Date().toISOString()
-        });
+        const body: LogEntry | LogEntry[] = await request.json();
+        // The tracker ships batches (oldest first); single entries are still accepted
+        const batch = Array.isArray(body) ? body : [body];
+
+        for (const log of batch) {
+            // Add to beginning (newest first)
+            logs.unshift({
+                message: log.message,
+                level: log.level || 'info',
+                timestamp: log.timestamp || new Date().toISOString()
+            });
+        }
 
         // Trim if over limit
         if (logs.length > MAX_LOGS) {
-            logs.pop();
+            logs.length = MAX_LOGS;
         }
 
-        return NextResponse.json({ success: true });
+        return NextResponse.json({ success: true, received: batch.length });
     } catch (error) {
         console.error('[Tracker Logs] Error:', error);
         return NextResponse.json({ error: 'Invalid log data' }, { status: 400 });